@@ -2,45 +2,117 @@
 
 from __future__ import annotations
 
-from datetime import UTC, datetime
-from typing import Annotated, cast
+import asyncio
+import inspect
+import json
+import time
+from collections.abc import AsyncIterator
+from datetime import UTC, date, datetime, timedelta
+from typing import Annotated, Any, BinaryIO, cast
 
-from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
+from starlette.datastructures import State
+from starlette.types import Receive, Scope, Send
 
+from ...config import Settings
 from ...schemas.dreams import (
     Dream,
     DreamCreate,
+    DreamGraph,
     DreamHighlights,
+    DreamImportResult,
+    DreamImportSummary,
+    DreamJournalBatchItem,
+    DreamJournalBatchRequest,
+    DreamJournalBatchResponse,
+    DreamJournalBatchResult,
+    DreamJournalJob,
     DreamJournalRequest,
     DreamJournalResponse,
     DreamListResponse,
+    DreamSimilarResponse,
     DreamTranscriptionRequest,
     DreamTranscriptionResponse,
+    DreamTrends,
     DreamUpdate,
+    ExportFormat,
+    SearchMode,
+    SimilarDream,
+    TagMatch,
+    TranscriptionSessionCreate,
+    TranscriptionSessionStatus,
+    TrendGranularity,
 )
-from ...services.dream_store import DreamStore
-from ...services.narrative import NarrativeEngine
+from ...services.dream_export import encode_export
+from ...services.dream_import import DreamDrafter, import_batches
+from ...services.dream_indexes import trend_period_count
+from ...services.dream_repository import (
+    AsyncDreamRepository,
+    AsyncDreamStore,
+    DreamRepository,
+    decode_cursor,
+    encode_cursor,
+)
+from ...services.journal_jobs import JournalJobQueue, QueueFullError
+from ...services.metrics import MetricsRegistry
+from ...services.narrative import NarrativeEngine, NarrativeResult
+from ...services.result_cache import cache_key
+from ...services.similarity import SimilarDreams
+from ...services.single_flight import SingleFlight
 from ...services.transcription import TranscriptionEngine, TranscriptionResult, decode_audio
+from ...services.transcription_sessions import (
+    SessionLimitError,
+    TranscriptionSession,
+    TranscriptionSessionManager,
+)
+from ...services.uploads import (
+    UploadTooLargeError,
+    limit_stream,
+    multipart_upload,
+    spool_body,
+)
 
 router = APIRouter()
 
+_QUEUE_RETRY_AFTER_SECONDS = 5
+_BINARY_SCHEMA = {"schema": {"type": "string", "format": "binary"}}
+_SIMILARITY_BATCH = 256
+_MAX_TREND_BUCKETS = 1_000
+_DEFAULT_TREND_DAYS = 365
+_EXPORT_MEDIA_TYPES: dict[ExportFormat, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
 
-def get_store(request: Request) -> DreamStore:
+
+def get_store(request: Request) -> AsyncDreamRepository:
     """Return the dream store attached to the FastAPI application."""
 
-    store = getattr(request.app.state, "dream_store", None)
+    return _store_from(request.app.state)
+
+
+def _store_from(state: State) -> AsyncDreamRepository:
+    store = getattr(state, "dream_store", None)
     if store is None:
         raise RuntimeError("Dream store is not initialised on the application state")
-    if not isinstance(store, DreamStore):
+    if inspect.iscoroutinefunction(getattr(store, "create", None)):
+        return cast(AsyncDreamRepository, store)
+    if not isinstance(store, DreamRepository):
         raise RuntimeError("Invalid dream store configured on the application state")
-    return store
+    return AsyncDreamStore(store, offload=getattr(store, "blocking", False))
 
 
 def get_narrative_engine(request: Request) -> NarrativeEngine:
     """Return the configured narrative engine."""
 
-    engine = getattr(request.app.state, "narrative_engine", None)
+    return _narrative_engine_from(request.app.state)
+
+
+def _narrative_engine_from(state: State) -> NarrativeEngine:
+    engine = getattr(state, "narrative_engine", None)
     if engine is None:
         raise RuntimeError("Narrative engine is not configured on the application state")
     if not isinstance(engine, NarrativeEngine) and not hasattr(engine, "journal"):
@@ -54,7 +126,11 @@ def get_narrative_engine(request: Request) -> NarrativeEngine:
 def get_transcription_engine(request: Request) -> TranscriptionEngine:
     """Return the configured transcription engine."""
 
-    engine = getattr(request.app.state, "transcription_engine", None)
+    return _transcription_engine_from(request.app.state)
+
+
+def _transcription_engine_from(state: State) -> TranscriptionEngine:
+    engine = getattr(state, "transcription_engine", None)
     if engine is None:
         raise RuntimeError("Transcription engine is not configured on the application state")
     if not isinstance(engine, TranscriptionEngine) and not hasattr(engine, "transcribe"):
@@ -65,9 +141,103 @@ def get_transcription_engine(request: Request) -> TranscriptionEngine:
     return cast(TranscriptionEngine, engine)
 
 
-StoreDependency = Annotated[DreamStore, Depends(get_store)]
+def get_metrics(request: Request) -> MetricsRegistry:
+    """Return the metrics registry attached to the application."""
+
+    metrics = getattr(request.app.state, "metrics", None)
+    if not isinstance(metrics, MetricsRegistry):
+        raise RuntimeError("Metrics registry is not configured on the application state")
+    return metrics
+
+
+def get_journal_flights(request: Request) -> SingleFlight[DreamJournalResponse]:
+    """Return the coalescer shared by concurrent identical journal requests."""
+
+    return _journal_flights_from(request.app.state)
+
+
+def _journal_flights_from(state: State) -> SingleFlight[DreamJournalResponse]:
+    flights = getattr(state, "journal_flights", None)
+    if not isinstance(flights, SingleFlight):
+        raise RuntimeError("Journal coalescer is not configured on the application state")
+    return cast(SingleFlight[DreamJournalResponse], flights)
+
+
+def get_journal_jobs(request: Request) -> JournalJobQueue:
+    """Return the background journal queue attached to the application."""
+
+    jobs = getattr(request.app.state, "journal_jobs", None)
+    if not isinstance(jobs, JournalJobQueue):
+        raise RuntimeError("Journal job queue is not configured on the application state")
+    return jobs
+
+
+def get_transcription_sessions(request: Request) -> TranscriptionSessionManager:
+    """Return the manager of live transcription sessions."""
+
+    sessions = getattr(request.app.state, "transcription_sessions", None)
+    if not isinstance(sessions, TranscriptionSessionManager):
+        raise RuntimeError("Transcription sessions are not configured on the application state")
+    return sessions
+
+
+def get_similar_dreams(request: Request) -> SimilarDreams:
+    """Return the similar-dream index attached to the application."""
+
+    return _similar_dreams_from(request.app.state)
+
+
+def _similar_dreams_from(state: State) -> SimilarDreams:
+    similar = getattr(state, "similar_dreams", None)
+    if not isinstance(similar, SimilarDreams):
+        raise RuntimeError("Similar-dream index is not configured on the application state")
+    return similar
+
+
+def get_dream_drafter(request: Request) -> DreamDrafter:
+    """Return the worker pool that drafts imported dreams."""
+
+    drafter = getattr(request.app.state, "dream_drafter", None)
+    if not isinstance(drafter, DreamDrafter):
+        raise RuntimeError("Dream drafter is not configured on the application state")
+    return drafter
+
+
+def get_settings(request: Request) -> Settings:
+    """Return the settings the application was created with."""
+
+    settings = getattr(request.app.state, "settings", None)
+    if not isinstance(settings, Settings):
+        raise RuntimeError("Settings are not configured on the application state")
+    return settings
+
+
+StoreDependency = Annotated[AsyncDreamRepository, Depends(get_store)]
 NarrativeDependency = Annotated[NarrativeEngine, Depends(get_narrative_engine)]
 TranscriptionDependency = Annotated[TranscriptionEngine, Depends(get_transcription_engine)]
+MetricsDependency = Annotated[MetricsRegistry, Depends(get_metrics)]
+JournalFlightsDependency = Annotated[
+    SingleFlight[DreamJournalResponse], Depends(get_journal_flights)
+]
+JournalJobsDependency = Annotated[JournalJobQueue, Depends(get_journal_jobs)]
+SettingsDependency = Annotated[Settings, Depends(get_settings)]
+SessionsDependency = Annotated[TranscriptionSessionManager, Depends(get_transcription_sessions)]
+SimilarDependency = Annotated[SimilarDreams, Depends(get_similar_dreams)]
+DrafterDependency = Annotated[DreamDrafter, Depends(get_dream_drafter)]
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """Stream a response while the content iterator is still reading the request body.
+
+    ``StreamingResponse`` consumes ``receive`` to watch for disconnects, which
+    would swallow the body chunks; ``Request.stream`` raises ``ClientDisconnect``
+    itself when the client goes away.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
 
 
 class DreamListFilters(BaseModel):
@@ -76,10 +246,25 @@ class DreamListFilters(BaseModel):
     tag: str | None = Field(
         default=None, description="Filter dreams that include the provided tag"
     )
+    tags: str | None = Field(
+        default=None,
+        description="Comma-separated tags combined according to `tag_match`",
+    )
+    tag_match: TagMatch = Field(
+        default="all",
+        description="Require all of `tags` (`all`) or at least one of them (`any`)",
+    )
     query: str | None = Field(
         default=None,
         description="Search recorded dreams by title, transcript, summary, or journal",
     )
+    search: SearchMode = Field(
+        default="tokens",
+        description=(
+            "`tokens` matches indexed words (last word as a prefix) newest first, "
+            "`ranked` orders those matches by relevance, `substring` matches raw text"
+        ),
+    )
     mood: str | None = Field(default=None, description="Filter by the recorded mood")
     start: datetime | None = Field(
         default=None, description="Limit to dreams recorded after this time"
@@ -93,97 +278,757 @@ class DreamListFilters(BaseModel):
         le=100,
         description="Number of items to return",
     )
+    cursor: str | None = Field(
+        default=None,
+        description="`next_cursor` of the previous page; not supported with `search=ranked`",
+    )
+    include_total: bool = Field(
+        default=True, description="Count every match; disable to skip the count on each page"
+    )
+
+    def tag_list(self) -> list[str]:
+        """Return the individual tags supplied through ``tags``."""
+
+        if not self.tags:
+            return []
+        return [item for item in (part.strip() for part in self.tags.split(",")) if item]
 
 
 FiltersDependency = Annotated[DreamListFilters, Depends()]
 
 
+class DreamGraphOptions(BaseModel):
+    """Pruning and window options accepted when drawing the dream map."""
+
+    motifs: int = Field(
+        default=25, ge=1, le=100, description="Number of most frequent motifs to draw"
+    )
+    edges: int = Field(
+        default=50,
+        ge=0,
+        le=500,
+        description="Maximum co-occurrence edges, and separately maximum dream links",
+    )
+    dreams_per_motif: int = Field(
+        default=3, ge=0, le=10, description="Newest dreams drawn next to each motif"
+    )
+    start: date | None = Field(default=None, description="First UTC day of the window")
+    end: date | None = Field(default=None, description="Last UTC day of the window, inclusive")
+
+
+GraphOptionsDependency = Annotated[DreamGraphOptions, Depends()]
+
+
+class DreamTrendOptions(BaseModel):
+    """Window and bucket options accepted when reading dream trends."""
+
+    granularity: TrendGranularity = Field(
+        default="week", description="Bucket size: UTC `day`, ISO `week` or calendar `month`"
+    )
+    start: date | None = Field(
+        default=None, description="First UTC day of the window; defaults to 365 days before `end`"
+    )
+    end: date | None = Field(
+        default=None, description="Last UTC day of the window, inclusive; defaults to today"
+    )
+    motifs: int = Field(
+        default=5, ge=0, le=50, description="Number of most frequent tags tracked per bucket"
+    )
+
+    def window(self) -> tuple[date, date]:
+        """Return the requested window with defaults applied."""
+
+        end = self.end or datetime.now(UTC).date()
+        if self.start is not None:
+            return self.start, end
+        return end - min(timedelta(days=_DEFAULT_TREND_DAYS - 1), end - date.min), end
+
+
+TrendOptionsDependency = Annotated[DreamTrendOptions, Depends()]
+
+
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=Dream)
-async def create_dream(payload: DreamCreate, store: StoreDependency) -> Dream:
+async def create_dream(
+    payload: DreamCreate, store: StoreDependency, similar: SimilarDependency
+) -> Dream:
     """Create a dream entry and return the stored representation."""
 
-    return store.create(payload)
+    dream = await store.create(payload)
+    await similar.add([dream])
+    return dream
+
+
+@router.post(
+    "/import",
+    response_class=StreamingResponse,
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/x-ndjson": {"schema": {"type": "string"}}},
+            "required": True,
+        }
+    },
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def import_dreams(
+    request: Request,
+    store: StoreDependency,
+    similar: SimilarDependency,
+    drafter: DrafterDependency,
+    settings: SettingsDependency,
+) -> StreamingResponse:
+    """Import an NDJSON archive holding one dream per line.
+
+    Each line is a ``POST /dreams/`` payload plus the dream's original
+    ``created_at``, which is kept. The body is parsed as it arrives; every
+    ``import_batch_size`` lines are drafted across worker processes and stored
+    in a single write. The response streams ``{"line", "dream_id"}`` or
+    ``{"line", "error"}`` for each non-blank line in order, then a final
+    ``{"imported", "failed"}`` line.
+    """
+
+    async def results() -> AsyncIterator[str]:
+        imported = failed = 0
+        batches = import_batches(
+            request.stream(),
+            batch_size=max(1, settings.import_batch_size),
+            max_line_bytes=settings.import_max_line_bytes,
+        )
+        async for batch in batches:
+            items = [item for _, item in batch if not isinstance(item, str)]
+            dreams = await store.import_dreams(await drafter.draft(items))
+            await similar.add(dreams)
+            identifiers = iter(dream.id for dream in dreams)
+            lines = []
+            for number, item in batch:
+                if isinstance(item, str):
+                    failed += 1
+                    result = DreamImportResult(line=number, error=item)
+                else:
+                    imported += 1
+                    result = DreamImportResult(line=number, dream_id=next(identifiers))
+                lines.append(result.model_dump_json(exclude_none=True))
+            yield "\n".join(lines) + "\n"
+        yield DreamImportSummary(imported=imported, failed=failed).model_dump_json() + "\n"
+
+    return _DuplexStreamingResponse(results(), media_type="application/x-ndjson")
 
 
 @router.get("/", response_model=DreamListResponse)
-async def list_dreams(store: StoreDependency, filters: FiltersDependency) -> DreamListResponse:
-    """Return recorded dreams optionally filtered by tag."""
+async def list_dreams(
+    request: Request, response: Response, store: StoreDependency, filters: FiltersDependency
+) -> DreamListResponse | Response:
+    """Return recorded dreams optionally filtered by tag.
 
-    dreams = store.list(
+    Pages are keyed on ``(created_at, id)``: passing the previous ``next_cursor``
+    resumes right after its last dream, so each page costs O(limit) however deep
+    the client scrolls.
+
+    The ETag combines the store version with a digest of the filters, so a poll
+    with a matching ``If-None-Match`` gets a 304 without listing anything.
+    """
+
+    etag = _etag(
+        "dreams", store.epoch, await store.version(), cache_key(filters.model_dump_json())[:16]
+    )
+    if _not_modified(request, etag):
+        return _unchanged(etag)
+    _tag_response(response, etag)
+
+    after = None
+    if filters.cursor is not None:
+        if filters.search == "ranked":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursors are not supported for ranked search",
+            )
+        try:
+            after = decode_cursor(filters.cursor)
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+            ) from exc
+
+    page = await store.list(
         tag=filters.tag,
+        tags=filters.tag_list(),
+        tag_match=filters.tag_match,
         query=filters.query,
+        search=filters.search,
         mood=filters.mood,
         start=filters.start,
         end=filters.end,
+        limit=filters.limit,
+        after=after,
+        count_total=filters.include_total,
     )
-    return DreamListResponse(dreams=dreams[: filters.limit], total=len(dreams))
+    next_cursor = None
+    if page.has_more and page.dreams and filters.search != "ranked":
+        next_cursor = encode_cursor(page.dreams[-1])
+    return DreamListResponse(dreams=page.dreams, total=page.total, next_cursor=next_cursor)
 
 
 @router.get("/highlights", response_model=DreamHighlights)
-async def get_highlights(store: StoreDependency) -> DreamHighlights:
+async def get_highlights(
+    request: Request, response: Response, store: StoreDependency
+) -> DreamHighlights | Response:
     """Return aggregate insight for recorded dreams."""
 
-    return store.highlights()
+    etag = _etag("highlights", store.epoch, await store.version())
+    if _not_modified(request, etag):
+        return _unchanged(etag)
+    _tag_response(response, etag)
+    return await store.highlights()
+
+
+@router.get("/graph", response_model=DreamGraph)
+async def get_graph(
+    request: Request, response: Response, store: StoreDependency, options: GraphOptionsDependency
+) -> DreamGraph | Response:
+    """Return the dream map: the strongest motifs, how they co-occur, and recent dreams.
+
+    The store keeps co-occurrence counts up to date on every write, so drawing
+    the map costs the same for a fixed ``motifs`` however many dreams exist; a
+    window adds the days it spans.
+    """
+
+    etag = _etag(
+        "graph", store.epoch, await store.version(), cache_key(options.model_dump_json())[:16]
+    )
+    if _not_modified(request, etag):
+        return _unchanged(etag)
+    _tag_response(response, etag)
+    return await store.graph(
+        motifs=options.motifs,
+        edges=options.edges,
+        dreams_per_motif=options.dreams_per_motif,
+        start=options.start,
+        end=options.end,
+    )
+
+
+@router.get("/trends", response_model=DreamTrends)
+async def get_trends(
+    request: Request, response: Response, store: StoreDependency, options: TrendOptionsDependency
+) -> DreamTrends | Response:
+    """Return dream frequency, mood distribution and motif counts per period.
+
+    Stores keep day, week and month rollups up to date on every write, so a
+    window is answered by merging one bucket per period rather than scanning the
+    dreams recorded in it.
+    """
+
+    start, end = options.window()
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="start must not be after end"
+        )
+    if trend_period_count(start, end, options.granularity) > _MAX_TREND_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Windows are limited to {_MAX_TREND_BUCKETS} {options.granularity} buckets",
+        )
+    resolved = options.model_copy(update={"start": start, "end": end})
+    etag = _etag(
+        "trends", store.epoch, await store.version(), cache_key(resolved.model_dump_json())[:16]
+    )
+    if _not_modified(request, etag):
+        return _unchanged(etag)
+    _tag_response(response, etag)
+    return await store.trends(
+        granularity=options.granularity, start=start, end=end, motifs=options.motifs
+    )
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {
+                "application/x-ndjson": {},
+                "text/csv": {},
+                "application/gzip": {},
+            }
+        }
+    },
+)
+async def export_dreams(
+    store: StoreDependency,
+    export_format: Annotated[ExportFormat, Query(alias="format")] = "ndjson",
+    compress: bool = False,
+) -> StreamingResponse:
+    """Download every dream, oldest first, as NDJSON or CSV.
+
+    The archive is read from one consistent snapshot of the store and encoded
+    a row at a time, optionally gzip-compressed on the fly, so memory use does
+    not grow with the number of dreams. NDJSON exports can be fed straight back
+    to ``POST /dreams/import``.
+    """
+
+    filename = f"dreams.{export_format}"
+    media_type = _EXPORT_MEDIA_TYPES[export_format]
+    if compress:
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        encode_export(store.export(), export_format=export_format, compress=compress),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.get("/{dream_id}", response_model=Dream)
-async def get_dream(dream_id: str, store: StoreDependency) -> Dream:
-    """Return the details of a single dream."""
+async def get_dream(
+    dream_id: str, request: Request, response: Response, store: StoreDependency
+) -> Dream | Response:
+    """Return the details of a single dream, tagged with the dream's own version."""
 
-    dream = store.get(dream_id)
+    version = await store.dream_version(dream_id)
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dream not found")
+    etag = _etag("dream", store.epoch, dream_id, version)
+    if _not_modified(request, etag):
+        return _unchanged(etag)
+    dream = await store.get(dream_id)
     if dream is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dream not found")
+    _tag_response(response, etag)
     return dream
 
 
 @router.put("/{dream_id}", response_model=Dream)
-async def update_dream(dream_id: str, payload: DreamUpdate, store: StoreDependency) -> Dream:
+async def update_dream(
+    dream_id: str, payload: DreamUpdate, store: StoreDependency, similar: SimilarDependency
+) -> Dream:
     """Update an existing dream entry."""
 
-    dream = store.update(dream_id, payload)
+    dream = await store.update(dream_id, payload)
     if dream is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dream not found")
+    await similar.add([dream])
     return dream
 
 
 @router.delete("/{dream_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_dream(dream_id: str, store: StoreDependency) -> Response:
+async def delete_dream(
+    dream_id: str, store: StoreDependency, similar: SimilarDependency
+) -> Response:
     """Delete an existing dream entry."""
 
-    removed = store.delete(dream_id)
+    removed = await store.delete(dream_id)
     if not removed:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dream not found")
+    similar.discard(dream_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get("/{dream_id}/similar", response_model=DreamSimilarResponse)
+async def get_similar(
+    dream_id: str,
+    store: StoreDependency,
+    similar: SimilarDependency,
+    limit: Annotated[int, Query(ge=1, le=50, description="Number of dreams to return")] = 10,
+) -> DreamSimilarResponse:
+    """Return the dreams whose content is closest to the given dream.
+
+    The dream is re-indexed first, which is a no-op unless its text changed
+    without passing through this process. Matches deleted elsewhere are dropped
+    from the index as they are found.
+    """
+
+    dream = await store.get(dream_id)
+    if dream is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dream not found")
+    await similar.add([dream])
+    results: list[SimilarDream] = []
+    for match_id, score in similar.similar(dream_id, limit):
+        match = await store.get(match_id)
+        if match is None:
+            similar.discard(match_id)
+            continue
+        results.append(SimilarDream(dream=match, score=score))
+    return DreamSimilarResponse(dreams=results)
+
+
+@router.post(
+    "/transcribe/upload",
+    response_model=DreamTranscriptionResponse,
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {
+                            "file": {"type": "string", "format": "binary"},
+                            "prompt": {"type": "string"},
+                        },
+                        "required": ["file"],
+                    }
+                },
+                "application/octet-stream": _BINARY_SCHEMA,
+            },
+            "required": True,
+        }
+    },
+)
+async def upload_audio(
+    request: Request,
+    engine: TranscriptionDependency,
+    settings: SettingsDependency,
+    prompt: Annotated[
+        str | None, Query(description="Optional guiding phrases for the transcription")
+    ] = None,
+    segmented: Annotated[
+        bool, Query(description="Transcribe long audio as overlapping parallel segments")
+    ] = False,
+) -> DreamTranscriptionResponse:
+    """Transcribe audio streamed as a multipart ``file`` part or as the raw body.
+
+    The body is spooled to a temporary file while it arrives and the file handle
+    is passed to the engine, so the audio is never held in memory as a whole.
+    Uploads larger than ``transcription_max_upload_bytes`` are rejected with 413.
+    With ``segmented=true`` WAV or ``audio/L16`` recordings longer than one segment
+    are split on sample frames and transcribed concurrently; other formats are
+    transcribed whole. The format is detected from the audio, falling back to the
+    part's or body's content type.
+    """
+
+    max_bytes = settings.transcription_max_upload_bytes
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > max_bytes:
+        raise _upload_too_large(max_bytes)
+
+    try:
+        if request.headers.get("content-type", "").startswith("multipart/form-data"):
+            upload, form_prompt = await multipart_upload(
+                request.headers,
+                request.stream(),
+                max_bytes=max_bytes,
+                spool_bytes=settings.transcription_spool_bytes,
+            )
+            audio = upload.file
+            content_type = upload.content_type
+            prompt = prompt or form_prompt
+        else:
+            content_type = request.headers.get("content-type")
+            audio = await spool_body(
+                request.stream(),
+                max_bytes=max_bytes,
+                spool_bytes=settings.transcription_spool_bytes,
+            )
+    except UploadTooLargeError as exc:
+        raise _upload_too_large(max_bytes) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    with audio:
+        try:
+            if segmented and hasattr(engine, "atranscribe_segmented"):
+                result = await engine.atranscribe_segmented(
+                    file=audio,
+                    prompt=prompt,
+                    segment_bytes=settings.transcription_segment_bytes,
+                    overlap_bytes=settings.transcription_overlap_bytes,
+                    concurrency=settings.transcription_concurrency,
+                    content_type=content_type,
+                )
+            else:
+                result = await _transcribe_file(
+                    engine, file=audio, prompt=prompt, content_type=content_type
+                )
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return DreamTranscriptionResponse(
+        transcript=result.transcript,
+        engine=result.engine,
+        confidence=result.confidence,
+        cached=getattr(result, "cached", False),
+    )
+
+
+@router.post(
+    "/transcribe/sessions",
+    status_code=status.HTTP_201_CREATED,
+    response_model=TranscriptionSessionStatus,
+)
+async def open_transcription_session(
+    payload: TranscriptionSessionCreate, sessions: SessionsDependency
+) -> TranscriptionSessionStatus:
+    """Start a live session that transcribes audio chunks while recording continues."""
+
+    try:
+        session = sessions.open(prompt=payload.prompt, content_type=payload.content_type)
+    except SessionLimitError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(exc)
+        ) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return _session_status(session)
+
+
+@router.post(
+    "/transcribe/sessions/{session_id}/chunks",
+    response_model=TranscriptionSessionStatus,
+    openapi_extra={
+        "requestBody": {"content": {"application/octet-stream": _BINARY_SCHEMA}, "required": True}
+    },
+)
+async def append_transcription_chunk(
+    session_id: str, request: Request, sessions: SessionsDependency
+) -> TranscriptionSessionStatus:
+    """Append recorded audio sent as the raw body; completed segments start transcribing."""
+
+    session = _open_session(sessions, session_id)
+    try:
+        chunk = b"".join(
+            [
+                part
+                async for part in limit_stream(
+                    request.stream(), max_bytes=sessions.remaining_bytes(session)
+                )
+            ]
+        )
+        sessions.append(session, chunk)
+    except UploadTooLargeError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(exc)
+        ) from exc
+    return _session_status(session)
+
+
+@router.get("/transcribe/sessions/{session_id}", response_model=TranscriptionSessionStatus)
+async def get_transcription_session(
+    session_id: str, sessions: SessionsDependency
+) -> TranscriptionSessionStatus:
+    """Return the partial transcript of an open session."""
+
+    return _session_status(_open_session(sessions, session_id))
+
+
+@router.post(
+    "/transcribe/sessions/{session_id}/finalize", response_model=DreamTranscriptionResponse
+)
+async def finalize_transcription_session(
+    session_id: str, sessions: SessionsDependency
+) -> DreamTranscriptionResponse:
+    """Transcribe the audio after the last full segment and return the whole transcript."""
+
+    session = _open_session(sessions, session_id)
+    try:
+        result = await sessions.finalize(session)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    except RuntimeError as exc:
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc)) from exc
+    return DreamTranscriptionResponse(
+        transcript=result.transcript,
+        engine=result.engine,
+        confidence=result.confidence,
+        cached=getattr(result, "cached", False),
+    )
+
+
+@router.delete("/transcribe/sessions/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def close_transcription_session(session_id: str, sessions: SessionsDependency) -> Response:
+    """Discard a session without finalising it."""
+
+    sessions.close(_open_session(sessions, session_id))
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
-@router.post("/{dream_id}/journal", response_model=DreamJournalResponse)
+async def transcribe_session_segment(
+    state: State, audio: bytes, prompt: str | None, filename: str
+) -> TranscriptionResult:
+    """Transcribe one segment of a live session with the configured engine."""
+
+    return await _transcribe(
+        _transcription_engine_from(state), audio=audio, prompt=prompt, filename=filename
+    )
+
+
+@router.post("/journal/batch", response_model=DreamJournalBatchResponse)
+async def generate_journal_batch(
+    payload: DreamJournalBatchRequest,
+    store: StoreDependency,
+    engine: NarrativeDependency,
+    flights: JournalFlightsDependency,
+    settings: SettingsDependency,
+) -> DreamJournalBatchResponse:
+    """Generate journals for several dreams with bounded concurrency.
+
+    Items are processed independently: a missing dream or a failed generation is
+    reported on its own result without affecting the rest of the batch.
+    """
+
+    slots = asyncio.Semaphore(max(1, settings.journal_batch_concurrency))
+
+    async def generate(item: DreamJournalBatchItem) -> DreamJournalBatchResult:
+        async with slots:
+            dream = await store.get(item.dream_id)
+            if dream is None:
+                return DreamJournalBatchResult(dream_id=item.dream_id, error="Dream not found")
+            try:
+                result = await _journal(store, engine, flights, dream, item)
+            except Exception as exc:  # failures are reported per item
+                return DreamJournalBatchResult(
+                    dream_id=item.dream_id, error=str(exc) or type(exc).__name__
+                )
+            return DreamJournalBatchResult(dream_id=item.dream_id, result=result)
+
+    results = await asyncio.gather(*(generate(item) for item in payload.items))
+    failed = sum(1 for result in results if result.error is not None)
+    return DreamJournalBatchResponse(
+        results=list(results), succeeded=len(results) - failed, failed=failed
+    )
+
+
+@router.get("/journal-jobs/{job_id}", response_model=DreamJournalJob)
+async def get_journal_job(job_id: str, jobs: JournalJobsDependency) -> DreamJournalJob:
+    """Return the status, and once finished the result, of a background journal job."""
+
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Journal job not found")
+    return job
+
+
+@router.post(
+    "/{dream_id}/journal",
+    response_model=DreamJournalResponse,
+    responses={status.HTTP_202_ACCEPTED: {"model": DreamJournalJob}},
+)
 async def generate_journal(
     dream_id: str,
     payload: DreamJournalRequest,
     store: StoreDependency,
     engine: NarrativeDependency,
-) -> DreamJournalResponse:
-    """Generate a dream journal narrative for the provided entry."""
+    flights: JournalFlightsDependency,
+    jobs: JournalJobsDependency,
+    background: Annotated[
+        bool, Query(description="Queue the generation and return a pollable job (202)")
+    ] = False,
+    user: Annotated[
+        str, Header(alias="X-User-Id", description="Caller used for fair queueing")
+    ] = "anonymous",
+) -> DreamJournalResponse | JSONResponse:
+    """Generate a dream journal narrative for the provided entry.
+
+    Concurrent requests for the same dream content and parameters share a single
+    generation and a single ``set_journal`` write. With ``background=true`` the
+    generation is queued and a job is returned for polling at
+    ``GET /dreams/journal-jobs/{job_id}``.
+    """
 
-    dream = store.get(dream_id)
+    dream = await store.get(dream_id)
     if dream is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dream not found")
 
-    result = engine.journal(
-        title=dream.title,
-        transcript=dream.transcript,
-        mood=dream.mood,
-        focus_points=payload.focus_points,
-        tone=payload.tone,
-    )
-    updated = store.set_journal(
-        dream_id,
-        narrative=result.narrative,
-        generated_at=datetime.now(UTC),
+    if background:
+        try:
+            job = await jobs.submit(user=user, dream_id=dream_id, request=payload)
+        except QueueFullError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=str(exc),
+                headers={"Retry-After": str(_QUEUE_RETRY_AFTER_SECONDS)},
+            ) from exc
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=job.model_dump(mode="json"),
+            headers={"Location": f"/dreams/journal-jobs/{job.id}"},
+        )
+
+    try:
+        return await _journal(store, engine, flights, dream, payload)
+    except LookupError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+
+
+async def index_stored_dreams(state: State) -> None:
+    """Load every stored dream into the similar-dream index, one page at a time."""
+
+    store = _store_from(state)
+    similar = _similar_dreams_from(state)
+    after = None
+    while True:
+        page = await store.list(limit=_SIMILARITY_BATCH, after=after, count_total=False)
+        await similar.add(page.dreams)
+        if not page.has_more:
+            return
+        after = (page.dreams[-1].created_at, page.dreams[-1].id)
+
+
+async def run_journal_job(state: State, job: DreamJournalJob) -> DreamJournalResponse:
+    """Generate and store the journal requested by a background job."""
+
+    store = _store_from(state)
+    dream = await store.get(job.dream_id)
+    if dream is None:
+        raise LookupError("Dream not found")
+    return await _journal(
+        store, _narrative_engine_from(state), _journal_flights_from(state), dream, job.request
     )
-    if updated is None:  # pragma: no cover - defensive path
+
+
+@router.post(
+    "/{dream_id}/journal/stream",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def stream_journal(
+    dream_id: str,
+    payload: DreamJournalRequest,
+    store: StoreDependency,
+    engine: NarrativeDependency,
+    metrics: MetricsDependency,
+) -> StreamingResponse:
+    """Stream a dream journal narrative as server-sent events.
+
+    ``chunk`` events carry fragments as the model produces them; the final ``done``
+    event carries the same payload as ``POST /dreams/{id}/journal`` once the
+    narrative has been stored. Failures after the stream started are reported as
+    an ``error`` event.
+    """
+
+    dream = await store.get(dream_id)
+    if dream is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dream not found")
-    return DreamJournalResponse(dream=updated, narrative=result.narrative, engine=result.engine)
+
+    started = time.perf_counter()
+
+    async def events() -> AsyncIterator[str]:
+        fragments: list[str] = []
+        try:
+            stream, engine_name = await _narrative_stream(engine, dream, payload)
+            async for fragment in stream:
+                if not fragments:
+                    metrics.observe(
+                        "journal_stream_ttfb_ms", (time.perf_counter() - started) * 1000
+                    )
+                fragments.append(fragment)
+                yield _sse("chunk", json.dumps({"text": fragment}))
+            narrative = "".join(fragments).strip()
+            if not narrative:
+                raise RuntimeError("No content returned from the language model")
+            updated = await store.set_journal(
+                dream_id, narrative=narrative, generated_at=datetime.now(UTC)
+            )
+            if updated is None:
+                raise LookupError("Dream not found")
+        except (LookupError, RuntimeError, ValueError) as exc:
+            metrics.increment("journal_stream_errors")
+            yield _sse("error", json.dumps({"detail": str(exc)}))
+            return
+        result = DreamJournalResponse(dream=updated, narrative=narrative, engine=engine_name)
+        yield _sse("done", result.model_dump_json())
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.post("/transcribe", response_model=DreamTranscriptionResponse)
@@ -194,9 +1039,214 @@ async def transcribe_audio(
     """Convert uploaded dream audio into text."""
 
     audio = decode_audio(payload.audio_base64)
-    result: TranscriptionResult = engine.transcribe(audio=audio, prompt=payload.prompt)
+    result = await _transcribe(engine, audio=audio, prompt=payload.prompt)
     return DreamTranscriptionResponse(
         transcript=result.transcript,
         engine=result.engine,
         confidence=result.confidence,
+        cached=getattr(result, "cached", False),
+    )
+
+
+async def _journal(
+    store: AsyncDreamRepository,
+    engine: NarrativeEngine,
+    flights: SingleFlight[DreamJournalResponse],
+    dream: Dream,
+    payload: DreamJournalRequest,
+) -> DreamJournalResponse:
+    """Generate and store a journal, sharing the work with identical in-flight requests."""
+
+    async def generate() -> DreamJournalResponse:
+        result = await _generate_narrative(engine, dream, payload)
+        updated = await store.set_journal(
+            dream.id,
+            narrative=result.narrative,
+            generated_at=datetime.now(UTC),
+        )
+        if updated is None:
+            raise LookupError("Dream not found")
+        return DreamJournalResponse(
+            dream=updated,
+            narrative=result.narrative,
+            engine=result.engine,
+            cached=getattr(result, "cached", False),
+        )
+
+    return await flights.run(_journal_flight_key(dream, payload), generate)
+
+
+async def _generate_narrative(
+    engine: NarrativeEngine, dream: Dream, payload: DreamJournalRequest
+) -> NarrativeResult:
+    """Run the narrative engine without blocking the event loop.
+
+    Engines exposing ``ajournal`` are awaited directly; journal-only services are
+    executed in the threadpool.
+    """
+
+    options = _journal_options(payload)
+    ajournal = getattr(engine, "ajournal", None)
+    if ajournal is not None:
+        result = await ajournal(
+            title=dream.title,
+            transcript=dream.transcript,
+            mood=dream.mood,
+            focus_points=payload.focus_points,
+            tone=payload.tone,
+            **options,
+        )
+        return cast(NarrativeResult, result)
+    return await run_in_threadpool(
+        engine.journal,
+        title=dream.title,
+        transcript=dream.transcript,
+        mood=dream.mood,
+        focus_points=payload.focus_points,
+        tone=payload.tone,
+        **options,
     )
+
+
+async def _transcribe(
+    engine: TranscriptionEngine, *, audio: bytes, prompt: str | None, filename: str | None = None
+) -> TranscriptionResult:
+    """Run the transcription engine without blocking the event loop.
+
+    ``filename`` is only passed on when given, so engines that detect the format
+    themselves need not accept it.
+    """
+
+    options = {"filename": filename} if filename is not None else {}
+    atranscribe = getattr(engine, "atranscribe", None)
+    if atranscribe is not None:
+        return cast(TranscriptionResult, await atranscribe(audio=audio, prompt=prompt, **options))
+    return await run_in_threadpool(engine.transcribe, audio=audio, prompt=prompt, **options)
+
+
+async def _transcribe_file(
+    engine: TranscriptionEngine, *, file: BinaryIO, prompt: str | None, content_type: str | None
+) -> TranscriptionResult:
+    """Transcribe an uploaded file handle, reading it only for bytes-only engines."""
+
+    atranscribe_file = getattr(engine, "atranscribe_file", None)
+    if atranscribe_file is not None:
+        result = await atranscribe_file(file=file, prompt=prompt, content_type=content_type)
+        return cast(TranscriptionResult, result)
+    audio = await run_in_threadpool(file.read)
+    return await _transcribe(engine, audio=audio, prompt=prompt)
+
+
+def _open_session(sessions: TranscriptionSessionManager, session_id: str) -> TranscriptionSession:
+    session = sessions.get(session_id)
+    if session is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Transcription session not found"
+        )
+    return session
+
+
+def _session_status(session: TranscriptionSession) -> TranscriptionSessionStatus:
+    return TranscriptionSessionStatus(
+        id=session.id,
+        received_bytes=session.received_bytes,
+        segments_scheduled=len(session.segments),
+        segments_completed=session.segments_completed,
+        partial_transcript=session.partial_transcript(),
+    )
+
+
+def _etag(*parts: object) -> str:
+    """Build a strong entity tag from version components.
+
+    Versions are read before the data they describe, so a response can only be
+    tagged older than its body and the next poll fetches it again. Every tag
+    includes the store's epoch, so tags issued before its versions restarted
+    never match again.
+    """
+
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    """Return whether ``If-None-Match`` already names ``etag`` (weak comparison)."""
+
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _tag_response(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+
+
+def _unchanged(etag: str) -> Response:
+    """Return an empty 304 so nothing is loaded or serialised."""
+
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    _tag_response(response, etag)
+    return response
+
+
+def _upload_too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Audio uploads are limited to {max_bytes} bytes",
+    )
+
+
+async def _narrative_stream(
+    engine: NarrativeEngine, dream: Dream, payload: DreamJournalRequest
+) -> tuple[AsyncIterator[str], str]:
+    """Return narrative fragments and the engine label for the streaming route.
+
+    Engines without ``astream_journal`` produce the whole narrative as one fragment.
+    """
+
+    astream_journal = getattr(engine, "astream_journal", None)
+    if astream_journal is None:
+        result = await _generate_narrative(engine, dream, payload)
+        return _single_fragment(result.narrative), result.engine
+    fragments = astream_journal(
+        title=dream.title,
+        transcript=dream.transcript,
+        mood=dream.mood,
+        focus_points=payload.focus_points,
+        tone=payload.tone,
+        **_journal_options(payload),
+    )
+    return cast(AsyncIterator[str], fragments), cast(str, getattr(engine, "engine_name", "openai"))
+
+
+def _journal_flight_key(dream: Dream, payload: DreamJournalRequest) -> str:
+    """Identify journal requests that would produce the same generation."""
+
+    return cache_key(
+        dream.id,
+        dream.title,
+        dream.transcript,
+        dream.mood or "",
+        payload.tone or "",
+        *payload.focus_points,
+        str(len(payload.focus_points)),
+        "force" if payload.force_regenerate else "",
+    )
+
+
+def _journal_options(payload: DreamJournalRequest) -> dict[str, Any]:
+    """Return optional engine keywords, omitting defaults for duck-typed engines."""
+
+    return {"force_regenerate": True} if payload.force_regenerate else {}
+
+
+async def _single_fragment(text: str) -> AsyncIterator[str]:
+    yield text
+
+
+def _sse(event: str, data: str) -> str:
+    """Encode a single server-sent event."""
+
+    return f"event: {event}\ndata: {data}\n\n"
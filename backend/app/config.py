@@ -0,0 +1,188 @@
+"""Runtime configuration for the DreamWeave backend."""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal, TypeVar, cast, get_args
+
+DreamStoreBackend = Literal["memory", "sqlite", "postgres"]
+SimilarityEmbedder = Literal["hashing", "openai"]
+
+_Choice = TypeVar("_Choice", bound=str)
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Settings resolved once when the application is created."""
+
+    openai_api_key: str | None = None
+    openai_base_url: str | None = None
+    openai_max_connections: int = 100
+    openai_max_keepalive_connections: int = 20
+    openai_timeout_seconds: float = 60.0
+    dream_store_backend: DreamStoreBackend = "memory"
+    dream_store_dir: Path | None = None
+    database_url: str | None = None
+    database_pool_size: int = 10
+    dream_log_commit_interval: float = 0.01
+    dream_snapshot_every: int = 100_000
+    dream_durable_writes: bool = False
+    similarity_embedder: SimilarityEmbedder = "hashing"
+    similarity_dimensions: int = 256
+    similarity_ann_threshold: int = 50_000
+    similarity_probes: int = 8
+    embedding_model: str = "text-embedding-3-small"
+    journal_cache_max_entries: int = 1024
+    journal_cache_max_bytes: int = 16 * 1024 * 1024
+    journal_cache_ttl_seconds: float = 7 * 24 * 60 * 60
+    journal_cache_dir: Path | None = None
+    journal_workers: int = 4
+    journal_queue_capacity: int = 256
+    journal_queue_per_user: int = 16
+    journal_jobs_dir: Path | None = None
+    journal_batch_concurrency: int = 8
+    import_batch_size: int = 500
+    import_max_line_bytes: int = 1024 * 1024
+    import_workers: int = 2
+    transcription_max_upload_bytes: int = 25 * 1024 * 1024
+    transcription_spool_bytes: int = 1024 * 1024
+    transcription_segment_bytes: int = 4 * 1024 * 1024
+    transcription_overlap_bytes: int = 128 * 1024
+    transcription_concurrency: int = 4
+    transcription_cache_max_entries: int = 4096
+    transcription_cache_max_bytes: int = 8 * 1024 * 1024
+    transcription_cache_ttl_seconds: float = 30 * 24 * 60 * 60
+    transcription_cache_dir: Path | None = None
+
+    @classmethod
+    def from_env(cls) -> Settings:
+        """Build settings from environment variables, falling back to defaults."""
+
+        defaults = cls()
+        return cls(
+            openai_api_key=os.getenv("OPENAI_API_KEY") or None,
+            openai_base_url=os.getenv("OPENAI_BASE_URL") or None,
+            openai_max_connections=_int_env(
+                "DREAMWEAVE_OPENAI_MAX_CONNECTIONS", defaults.openai_max_connections
+            ),
+            openai_max_keepalive_connections=_int_env(
+                "DREAMWEAVE_OPENAI_MAX_KEEPALIVE", defaults.openai_max_keepalive_connections
+            ),
+            openai_timeout_seconds=_float_env(
+                "DREAMWEAVE_OPENAI_TIMEOUT", defaults.openai_timeout_seconds
+            ),
+            dream_store_backend=_choice_env(
+                "DREAMWEAVE_STORE_BACKEND", defaults.dream_store_backend, DreamStoreBackend
+            ),
+            dream_store_dir=_path_env("DREAMWEAVE_STORE_DIR"),
+            database_url=os.getenv("DREAMWEAVE_DATABASE_URL") or None,
+            database_pool_size=_int_env(
+                "DREAMWEAVE_DATABASE_POOL_SIZE", defaults.database_pool_size
+            ),
+            dream_log_commit_interval=_float_env(
+                "DREAMWEAVE_LOG_COMMIT_INTERVAL", defaults.dream_log_commit_interval
+            ),
+            dream_snapshot_every=_int_env(
+                "DREAMWEAVE_SNAPSHOT_EVERY", defaults.dream_snapshot_every
+            ),
+            dream_durable_writes=_bool_env(
+                "DREAMWEAVE_DURABLE_WRITES", defaults.dream_durable_writes
+            ),
+            similarity_embedder=_choice_env(
+                "DREAMWEAVE_SIMILARITY_EMBEDDER", defaults.similarity_embedder, SimilarityEmbedder
+            ),
+            similarity_dimensions=_int_env(
+                "DREAMWEAVE_SIMILARITY_DIMENSIONS", defaults.similarity_dimensions
+            ),
+            similarity_ann_threshold=_int_env(
+                "DREAMWEAVE_SIMILARITY_ANN_THRESHOLD", defaults.similarity_ann_threshold
+            ),
+            similarity_probes=_int_env("DREAMWEAVE_SIMILARITY_PROBES", defaults.similarity_probes),
+            embedding_model=os.getenv("DREAMWEAVE_EMBEDDING_MODEL") or defaults.embedding_model,
+            journal_cache_max_entries=_int_env(
+                "DREAMWEAVE_JOURNAL_CACHE_ENTRIES", defaults.journal_cache_max_entries
+            ),
+            journal_cache_max_bytes=_int_env(
+                "DREAMWEAVE_JOURNAL_CACHE_BYTES", defaults.journal_cache_max_bytes
+            ),
+            journal_cache_ttl_seconds=_float_env(
+                "DREAMWEAVE_JOURNAL_CACHE_TTL", defaults.journal_cache_ttl_seconds
+            ),
+            journal_cache_dir=_path_env("DREAMWEAVE_JOURNAL_CACHE_DIR"),
+            journal_workers=_int_env("DREAMWEAVE_JOURNAL_WORKERS", defaults.journal_workers),
+            journal_queue_capacity=_int_env(
+                "DREAMWEAVE_JOURNAL_QUEUE_CAPACITY", defaults.journal_queue_capacity
+            ),
+            journal_queue_per_user=_int_env(
+                "DREAMWEAVE_JOURNAL_QUEUE_PER_USER", defaults.journal_queue_per_user
+            ),
+            journal_jobs_dir=_path_env("DREAMWEAVE_JOURNAL_JOBS_DIR"),
+            journal_batch_concurrency=_int_env(
+                "DREAMWEAVE_JOURNAL_BATCH_CONCURRENCY", defaults.journal_batch_concurrency
+            ),
+            import_batch_size=_int_env("DREAMWEAVE_IMPORT_BATCH_SIZE", defaults.import_batch_size),
+            import_max_line_bytes=_int_env(
+                "DREAMWEAVE_IMPORT_MAX_LINE_BYTES", defaults.import_max_line_bytes
+            ),
+            import_workers=_int_env("DREAMWEAVE_IMPORT_WORKERS", defaults.import_workers),
+            transcription_max_upload_bytes=_int_env(
+                "DREAMWEAVE_TRANSCRIPTION_MAX_UPLOAD", defaults.transcription_max_upload_bytes
+            ),
+            transcription_spool_bytes=_int_env(
+                "DREAMWEAVE_TRANSCRIPTION_SPOOL", defaults.transcription_spool_bytes
+            ),
+            transcription_segment_bytes=_int_env(
+                "DREAMWEAVE_TRANSCRIPTION_SEGMENT", defaults.transcription_segment_bytes
+            ),
+            transcription_overlap_bytes=_int_env(
+                "DREAMWEAVE_TRANSCRIPTION_OVERLAP", defaults.transcription_overlap_bytes
+            ),
+            transcription_concurrency=_int_env(
+                "DREAMWEAVE_TRANSCRIPTION_CONCURRENCY", defaults.transcription_concurrency
+            ),
+            transcription_cache_max_entries=_int_env(
+                "DREAMWEAVE_TRANSCRIPTION_CACHE_ENTRIES", defaults.transcription_cache_max_entries
+            ),
+            transcription_cache_max_bytes=_int_env(
+                "DREAMWEAVE_TRANSCRIPTION_CACHE_BYTES", defaults.transcription_cache_max_bytes
+            ),
+            transcription_cache_ttl_seconds=_float_env(
+                "DREAMWEAVE_TRANSCRIPTION_CACHE_TTL", defaults.transcription_cache_ttl_seconds
+            ),
+            transcription_cache_dir=_path_env("DREAMWEAVE_TRANSCRIPTION_CACHE_DIR"),
+        )
+
+
+def _int_env(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _float_env(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def _bool_env(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    return value.strip().lower() in {"1", "true", "yes", "on"} if value else default
+
+
+def _path_env(name: str) -> Path | None:
+    value = os.getenv(name)
+    return Path(value) if value else None
+
+
+def _choice_env(name: str, default: _Choice, choices: object) -> _Choice:
+    """Read one of the values of the ``Literal`` alias ``choices``."""
+
+    value = (os.getenv(name) or "").strip().lower()
+    if not value:
+        return default
+    allowed = get_args(choices)
+    if value not in allowed:
+        options = ", ".join(repr(option) for option in allowed[:-1])
+        raise ValueError(f"{name} must be {options} or {allowed[-1]!r}, not {value!r}")
+    return cast(_Choice, value)
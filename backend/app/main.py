@@ -2,21 +2,60 @@
 
 from __future__ import annotations
 
-import os
+import asyncio
+import contextlib
+import inspect
+from collections.abc import AsyncIterator, Coroutine
+from contextlib import asynccontextmanager
+from functools import partial
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from openai import AsyncOpenAI
 
 from .api.routes import dreams
+from .config import Settings
+from .schemas.dreams import DreamJournalResponse
+from .services.dream_import import DreamDrafter
+from .services.dream_log import DreamLog
+from .services.dream_repository import AsyncDreamRepository, DreamRepository
 from .services.dream_store import DreamStore
+from .services.journal_jobs import JournalJobQueue
+from .services.metrics import MetricsRegistry
 from .services.narrative import NarrativeEngine
+from .services.openai_clients import create_async_client
+from .services.result_cache import ResultCache
+from .services.similarity import Embedder, HashingEmbedder, OpenAIEmbedder, SimilarDreams
+from .services.single_flight import SingleFlight
+from .services.sqlite_dream_store import SQLiteDreamStore
 from .services.transcription import TranscriptionEngine
+from .services.transcription_sessions import TranscriptionSessionManager
+from .services.vector_index import VectorIndex
 
 
-def create_app() -> FastAPI:
+def create_app(settings: Settings | None = None) -> FastAPI:
     """Create and configure the FastAPI application instance."""
 
-    app = FastAPI(title="DreamWeave API", version="0.1.0")
+    settings = settings or Settings.from_env()
+    async_client = create_async_client(settings)
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        dream_store = app.state.dream_store
+        if hasattr(dream_store, "start"):
+            await dream_store.start()
+        await journal_jobs.start()
+        async with _in_background(dreams.index_stored_dreams(app.state)):
+            yield
+        await journal_jobs.stop()
+        app.state.dream_drafter.close()
+        closing = dream_store.close()
+        if inspect.isawaitable(closing):
+            await closing
+        if async_client is not None:
+            await async_client.close()
+
+    app = FastAPI(title="DreamWeave API", version="0.1.0", lifespan=lifespan)
 
     app.add_middleware(
         CORSMiddleware,
@@ -26,11 +65,61 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
-    api_key = os.getenv("OPENAI_API_KEY")
+    api_key = settings.openai_api_key
+    base_url = settings.openai_base_url
 
-    app.state.dream_store = DreamStore()
-    app.state.narrative_engine = NarrativeEngine(api_key=api_key)
-    app.state.transcription_engine = TranscriptionEngine(api_key=api_key)
+    registry = MetricsRegistry()
+    journal_cache = ResultCache(
+        max_entries=settings.journal_cache_max_entries,
+        max_bytes=settings.journal_cache_max_bytes,
+        ttl_seconds=settings.journal_cache_ttl_seconds,
+        directory=settings.journal_cache_dir,
+    )
+    _register_cache_gauges(registry, "journal_cache", journal_cache)
+    journal_flights: SingleFlight[DreamJournalResponse] = SingleFlight()
+    registry.register_gauge("journal_in_flight", lambda: journal_flights.in_flight)
+    registry.register_gauge("journal_coalesced", lambda: journal_flights.coalesced)
+
+    app.state.settings = settings
+    app.state.metrics = registry
+    app.state.dream_store = _create_store(settings)
+    app.state.journal_flights = journal_flights
+    app.state.dream_drafter = DreamDrafter(workers=settings.import_workers)
+    journal_jobs = JournalJobQueue(
+        partial(dreams.run_journal_job, app.state),
+        workers=settings.journal_workers,
+        capacity=settings.journal_queue_capacity,
+        per_user_capacity=settings.journal_queue_per_user,
+        directory=settings.journal_jobs_dir,
+    )
+    registry.register_gauge("journal_queue_depth", lambda: journal_jobs.depth)
+    registry.register_gauge("journal_jobs_running", lambda: journal_jobs.running)
+    app.state.journal_jobs = journal_jobs
+    transcription_sessions = TranscriptionSessionManager(
+        partial(dreams.transcribe_session_segment, app.state),
+        segment_bytes=settings.transcription_segment_bytes,
+        overlap_bytes=settings.transcription_overlap_bytes,
+        concurrency=settings.transcription_concurrency,
+        max_session_bytes=settings.transcription_max_upload_bytes,
+    )
+    registry.register_gauge(
+        "transcription_sessions_open", lambda: transcription_sessions.open_sessions
+    )
+    app.state.transcription_sessions = transcription_sessions
+    app.state.similar_dreams = _create_similar_dreams(settings, async_client, registry)
+    app.state.narrative_engine = NarrativeEngine(
+        api_key=api_key, base_url=base_url, async_client=async_client, cache=journal_cache
+    )
+    transcription_cache = ResultCache(
+        max_entries=settings.transcription_cache_max_entries,
+        max_bytes=settings.transcription_cache_max_bytes,
+        ttl_seconds=settings.transcription_cache_ttl_seconds,
+        directory=settings.transcription_cache_dir,
+    )
+    _register_cache_gauges(registry, "transcription_cache", transcription_cache)
+    app.state.transcription_engine = TranscriptionEngine(
+        api_key=api_key, base_url=base_url, async_client=async_client, cache=transcription_cache
+    )
 
     @app.get("/health", tags=["Health"])
     async def health_check() -> dict[str, str]:
@@ -38,9 +127,78 @@ def create_app() -> FastAPI:
 
         return {"status": "ok"}
 
+    @app.get("/metrics", tags=["Health"])
+    async def metrics() -> dict[str, object]:
+        """Return in-process counters, latency summaries and gauges."""
+
+        current: MetricsRegistry = app.state.metrics
+        return current.snapshot()
+
     app.include_router(dreams.router, prefix="/dreams", tags=["Dreams"])
 
     return app
 
 
+def _create_store(settings: Settings) -> DreamRepository | AsyncDreamRepository:
+    if settings.dream_store_backend == "postgres":
+        if settings.database_url is None:
+            raise ValueError("The postgres dream store requires DREAMWEAVE_DATABASE_URL")
+        # asyncpg is an optional dependency, only imported when it is used.
+        from .services.postgres_dream_store import PostgresDreamStore  # noqa: PLC0415
+
+        return PostgresDreamStore(settings.database_url, pool_size=settings.database_pool_size)
+    if settings.dream_store_backend == "sqlite":
+        if settings.dream_store_dir is None:
+            raise ValueError("The sqlite dream store requires DREAMWEAVE_STORE_DIR")
+        return SQLiteDreamStore(settings.dream_store_dir / "dreams.sqlite3")
+    if settings.dream_store_dir is None:
+        return DreamStore()
+    log = DreamLog(settings.dream_store_dir, commit_interval=settings.dream_log_commit_interval)
+    return DreamStore(
+        log=log,
+        snapshot_every=settings.dream_snapshot_every,
+        durable_writes=settings.dream_durable_writes,
+    )
+
+
+def _create_similar_dreams(
+    settings: Settings, async_client: AsyncOpenAI | None, registry: MetricsRegistry
+) -> SimilarDreams:
+    embedder: Embedder = HashingEmbedder(settings.similarity_dimensions)
+    if settings.similarity_embedder == "openai":
+        if async_client is None:
+            raise ValueError("The openai similarity embedder requires OPENAI_API_KEY")
+        embedder = OpenAIEmbedder(
+            async_client,
+            model=settings.embedding_model,
+            dimensions=settings.similarity_dimensions,
+        )
+    index = VectorIndex(
+        settings.similarity_dimensions,
+        approximate_threshold=settings.similarity_ann_threshold,
+        probes=settings.similarity_probes,
+    )
+    registry.register_gauge("similarity_index_size", lambda: len(index))
+    return SimilarDreams(embedder, index)
+
+
+@asynccontextmanager
+async def _in_background(work: Coroutine[object, object, None]) -> AsyncIterator[None]:
+    """Run ``work`` as a task for the duration of the block, cancelling it on exit."""
+
+    task = asyncio.create_task(work)
+    try:
+        yield
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+def _register_cache_gauges(registry: MetricsRegistry, prefix: str, cache: ResultCache) -> None:
+    registry.register_gauge(f"{prefix}_hit_ratio", lambda: cache.stats().hit_ratio)
+    registry.register_gauge(f"{prefix}_bytes", lambda: cache.stats().bytes)
+    registry.register_gauge(f"{prefix}_entries", lambda: cache.stats().entries)
+
+
 app = create_app()
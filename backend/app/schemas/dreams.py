@@ -3,9 +3,31 @@
 from __future__ import annotations
 
 from collections.abc import Sequence
-from datetime import datetime
+from datetime import UTC, date, datetime
+from typing import Literal
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+TagMatch = Literal["all", "any"]
+"""How multiple tag filters combine: every tag (``all``) or at least one (``any``)."""
+
+SearchMode = Literal["tokens", "ranked", "substring"]
+"""How ``query`` is matched: indexed tokens by recency, BM25-ranked tokens, or substrings."""
+
+JournalJobState = Literal["queued", "running", "succeeded", "failed"]
+"""Lifecycle of a background journal generation."""
+
+GraphNodeKind = Literal["motif", "dream"]
+"""Node types of the dream map: tags (motifs, places, people) and dreams."""
+
+GraphEdgeKind = Literal["co_occurs", "features", "related"]
+"""Motif-motif co-occurrence, dream-motif membership, and dreams sharing motifs."""
+
+ExportFormat = Literal["ndjson", "csv"]
+"""Encoding of a dream archive export: one JSON object or one CSV row per dream."""
+
+TrendGranularity = Literal["day", "week", "month"]
+"""Period of a trend bucket: a UTC day, an ISO week starting Monday, or a calendar month."""
 
 
 class DreamBase(BaseModel):
@@ -33,6 +55,38 @@ class DreamCreate(DreamBase):
     pass
 
 
+class DreamImportItem(DreamCreate):
+    """One line of an NDJSON dream archive brought over from another journal."""
+
+    created_at: datetime = Field(
+        ..., description="When the dream was originally recorded; naive times are read as UTC"
+    )
+
+    @field_validator("created_at")
+    @classmethod
+    def normalise_created_at(cls, value: datetime) -> datetime:
+        """Store original timestamps in UTC like the ones the API assigns."""
+
+        if value.tzinfo is None:
+            return value.replace(tzinfo=UTC)
+        return value.astimezone(UTC)
+
+
+class DreamImportResult(BaseModel):
+    """Outcome of one archive line, streamed back in line order."""
+
+    line: int = Field(..., description="1-based line number within the uploaded archive")
+    dream_id: str | None = Field(default=None, description="Identifier of the imported dream")
+    error: str | None = Field(default=None, description="Why the line was skipped")
+
+
+class DreamImportSummary(BaseModel):
+    """Final line of an import response."""
+
+    imported: int
+    failed: int
+
+
 class DreamUpdate(BaseModel):
     """Payload accepted when mutating an existing dream entry."""
 
@@ -88,7 +142,25 @@ class DreamListResponse(BaseModel):
     """Envelope returned when multiple dreams are requested."""
 
     dreams: Sequence[Dream]
-    total: int
+    total: int | None = Field(
+        default=None, description="Number of matching dreams, omitted with include_total=false"
+    )
+    next_cursor: str | None = Field(
+        default=None, description="Pass as `cursor` to fetch the next page; null on the last page"
+    )
+
+
+class SimilarDream(BaseModel):
+    """A dream returned by similarity search with its cosine score."""
+
+    dream: Dream
+    score: float = Field(description="Cosine similarity to the requested dream, at most 1")
+
+
+class DreamSimilarResponse(BaseModel):
+    """Dreams closest to a given dream, most similar first."""
+
+    dreams: Sequence[SimilarDream]
 
 
 class TagCount(BaseModel):
@@ -113,6 +185,59 @@ class DreamHighlights(BaseModel):
     moods: Sequence[MoodCount] = Field(default_factory=list)
 
 
+class DreamGraphNode(BaseModel):
+    """A motif or dream drawn on the dream map."""
+
+    id: str = Field(..., description="`motif:<tag>` or `dream:<id>`")
+    kind: GraphNodeKind
+    label: str = Field(..., description="The tag, or the dream's title")
+    weight: int = Field(
+        ..., description="Dreams carrying the motif in the window; a dream's number of tags"
+    )
+
+
+class DreamGraphEdge(BaseModel):
+    """A weighted link between two nodes of the dream map."""
+
+    source: str
+    target: str
+    kind: GraphEdgeKind
+    weight: int = Field(..., description="Dreams sharing both motifs, or motifs shared")
+
+
+class DreamGraph(BaseModel):
+    """Pruned subgraph of the strongest motifs, their links and recent dreams."""
+
+    nodes: Sequence[DreamGraphNode] = Field(default_factory=list)
+    edges: Sequence[DreamGraphEdge] = Field(default_factory=list)
+
+
+class DreamTrendBucket(BaseModel):
+    """Dream, mood and motif counts of one period of a trend window."""
+
+    start: date = Field(..., description="First UTC day of the period inside the window")
+    end: date = Field(..., description="Last UTC day of the period inside the window")
+    dream_count: int
+    moods: dict[str, int] = Field(
+        default_factory=dict, description="Count of every mood in the window's `moods`"
+    )
+    tags: dict[str, int] = Field(
+        default_factory=dict, description="Count of every tag in the window's `top_tags`"
+    )
+
+
+class DreamTrends(BaseModel):
+    """Dream frequency, mood distribution and motif counts per period of a window."""
+
+    granularity: TrendGranularity
+    start: date
+    end: date
+    dream_count: int
+    top_tags: list[TagCount] = Field(default_factory=list)
+    moods: list[MoodCount] = Field(default_factory=list)
+    buckets: list[DreamTrendBucket] = Field(default_factory=list)
+
+
 class DreamJournalRequest(BaseModel):
     """Parameters accepted when generating a dream journal."""
 
@@ -125,6 +250,10 @@ class DreamJournalRequest(BaseModel):
         max_length=60,
         description="Optional tone such as 'hopeful', 'mysterious', or 'grounded'",
     )
+    force_regenerate: bool = Field(
+        default=False,
+        description="Bypass cached journals generated from an identical prompt",
+    )
 
 
 class DreamJournalResponse(BaseModel):
@@ -133,6 +262,54 @@ class DreamJournalResponse(BaseModel):
     dream: Dream
     narrative: str
     engine: str
+    cached: bool = Field(
+        default=False, description="Whether the narrative was served from the journal cache"
+    )
+
+
+class DreamJournalBatchItem(DreamJournalRequest):
+    """One dream and its journal parameters within a batch request."""
+
+    dream_id: str
+
+
+class DreamJournalBatchRequest(BaseModel):
+    """Several journal generations submitted in one call."""
+
+    items: list[DreamJournalBatchItem] = Field(..., min_length=1, max_length=100)
+
+
+class DreamJournalBatchResult(BaseModel):
+    """Outcome of a single item of a batch, in request order."""
+
+    dream_id: str
+    result: DreamJournalResponse | None = None
+    error: str | None = Field(default=None, description="Failure reason when the item failed")
+
+
+class DreamJournalBatchResponse(BaseModel):
+    """Per-item results of a batch journal request."""
+
+    results: list[DreamJournalBatchResult]
+    succeeded: int
+    failed: int
+
+
+class DreamJournalJob(BaseModel):
+    """Status of a journal generation queued with ``background=true``."""
+
+    id: str = Field(..., description="Identifier used to poll the job")
+    dream_id: str
+    user: str = Field(..., description="Caller the job is scheduled fairly against")
+    request: DreamJournalRequest
+    state: JournalJobState = "queued"
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    result: DreamJournalResponse | None = Field(
+        default=None, description="Generated journal once the job has succeeded"
+    )
+    error: str | None = Field(default=None, description="Failure reason when the job failed")
 
 
 class DreamTranscriptionRequest(BaseModel):
@@ -151,3 +328,34 @@ class DreamTranscriptionResponse(BaseModel):
     transcript: str
     engine: str
     confidence: float
+    cached: bool = Field(
+        default=False, description="Whether the transcript was served from the cache"
+    )
+
+
+class TranscriptionSessionCreate(BaseModel):
+    """Parameters for a live transcription session."""
+
+    prompt: str | None = Field(
+        default=None,
+        description="Optional guiding phrases applied to every segment",
+    )
+    content_type: str | None = Field(
+        default=None,
+        description=(
+            "Media type of the audio, required for raw PCM "
+            "(audio/L16;rate=16000;channels=1); other formats are detected from the audio"
+        ),
+    )
+
+
+class TranscriptionSessionStatus(BaseModel):
+    """Progress of a live transcription session."""
+
+    id: str
+    received_bytes: int
+    segments_scheduled: int
+    segments_completed: int
+    partial_transcript: str = Field(
+        ..., description="Stitched text of the segments transcribed so far, in order"
+    )
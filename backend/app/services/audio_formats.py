@@ -0,0 +1,230 @@
+"""Recognising uploaded audio formats and cutting PCM audio into playable segments.
+
+The transcription API infers the format of an upload from its file name, and a
+byte range of a compressed container such as M4A is not a playable file. Only
+audio made of fixed-size sample frames can be cut anywhere: WAV uploads and raw
+16-bit PCM declared as ``audio/L16`` are split on frame boundaries and every
+segment gets a WAV header of its own. Everything else is transcribed whole.
+"""
+
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass
+
+from .audio_segments import segment_ranges
+
+HEADER_BYTES = 64 * 1024
+"""Leading bytes of an upload that :func:`detect_format` looks at."""
+
+_DEFAULT_FILENAME = "dream.m4a"
+_WAV_FILENAME = "dream.wav"
+_PCM_FORMAT_TAG = 1
+_PCM_FMT_BYTES = 16
+_MPEG_FRAME_START = 0xFF
+_MPEG_SYNC = 0xE0
+_MPEG_LAYER = 0x06
+_L16_SAMPLE_BYTES = 2
+_UNKNOWN_DATA_SIZES = (0, 0xFFFFFFFF)
+_MEDIA_FILENAMES = {
+    "audio/aac": "dream.m4a",
+    "audio/flac": "dream.flac",
+    "audio/m4a": "dream.m4a",
+    "audio/mp3": "dream.mp3",
+    "audio/mp4": "dream.m4a",
+    "audio/mpeg": "dream.mp3",
+    "audio/ogg": "dream.ogg",
+    "audio/wav": _WAV_FILENAME,
+    "audio/wave": _WAV_FILENAME,
+    "audio/webm": "dream.webm",
+    "audio/x-m4a": "dream.m4a",
+    "audio/x-wav": _WAV_FILENAME,
+}
+_SIGNATURES = (
+    (8, b"WAVE", _WAV_FILENAME),
+    (4, b"ftyp", "dream.m4a"),
+    (0, b"ID3", "dream.mp3"),
+    (0, b"OggS", "dream.ogg"),
+    (0, b"\x1aE\xdf\xa3", "dream.webm"),
+    (0, b"fLaC", "dream.flac"),
+)
+
+
+@dataclass(frozen=True)
+class AudioFormat:
+    """The name an upload is sent under and, for PCM audio, how to cut it.
+
+    ``frame_bytes`` is the size of one sample frame and is ``0`` for formats
+    that cannot be split. Sample data starts at ``data_offset`` and spans
+    ``data_bytes`` bytes, or the rest of the upload when that is unknown.
+    """
+
+    filename: str
+    frame_bytes: int = 0
+    data_offset: int = 0
+    data_bytes: int | None = None
+    fmt_chunk: bytes = b""
+    big_endian: bool = False
+
+    @property
+    def splittable(self) -> bool:
+        """Whether segments can be cut from the sample data and wrapped as WAV."""
+
+        return self.frame_bytes > 0
+
+    @property
+    def headerless(self) -> bool:
+        """Whether the upload is bare samples that must be wrapped before sending."""
+
+        return self.splittable and self.data_offset == 0
+
+    def segment_lengths(self, segment_bytes: int, overlap_bytes: int) -> tuple[int, int]:
+        """Round a segment and its overlap down to whole sample frames."""
+
+        frame = self.frame_bytes
+        segment = max(frame, segment_bytes // frame * frame)
+        return segment, min(overlap_bytes // frame * frame, segment - frame)
+
+    def segment_ranges(
+        self, size: int, *, segment_bytes: int, overlap_bytes: int
+    ) -> list[tuple[int, int]]:
+        """Return frame-aligned ``(offset, length)`` ranges of the samples in ``size`` bytes."""
+
+        samples = size - self.data_offset
+        if self.data_bytes is not None:
+            samples = min(samples, self.data_bytes)
+        segment, overlap = self.segment_lengths(segment_bytes, overlap_bytes)
+        samples -= samples % self.frame_bytes
+        return [
+            (self.data_offset + offset, length)
+            for offset, length in segment_ranges(
+                samples, segment_bytes=segment, overlap_bytes=overlap
+            )
+        ]
+
+    def wrap(self, samples: bytes) -> bytes:
+        """Return the whole frames of ``samples`` as a little-endian WAV file."""
+
+        samples = samples[: len(samples) - len(samples) % self.frame_bytes]
+        if self.big_endian:
+            swapped = bytearray(len(samples))
+            swapped[0::2] = samples[1::2]
+            swapped[1::2] = samples[0::2]
+            samples = bytes(swapped)
+        padding = b"\x00" * (len(samples) & 1)
+        fmt = self.fmt_chunk
+        riff_size = 4 + 8 + len(fmt) + 8 + len(samples) + len(padding)
+        return b"".join(
+            (
+                struct.pack("<4sI4s4sI", b"RIFF", riff_size, b"WAVE", b"fmt ", len(fmt)),
+                fmt,
+                struct.pack("<4sI", b"data", len(samples)),
+                samples,
+                padding,
+            )
+        )
+
+
+def detect_format(head: bytes, content_type: str | None = None) -> AudioFormat:
+    """Recognise an upload from its first bytes, falling back to its media type.
+
+    ``head`` should hold the first :data:`HEADER_BYTES` of the upload, or all of
+    it when shorter. Raw PCM has no signature and must be declared as
+    ``audio/L16;rate=<hz>;channels=<n>`` (big-endian, as RFC 2586 defines it).
+    """
+
+    media_type, parameters = _parse_media_type(content_type)
+    if media_type == "audio/l16":
+        return _l16_format(parameters)
+    if (layout := _wav_layout(head)) is not None:
+        return layout
+    for offset, signature, filename in _SIGNATURES:
+        if head[offset : offset + len(signature)] == signature:
+            return AudioFormat(filename=filename)
+    if _is_mpeg_frame(head):
+        return AudioFormat(filename="dream.mp3")
+    return AudioFormat(filename=_MEDIA_FILENAMES.get(media_type, _DEFAULT_FILENAME))
+
+
+def wav_samples(audio: bytes) -> bytes:
+    """Return the sample data of a WAV file, or ``audio`` unchanged for other formats."""
+
+    layout = _wav_layout(audio)
+    if layout is None:
+        return audio
+    end = None if layout.data_bytes is None else layout.data_offset + layout.data_bytes
+    return audio[layout.data_offset : end]
+
+
+def _wav_layout(head: bytes) -> AudioFormat | None:
+    """Locate the ``fmt `` and ``data`` chunks of a WAV file with fixed-size frames."""
+
+    if head[:4] != b"RIFF" or head[8:12] != b"WAVE":
+        return None
+    fmt = b""
+    offset = 12
+    while offset + 8 <= len(head):
+        chunk_id, size = struct.unpack_from("<4sI", head, offset)
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            fmt = head[body : body + size]
+        elif chunk_id == b"data":
+            if len(fmt) < _PCM_FMT_BYTES:
+                return None
+            (frame_bytes,) = struct.unpack_from("<H", fmt, 12)
+            if frame_bytes == 0:
+                return None
+            return AudioFormat(
+                filename=_WAV_FILENAME,
+                frame_bytes=frame_bytes,
+                data_offset=body,
+                data_bytes=None if size in _UNKNOWN_DATA_SIZES else size,
+                fmt_chunk=fmt,
+            )
+        offset = body + size + (size & 1)
+    return None
+
+
+def _is_mpeg_frame(head: bytes) -> bool:
+    """Whether ``head`` starts with an MPEG audio frame header (ADTS AAC has layer 0)."""
+
+    return (
+        len(head) > 1
+        and head[0] == _MPEG_FRAME_START
+        and head[1] & _MPEG_SYNC == _MPEG_SYNC
+        and head[1] & _MPEG_LAYER != 0
+    )
+
+
+def _l16_format(parameters: dict[str, str]) -> AudioFormat:
+    try:
+        rate = int(parameters["rate"])
+        channels = int(parameters.get("channels", "1"))
+    except (KeyError, ValueError) as exc:
+        raise ValueError("audio/L16 audio must declare an integer rate and channels") from exc
+    if rate <= 0 or channels <= 0:
+        raise ValueError("audio/L16 rate and channels must be positive")
+    frame_bytes = channels * _L16_SAMPLE_BYTES
+    fmt = struct.pack(
+        "<HHIIHH",
+        _PCM_FORMAT_TAG,
+        channels,
+        rate,
+        rate * frame_bytes,
+        frame_bytes,
+        _L16_SAMPLE_BYTES * 8,
+    )
+    return AudioFormat(
+        filename=_WAV_FILENAME, frame_bytes=frame_bytes, fmt_chunk=fmt, big_endian=True
+    )
+
+
+def _parse_media_type(content_type: str | None) -> tuple[str, dict[str, str]]:
+    if not content_type:
+        return "", {}
+    media_type, *rest = content_type.split(";")
+    parameters = {}
+    for item in rest:
+        name, _, value = item.partition("=")
+        parameters[name.strip().lower()] = value.strip().strip('"')
+    return media_type.strip().lower(), parameters
@@ -0,0 +1,100 @@
+"""Splitting long recordings into overlapping segments and stitching their text."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Sequence
+
+_WORD_PATTERN = re.compile(r"\S+")
+_NORMALISE_PATTERN = re.compile(r"[^\w']+")
+_MAX_OVERLAP_WORDS = 48
+_MIN_OVERLAP_WORDS = 2
+_BOUNDARY_FRAGMENT_WORDS = 2
+
+
+def segment_ranges(size: int, *, segment_bytes: int, overlap_bytes: int) -> list[tuple[int, int]]:
+    """Return ``(offset, length)`` byte ranges covering ``size`` bytes.
+
+    Consecutive ranges share ``overlap_bytes`` so words cut at a boundary appear
+    whole in at least one segment.
+    """
+
+    if segment_bytes <= overlap_bytes:
+        raise ValueError("Segments must be larger than their overlap")
+    if size <= segment_bytes:
+        return [(0, size)]
+    step = segment_bytes - overlap_bytes
+    ranges: list[tuple[int, int]] = []
+    offset = 0
+    while True:
+        length = min(segment_bytes, size - offset)
+        ranges.append((offset, length))
+        if offset + length >= size:
+            return ranges
+        offset += step
+
+
+def stitch_transcripts(texts: Sequence[str]) -> str:
+    """Join segment transcripts, dropping the words repeated across each overlap.
+
+    The longest run of at least ``_MIN_OVERLAP_WORDS`` words shared by the end of
+    the text so far and the start of the next segment is treated as the overlap.
+    At most ``_BOUNDARY_FRAGMENT_WORDS`` words after it in the previous text and
+    before it in the next segment are boundary fragments and dropped. Segments
+    without such a run are joined as they are.
+    """
+
+    words: list[str] = []
+    for text in texts:
+        incoming = _WORD_PATTERN.findall(text)
+        if not words:
+            words = incoming
+            continue
+        tail_start = max(0, len(words) - _MAX_OVERLAP_WORDS)
+        match = _longest_shared_run(words[tail_start:], incoming[:_MAX_OVERLAP_WORDS])
+        if match is None:
+            words.extend(incoming)
+            continue
+        previous_index, incoming_index = match
+        words = words[: tail_start + previous_index] + incoming[incoming_index:]
+    return " ".join(words)
+
+
+def merge_confidences(confidences: Sequence[float], weights: Sequence[int]) -> float:
+    """Return the confidence of a stitched transcript weighted by segment size."""
+
+    total = sum(weights)
+    if not total:
+        return min(confidences, default=0.0)
+    return sum(value * weight for value, weight in zip(confidences, weights, strict=True)) / total
+
+
+def _longest_shared_run(previous: Sequence[str], incoming: Sequence[str]) -> tuple[int, int] | None:
+    """Return start indexes of the longest run ending ``previous`` and starting ``incoming``.
+
+    Runs shorter than ``_MIN_OVERLAP_WORDS``, or leaving more than
+    ``_BOUNDARY_FRAGMENT_WORDS`` unmatched words at either edge, are not overlaps.
+    Among equally long runs the latest one wins.
+    """
+
+    left = [_normalise(word) for word in previous]
+    right = [_normalise(word) for word in incoming]
+    best_length = _MIN_OVERLAP_WORDS
+    best: tuple[int, int] | None = None
+    last_end = len(left) - _BOUNDARY_FRAGMENT_WORDS
+    lengths = [0] * (len(right) + 1)
+    for i, word in enumerate(left, start=1):
+        current = [0] * (len(right) + 1)
+        for j, other in enumerate(right, start=1):
+            if word and word == other:
+                length = current[j] = lengths[j - 1] + 1
+                edges_fit = i >= last_end and j - length <= _BOUNDARY_FRAGMENT_WORDS
+                if edges_fit and length >= best_length:
+                    best_length = length
+                    best = (i - length, j - length)
+        lengths = current
+    return best
+
+
+def _normalise(word: str) -> str:
+    return _NORMALISE_PATTERN.sub("", word.lower())
@@ -0,0 +1,80 @@
+"""Incremental NDJSON and CSV encoding for dream archive exports."""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import zlib
+from collections.abc import AsyncIterator
+
+from ..schemas.dreams import Dream, ExportFormat
+
+_FLUSH_CHARS = 64 * 1024
+"""Encoded text gathered before a chunk is sent, so each write carries many rows."""
+
+_CSV_COLUMNS = (
+    "id",
+    "title",
+    "transcript",
+    "tags",
+    "mood",
+    "summary",
+    "created_at",
+    "journal",
+    "journal_generated_at",
+)
+
+
+async def encode_export(
+    dreams: AsyncIterator[Dream], *, export_format: ExportFormat, compress: bool
+) -> AsyncIterator[bytes]:
+    """Encode ``dreams`` one row at a time, holding at most one chunk in memory.
+
+    NDJSON lines are full :class:`Dream` objects, which ``POST /dreams/import``
+    accepts as they are. CSV rows follow a header, with tags as a JSON array and
+    missing values left empty. With ``compress`` the output is a gzip stream
+    produced as the rows are encoded.
+    """
+
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    text = io.StringIO()
+    writer = csv.writer(text, lineterminator="\n") if export_format == "csv" else None
+    if writer is not None:
+        writer.writerow(_CSV_COLUMNS)
+    async for dream in dreams:
+        if writer is None:
+            text.write(dream.model_dump_json())
+            text.write("\n")
+        else:
+            writer.writerow(_csv_row(dream))
+        if text.tell() >= _FLUSH_CHARS:
+            if chunk := _drain(text, compressor):
+                yield chunk
+    if chunk := _drain(text, compressor):
+        yield chunk
+    if compressor is not None:
+        yield compressor.flush()
+
+
+def _csv_row(dream: Dream) -> list[str]:
+    return [
+        dream.id,
+        dream.title,
+        dream.transcript,
+        json.dumps(dream.tags),
+        dream.mood or "",
+        dream.summary,
+        dream.created_at.isoformat(),
+        dream.journal or "",
+        dream.journal_generated_at.isoformat() if dream.journal_generated_at else "",
+    ]
+
+
+def _drain(text: io.StringIO, compressor: zlib._Compress | None) -> bytes:
+    """Empty ``text`` and return its contents as UTF-8, compressed when requested."""
+
+    encoded = text.getvalue().encode("utf-8")
+    text.seek(0)
+    text.truncate()
+    return compressor.compress(encoded) if compressor is not None else encoded
@@ -0,0 +1,164 @@
+"""Incremental NDJSON parsing and parallel drafting for bulk dream imports."""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from collections.abc import AsyncIterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+
+from pydantic import ValidationError
+
+from ..schemas.dreams import Dream, DreamImportItem
+from .dream_repository import draft_import
+from .text_analysis import TranscriptAnalysis, analyse_transcript, remember_analysis
+
+_MIN_CHUNK = 64
+"""Smallest share of a batch sent to one worker; tinier ones cost more to ship than to draft."""
+
+ImportLine = tuple[int, DreamImportItem | str]
+"""A 1-based line number with its parsed dream, or the reason the line was rejected."""
+
+
+async def ndjson_lines(
+    chunks: AsyncIterator[bytes], *, max_line_bytes: int
+) -> AsyncIterator[tuple[int, bytes | None]]:
+    """Split a streamed body into numbered lines, holding at most one line at a time.
+
+    Lines longer than ``max_line_bytes`` are yielded as ``None`` and skipped up
+    to their newline without being buffered. A last line without a trailing
+    newline is yielded as well.
+    """
+
+    buffer = bytearray()
+    oversized = False
+    number = 0
+    async for chunk in chunks:
+        start = 0
+        while (end := chunk.find(b"\n", start)) >= 0:
+            number += 1
+            if oversized or len(buffer) + end - start > max_line_bytes:
+                yield number, None
+            elif buffer:
+                buffer += chunk[start:end]
+                yield number, bytes(buffer)
+            else:
+                yield number, chunk[start:end]
+            buffer.clear()
+            oversized = False
+            start = end + 1
+        if not oversized:
+            buffer += chunk[start:]
+            if len(buffer) > max_line_bytes:
+                buffer.clear()
+                oversized = True
+    if buffer or oversized:
+        yield number + 1, None if oversized else bytes(buffer)
+
+
+async def import_lines(
+    chunks: AsyncIterator[bytes], *, max_line_bytes: int
+) -> AsyncIterator[ImportLine]:
+    """Parse each non-blank NDJSON line into a :class:`DreamImportItem` or an error."""
+
+    async for number, line in ndjson_lines(chunks, max_line_bytes=max_line_bytes):
+        if line is None:
+            yield number, f"Line exceeds the {max_line_bytes} byte limit"
+            continue
+        if not line.strip():
+            continue
+        try:
+            parsed: DreamImportItem | str = DreamImportItem.model_validate_json(line)
+        except ValidationError as exc:
+            parsed = _describe(exc)
+        yield number, parsed
+
+
+async def import_batches(
+    chunks: AsyncIterator[bytes], *, batch_size: int, max_line_bytes: int
+) -> AsyncIterator[list[ImportLine]]:
+    """Group parsed lines into batches of ``batch_size`` as the body streams in."""
+
+    batch: list[ImportLine] = []
+    async for line in import_lines(chunks, max_line_bytes=max_line_bytes):
+        batch.append(line)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def draft_imports(items: Sequence[DreamImportItem]) -> list[Dream]:
+    """Draft a batch of imported dreams in the calling thread."""
+
+    return [draft_import(item) for item in items]
+
+
+def analyse_transcripts(transcripts: Sequence[str]) -> list[TranscriptAnalysis]:
+    """Analyse a chunk of transcripts; runs in the worker processes."""
+
+    return [analyse_transcript(transcript) for transcript in transcripts]
+
+
+class DreamDrafter:
+    """Draft imported dreams in a pool of worker processes.
+
+    Summaries and tags are pure-Python text processing that holds the GIL, so
+    each batch's transcripts are split across processes rather than threads.
+    Only transcripts go out and summaries and tags come back, which keeps the
+    pickling cost well below the analysis itself. The pool starts on first use;
+    workers are spawned rather than forked because the application runs threads
+    that may hold locks. ``workers=0`` drafts in a single worker thread instead.
+    """
+
+    def __init__(self, *, workers: int) -> None:
+        self._workers = workers
+        self._pool: ProcessPoolExecutor | None = None
+
+    async def draft(self, items: Sequence[DreamImportItem]) -> list[Dream]:
+        """Return the drafts of ``items`` in order, without identifiers."""
+
+        if not items:
+            return []
+        if self._workers <= 0:
+            return await asyncio.to_thread(draft_imports, items)
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                self._workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        loop = asyncio.get_running_loop()
+        transcripts = [item.transcript for item in items]
+        size = max(_MIN_CHUNK, -(-len(transcripts) // self._workers))
+        chunks = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    self._pool, analyse_transcripts, transcripts[index : index + size]
+                )
+                for index in range(0, len(transcripts), size)
+            )
+        )
+        analyses = [analysis for chunk in chunks for analysis in chunk]
+        for transcript, analysis in zip(transcripts, analyses, strict=True):
+            remember_analysis(transcript, analysis)
+        return [
+            draft_import(item, analysis) for item, analysis in zip(items, analyses, strict=True)
+        ]
+
+    def close(self) -> None:
+        """Stop the worker processes, abandoning queued chunks."""
+
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+
+def _describe(exc: ValidationError) -> str:
+    """Summarise validation errors on one line, e.g. ``created_at: Field required``."""
+
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+        if error["loc"]
+        else error["msg"]
+        for error in exc.errors(include_url=False)
+    )
@@ -0,0 +1,672 @@
+"""Secondary index structures maintained by the dream store."""
+
+from __future__ import annotations
+
+import calendar
+import heapq
+import itertools
+import math
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from collections.abc import Collection, Iterable, Iterator, Sequence, Set
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from operator import itemgetter
+from typing import TypeVar, get_args
+
+from ..schemas.dreams import TrendGranularity
+
+_TIMESTAMP = itemgetter(0)
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+_Key = TypeVar("_Key")
+
+TREND_GRANULARITIES: tuple[TrendGranularity, ...] = get_args(TrendGranularity)
+
+
+class TimelineIndex:
+    """Dream identifiers kept sorted by ``(created_at, id)``."""
+
+    def __init__(self) -> None:
+        self._keys: list[tuple[datetime, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, dream_id: str, created_at: datetime) -> None:
+        """Register a dream; appending newer entries is amortised O(1)."""
+
+        key = (created_at, dream_id)
+        if not self._keys or self._keys[-1] < key:
+            self._keys.append(key)
+        else:
+            insort(self._keys, key)
+
+    def remove(self, dream_id: str, created_at: datetime) -> bool:
+        """Drop a dream from the index, returning whether it was present."""
+
+        key = (created_at, dream_id)
+        position = bisect_left(self._keys, key)
+        if position < len(self._keys) and self._keys[position] == key:
+            del self._keys[position]
+            return True
+        return False
+
+    def bounds(self, start: datetime | None, end: datetime | None) -> tuple[int, int]:
+        """Return the half-open slot range covering ``start <= created_at <= end``."""
+
+        lower = 0 if start is None else bisect_left(self._keys, start, key=_TIMESTAMP)
+        upper = (
+            len(self._keys)
+            if end is None
+            else bisect_right(self._keys, end, key=_TIMESTAMP)
+        )
+        return lower, max(lower, upper)
+
+    def position(self, created_at: datetime, dream_id: str) -> int:
+        """Return the slot of the first entry not ordered before ``(created_at, dream_id)``."""
+
+        return bisect_left(self._keys, (created_at, dream_id))
+
+    def newest(self, lower: int, upper: int) -> Iterator[str]:
+        """Yield identifiers within ``[lower, upper)`` from newest to oldest."""
+
+        for index in range(upper - 1, lower - 1, -1):
+            yield self._keys[index][1]
+
+
+class PostingIndex:
+    """Inverted index mapping a key such as a tag or mood to dream identifiers."""
+
+    def __init__(self) -> None:
+        self._postings: dict[str, set[str]] = {}
+
+    def add(self, dream_id: str, keys: Iterable[str]) -> None:
+        """Record ``dream_id`` under each of ``keys``."""
+
+        for key in keys:
+            self._postings.setdefault(key, set()).add(dream_id)
+
+    def remove(self, dream_id: str, keys: Iterable[str]) -> None:
+        """Forget ``dream_id`` under each of ``keys``, pruning empty postings."""
+
+        for key in keys:
+            posting = self._postings.get(key)
+            if posting is None:
+                continue
+            posting.discard(dream_id)
+            if not posting:
+                del self._postings[key]
+
+    def get(self, key: str) -> Set[str]:
+        """Return the identifiers recorded under ``key``."""
+
+        return self._postings.get(key, frozenset())
+
+    def all_of(self, keys: Iterable[str]) -> set[str]:
+        """Return identifiers recorded under every key, intersecting smallest first."""
+
+        postings = sorted((self.get(key) for key in set(keys)), key=len)
+        if not postings:
+            return set()
+        matches = set(postings[0])
+        for posting in postings[1:]:
+            if not matches:
+                break
+            matches &= posting
+        return matches
+
+    def any_of(self, keys: Iterable[str]) -> set[str]:
+        """Return identifiers recorded under at least one key."""
+
+        matches: set[str] = set()
+        for key in set(keys):
+            matches |= self.get(key)
+        return matches
+
+
+class TokenIndex:
+    """Inverted token index supporting prefix expansion and BM25 ranking."""
+
+    def __init__(self) -> None:
+        self._postings: dict[str, dict[str, int]] = {}
+        self._vocabulary: list[str] = []
+        self._pending: list[str] = []
+        self._documents: dict[str, tuple[int, tuple[str, ...]]] = {}
+        self._total_length = 0
+
+    def add(self, dream_id: str, tokens: Sequence[str]) -> None:
+        """Index ``tokens`` for ``dream_id``, replacing any previous entry."""
+
+        self.remove(dream_id)
+        frequencies = Counter(tokens)
+        for token, frequency in frequencies.items():
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = {}
+                self._pending.append(token)
+            posting[dream_id] = frequency
+        self._documents[dream_id] = (len(tokens), tuple(frequencies))
+        self._total_length += len(tokens)
+
+    def remove(self, dream_id: str) -> None:
+        """Forget every token recorded for ``dream_id``."""
+
+        document = self._documents.pop(dream_id, None)
+        if document is None:
+            return
+        length, terms = document
+        self._total_length -= length
+        self._merge_pending()
+        for token in terms:
+            posting = self._postings[token]
+            del posting[dream_id]
+            if not posting:
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+    def expand(self, prefix: str) -> list[str]:
+        """Return indexed tokens starting with ``prefix``."""
+
+        self._merge_pending()
+        position = bisect_left(self._vocabulary, prefix)
+        matches: list[str] = []
+        while position < len(self._vocabulary) and self._vocabulary[position].startswith(prefix):
+            matches.append(self._vocabulary[position])
+            position += 1
+        return matches
+
+    def match(self, terms: Sequence[str]) -> set[str]:
+        """Return dreams containing every term; the last term matches as a prefix."""
+
+        postings = sorted(
+            (self._documents_for(terms, index) for index in range(len(terms))), key=len
+        )
+        if not postings:
+            return set()
+        matches = set(postings[0])
+        for posting in postings[1:]:
+            if not matches:
+                break
+            matches &= posting
+        return matches
+
+    def score(self, terms: Sequence[str], dream_ids: Iterable[str]) -> dict[str, float]:
+        """Return BM25 relevance scores of ``dream_ids`` for ``terms``."""
+
+        document_count = len(self._documents)
+        if not document_count:
+            return {}
+        average_length = self._total_length / document_count or 1.0
+        weighted_terms: list[tuple[float, dict[str, int]]] = []
+        for index in range(len(terms)):
+            for token in self._tokens_for(terms, index):
+                posting = self._postings[token]
+                idf = math.log(1 + (document_count - len(posting) + 0.5) / (len(posting) + 0.5))
+                weighted_terms.append((idf, posting))
+
+        scores: dict[str, float] = {}
+        for dream_id in dream_ids:
+            length = self._documents[dream_id][0]
+            norm = _BM25_K1 * (1 - _BM25_B + _BM25_B * length / average_length)
+            total = 0.0
+            for idf, posting in weighted_terms:
+                frequency = posting.get(dream_id)
+                if frequency:
+                    total += idf * frequency * (_BM25_K1 + 1) / (frequency + norm)
+            scores[dream_id] = total
+        return scores
+
+    def _merge_pending(self) -> None:
+        """Fold tokens first seen since the last lookup into the sorted vocabulary.
+
+        Timsort merges the sorted vocabulary with the new run in one pass, so bulk
+        loads such as log replay avoid an O(V) ``insort`` for every new token.
+        """
+
+        if self._pending:
+            self._vocabulary.extend(self._pending)
+            self._vocabulary.sort()
+            self._pending.clear()
+
+    def _tokens_for(self, terms: Sequence[str], index: int) -> list[str]:
+        term = terms[index]
+        if index == len(terms) - 1:
+            return self.expand(term)
+        return [term] if term in self._postings else []
+
+    def _documents_for(self, terms: Sequence[str], index: int) -> Set[str]:
+        tokens = self._tokens_for(terms, index)
+        if len(tokens) == 1:
+            return self._postings[tokens[0]].keys()
+        documents: set[str] = set()
+        for token in tokens:
+            documents.update(self._postings[token])
+        return documents
+
+
+class _MotifDay:
+    """Tag and tag-pair counts of the dreams recorded on one UTC day."""
+
+    __slots__ = ("pairs", "tags")
+
+    def __init__(self) -> None:
+        self.tags: Counter[str] = Counter()
+        self.pairs: Counter[tuple[str, str]] = Counter()
+
+
+class MotifGraph:
+    """Tag co-occurrence counts and a per-tag timeline backing the dream map.
+
+    Pair counts are kept overall and per UTC day, so the pairs among a handful of
+    top tags are looked up in O(motifs²) without a window and summed over the
+    covered days with one. A :class:`TimelineIndex` per tag answers "newest
+    dreams carrying this tag" by bisection.
+    """
+
+    def __init__(self) -> None:
+        self._pairs: Counter[tuple[str, str]] = Counter()
+        self._days: dict[date, _MotifDay] = {}
+        self._day_keys: list[date] = []
+        self._timelines: dict[str, TimelineIndex] = {}
+
+    def add(self, dream_id: str, created_at: datetime, day: date, tags: Iterable[str]) -> None:
+        """Count a dream carrying ``tags`` recorded at ``created_at`` on ``day``."""
+
+        self._apply(dream_id, created_at, day, tags, 1)
+
+    def remove(
+        self, dream_id: str, created_at: datetime, day: date, tags: Iterable[str]
+    ) -> None:
+        """Undo :meth:`add` for the same arguments."""
+
+        self._apply(dream_id, created_at, day, tags, -1)
+
+    def window_counts(
+        self, limit: int, start: date | None, end: date | None
+    ) -> list[tuple[str, int]]:
+        """Return the ``limit`` tags carried by most dreams in the day window.
+
+        Ties are ordered alphabetically.
+        """
+
+        totals: Counter[str] = Counter()
+        for day in self._covered(start, end):
+            totals.update(day.tags)
+        return heapq.nsmallest(limit, totals.items(), key=lambda item: (-item[1], item[0]))
+
+    def pair_counts(
+        self, tags: Sequence[str], start: date | None, end: date | None
+    ) -> dict[tuple[str, str], int]:
+        """Return how many dreams in the day window carry each pair of ``tags``."""
+
+        if start is None and end is None:
+            pairs = (_pair(first, second) for first, second in itertools.combinations(tags, 2))
+            return {pair: self._pairs[pair] for pair in pairs if pair in self._pairs}
+        wanted = set(tags)
+        totals: Counter[tuple[str, str]] = Counter()
+        for day in self._covered(start, end):
+            for pair, count in day.pairs.items():
+                if pair[0] in wanted and pair[1] in wanted:
+                    totals[pair] += count
+        return dict(totals)
+
+    def newest(
+        self, tag: str, limit: int, start: datetime | None, end: datetime | None
+    ) -> list[str]:
+        """Return up to ``limit`` dreams carrying ``tag`` in the time range, newest first."""
+
+        timeline = self._timelines.get(tag)
+        if timeline is None or limit <= 0:
+            return []
+        lower, upper = timeline.bounds(start, end)
+        return list(itertools.islice(timeline.newest(lower, upper), limit))
+
+    def _covered(self, start: date | None, end: date | None) -> Iterator[_MotifDay]:
+        lower = 0 if start is None else bisect_left(self._day_keys, start)
+        upper = len(self._day_keys) if end is None else bisect_right(self._day_keys, end)
+        for day in self._day_keys[lower:upper]:
+            yield self._days[day]
+
+    def _apply(
+        self, dream_id: str, created_at: datetime, day: date, tags: Iterable[str], sign: int
+    ) -> None:
+        distinct = sorted(set(tags))
+        if not distinct:
+            return
+        bucket = self._days.get(day)
+        if bucket is None:
+            bucket = self._days[day] = _MotifDay()
+            insort(self._day_keys, day)
+        for tag in distinct:
+            _adjust(bucket.tags, tag, sign)
+            timeline = self._timelines.setdefault(tag, TimelineIndex())
+            if sign > 0:
+                timeline.add(dream_id, created_at)
+            else:
+                timeline.remove(dream_id, created_at)
+                if not len(timeline):
+                    del self._timelines[tag]
+        for pair in itertools.combinations(distinct, 2):
+            _adjust(self._pairs, pair, sign)
+            _adjust(bucket.pairs, pair, sign)
+        if not bucket.tags:
+            del self._days[day]
+            del self._day_keys[bisect_left(self._day_keys, day)]
+
+
+def _pair(first: str, second: str) -> tuple[str, str]:
+    return (first, second) if first <= second else (second, first)
+
+
+def _adjust(counter: Counter[_Key], key: _Key, delta: int) -> None:
+    """Add ``delta`` to ``counter[key]``, dropping the key when it reaches zero."""
+
+    count = counter[key] + delta
+    if count:
+        counter[key] = count
+    else:
+        del counter[key]
+
+
+def period_start(day: date, granularity: TrendGranularity) -> date:
+    """Return the first day of the day, ISO week or calendar month containing ``day``."""
+
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+@dataclass
+class TrendSpan:
+    """The days ``first`` through ``last`` of the period starting on ``period``.
+
+    ``full`` spans cover their whole period and are read from its rollup bucket;
+    the partial periods at the edges of a window sum day buckets instead.
+    """
+
+    period: date
+    first: date
+    last: date
+    full: bool
+
+
+def trend_spans(start: date, end: date, granularity: TrendGranularity) -> list[TrendSpan]:
+    """Split the UTC days ``start`` through ``end`` into periods of ``granularity``."""
+
+    spans: list[TrendSpan] = []
+    first = start
+    while True:
+        period = period_start(first, granularity)
+        period_last = _period_end(period, granularity)
+        last = min(period_last, end)
+        spans.append(TrendSpan(period, first, last, first == period and last == period_last))
+        if last >= end:
+            return spans
+        first = last + timedelta(days=1)
+
+
+def trend_period_count(start: date, end: date, granularity: TrendGranularity) -> int:
+    """Return how many periods :func:`trend_spans` splits the window into."""
+
+    if granularity == "month":
+        return (end.year - start.year) * 12 + end.month - start.month + 1
+    first, last = period_start(start, granularity), period_start(end, granularity)
+    return (last - first).days // (7 if granularity == "week" else 1) + 1
+
+
+def _period_end(period: date, granularity: TrendGranularity) -> date:
+    if granularity == "week":
+        length = timedelta(days=6)
+    elif granularity == "month":
+        length = timedelta(days=calendar.monthrange(period.year, period.month)[1] - 1)
+    else:
+        return period
+    return period + min(length, date.max - period)
+
+
+class PeriodCounts:
+    """Dream, tag and mood counts of one period."""
+
+    __slots__ = ("dreams", "moods", "tags")
+
+    def __init__(self) -> None:
+        self.dreams = 0
+        self.tags: Counter[str] = Counter()
+        self.moods: Counter[str] = Counter()
+
+    def add(self, kind: str, name: str, count: int) -> None:
+        """Add a ``total``, ``tag`` or ``mood`` count as stored by the SQL rollup tables."""
+
+        if kind == "total":
+            self.dreams += count
+        elif kind == "tag":
+            self.tags[name] += count
+        elif kind == "mood":
+            self.moods[name] += count
+
+    def merge(self, other: PeriodCounts, tags: Collection[str] | None = None) -> None:
+        """Add the counts of ``other``, keeping only ``tags`` if given."""
+
+        self.dreams += other.dreams
+        self.moods.update(other.moods)
+        if tags is None:
+            self.tags.update(other.tags)
+            return
+        for tag in tags:
+            count = other.tags.get(tag)
+            if count:
+                self.tags[tag] += count
+
+    def restricted(self, tags: Collection[str] | None) -> PeriodCounts:
+        """Return an independent copy keeping only ``tags``, or every tag if ``None``."""
+
+        duplicate = PeriodCounts()
+        duplicate.merge(self, tags)
+        return duplicate
+
+
+class PeriodRollups:
+    """Dream, tag and mood counts per UTC day, ISO week and calendar month.
+
+    Every write adjusts one bucket per granularity, so a trend window reads one
+    bucket per period it covers and merges day buckets only for the partial
+    periods at its edges.
+    """
+
+    def __init__(self) -> None:
+        self._buckets: dict[TrendGranularity, dict[date, PeriodCounts]] = {
+            granularity: {} for granularity in TREND_GRANULARITIES
+        }
+
+    def add(self, day: date, tags: Iterable[str], mood: str | None) -> None:
+        """Count a dream recorded on ``day`` carrying ``tags`` and ``mood``."""
+
+        self._apply(day, tags, mood, 1)
+
+    def remove(self, day: date, tags: Iterable[str], mood: str | None) -> None:
+        """Undo :meth:`add` for the same arguments."""
+
+        self._apply(day, tags, mood, -1)
+
+    def read(
+        self,
+        granularity: TrendGranularity,
+        spans: Sequence[TrendSpan],
+        tags: Collection[str] | None = None,
+    ) -> list[PeriodCounts]:
+        """Return independent counts for each span, keeping only ``tags`` if given."""
+
+        buckets = self._buckets[granularity]
+        counts: list[PeriodCounts] = []
+        for span in spans:
+            total = PeriodCounts()
+            if span.full:
+                bucket = buckets.get(span.period)
+                if bucket is not None:
+                    total.merge(bucket, tags)
+            else:
+                for bucket in self._covering(span.first, span.last):
+                    total.merge(bucket, tags)
+            counts.append(total)
+        return counts
+
+    def window(self, start: date, end: date) -> PeriodCounts:
+        """Return the counts of the days ``start`` through ``end``."""
+
+        total = PeriodCounts()
+        for bucket in self._covering(start, end):
+            total.merge(bucket)
+        return total
+
+    def _covering(self, first: date, last: date) -> Iterator[PeriodCounts]:
+        """Yield the buckets of ``first`` through ``last``, taking whole months and weeks first.
+
+        A year-long window is covered by about a dozen month buckets plus a few
+        weeks and days at its edges instead of 365 day buckets.
+        """
+
+        day = first
+        while True:
+            for granularity in reversed(TREND_GRANULARITIES):
+                period_last = _period_end(day, granularity)
+                if period_start(day, granularity) == day and period_last <= last:
+                    break
+            bucket = self._buckets[granularity].get(day)
+            if bucket is not None:
+                yield bucket
+            if period_last >= last:
+                return
+            day = period_last + timedelta(days=1)
+
+    def _apply(self, day: date, tags: Iterable[str], mood: str | None, sign: int) -> None:
+        distinct = set(tags)
+        for granularity, buckets in self._buckets.items():
+            period = period_start(day, granularity)
+            bucket = buckets.get(period)
+            if bucket is None:
+                bucket = buckets[period] = PeriodCounts()
+            bucket.dreams += sign
+            for tag in distinct:
+                _adjust(bucket.tags, tag, sign)
+            if mood:
+                _adjust(bucket.moods, mood, sign)
+            if not bucket.dreams:
+                del buckets[period]
+
+
+class _CountBucket:
+    """Keys sharing one count, linked to the neighbouring counts."""
+
+    __slots__ = ("count", "higher", "keys", "lower")
+
+    def __init__(self, count: int) -> None:
+        self.count = count
+        self.keys: dict[str, None] = {}
+        self.higher: _CountBucket | None = None
+        self.lower: _CountBucket | None = None
+
+
+class RankedCounter:
+    """Counter that keeps keys grouped by count so the top entries are read in O(k).
+
+    Buckets form a doubly linked list ordered by count, and every increment or
+    decrement moves a key into an adjacent bucket in O(1). Keys with equal counts
+    are reported in the order they reached that count.
+    """
+
+    def __init__(self) -> None:
+        self._buckets: dict[str, _CountBucket] = {}
+        self._highest: _CountBucket | None = None
+        self._lowest: _CountBucket | None = None
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def __getitem__(self, key: str) -> int:
+        bucket = self._buckets.get(key)
+        return bucket.count if bucket is not None else 0
+
+    def counts(self) -> dict[str, int]:
+        """Return a plain mapping of every key to its count."""
+
+        return {key: bucket.count for key, bucket in self._buckets.items()}
+
+    def increment(self, key: str) -> None:
+        """Add one occurrence of ``key``."""
+
+        current = self._buckets.get(key)
+        if current is None:
+            target = self._lowest
+            if target is None or target.count != 1:
+                target = self._link(_CountBucket(1), higher=target, lower=None)
+        else:
+            target = current.higher
+            if target is None or target.count != current.count + 1:
+                target = self._link(
+                    _CountBucket(current.count + 1), higher=target, lower=current
+                )
+            self._detach(key, current)
+        target.keys[key] = None
+        self._buckets[key] = target
+
+    def decrement(self, key: str) -> None:
+        """Remove one occurrence of ``key``, forgetting it when the count reaches zero."""
+
+        current = self._buckets.get(key)
+        if current is None:
+            return
+        if current.count == 1:
+            del self._buckets[key]
+            self._detach(key, current)
+            return
+        target = current.lower
+        if target is None or target.count != current.count - 1:
+            target = self._link(_CountBucket(current.count - 1), higher=current, lower=target)
+        self._detach(key, current)
+        target.keys[key] = None
+        self._buckets[key] = target
+
+    def most_common(self, limit: int | None = None) -> list[tuple[str, int]]:
+        """Return up to ``limit`` keys with the highest counts, highest first."""
+
+        result: list[tuple[str, int]] = []
+        bucket = self._highest
+        while bucket is not None:
+            for key in bucket.keys:
+                if limit is not None and len(result) >= limit:
+                    return result
+                result.append((key, bucket.count))
+            bucket = bucket.lower
+        return result
+
+    def _link(
+        self, bucket: _CountBucket, *, higher: _CountBucket | None, lower: _CountBucket | None
+    ) -> _CountBucket:
+        bucket.higher = higher
+        bucket.lower = lower
+        if higher is None:
+            self._highest = bucket
+        else:
+            higher.lower = bucket
+        if lower is None:
+            self._lowest = bucket
+        else:
+            lower.higher = bucket
+        return bucket
+
+    def _detach(self, key: str, bucket: _CountBucket) -> None:
+        del bucket.keys[key]
+        if bucket.keys:
+            return
+        if bucket.higher is None:
+            self._highest = bucket.lower
+        else:
+            bucket.higher.lower = bucket.lower
+        if bucket.lower is None:
+            self._lowest = bucket.higher
+        else:
+            bucket.lower.higher = bucket.higher
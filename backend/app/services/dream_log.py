@@ -0,0 +1,223 @@
+"""Append-only operation log and compacted snapshots backing :class:`DreamStore`."""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import threading
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Literal
+
+from ..schemas.dreams import Dream
+
+DreamOperation = Literal["create", "update", "set_journal", "delete"]
+
+_SNAPSHOT_NAME = "snapshot.jsonl"
+_SEGMENT_PREFIX = "oplog-"
+_SEGMENT_SUFFIX = ".jsonl"
+_SNAPSHOT_VERSION = 1
+
+
+@dataclass
+class LogState:
+    """Dreams recovered from the snapshot and the log tail, oldest first.
+
+    ``version`` counts every mutation ever applied, so the store's version keeps
+    increasing across restarts.
+    """
+
+    dreams: dict[str, Dream] = field(default_factory=dict)
+    counter: int = 0
+    version: int = 0
+
+
+class DreamLog:
+    """Durable record of every mutation applied to a dream store.
+
+    Each operation is written to the current log segment as one JSON line as soon
+    as it is appended, so a process crash loses nothing. ``fsync`` is batched
+    (group commit): :meth:`wait_durable` syncs every append made so far, and
+    callers arriving while a sync is running wait for it and share the next one.
+    Appends nobody waits for are synced by a background thread at most every
+    ``commit_interval`` seconds.
+
+    :meth:`snapshot` writes the full state to ``snapshot.jsonl`` and deletes the
+    segments it covers, so startup replays one snapshot plus a short log tail.
+    """
+
+    def __init__(self, directory: Path, *, commit_interval: float = 0.01) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        self._directory = directory
+        self._commit_interval = commit_interval
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._segment = max(self._segments(), default=0) + 1
+        self._handle = self._open_segment(self._segment)
+        self._appended = 0
+        self._durable = 0
+        self._since_snapshot = 0
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+
+    def load(self) -> LogState:
+        """Replay the latest snapshot and every later log segment."""
+
+        state = LogState()
+        first_segment = 0
+        snapshot = self._directory / _SNAPSHOT_NAME
+        if snapshot.exists():
+            with snapshot.open("rb") as handle:
+                header = json.loads(handle.readline())
+                state.counter = int(header["counter"])
+                state.version = int(header.get("store_version", 0))
+                first_segment = int(header["next_segment"])
+                for line in handle:
+                    dream = Dream.model_validate_json(line)
+                    state.dreams[dream.id] = dream
+        for segment in self._segments():
+            if first_segment <= segment < self._segment:
+                self._replay(self._segment_path(segment), state)
+        return state
+
+    def append(
+        self, operation: DreamOperation, *, dream: Dream | None = None, dream_id: str | None = None
+    ) -> int:
+        """Write one operation and return its sequence number for :meth:`wait_durable`."""
+
+        if operation == "delete":
+            line = json.dumps({"op": operation, "id": dream_id}, separators=(",", ":"))
+        else:
+            assert dream is not None
+            line = f'{{"op":"{operation}","dream":{dream.model_dump_json()}}}'
+        with self._lock:
+            self._handle.write(line.encode("utf-8") + b"\n")
+            self._appended += 1
+            self._since_snapshot += 1
+            return self._appended
+
+    @property
+    def operations_since_snapshot(self) -> int:
+        """Number of operations appended since the last snapshot started."""
+
+        return self._since_snapshot
+
+    def wait_durable(self, sequence: int) -> None:
+        """Block until the append numbered ``sequence`` has been fsynced."""
+
+        if self._durable >= sequence:
+            return
+        with self._io_lock:
+            if self._durable < sequence and not self._handle.closed:
+                self._sync()
+
+    def rotate(self) -> int:
+        """Start a new segment and return the first segment a snapshot taken now excludes.
+
+        Call while holding the store lock so that the dreams passed to
+        :meth:`snapshot` reflect exactly the operations in earlier segments.
+        """
+
+        with self._lock, self._io_lock:
+            self._sync()
+            self._handle.close()
+            self._segment += 1
+            self._handle = self._open_segment(self._segment)
+            self._since_snapshot = 0
+            return self._segment
+
+    def snapshot(
+        self, dreams: Iterable[Dream], *, counter: int, next_segment: int, version: int = 0
+    ) -> None:
+        """Persist ``dreams`` as the state before ``next_segment`` and drop older segments."""
+
+        target = self._directory / _SNAPSHOT_NAME
+        temporary = target.with_suffix(".tmp")
+        with temporary.open("wb") as handle:
+            header = {"version": _SNAPSHOT_VERSION, "counter": counter}
+            header["next_segment"] = next_segment
+            header["store_version"] = version
+            handle.write(json.dumps(header).encode("utf-8") + b"\n")
+            for dream in dreams:
+                handle.write(dream.model_dump_json().encode("utf-8") + b"\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, target)
+        self._sync_directory()
+        for segment in self._segments():
+            if segment < next_segment:
+                self._segment_path(segment).unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """Sync outstanding appends and stop the background flusher."""
+
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._flusher.join()
+        with self._lock, self._io_lock:
+            self._sync()
+            self._handle.close()
+
+    def _flush_loop(self) -> None:
+        while not self._closed.wait(self._commit_interval):
+            with self._io_lock:
+                self._sync()
+
+    def _sync(self) -> None:
+        """Fsync the current segment; callers hold ``_io_lock``."""
+
+        target = self._appended
+        if target == self._durable:
+            return
+        os.fsync(self._handle.fileno())
+        self._durable = target
+
+    def _replay(self, path: Path, state: LogState) -> None:
+        for record in _records(path):
+            state.version += 1
+            if record["op"] == "delete":
+                state.dreams.pop(str(record["id"]), None)
+                continue
+            dream = Dream.model_validate(record["dream"])
+            if record["op"] == "create" and dream.id.isdigit():
+                state.counter = max(state.counter, int(dream.id))
+            state.dreams[dream.id] = dream
+
+    def _segments(self) -> list[int]:
+        segments: list[int] = []
+        for path in self._directory.glob(f"{_SEGMENT_PREFIX}*{_SEGMENT_SUFFIX}"):
+            number = path.name[len(_SEGMENT_PREFIX) : -len(_SEGMENT_SUFFIX)]
+            if number.isdigit():
+                segments.append(int(number))
+        return sorted(segments)
+
+    def _segment_path(self, segment: int) -> Path:
+        return self._directory / f"{_SEGMENT_PREFIX}{segment:08d}{_SEGMENT_SUFFIX}"
+
+    def _open_segment(self, segment: int) -> io.FileIO:
+        handle = self._segment_path(segment).open("ab", buffering=0)
+        self._sync_directory()
+        return handle
+
+    def _sync_directory(self) -> None:
+        descriptor = os.open(self._directory, os.O_RDONLY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+
+def _records(path: Path) -> Iterator[dict[str, object]]:
+    """Yield the log records of ``path``, stopping at a torn final line."""
+
+    with path.open("rb") as handle:
+        for line in handle:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                return
+
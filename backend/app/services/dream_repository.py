@@ -0,0 +1,732 @@
+"""Storage interfaces shared by dream store implementations.
+
+Every implementation drafts summaries, tags, revisions and timestamps with the
+helpers below so that a dream is stored identically whichever backend is used.
+Blocking stores implement :class:`DreamRepository`; the routes use the
+:class:`AsyncDreamRepository` interface, wrapping blocking stores in
+:class:`AsyncDreamStore`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+import contextlib
+import heapq
+import itertools
+import json
+import secrets
+from collections import Counter
+from collections.abc import AsyncIterator, Generator, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, time, timedelta
+from typing import Protocol, runtime_checkable
+
+from ..schemas.dreams import (
+    Dream,
+    DreamCreate,
+    DreamGraph,
+    DreamGraphEdge,
+    DreamGraphNode,
+    DreamHighlights,
+    DreamImportItem,
+    DreamTrends,
+    DreamUpdate,
+    SearchMode,
+    TagMatch,
+    TrendGranularity,
+)
+from .dream_indexes import PeriodCounts, TrendSpan
+from .text_analysis import TranscriptAnalysis, analyse_transcript, tokenize
+
+_TIMESTAMP_INCREMENT = timedelta(seconds=1)
+_TIMESTAMP_EPSILON = timedelta(microseconds=1)
+_EXPORT_BATCH = 256
+
+ListCursor = tuple[datetime, str]
+"""``(created_at, id)`` of the last dream on a page; listings continue strictly after it."""
+
+
+@dataclass
+class DreamPage:
+    """Newest-first slice of dreams matching a listing query.
+
+    ``total`` is ``None`` when the caller skipped counting, and ``has_more``
+    reports whether dreams after the last one on the page match as well.
+    """
+
+    dreams: list[Dream]
+    total: int | None
+    has_more: bool = False
+
+
+@runtime_checkable
+class DreamRepository(Protocol):
+    """Operations the API routes need from a dream store."""
+
+    epoch: int
+    """Identifies the store's version sequence; it changes when versions restart."""
+
+    def create(self, payload: DreamCreate) -> Dream:
+        """Persist a dream and return the stored representation."""
+        ...
+
+    def import_dreams(self, drafts: Sequence[Dream]) -> list[Dream]:
+        """Store drafted dreams under new identifiers in one write, keeping ``created_at``.
+
+        Returns the stored dreams in the order of ``drafts``.
+        """
+        ...
+
+    def list(  # noqa: PLR0913 - keyword-only filters mirror the query string
+        self,
+        *,
+        tag: str | None = None,
+        tags: Sequence[str] | None = None,
+        tag_match: TagMatch = "all",
+        query: str | None = None,
+        search: SearchMode = "tokens",
+        mood: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int | None = None,
+        after: ListCursor | None = None,
+        count_total: bool = True,
+    ) -> DreamPage:
+        """Return dreams matching the filters, newest first unless ranked.
+
+        ``after`` continues a recency-ordered listing strictly after the cursor
+        key; ranked searches ignore it. ``count_total=False`` skips counting the
+        matches and leaves ``total`` as ``None``.
+        """
+        ...
+
+    def get(self, dream_id: str) -> Dream | None:
+        """Retrieve a specific dream by its identifier if available."""
+        ...
+
+    def update(self, dream_id: str, payload: DreamUpdate) -> Dream | None:
+        """Mutate an existing dream entry with the provided payload."""
+        ...
+
+    def delete(self, dream_id: str) -> bool:
+        """Remove a dream entry, returning whether it existed."""
+        ...
+
+    def set_journal(
+        self, dream_id: str, *, narrative: str, generated_at: datetime
+    ) -> Dream | None:
+        """Persist the generated journal on the stored dream."""
+        ...
+
+    def highlights(self) -> DreamHighlights:
+        """Return tag and mood counts over every stored dream."""
+        ...
+
+    def graph(
+        self,
+        *,
+        motifs: int,
+        edges: int,
+        dreams_per_motif: int,
+        start: date | None = None,
+        end: date | None = None,
+    ) -> DreamGraph:
+        """Return the dream map of the strongest motifs within the optional UTC day window.
+
+        Stores keep the counts up to date on every write, so the work depends on
+        ``motifs``, ``edges`` and ``dreams_per_motif`` rather than on the number
+        of stored dreams; a window adds the days it covers.
+        """
+        ...
+
+    def export(self) -> Iterator[Dream]:
+        """Yield every stored dream oldest first from a consistent snapshot.
+
+        Dreams are produced lazily; callers close the iterator if they stop early.
+        """
+        ...
+
+    def trends(
+        self, *, granularity: TrendGranularity, start: date, end: date, motifs: int
+    ) -> DreamTrends:
+        """Return per-period counts over the UTC days ``start`` through ``end``.
+
+        Stores keep day, week and month rollups up to date on every write, so the
+        work depends on the number of periods in the window rather than on the
+        number of dreams recorded in it.
+        """
+        ...
+
+    def version(self) -> int:
+        """Return a number that increases with every mutation of the store."""
+        ...
+
+    def dream_version(self, dream_id: str) -> int | None:
+        """Return a number that changes whenever ``dream_id`` does, or ``None`` if missing."""
+        ...
+
+    def close(self) -> None:
+        """Release resources held by the store."""
+        ...
+
+
+class AsyncDreamRepository(Protocol):
+    """Awaitable counterpart of :class:`DreamRepository` used by the API routes."""
+
+    epoch: int
+    """Identifies the store's version sequence; it changes when versions restart."""
+
+    async def create(self, payload: DreamCreate) -> Dream:
+        """Persist a dream and return the stored representation."""
+        ...
+
+    async def import_dreams(self, drafts: Sequence[Dream]) -> list[Dream]:
+        """Store drafted dreams under new identifiers in one write, keeping ``created_at``.
+
+        Returns the stored dreams in the order of ``drafts``.
+        """
+        ...
+
+    async def list(  # noqa: PLR0913 - keyword-only filters mirror the query string
+        self,
+        *,
+        tag: str | None = None,
+        tags: Sequence[str] | None = None,
+        tag_match: TagMatch = "all",
+        query: str | None = None,
+        search: SearchMode = "tokens",
+        mood: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int | None = None,
+        after: ListCursor | None = None,
+        count_total: bool = True,
+    ) -> DreamPage:
+        """Return dreams matching the filters, newest first unless ranked."""
+        ...
+
+    async def get(self, dream_id: str) -> Dream | None:
+        """Retrieve a specific dream by its identifier if available."""
+        ...
+
+    async def update(self, dream_id: str, payload: DreamUpdate) -> Dream | None:
+        """Mutate an existing dream entry with the provided payload."""
+        ...
+
+    async def delete(self, dream_id: str) -> bool:
+        """Remove a dream entry, returning whether it existed."""
+        ...
+
+    async def set_journal(
+        self, dream_id: str, *, narrative: str, generated_at: datetime
+    ) -> Dream | None:
+        """Persist the generated journal on the stored dream."""
+        ...
+
+    async def highlights(self) -> DreamHighlights:
+        """Return tag and mood counts over every stored dream."""
+        ...
+
+    async def graph(
+        self,
+        *,
+        motifs: int,
+        edges: int,
+        dreams_per_motif: int,
+        start: date | None = None,
+        end: date | None = None,
+    ) -> DreamGraph:
+        """Return the dream map of the strongest motifs within the optional UTC day window."""
+        ...
+
+    def export(self) -> AsyncIterator[Dream]:
+        """Yield every stored dream oldest first from a consistent snapshot."""
+        ...
+
+    async def trends(
+        self, *, granularity: TrendGranularity, start: date, end: date, motifs: int
+    ) -> DreamTrends:
+        """Return per-period counts over the UTC days ``start`` through ``end``."""
+        ...
+
+    async def version(self) -> int:
+        """Return a number that increases with every mutation of the store."""
+        ...
+
+    async def dream_version(self, dream_id: str) -> int | None:
+        """Return a number that changes whenever ``dream_id`` does, or ``None`` if missing."""
+        ...
+
+
+class AsyncDreamStore:
+    """Expose a blocking :class:`DreamRepository` through the async interface.
+
+    In-memory stores answer in microseconds and are called directly on the event
+    loop. Stores marked ``blocking = True`` perform disk I/O, so ``offload`` runs
+    their calls in a worker thread instead.
+    """
+
+    def __init__(self, store: DreamRepository, *, offload: bool = False) -> None:
+        self.store = store
+        self.epoch = store.epoch
+        self._offload = offload
+
+    async def create(self, payload: DreamCreate) -> Dream:
+        """Persist a dream and return the stored representation."""
+
+        if self._offload:
+            return await asyncio.to_thread(self.store.create, payload)
+        return self.store.create(payload)
+
+    async def import_dreams(self, drafts: Sequence[Dream]) -> list[Dream]:
+        """Store drafted dreams under new identifiers in one write, keeping ``created_at``."""
+
+        if self._offload:
+            return await asyncio.to_thread(self.store.import_dreams, drafts)
+        return self.store.import_dreams(drafts)
+
+    async def list(  # noqa: PLR0913 - keyword-only filters mirror the query string
+        self,
+        *,
+        tag: str | None = None,
+        tags: Sequence[str] | None = None,
+        tag_match: TagMatch = "all",
+        query: str | None = None,
+        search: SearchMode = "tokens",
+        mood: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int | None = None,
+        after: ListCursor | None = None,
+        count_total: bool = True,
+    ) -> DreamPage:
+        """Return dreams matching the filters, newest first unless ranked."""
+
+        filters = {
+            "tag": tag,
+            "tags": tags,
+            "tag_match": tag_match,
+            "query": query,
+            "search": search,
+            "mood": mood,
+            "start": start,
+            "end": end,
+            "limit": limit,
+            "after": after,
+            "count_total": count_total,
+        }
+        if self._offload:
+            return await asyncio.to_thread(self.store.list, **filters)  # type: ignore[arg-type]
+        return self.store.list(**filters)  # type: ignore[arg-type]
+
+    async def get(self, dream_id: str) -> Dream | None:
+        """Retrieve a specific dream by its identifier if available."""
+
+        if self._offload:
+            return await asyncio.to_thread(self.store.get, dream_id)
+        return self.store.get(dream_id)
+
+    async def update(self, dream_id: str, payload: DreamUpdate) -> Dream | None:
+        """Mutate an existing dream entry with the provided payload."""
+
+        if self._offload:
+            return await asyncio.to_thread(self.store.update, dream_id, payload)
+        return self.store.update(dream_id, payload)
+
+    async def delete(self, dream_id: str) -> bool:
+        """Remove a dream entry, returning whether it existed."""
+
+        if self._offload:
+            return await asyncio.to_thread(self.store.delete, dream_id)
+        return self.store.delete(dream_id)
+
+    async def set_journal(
+        self, dream_id: str, *, narrative: str, generated_at: datetime
+    ) -> Dream | None:
+        """Persist the generated journal on the stored dream."""
+
+        if self._offload:
+            return await asyncio.to_thread(
+                self.store.set_journal, dream_id, narrative=narrative, generated_at=generated_at
+            )
+        return self.store.set_journal(dream_id, narrative=narrative, generated_at=generated_at)
+
+    async def highlights(self) -> DreamHighlights:
+        """Return tag and mood counts over every stored dream."""
+
+        if self._offload:
+            return await asyncio.to_thread(self.store.highlights)
+        return self.store.highlights()
+
+    async def graph(
+        self,
+        *,
+        motifs: int,
+        edges: int,
+        dreams_per_motif: int,
+        start: date | None = None,
+        end: date | None = None,
+    ) -> DreamGraph:
+        """Return the dream map of the strongest motifs within the optional UTC day window."""
+
+        options = {
+            "motifs": motifs,
+            "edges": edges,
+            "dreams_per_motif": dreams_per_motif,
+            "start": start,
+            "end": end,
+        }
+        if self._offload:
+            return await asyncio.to_thread(self.store.graph, **options)  # type: ignore[arg-type]
+        return self.store.graph(**options)  # type: ignore[arg-type]
+
+    async def export(self) -> AsyncIterator[Dream]:
+        """Yield every stored dream oldest first from a consistent snapshot.
+
+        Dreams are pulled ``_EXPORT_BATCH`` at a time, in a worker thread for
+        offloaded stores, and control returns to the event loop between batches.
+        """
+
+        dreams = self.store.export()
+        try:
+            while True:
+                if self._offload:
+                    batch = await asyncio.to_thread(_take, dreams, _EXPORT_BATCH)
+                else:
+                    batch = _take(dreams, _EXPORT_BATCH)
+                    await asyncio.sleep(0)
+                if not batch:
+                    return
+                for dream in batch:
+                    yield dream
+        finally:
+            # A cancelled pull may still be running in its worker thread, in which
+            # case the generator finishes there and is closed once collected.
+            if isinstance(dreams, Generator):
+                with contextlib.suppress(ValueError):
+                    dreams.close()
+
+    async def trends(
+        self, *, granularity: TrendGranularity, start: date, end: date, motifs: int
+    ) -> DreamTrends:
+        """Return per-period counts over the UTC days ``start`` through ``end``."""
+
+        if self._offload:
+            return await asyncio.to_thread(
+                self.store.trends, granularity=granularity, start=start, end=end, motifs=motifs
+            )
+        return self.store.trends(granularity=granularity, start=start, end=end, motifs=motifs)
+
+    async def version(self) -> int:
+        """Return a number that increases with every mutation of the store."""
+
+        if self._offload:
+            return await asyncio.to_thread(self.store.version)
+        return self.store.version()
+
+    async def dream_version(self, dream_id: str) -> int | None:
+        """Return a number that changes whenever ``dream_id`` does, or ``None`` if missing."""
+
+        if self._offload:
+            return await asyncio.to_thread(self.store.dream_version, dream_id)
+        return self.store.dream_version(dream_id)
+
+
+def _take(dreams: Iterator[Dream], count: int) -> list[Dream]:
+    return list(itertools.islice(dreams, count))
+
+
+def new_epoch() -> int:
+    """Return a random epoch for a store whose version sequence starts afresh."""
+
+    return secrets.randbits(63)
+
+
+def next_timestamp(last_created_at: datetime | None) -> datetime:
+    """Return a creation time strictly after ``last_created_at`` so ordering is stable."""
+
+    timestamp = datetime.now(UTC)
+    if last_created_at is not None:
+        minimum = last_created_at + _TIMESTAMP_INCREMENT
+        timestamp = max(timestamp, minimum + _TIMESTAMP_EPSILON)
+    return timestamp
+
+
+def dream_day(created_at: datetime) -> date:
+    """Return the UTC day a dream recorded at ``created_at`` belongs to."""
+
+    if created_at.tzinfo is None:
+        return created_at.date()
+    return created_at.astimezone(UTC).date()
+
+
+def day_window(
+    start: date | None, end: date | None
+) -> tuple[datetime | None, datetime | None]:
+    """Return the first and last instants of the UTC days ``start`` through ``end``."""
+
+    return (
+        None if start is None else datetime.combine(start, time.min, UTC),
+        None if end is None else datetime.combine(end, time.max, UTC),
+    )
+
+
+def assemble_graph(
+    motifs: Sequence[tuple[str, int]],
+    pairs: Mapping[tuple[str, str], int],
+    recent: Mapping[str, Sequence[Dream]],
+    *,
+    edges: int,
+) -> DreamGraph:
+    """Build the dream map from ranked motifs, co-occurrence counts and recent dreams.
+
+    Motif nodes keep the order of ``motifs`` and the ``edges`` strongest
+    co-occurrences between them are kept. Each dream in ``recent`` is linked to
+    every returned motif it carries, and the ``edges`` pairs of those dreams that
+    share the most tags become ``related`` links. Ties are broken by key, so every
+    store draws the same map from the same counts.
+    """
+
+    motif_ids = {tag: f"motif:{tag}" for tag, _ in motifs}
+    nodes = [
+        DreamGraphNode(id=motif_ids[tag], kind="motif", label=tag, weight=count)
+        for tag, count in motifs
+    ]
+    co_occurring = sorted(
+        (
+            (weight, first, second)
+            for (first, second), weight in pairs.items()
+            if weight > 0 and first in motif_ids and second in motif_ids
+        ),
+        key=lambda item: (-item[0], item[1], item[2]),
+    )
+    graph_edges = [
+        DreamGraphEdge(
+            source=motif_ids[first], target=motif_ids[second], kind="co_occurs", weight=weight
+        )
+        for weight, first, second in co_occurring[:edges]
+    ]
+
+    dreams: dict[str, Dream] = {}
+    for tag, _ in motifs:
+        for dream in recent.get(tag, ()):
+            dreams.setdefault(dream.id, dream)
+    carriers: dict[str, list[str]] = {}
+    for dream in dreams.values():
+        node = f"dream:{dream.id}"
+        nodes.append(
+            DreamGraphNode(id=node, kind="dream", label=dream.title, weight=len(dream.tags))
+        )
+        for tag in dict.fromkeys(dream.tags):
+            carriers.setdefault(tag, []).append(dream.id)
+            if tag in motif_ids:
+                graph_edges.append(
+                    DreamGraphEdge(source=node, target=motif_ids[tag], kind="features", weight=1)
+                )
+
+    shared: Counter[tuple[str, str]] = Counter()
+    for carrier_ids in carriers.values():
+        shared.update(itertools.combinations(sorted(carrier_ids), 2))
+    links = sorted(shared.items(), key=lambda item: (-item[1], item[0]))
+    graph_edges.extend(
+        DreamGraphEdge(
+            source=f"dream:{first}", target=f"dream:{second}", kind="related", weight=weight
+        )
+        for (first, second), weight in links[:edges]
+    )
+    return DreamGraph(nodes=nodes, edges=graph_edges)
+
+
+def top_motifs(window: PeriodCounts, motifs: int) -> list[tuple[str, int]]:
+    """Return the ``motifs`` tags carried by most dreams in ``window``, ties alphabetical."""
+
+    return heapq.nsmallest(motifs, window.tags.items(), key=_by_count)
+
+
+def assemble_trends(
+    granularity: TrendGranularity,
+    spans: Sequence[TrendSpan],
+    counts: Sequence[PeriodCounts],
+    window: PeriodCounts,
+    *,
+    motifs: int,
+) -> DreamTrends:
+    """Build the trend response from the window's totals and the counts of each span.
+
+    Every bucket reports the window's moods and :func:`top_motifs` in the same
+    order, zero counts included, so clients can draw one series per key;
+    ``counts`` only need to hold those tags. The response is validated in one
+    pass from plain values, which keeps a year of day buckets cheap to build.
+    """
+
+    ranked = top_motifs(window, motifs)
+    moods = sorted(((mood, count) for mood, count in window.moods.items() if count), key=_by_count)
+    return DreamTrends.model_validate(
+        {
+            "granularity": granularity,
+            "start": spans[0].first,
+            "end": spans[-1].last,
+            "dream_count": window.dreams,
+            "top_tags": [{"tag": tag, "count": count} for tag, count in ranked],
+            "moods": [{"mood": mood, "count": count} for mood, count in moods],
+            "buckets": [
+                {
+                    "start": span.first,
+                    "end": span.last,
+                    "dream_count": period.dreams,
+                    "moods": {mood: period.moods[mood] for mood, _ in moods},
+                    "tags": {tag: period.tags[tag] for tag, _ in ranked},
+                }
+                for span, period in zip(spans, counts, strict=True)
+            ],
+        }
+    )
+
+
+def _by_count(item: tuple[str, int]) -> tuple[int, str]:
+    return -item[1], item[0]
+
+
+def encode_cursor(dream: Dream) -> str:
+    """Return an opaque cursor continuing a listing after ``dream``."""
+
+    payload = json.dumps([dream.created_at.isoformat(), dream.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> ListCursor:
+    """Parse a cursor produced by :func:`encode_cursor`, raising ``ValueError`` if invalid."""
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, dream_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        created_at = datetime.fromisoformat(timestamp)
+    except (binascii.Error, UnicodeError, TypeError, ValueError) as exc:
+        raise ValueError("Invalid pagination cursor") from exc
+    if not isinstance(dream_id, str) or created_at.tzinfo is None:
+        raise ValueError("Invalid pagination cursor")
+    return created_at, dream_id
+
+
+def draft_dream(
+    payload: DreamCreate,
+    *,
+    identifier: str,
+    created_at: datetime,
+    analysis: TranscriptAnalysis | None = None,
+) -> Dream:
+    """Build a new dream, merging the supplied tags with keywords from the transcript.
+
+    ``analysis`` is the transcript's :func:`analyse_transcript` result when it was
+    computed elsewhere, such as in an import worker process.
+    """
+
+    if analysis is None:
+        analysis = analyse_transcript(payload.transcript)
+    tags = list(payload.tags)
+    if not tags:
+        tags = list(analysis.tags)
+    else:
+        tags = list(dict.fromkeys([*tags, *analysis.tags]))
+    return Dream(
+        id=identifier,
+        title=payload.title,
+        transcript=payload.transcript,
+        tags=tags,
+        mood=payload.mood,
+        summary=analysis.summary,
+        created_at=created_at,
+        journal=None,
+        journal_generated_at=None,
+    )
+
+
+def draft_import(item: DreamImportItem, analysis: TranscriptAnalysis | None = None) -> Dream:
+    """Draft an archived dream like a new one, keeping its original ``created_at``.
+
+    The identifier is left empty; :meth:`DreamRepository.import_dreams` assigns it.
+    """
+
+    return draft_dream(item, identifier="", created_at=item.created_at, analysis=analysis)
+
+
+def revise_dream(current: Dream, payload: DreamUpdate) -> Dream:
+    """Apply an update, redrafting tags and summary and dropping a stale journal."""
+
+    title = payload.title if payload.title is not None else current.title
+    transcript = (
+        payload.transcript
+        if payload.transcript is not None
+        else current.transcript
+    )
+    mood = payload.mood if payload.mood is not None else current.mood
+
+    transcript_changed = (
+        payload.transcript is not None and payload.transcript != current.transcript
+    )
+    if payload.tags is None and not transcript_changed:
+        # The stored tags already include the transcript's keywords.
+        tags = current.tags
+        summary = current.summary
+    else:
+        analysis = analyse_transcript(transcript)
+        if payload.tags is None:
+            tags = list(dict.fromkeys([*current.tags, *analysis.tags]))
+        elif payload.tags:
+            tags = list(dict.fromkeys([*payload.tags, *analysis.tags]))
+        else:
+            tags = list(analysis.tags)
+        summary = analysis.summary if payload.transcript is not None else current.summary
+
+    return Dream(
+        id=current.id,
+        title=title,
+        transcript=transcript,
+        tags=tags,
+        mood=mood,
+        summary=summary,
+        created_at=current.created_at,
+        journal=None if transcript_changed else current.journal,
+        journal_generated_at=(
+            None if transcript_changed else current.journal_generated_at
+        ),
+    )
+
+
+def journal_dream(current: Dream, *, narrative: str, generated_at: datetime) -> Dream:
+    """Return ``current`` carrying a newly generated journal."""
+
+    return current.model_copy(update={"journal": narrative, "journal_generated_at": generated_at})
+
+
+def text_fields(dream: Dream) -> tuple[str, str, str | None]:
+    """Return the fields covered by token search.
+
+    The summary is left out because it is always derived from the transcript.
+    """
+
+    return dream.title, dream.transcript, dream.journal
+
+
+def search_tokens(dream: Dream) -> list[str]:
+    """Return the tokens token search indexes for ``dream``.
+
+    The transcript's tokens come from its memoised analysis.
+    """
+
+    title, transcript, journal = text_fields(dream)
+    return [
+        *tokenize(title),
+        *analyse_transcript(transcript).tokens,
+        *(tokenize(journal) if journal else ()),
+    ]
+
+
+def haystack(dream: Dream) -> str:
+    """Return the lowercase text matched by substring searches."""
+
+    return " ".join(
+        filter(None, [dream.title, dream.transcript, dream.summary, dream.journal])
+    ).lower()
@@ -2,66 +2,54 @@
 
 from __future__ import annotations
 
-import re
 from collections import Counter
+from collections.abc import Iterable, Iterator, Sequence, Set
 from dataclasses import dataclass
-from datetime import UTC, datetime, timedelta
-from threading import Lock
+from datetime import date, datetime
+from itertools import islice
+from threading import Lock, Thread
 
 from ..schemas.dreams import (
     Dream,
     DreamCreate,
+    DreamGraph,
     DreamHighlights,
+    DreamTrends,
     DreamUpdate,
     MoodCount,
+    SearchMode,
     TagCount,
+    TagMatch,
+    TrendGranularity,
 )
-
-_STOPWORDS = {
-    "the",
-    "and",
-    "that",
-    "with",
-    "have",
-    "this",
-    "from",
-    "there",
-    "were",
-    "they",
-    "their",
-    "about",
-    "would",
-    "could",
-    "should",
-    "while",
-    "where",
-    "which",
-    "into",
-    "after",
-    "before",
-    "through",
-    "over",
-    "under",
-    "again",
-    "dream",
-    "dreams",
-    "like",
-    "just",
-    "then",
-    "some",
-    "when",
-    "your",
-    "once",
-}
-
-_SUMMARY_MAX_CHARACTERS = 280
-_SUMMARY_SUFFIX = "..."
-_SUMMARY_SUFFIX_LENGTH = len(_SUMMARY_SUFFIX)
-_SUMMARY_BODY_LENGTH = _SUMMARY_MAX_CHARACTERS - _SUMMARY_SUFFIX_LENGTH
-_MAX_AUTO_TAGS = 5
-_MIN_KEYWORD_LENGTH = 4
-_TIMESTAMP_INCREMENT = timedelta(seconds=1)
-_TIMESTAMP_EPSILON = timedelta(microseconds=1)
+from .dream_indexes import (
+    MotifGraph,
+    PeriodRollups,
+    PostingIndex,
+    RankedCounter,
+    TimelineIndex,
+    TokenIndex,
+    trend_spans,
+)
+from .dream_log import DreamLog, DreamOperation, LogState
+from .dream_repository import (
+    DreamPage,
+    ListCursor,
+    assemble_graph,
+    assemble_trends,
+    day_window,
+    draft_dream,
+    dream_day,
+    haystack,
+    journal_dream,
+    new_epoch,
+    next_timestamp,
+    revise_dream,
+    search_tokens,
+    text_fields,
+    top_motifs,
+)
+from .text_analysis import MAX_AUTO_TAGS, search_terms
 
 
 @dataclass
@@ -69,93 +57,386 @@ class _DreamRecord:
     """Internal representation of a dream stored in memory."""
 
     dream: Dream
+    haystack: str
+
+    @classmethod
+    def of(cls, dream: Dream) -> _DreamRecord:
+        """Wrap ``dream`` with the lowercase text used by substring searches."""
+
+        return cls(dream=dream, haystack=haystack(dream))
 
 
 class DreamStore:
-    """Simple, threadsafe registry used during the early MVP stage."""
+    """Simple, threadsafe registry used during the early MVP stage.
 
-    def __init__(self) -> None:
+    ``check_consistency`` makes :meth:`highlights` recount every dream and raise
+    when the incrementally maintained counters disagree; it is meant for tests.
+
+    With a ``log`` the store replays it on construction and appends every
+    mutation to it. A compacted snapshot is written in the background after
+    ``snapshot_every`` operations. ``durable_writes`` makes mutations wait until
+    their log entry has been fsynced; otherwise they reach the operating system
+    immediately and disk within the log's commit interval. Durable stores are
+    ``blocking``, so the routes call them from a worker thread.
+
+    Every mutation increments :meth:`version` and stamps the affected dream with
+    the new value, which the routes turn into ETags. Versions start again in
+    every process, and a restored log stamps all dreams with its snapshot
+    version, so each store also draws a random :attr:`epoch` for the ETags.
+    """
+
+    def __init__(
+        self,
+        *,
+        check_consistency: bool = False,
+        log: DreamLog | None = None,
+        snapshot_every: int = 100_000,
+        durable_writes: bool = False,
+    ) -> None:
         self._records: dict[str, _DreamRecord] = {}
+        self._timeline = TimelineIndex()
+        self._tags = PostingIndex()
+        self._moods = PostingIndex()
+        self._text = TokenIndex()
+        self._tag_counts = RankedCounter()
+        self._mood_counts = RankedCounter()
+        self._motifs = MotifGraph()
+        self._rollups = PeriodRollups()
+        self._check_consistency = check_consistency
         self._lock = Lock()
         self._counter = 0
         self._last_created_at: datetime | None = None
+        self._version = 0
+        self._versions: dict[str, int] = {}
+        self.epoch = new_epoch()
+        self._log = log
+        self._snapshot_every = snapshot_every
+        self._durable_writes = durable_writes
+        self.blocking = log is not None and durable_writes
+        self._snapshotting: Thread | None = None
+        if log is not None:
+            self._restore(log.load())
+
+    def _restore(self, state: LogState) -> None:
+        """Rebuild records and indexes from replayed log state, oldest first."""
+
+        with self._lock:
+            for dream in state.dreams.values():
+                self._records[dream.id] = _DreamRecord.of(dream)
+                self._reindex(None, dream)
+                if self._last_created_at is None or dream.created_at > self._last_created_at:
+                    self._last_created_at = dream.created_at
+            self._counter = state.counter
+            self._version = state.version
+            self._versions = dict.fromkeys(state.dreams, state.version)
+
+    def _write(
+        self, operation: DreamOperation, *, dream: Dream | None = None, dream_id: str | None = None
+    ) -> int | None:
+        """Record a mutation's versions and append it to the log.
+
+        Callers must hold ``self._lock``.
+        """
+
+        self._version += 1
+        if operation == "delete":
+            self._versions.pop(dream_id or "", None)
+        elif dream is not None:
+            self._versions[dream.id] = self._version
+        if self._log is None:
+            return None
+        sequence = self._log.append(operation, dream=dream, dream_id=dream_id)
+        if self._log.operations_since_snapshot >= self._snapshot_every and (
+            self._snapshotting is None or not self._snapshotting.is_alive()
+        ):
+            self._snapshotting = self._start_snapshot(self._log)
+        return sequence
+
+    def _committed(self, sequence: int | None) -> None:
+        """Wait for ``sequence`` to be fsynced when writes must be durable."""
+
+        if sequence is not None and self._durable_writes and self._log is not None:
+            self._log.wait_durable(sequence)
+
+    def _start_snapshot(self, log: DreamLog) -> Thread:
+        """Rotate the log and write the current dreams in a background thread.
+
+        Callers must hold ``self._lock``; records are immutable once stored, so the
+        captured list stays consistent while later mutations continue.
+        """
+
+        next_segment = log.rotate()
+        identifiers = list(self._timeline.newest(0, len(self._timeline)))
+        identifiers.reverse()
+        dreams = [self._records[dream_id].dream for dream_id in identifiers]
+        thread = Thread(
+            target=log.snapshot,
+            args=(dreams,),
+            kwargs={
+                "counter": self._counter,
+                "next_segment": next_segment,
+                "version": self._version,
+            },
+            daemon=True,
+        )
+        thread.start()
+        return thread
+
+    def _ranked(
+        self,
+        terms: Sequence[str],
+        candidates: Set[str],
+        *,
+        start: datetime | None,
+        end: datetime | None,
+        limit: int | None,
+    ) -> DreamPage:
+        """Order matching dreams by BM25 score, breaking ties by recency."""
+
+        dreams = self._within(candidates, start=start, end=end)
+        scores = self._text.score(terms, (dream.id for dream in dreams))
+        dreams.sort(key=lambda dream: (scores[dream.id], *_timeline_key(dream)), reverse=True)
+        return DreamPage(dreams=dreams[:limit], total=len(dreams))
+
+    def _within(
+        self, dream_ids: Iterable[str], *, start: datetime | None, end: datetime | None
+    ) -> list[Dream]:
+        """Resolve ``dream_ids`` to dreams recorded inside the optional time window."""
+
+        return [
+            dream
+            for dream in (self._records[dream_id].dream for dream_id in dream_ids)
+            if (start is None or dream.created_at >= start)
+            and (end is None or dream.created_at <= end)
+        ]
+
+    def _postings(
+        self,
+        *,
+        tag: str | None,
+        tags: Sequence[str] | None,
+        tag_match: TagMatch,
+        mood: str | None,
+    ) -> list[Set[str]]:
+        """Collect the posting sets selected by the tag and mood filters."""
+
+        postings: list[Set[str]] = []
+        if tag:
+            postings.append(self._tags.get(tag))
+        if tags:
+            if tag_match == "any":
+                postings.append(self._tags.any_of(tags))
+            else:
+                postings.append(self._tags.all_of(tags))
+        if mood:
+            postings.append(self._moods.get(mood))
+        return postings
 
     def create(self, payload: DreamCreate) -> Dream:
         """Persist a dream and return the stored representation."""
 
         with self._lock:
             self._counter += 1
-            identifier = str(self._counter)
-
-        tags = list(payload.tags)
-        if not tags:
-            tags = _generate_tags(payload.transcript)
-        else:
-            auto_tags = _generate_tags(payload.transcript)
-            tags = list(dict.fromkeys([*tags, *auto_tags]))
-
-        timestamp = datetime.now(UTC)
-        if self._last_created_at is not None:
-            minimum = self._last_created_at + _TIMESTAMP_INCREMENT
-            timestamp = max(timestamp, minimum + _TIMESTAMP_EPSILON)
-
-        dream = Dream(
-            id=identifier,
-            title=payload.title,
-            transcript=payload.transcript,
-            tags=tags,
-            mood=payload.mood,
-            summary=_summarise(payload.transcript),
-            created_at=timestamp,
-            journal=None,
-            journal_generated_at=None,
-        )
-        self._records[dream.id] = _DreamRecord(dream=dream)
-        self._last_created_at = timestamp
+            timestamp = next_timestamp(self._last_created_at)
+            dream = draft_dream(payload, identifier=str(self._counter), created_at=timestamp)
+            self._records[dream.id] = _DreamRecord.of(dream)
+            self._reindex(None, dream)
+            self._last_created_at = timestamp
+            sequence = self._write("create", dream=dream)
+        self._committed(sequence)
         return dream
 
-    def list(
+    def import_dreams(self, drafts: Sequence[Dream]) -> list[Dream]:
+        """Store drafted dreams under new identifiers in one critical section.
+
+        Drafts keep their ``created_at``; later creates are still stamped after
+        the newest stored dream. Durable stores wait for the last log entry only.
+        """
+
+        dreams: list[Dream] = []
+        sequence = None
+        with self._lock:
+            for draft in drafts:
+                self._counter += 1
+                dream = draft.model_copy(update={"id": str(self._counter)})
+                self._records[dream.id] = _DreamRecord.of(dream)
+                self._reindex(None, dream)
+                if self._last_created_at is None or dream.created_at > self._last_created_at:
+                    self._last_created_at = dream.created_at
+                sequence = self._write("create", dream=dream)
+                dreams.append(dream)
+        self._committed(sequence)
+        return dreams
+
+    def list(  # noqa: PLR0913 - keyword-only filters mirror the query string
         self,
         *,
         tag: str | None = None,
+        tags: Sequence[str] | None = None,
+        tag_match: TagMatch = "all",
         query: str | None = None,
+        search: SearchMode = "tokens",
         mood: str | None = None,
         start: datetime | None = None,
         end: datetime | None = None,
-    ) -> list[Dream]:
-        """Return stored dreams ordered by creation time descending."""
+        limit: int | None = None,
+        after: ListCursor | None = None,
+        count_total: bool = True,
+    ) -> DreamPage:
+        """Return stored dreams ordered by creation time descending.
+
+        ``start``/``end`` are resolved against the timeline index by bisection and
+        tag/mood filters intersect posting sets, so the work done scales with the
+        number of matching dreams rather than with the size of the store. ``tags``
+        requires every listed tag when ``tag_match`` is ``"all"`` and at least one
+        of them when it is ``"any"``; ``tag`` is always required on top.
+
+        ``query`` is answered from the token index, treating the last term as a
+        prefix. ``search="ranked"`` orders matches by BM25 relevance instead of
+        recency, and ``search="substring"`` keeps plain substring semantics, which
+        is also the fallback for queries the tokenizer cannot represent.
+
+        ``after`` resumes below the cursor key by bisecting the timeline, so an
+        unfiltered page costs O(limit) when ``count_total`` is ``False``.
+        """
 
-        dreams = sorted(
-            (record.dream for record in self._records.values()),
-            key=lambda dream: dream.created_at,
-            reverse=True,
-        )
-        filtered: list[Dream] = []
-        for dream in dreams:
-            if tag and tag not in dream.tags:
-                continue
-            if mood and dream.mood != mood:
-                continue
-            if start and dream.created_at < start:
-                continue
-            if end and dream.created_at > end:
-                continue
-            if query:
-                haystack = " ".join(
-                    filter(
-                        None,
-                        [
-                            dream.title,
-                            dream.transcript,
-                            dream.summary,
-                            dream.journal,
-                        ],
-                    )
-                ).lower()
-                if query.lower() not in haystack:
+        with self._lock:
+            lower, upper = self._timeline.bounds(start, end)
+            postings = self._postings(tag=tag, tags=tags, tag_match=tag_match, mood=mood)
+            terms = search_terms(query) if query and search != "substring" else None
+            needle = query.lower() if query and terms is None else None
+            if terms is not None:
+                postings.append(self._text.match(terms))
+            candidates = _intersect(postings)
+
+            if terms is not None and search == "ranked":
+                return self._ranked(terms, candidates or set(), start=start, end=end, limit=limit)
+
+            cutoff = upper
+            if after is not None:
+                cutoff = min(upper, max(lower, self._timeline.position(*after)))
+
+            ordered: Iterable[str]
+            matching: Iterable[str]
+            known_total: int | None
+            if candidates is None:
+                ordered = self._timeline.newest(lower, cutoff)
+                matching = self._timeline.newest(lower, upper)
+                known_total = upper - lower
+            elif len(candidates) < upper - lower:
+                dreams = self._within(candidates, start=start, end=end)
+                known_total = len(dreams)
+                matching = [dream.id for dream in dreams]
+                if after is not None:
+                    dreams = [dream for dream in dreams if _timeline_key(dream) < after]
+                dreams.sort(key=_timeline_key, reverse=True)
+                ordered = [dream.id for dream in dreams]
+            else:
+                ordered = _members(self._timeline.newest(lower, cutoff), candidates)
+                matching = _members(self._timeline.newest(lower, upper), candidates)
+                known_total = None
+
+            if needle is None and (known_total is not None or not count_total):
+                identifiers = ordered if limit is None else islice(ordered, limit + 1)
+                page = [self._records[dream_id].dream for dream_id in identifiers]
+                has_more = limit is not None and len(page) > limit
+                return DreamPage(
+                    dreams=page[:limit] if has_more else page,
+                    total=known_total if count_total else None,
+                    has_more=has_more,
+                )
+
+            filtered: list[Dream] = []
+            has_more = False
+            for dream_id in ordered:
+                record = self._records[dream_id]
+                if needle and needle not in record.haystack:
                     continue
-            filtered.append(dream)
-        return filtered
+                if limit is not None and len(filtered) >= limit:
+                    has_more = True
+                    break
+                filtered.append(record.dream)
+            total = None
+            if count_total:
+                total = sum(
+                    1
+                    for dream_id in matching
+                    if not needle or needle in self._records[dream_id].haystack
+                )
+            return DreamPage(dreams=filtered, total=total, has_more=has_more)
+
+    def _reindex(self, before: Dream | None, after: Dream | None) -> None:
+        """Apply the difference between two versions of a dream to every index.
+
+        Callers must hold ``self._lock``.
+        """
+
+        if before is not None and (after is None or after.created_at != before.created_at):
+            self._timeline.remove(before.id, before.created_at)
+        if after is not None and (before is None or before.created_at != after.created_at):
+            self._timeline.add(after.id, after.created_at)
+
+        old_tags = set(before.tags) if before is not None else set()
+        new_tags = set(after.tags) if after is not None else set()
+        if before is not None:
+            self._tags.remove(before.id, old_tags - new_tags)
+        if after is not None:
+            self._tags.add(after.id, new_tags - old_tags)
+        for removed_tag in old_tags - new_tags:
+            self._tag_counts.decrement(removed_tag)
+        for added_tag in new_tags - old_tags:
+            self._tag_counts.increment(added_tag)
+        self._reindex_motifs(before, after)
+        self._reindex_rollups(before, after)
+
+        old_mood = before.mood if before is not None else None
+        new_mood = after.mood if after is not None else None
+        if old_mood != new_mood:
+            if before is not None and old_mood:
+                self._moods.remove(before.id, [old_mood])
+                self._mood_counts.decrement(old_mood)
+            if after is not None and new_mood:
+                self._moods.add(after.id, [new_mood])
+                self._mood_counts.increment(new_mood)
+
+        if after is None:
+            if before is not None:
+                self._text.remove(before.id)
+        elif before is None or text_fields(before) != text_fields(after):
+            self._text.add(after.id, search_tokens(after))
+
+    def _reindex_motifs(self, before: Dream | None, after: Dream | None) -> None:
+        """Move a dream's tag pairs in the motif graph when its tags or day change."""
+
+        if (
+            before is not None
+            and after is not None
+            and set(before.tags) == set(after.tags)
+            and before.created_at == after.created_at
+        ):
+            return
+        if before is not None:
+            self._motifs.remove(
+                before.id, before.created_at, dream_day(before.created_at), before.tags
+            )
+        if after is not None:
+            self._motifs.add(after.id, after.created_at, dream_day(after.created_at), after.tags)
+
+    def _reindex_rollups(self, before: Dream | None, after: Dream | None) -> None:
+        """Move a dream between the trend rollups when its tags or mood change."""
+
+        if (
+            before is not None
+            and after is not None
+            and set(before.tags) == set(after.tags)
+            and before.mood == after.mood
+            and before.created_at == after.created_at
+        ):
+            return
+        if before is not None:
+            self._rollups.remove(dream_day(before.created_at), before.tags, before.mood)
+        if after is not None:
+            self._rollups.add(dream_day(after.created_at), after.tags, after.mood)
 
     def get(self, dream_id: str) -> Dream | None:
         """Retrieve a specific dream by its identifier if available."""
@@ -163,6 +444,16 @@ class DreamStore:
         record = self._records.get(dream_id)
         return record.dream if record else None
 
+    def version(self) -> int:
+        """Return a number that increases with every mutation of the store."""
+
+        return self._version
+
+    def dream_version(self, dream_id: str) -> int | None:
+        """Return the store version that last changed ``dream_id``, if it exists."""
+
+        return self._versions.get(dream_id)
+
     def update(self, dream_id: str, payload: DreamUpdate) -> Dream | None:
         """Mutate an existing dream entry with the provided payload."""
 
@@ -172,53 +463,24 @@ class DreamStore:
                 return None
 
             current = record.dream
-            title = payload.title if payload.title is not None else current.title
-            transcript = (
-                payload.transcript
-                if payload.transcript is not None
-                else current.transcript
-            )
-            mood = payload.mood if payload.mood is not None else current.mood
-
-            auto_tags = _generate_tags(transcript)
-            if payload.tags is None:
-                base_tags = current.tags
-                tags = list(dict.fromkeys([*base_tags, *auto_tags]))
-            elif payload.tags:
-                tags = list(dict.fromkeys([*payload.tags, *auto_tags]))
-            else:
-                tags = auto_tags
-
-            summary = (
-                _summarise(transcript)
-                if payload.transcript is not None
-                else current.summary
-            )
-            transcript_changed = (
-                payload.transcript is not None and payload.transcript != current.transcript
-            )
-
-            updated = Dream(
-                id=current.id,
-                title=title,
-                transcript=transcript,
-                tags=tags,
-                mood=mood,
-                summary=summary,
-                created_at=current.created_at,
-                journal=None if transcript_changed else current.journal,
-                journal_generated_at=(
-                    None if transcript_changed else current.journal_generated_at
-                ),
-            )
-            record.dream = updated
-            return updated
+            updated = revise_dream(current, payload)
+            self._records[dream_id] = _DreamRecord.of(updated)
+            self._reindex(current, updated)
+            sequence = self._write("update", dream=updated)
+        self._committed(sequence)
+        return updated
 
     def delete(self, dream_id: str) -> bool:
         """Remove a dream entry from the registry."""
 
         with self._lock:
-            return self._records.pop(dream_id, None) is not None
+            record = self._records.pop(dream_id, None)
+            if record is None:
+                return False
+            self._reindex(record.dream, None)
+            sequence = self._write("delete", dream_id=dream_id)
+        self._committed(sequence)
+        return True
 
     def set_journal(
         self, dream_id: str, *, narrative: str, generated_at: datetime
@@ -230,70 +492,158 @@ class DreamStore:
             if record is None:
                 return None
             current = record.dream
-            updated = Dream(
-                id=current.id,
-                title=current.title,
-                transcript=current.transcript,
-                tags=current.tags,
-                mood=current.mood,
-                summary=current.summary,
-                created_at=current.created_at,
-                journal=narrative,
-                journal_generated_at=generated_at,
-            )
-            record.dream = updated
-            return updated
+            updated = journal_dream(current, narrative=narrative, generated_at=generated_at)
+            self._records[dream_id] = _DreamRecord.of(updated)
+            self._reindex(current, updated)
+            sequence = self._write("set_journal", dream=updated)
+        self._committed(sequence)
+        return updated
+
+    def snapshot(self) -> None:
+        """Write a compacted snapshot of the log now and wait for it to finish."""
+
+        if self._log is None:
+            return
+        with self._lock:
+            previous = self._snapshotting
+        if previous is not None:
+            previous.join()
+        with self._lock:
+            self._snapshotting = self._start_snapshot(self._log)
+        self._snapshotting.join()
+
+    def close(self) -> None:
+        """Finish any running snapshot and sync the log."""
+
+        if self._snapshotting is not None:
+            self._snapshotting.join()
+        if self._log is not None:
+            self._log.close()
 
     def highlights(self) -> DreamHighlights:
-        """Calculate lightweight insights for the recorded dreams."""
+        """Return insights from the running tag and mood counters in O(k)."""
+
+        with self._lock:
+            total = len(self._records)
+            top_tags = self._tag_counts.most_common(MAX_AUTO_TAGS)
+            moods = self._mood_counts.most_common()
+            if self._check_consistency:
+                self._verify_counts(top_tags, moods)
+
+        return DreamHighlights(
+            total_count=total,
+            top_tags=[TagCount(tag=tag, count=count) for tag, count in top_tags],
+            moods=[MoodCount(mood=mood, count=count) for mood, count in moods],
+        )
+
+    def graph(
+        self,
+        *,
+        motifs: int,
+        edges: int,
+        dreams_per_motif: int,
+        start: date | None = None,
+        end: date | None = None,
+    ) -> DreamGraph:
+        """Return the dream map of the strongest motifs within the optional UTC day window.
+
+        Without a window the top motifs come from the ranked tag counter in
+        O(motifs) and their pairs are looked up directly; a window sums the
+        per-day counts of the days it covers. Recent dreams per motif are read
+        from each tag's timeline, so no step visits every stored dream.
+        """
+
+        first, last = day_window(start, end)
+        with self._lock:
+            if start is None and end is None:
+                ranked = self._tag_counts.most_common(motifs)
+            else:
+                ranked = self._motifs.window_counts(motifs, start, end)
+            tags = [tag for tag, _ in ranked]
+            pairs = self._motifs.pair_counts(tags, start, end)
+            recent = {
+                tag: [
+                    self._records[dream_id].dream
+                    for dream_id in self._motifs.newest(tag, dreams_per_motif, first, last)
+                ]
+                for tag in tags
+            }
+        return assemble_graph(ranked, pairs, recent, edges=edges)
+
+    def export(self) -> Iterator[Dream]:
+        """Return every dream oldest first as of the call.
+
+        Records are immutable once stored, so the dreams captured under the lock
+        stay consistent while later mutations continue; the snapshot costs one
+        reference per dream.
+        """
+
+        with self._lock:
+            identifiers = list(self._timeline.newest(0, len(self._timeline)))
+            dreams = [self._records[dream_id].dream for dream_id in reversed(identifiers)]
+        return iter(dreams)
+
+    def trends(
+        self, *, granularity: TrendGranularity, start: date, end: date, motifs: int
+    ) -> DreamTrends:
+        """Return per-period counts over the UTC days ``start`` through ``end``.
+
+        Window totals merge month buckets, whole periods are copied from their
+        bucket and the partial periods at the window's edges sum at most a month
+        of day buckets each; only the window's top motifs are copied per bucket.
+        """
+
+        spans = trend_spans(start, end, granularity)
+        with self._lock:
+            window = self._rollups.window(start, end)
+            tags = [tag for tag, _ in top_motifs(window, motifs)]
+            counts = self._rollups.read(granularity, spans, tags)
+        return assemble_trends(granularity, spans, counts, window, motifs=motifs)
+
+    def _verify_counts(
+        self, top_tags: Sequence[tuple[str, int]], moods: Sequence[tuple[str, int]]
+    ) -> None:
+        """Compare the running counters with a full recount of every dream."""
 
-        dreams = [record.dream for record in self._records.values()]
         tag_counter: Counter[str] = Counter()
         mood_counter: Counter[str] = Counter()
+        for record in self._records.values():
+            tag_counter.update(record.dream.tags)
+            if record.dream.mood:
+                mood_counter.update([record.dream.mood])
 
-        for dream in dreams:
-            tag_counter.update(dream.tags)
-            if dream.mood:
-                mood_counter.update([dream.mood])
+        expected_tags = [count for _, count in tag_counter.most_common(MAX_AUTO_TAGS)]
+        if (
+            self._tag_counts.counts() != dict(tag_counter)
+            or [count for _, count in top_tags] != expected_tags
+            or self._mood_counts.counts() != dict(mood_counter)
+            or [count for _, count in moods] != sorted(mood_counter.values(), reverse=True)
+        ):
+            raise RuntimeError("Incremental highlight counters diverged from a full recount")
 
-        top_tags = [
-            TagCount(tag=tag, count=count)
-            for tag, count in tag_counter.most_common(_MAX_AUTO_TAGS)
-        ]
-        mood_counts = [
-            MoodCount(mood=mood, count=count)
-            for mood, count in mood_counter.most_common()
-        ]
 
-        return DreamHighlights(total_count=len(dreams), top_tags=top_tags, moods=mood_counts)
-
-
-def _summarise(transcript: str) -> str:
-    """Generate a short summary from the provided transcript."""
-
-    cleaned = " ".join(chunk.strip() for chunk in transcript.splitlines() if chunk.strip())
-    if not cleaned:
-        return ""
-    sentences = re.split(r"(?<=[.!?])\s+", cleaned)
-    primary = sentences[0]
-    if len(sentences) > 1:
-        secondary = sentences[1]
-        combined = f"{primary} {secondary}"
-    else:
-        combined = primary
-    if len(combined) <= _SUMMARY_MAX_CHARACTERS:
-        return combined
-    return f"{combined[:_SUMMARY_BODY_LENGTH]}{_SUMMARY_SUFFIX}"
-
-
-def _generate_tags(transcript: str) -> list[str]:
-    """Derive lightweight keyword tags from a transcript."""
-
-    words = re.findall(r"[A-Za-zÀ-ÖØ-öø-ÿ']+", transcript.lower())
-    filtered = [
-        word
-        for word in words
-        if len(word) >= _MIN_KEYWORD_LENGTH and word not in _STOPWORDS
-    ]
-    counter: Counter[str] = Counter(filtered)
-    return [word for word, _ in counter.most_common(_MAX_AUTO_TAGS)]
+def _timeline_key(dream: Dream) -> tuple[datetime, str]:
+    """Return the ordering key shared with :class:`TimelineIndex`."""
+
+    return dream.created_at, dream.id
+
+
+def _members(identifiers: Iterable[str], candidates: Set[str]) -> Iterator[str]:
+    """Yield the ``identifiers`` that are also in ``candidates``, keeping their order."""
+
+    return (dream_id for dream_id in identifiers if dream_id in candidates)
+
+
+def _intersect(postings: list[Set[str]]) -> set[str] | None:
+    """Intersect posting sets smallest first, or return ``None`` when unfiltered."""
+
+    if not postings:
+        return None
+    postings = sorted(postings, key=len)
+    matches = set(postings[0])
+    for posting in postings[1:]:
+        if not matches:
+            break
+        matches &= posting
+    return matches
+
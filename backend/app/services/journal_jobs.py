@@ -0,0 +1,236 @@
+"""In-process background queue for journal generation."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import tempfile
+from collections import OrderedDict, deque
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from pathlib import Path
+from uuid import uuid4
+
+from pydantic import ValidationError
+
+from ..schemas.dreams import DreamJournalJob, DreamJournalRequest, DreamJournalResponse
+
+JournalJobHandler = Callable[[DreamJournalJob], Awaitable[DreamJournalResponse]]
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a job cannot be accepted without exceeding the queue bounds."""
+
+
+class JournalJobQueue:
+    """Bounded worker pool that generates journals outside the request cycle.
+
+    Pending jobs are kept in one FIFO per user and workers take the next job from
+    each user in turn, so a single caller queueing many jobs cannot starve others.
+    ``submit`` rejects work once ``capacity`` jobs are pending overall or
+    ``per_user_capacity`` are pending for the caller. When ``directory`` is set,
+    every state change is written there and unfinished jobs are re-queued by
+    ``start`` after a restart. Only the newest ``retained`` finished jobs are kept.
+
+    Job files are written and removed by a single writer thread, off the event
+    loop and in the order the state changes happened, so a slow write can never
+    land after a newer one for the same job.
+    """
+
+    def __init__(
+        self,
+        handler: JournalJobHandler,
+        *,
+        workers: int = 4,
+        capacity: int = 256,
+        per_user_capacity: int = 16,
+        retained: int = 1024,
+        directory: Path | None = None,
+    ) -> None:
+        self._handler = handler
+        self._workers = workers
+        self._capacity = capacity
+        self._per_user_capacity = per_user_capacity
+        self._retained = retained
+        self._directory = directory
+        self._jobs: dict[str, DreamJournalJob] = {}
+        self._pending: OrderedDict[str, deque[str]] = OrderedDict()
+        self._finished: deque[str] = deque()
+        self._running = 0
+        self._ready: asyncio.Semaphore | None = None
+        self._tasks: list[asyncio.Task[None]] = []
+        self._writer: ThreadPoolExecutor | None = None
+        if directory is not None:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="journal-jobs")
+
+    async def submit(
+        self, *, user: str, dream_id: str, request: DreamJournalRequest
+    ) -> DreamJournalJob:
+        """Queue a journal generation and return its initial status once it is saved."""
+
+        queued = self._pending.get(user)
+        if self.depth >= self._capacity:
+            raise QueueFullError("Journal queue is full")
+        if queued is not None and len(queued) >= self._per_user_capacity:
+            raise QueueFullError("Too many journal jobs queued for this user")
+        job = DreamJournalJob(
+            id=uuid4().hex,
+            dream_id=dream_id,
+            user=user,
+            request=request,
+            created_at=datetime.now(UTC),
+        )
+        saved = self._save(job)
+        self._enqueue(job)
+        await saved
+        return job
+
+    def get(self, job_id: str) -> DreamJournalJob | None:
+        """Return the latest known status of ``job_id``."""
+
+        return self._jobs.get(job_id)
+
+    @property
+    def depth(self) -> int:
+        """Number of jobs waiting for a worker."""
+
+        return sum(len(queued) for queued in self._pending.values())
+
+    @property
+    def running(self) -> int:
+        """Number of jobs currently being generated."""
+
+        return self._running
+
+    async def start(self) -> None:
+        """Restore persisted jobs and start the worker pool on the running loop."""
+
+        stored_jobs = await asyncio.to_thread(self._load)
+        for stored in sorted(stored_jobs, key=lambda job: job.created_at):
+            if stored.id in self._jobs:
+                continue
+            if stored.state in ("queued", "running"):
+                requeued = stored.model_copy(update={"state": "queued", "started_at": None})
+                saved = self._save(requeued)
+                self._enqueue(requeued)
+                await saved
+            else:
+                self._jobs[stored.id] = stored
+                await self._retire(stored.id)
+        self._ready = asyncio.Semaphore(self.depth)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self._workers)]
+
+    async def stop(self) -> None:
+        """Cancel the workers; interrupted jobs resume on the next ``start``."""
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._ready = None
+
+    def _enqueue(self, job: DreamJournalJob) -> None:
+        self._jobs[job.id] = job
+        self._pending.setdefault(job.user, deque()).append(job.id)
+        if self._ready is not None:
+            self._ready.release()
+
+    def _next(self) -> DreamJournalJob:
+        user, queued = next(iter(self._pending.items()))
+        job_id = queued.popleft()
+        if queued:
+            self._pending.move_to_end(user)
+        else:
+            del self._pending[user]
+        return self._jobs[job_id]
+
+    async def _work(self) -> None:
+        assert self._ready is not None
+        while True:
+            await self._ready.acquire()
+            job = self._next()
+            self._running += 1
+            try:
+                await self._run(job)
+            finally:
+                self._running -= 1
+
+    async def _run(self, job: DreamJournalJob) -> None:
+        job = job.model_copy(update={"state": "running", "started_at": datetime.now(UTC)})
+        await self._save(job)
+        try:
+            result = await self._handler(job)
+        except asyncio.CancelledError:
+            saved = self._save(job.model_copy(update={"state": "queued", "started_at": None}))
+            self._pending.setdefault(job.user, deque()).appendleft(job.id)
+            await saved
+            raise
+        except Exception as exc:  # failures are reported on the job, not the worker
+            update: dict[str, object] = {"state": "failed", "error": str(exc) or type(exc).__name__}
+        else:
+            update = {"state": "succeeded", "result": result}
+        update["finished_at"] = datetime.now(UTC)
+        await self._save(job.model_copy(update=update))
+        await self._retire(job.id)
+
+    async def _retire(self, job_id: str) -> None:
+        self._finished.append(job_id)
+        expired_paths: list[Path] = []
+        while len(self._finished) > self._retained:
+            expired = self._finished.popleft()
+            self._jobs.pop(expired, None)
+            path = self._path(expired)
+            if path is not None:
+                expired_paths.append(path)
+        if expired_paths:
+            await self._on_writer(_unlink_all, expired_paths)
+
+    def _path(self, job_id: str) -> Path | None:
+        if self._directory is None:
+            return None
+        return self._directory / f"{job_id}.json"
+
+    def _save(self, job: DreamJournalJob) -> asyncio.Future[None]:
+        """Record ``job`` and queue its file write, returning when it is on disk.
+
+        The write is handed to the writer before this returns, so callers can
+        update in-memory state first and await the result afterwards.
+        """
+
+        self._jobs[job.id] = job
+        path = self._path(job.id)
+        if path is None:
+            done = asyncio.get_running_loop().create_future()
+            done.set_result(None)
+            return done
+        return self._on_writer(_write_atomically, path, job.model_dump_json())
+
+    def _on_writer(self, function: Callable[..., None], *args: object) -> asyncio.Future[None]:
+        assert self._writer is not None
+        return asyncio.get_running_loop().run_in_executor(self._writer, function, *args)
+
+    def _load(self) -> list[DreamJournalJob]:
+        if self._directory is None:
+            return []
+        jobs: list[DreamJournalJob] = []
+        for path in self._directory.glob("*.json"):
+            try:
+                jobs.append(DreamJournalJob.model_validate_json(path.read_bytes()))
+            except (OSError, ValidationError):
+                continue
+        return jobs
+
+
+def _write_atomically(path: Path, content: str) -> None:
+    """Replace ``path`` with ``content`` so readers never see a partial file."""
+
+    with tempfile.NamedTemporaryFile("w", dir=path.parent, delete=False) as handle:
+        handle.write(content)
+    os.replace(handle.name, path)
+
+
+def _unlink_all(paths: list[Path]) -> None:
+    for path in paths:
+        path.unlink(missing_ok=True)
@@ -0,0 +1,82 @@
+"""In-process metrics exposed through the ``/metrics`` endpoint."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable
+from threading import Lock
+
+_SUMMARY_WINDOW = 1024
+
+
+class _Summary:
+    """Running statistics plus a bounded window of recent observations."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.recent: deque[float] = deque(maxlen=_SUMMARY_WINDOW)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+        self.recent.append(value)
+
+    def snapshot(self) -> dict[str, float]:
+        ordered = sorted(self.recent)
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.maximum,
+            "p50": _quantile(ordered, 0.5),
+            "p99": _quantile(ordered, 0.99),
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe registry of counters, summaries and callback gauges."""
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._counters: dict[str, float] = {}
+        self._summaries: dict[str, _Summary] = {}
+        self._gauges: dict[str, Callable[[], float]] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Add ``value`` to the counter ``name``."""
+
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        """Record one observation, e.g. a latency in milliseconds, under ``name``."""
+
+        with self._lock:
+            self._summaries.setdefault(name, _Summary()).observe(value)
+
+    def register_gauge(self, name: str, callback: Callable[[], float]) -> None:
+        """Expose the value returned by ``callback`` whenever metrics are read."""
+
+        with self._lock:
+            self._gauges[name] = callback
+
+    def snapshot(self) -> dict[str, object]:
+        """Return every metric as JSON-serialisable data."""
+
+        with self._lock:
+            counters = dict(self._counters)
+            summaries = {name: summary.snapshot() for name, summary in self._summaries.items()}
+            gauges = dict(self._gauges)
+        return {
+            "counters": counters,
+            "summaries": summaries,
+            "gauges": {name: callback() for name, callback in gauges.items()},
+        }
+
+
+def _quantile(ordered: list[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
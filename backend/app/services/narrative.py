@@ -2,14 +2,35 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable, Sequence
+import re
+from collections.abc import AsyncIterator, Iterable, Iterator, Sequence
 from dataclasses import dataclass
+from typing import Any
 
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI, OpenAI, OpenAIError
+from openai.types.chat import ChatCompletion, ChatCompletionMessageParam
+
+from .result_cache import ResultCache, cache_key
+
+_SYSTEM_PROMPT = (
+    "You are a compassionate dream archivist. "
+    "Weave vivid 300-500 character narratives that preserve the user's voice, "
+    "highlight emotional beats, and close with a reflective line."
+)
+_MAX_TOKENS = 600
+_TEMPERATURE = 0.85
+_OFFLINE_CHUNK = re.compile(r"\S+\s*")
 
 
 class NarrativeEngine:
-    """Generate narrative dream journals using OpenAI if available."""
+    """Generate narrative dream journals using OpenAI if available.
+
+    :meth:`journal` uses the blocking client and :meth:`ajournal` the asynchronous
+    one; pass ``async_client`` to share a pooled ``AsyncOpenAI`` between engines.
+    Model output is cached by a hash of the model name and both prompts when a
+    ``cache`` is supplied.
+    """
 
     def __init__(
         self,
@@ -17,10 +38,17 @@ class NarrativeEngine:
         api_key: str | None,
         model: str = "gpt-4o-mini",
         offline_fallback: OfflineNarrative | None = None,
+        base_url: str | None = None,
+        async_client: AsyncOpenAI | None = None,
+        cache: ResultCache | None = None,
     ) -> None:
-        self._client = OpenAI(api_key=api_key) if api_key else None
+        self._client = OpenAI(api_key=api_key, base_url=base_url) if api_key else None
+        if async_client is None and api_key:
+            async_client = AsyncOpenAI(api_key=api_key, base_url=base_url)
+        self._async_client = async_client
         self._model = model
         self._fallback = offline_fallback or OfflineNarrative()
+        self._cache = cache
 
     def journal(
         self,
@@ -30,8 +58,13 @@ class NarrativeEngine:
         mood: str | None,
         focus_points: Sequence[str],
         tone: str | None,
+        force_regenerate: bool = False,
     ) -> NarrativeResult:
-        """Return a structured journal derived from the transcript."""
+        """Return a structured journal derived from the transcript.
+
+        Model results are served from the cache when the prompt is unchanged,
+        unless ``force_regenerate`` is set.
+        """
 
         if not transcript.strip():
             raise ValueError("A transcript is required to generate a journal entry")
@@ -52,28 +85,183 @@ class NarrativeEngine:
             focus_points=focus_points,
             tone=tone,
         )
+        key = self._cache_key(user_prompt)
+        cached = None if force_regenerate else self._cached(key)
+        if cached is not None:
+            return cached
+
         response = self._client.chat.completions.create(
             model=self._model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a compassionate dream archivist. "
-                        "Weave vivid 300-500 character narratives that preserve the user's voice, "
-                        "highlight emotional beats, and close with a reflective line."
-                    ),
-                },
-                {"role": "user", "content": user_prompt},
-            ],
-            max_tokens=600,
-            temperature=0.85,
+            messages=_messages(user_prompt),
+            max_tokens=_MAX_TOKENS,
+            temperature=_TEMPERATURE,
         )
+        result = _narrative_from(response)
+        self._remember(key, result.narrative)
+        return result
+
+    async def ajournal(
+        self,
+        *,
+        title: str,
+        transcript: str,
+        mood: str | None,
+        focus_points: Sequence[str],
+        tone: str | None,
+        force_regenerate: bool = False,
+    ) -> NarrativeResult:
+        """Asynchronous variant of :meth:`journal` that never blocks the event loop."""
+
+        if not transcript.strip():
+            raise ValueError("A transcript is required to generate a journal entry")
 
-        text = response.choices[0].message.content if response.choices else None
-        if not text:
+        if self._async_client is None:
+            return self._fallback.generate(
+                title=title,
+                transcript=transcript,
+                mood=mood,
+                focus_points=focus_points,
+                tone=tone,
+            )
+
+        user_prompt = _build_prompt(
+            title=title,
+            transcript=transcript,
+            mood=mood,
+            focus_points=focus_points,
+            tone=tone,
+        )
+        key = self._cache_key(user_prompt)
+        cached = None if force_regenerate else await self._acached(key)
+        if cached is not None:
+            return cached
+
+        response = await self._async_client.chat.completions.create(
+            model=self._model,
+            messages=_messages(user_prompt),
+            max_tokens=_MAX_TOKENS,
+            temperature=_TEMPERATURE,
+        )
+        result = _narrative_from(response)
+        await self._aremember(key, result.narrative)
+        return result
+
+    async def astream_journal(
+        self,
+        *,
+        title: str,
+        transcript: str,
+        mood: str | None,
+        focus_points: Sequence[str],
+        tone: str | None,
+        force_regenerate: bool = False,
+    ) -> AsyncIterator[str]:
+        """Yield narrative fragments as the language model produces them.
+
+        Joining the fragments and stripping whitespace gives the same text that
+        :meth:`ajournal` would have returned. Failures of the model request, including
+        ones after fragments were yielded, are raised as :class:`RuntimeError`.
+        """
+
+        if not transcript.strip():
+            raise ValueError("A transcript is required to generate a journal entry")
+
+        if self._async_client is None:
+            for fragment in self._fallback.stream(
+                title=title,
+                transcript=transcript,
+                mood=mood,
+                focus_points=focus_points,
+                tone=tone,
+            ):
+                yield fragment
+            return
+
+        user_prompt = _build_prompt(
+            title=title,
+            transcript=transcript,
+            mood=mood,
+            focus_points=focus_points,
+            tone=tone,
+        )
+        key = self._cache_key(user_prompt)
+        cached = None if force_regenerate else await self._acached(key)
+        if cached is not None:
+            yield cached.narrative
+            return
+
+        fragments: list[str] = []
+        try:
+            stream = await self._async_client.chat.completions.create(
+                model=self._model,
+                messages=_messages(user_prompt),
+                max_tokens=_MAX_TOKENS,
+                temperature=_TEMPERATURE,
+                stream=True,
+            )
+            async for chunk in stream:
+                content = chunk.choices[0].delta.content if chunk.choices else None
+                if content:
+                    fragments.append(content)
+                    yield content
+        except (OpenAIError, httpx.HTTPError) as exc:
+            raise RuntimeError(f"Language model request failed: {exc}") from exc
+        narrative = "".join(fragments).strip()
+        if not narrative:
             raise RuntimeError("No content returned from the language model")
+        await self._aremember(key, narrative)
+
+    @property
+    def engine_name(self) -> str:
+        """Name reported for results produced by this engine."""
+
+        return "openai" if self._async_client is not None else "offline"
+
+    def _cache_key(self, user_prompt: str) -> str:
+        return cache_key(self._model, _SYSTEM_PROMPT, user_prompt)
+
+    def _cached(self, key: str) -> NarrativeResult | None:
+        if self._cache is None:
+            return None
+        return _cached_result(self._cache.get(key))
+
+    async def _acached(self, key: str) -> NarrativeResult | None:
+        if self._cache is None:
+            return None
+        return _cached_result(await self._cache.aget(key))
+
+    def _remember(self, key: str, narrative: str) -> None:
+        if self._cache is not None:
+            self._cache.put(key, {"narrative": narrative})
+
+    async def _aremember(self, key: str, narrative: str) -> None:
+        if self._cache is not None:
+            await self._cache.aput(key, {"narrative": narrative})
 
-        return NarrativeResult(narrative=text.strip(), engine="openai")
+
+def _cached_result(payload: dict[str, Any] | None) -> NarrativeResult | None:
+    if payload is None:
+        return None
+    return NarrativeResult(narrative=str(payload["narrative"]), engine="openai", cached=True)
+
+
+def _messages(user_prompt: str) -> list[ChatCompletionMessageParam]:
+    """Return the chat messages sent to the language model."""
+
+    return [
+        {"role": "system", "content": _SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def _narrative_from(response: ChatCompletion) -> NarrativeResult:
+    """Extract the generated narrative from a chat completion response."""
+
+    text = response.choices[0].message.content if response.choices else None
+    if not text:
+        raise RuntimeError("No content returned from the language model")
+
+    return NarrativeResult(narrative=text.strip(), engine="openai")
 
 
 def _build_prompt(
@@ -102,6 +290,7 @@ class NarrativeResult:
 
     narrative: str
     engine: str
+    cached: bool = False
 
 
 class OfflineNarrative:
@@ -132,3 +321,24 @@ class OfflineNarrative:
         )
         return NarrativeResult(narrative=narrative, engine="offline")
 
+    def stream(
+        self,
+        *,
+        title: str,
+        transcript: str,
+        mood: str | None,
+        focus_points: Iterable[str],
+        tone: str | None,
+    ) -> Iterator[str]:
+        """Yield the offline narrative word by word to mimic a streaming model."""
+
+        result = self.generate(
+            title=title,
+            transcript=transcript,
+            mood=mood,
+            focus_points=focus_points,
+            tone=tone,
+        )
+        for match in _OFFLINE_CHUNK.finditer(result.narrative):
+            yield match.group()
+
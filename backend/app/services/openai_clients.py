@@ -0,0 +1,32 @@
+"""Factories for the OpenAI clients shared by the AI-backed services."""
+
+from __future__ import annotations
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from ..config import Settings
+
+
+def create_async_client(settings: Settings) -> AsyncOpenAI | None:
+    """Return an ``AsyncOpenAI`` client backed by one pooled HTTP client.
+
+    Every engine built from the returned client shares the same connection pool,
+    bounded by ``openai_max_connections``. ``None`` is returned when no API key is
+    configured so callers fall back to their offline implementations.
+    """
+
+    if not settings.openai_api_key:
+        return None
+    http_client = DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=settings.openai_max_connections,
+            max_keepalive_connections=settings.openai_max_keepalive_connections,
+        ),
+        timeout=httpx.Timeout(settings.openai_timeout_seconds, connect=5.0),
+    )
+    return AsyncOpenAI(
+        api_key=settings.openai_api_key,
+        base_url=settings.openai_base_url,
+        http_client=http_client,
+    )
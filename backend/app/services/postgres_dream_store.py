@@ -0,0 +1,861 @@
+"""Asynchronous PostgreSQL implementation of :class:`AsyncDreamRepository`.
+
+Requires the optional ``asyncpg`` dependency (``pip install -e .[postgres]``).
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+from collections import Counter
+from collections.abc import AsyncIterator, Mapping, Sequence
+from datetime import UTC, date, datetime
+from typing import Any
+
+import asyncpg
+
+from ..schemas.dreams import (
+    Dream,
+    DreamCreate,
+    DreamGraph,
+    DreamHighlights,
+    DreamTrends,
+    DreamUpdate,
+    MoodCount,
+    SearchMode,
+    TagCount,
+    TagMatch,
+    TrendGranularity,
+)
+from .dream_indexes import (
+    TREND_GRANULARITIES,
+    PeriodCounts,
+    period_start,
+    trend_spans,
+)
+from .dream_repository import (
+    DreamPage,
+    ListCursor,
+    assemble_graph,
+    assemble_trends,
+    day_window,
+    draft_dream,
+    dream_day,
+    haystack,
+    journal_dream,
+    new_epoch,
+    revise_dream,
+    search_tokens,
+    top_motifs,
+)
+from .text_analysis import MAX_AUTO_TAGS, search_terms
+
+_MAX_SEQ = 2**63 - 1
+_MAX_TS_POSITION = 16_383
+_SEARCH_BATCH = 500
+_EXPORT_PREFETCH = 500
+_SCHEMA_LOCK = 0x647265616D  # advisory lock serialising schema setup across workers
+_CREATE_LOCK = 0x647265616E  # advisory lock ordering created_at with seq across workers
+
+_Change = tuple[Dream | None, Dream | None]
+"""A dream before and after a write; ``None`` on the side where it does not exist."""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dreams (
+    seq BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    title TEXT NOT NULL,
+    transcript TEXT NOT NULL,
+    tags TEXT[] NOT NULL DEFAULT '{}',
+    mood TEXT,
+    summary TEXT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL,
+    journal TEXT,
+    journal_generated_at TIMESTAMPTZ,
+    haystack TEXT NOT NULL,
+    search TSVECTOR NOT NULL,
+    version BIGINT NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS dreams_created_at ON dreams (created_at DESC, seq DESC);
+CREATE INDEX IF NOT EXISTS dreams_mood ON dreams (mood, created_at DESC, seq DESC);
+CREATE INDEX IF NOT EXISTS dreams_tags ON dreams USING GIN (tags);
+CREATE INDEX IF NOT EXISTS dreams_search ON dreams USING GIN (search);
+
+CREATE TABLE IF NOT EXISTS dream_counts (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count BIGINT NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+CREATE INDEX IF NOT EXISTS dream_counts_ranked ON dream_counts (kind, count DESC, key);
+
+CREATE TABLE IF NOT EXISTS tag_days (
+    day DATE NOT NULL,
+    tag TEXT NOT NULL,
+    count BIGINT NOT NULL,
+    PRIMARY KEY (day, tag)
+);
+CREATE TABLE IF NOT EXISTS tag_pairs (
+    first TEXT NOT NULL,
+    second TEXT NOT NULL,
+    count BIGINT NOT NULL,
+    PRIMARY KEY (first, second)
+);
+CREATE TABLE IF NOT EXISTS tag_pair_days (
+    day DATE NOT NULL,
+    first TEXT NOT NULL,
+    second TEXT NOT NULL,
+    count BIGINT NOT NULL,
+    PRIMARY KEY (day, first, second)
+);
+CREATE TABLE IF NOT EXISTS tag_timeline (
+    tag TEXT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL,
+    seq BIGINT NOT NULL,
+    PRIMARY KEY (tag, created_at, seq)
+);
+CREATE TABLE IF NOT EXISTS period_counts (
+    granularity TEXT NOT NULL,
+    period DATE NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    count BIGINT NOT NULL,
+    PRIMARY KEY (granularity, period, kind, name)
+);
+CREATE INDEX IF NOT EXISTS period_counts_series
+ON period_counts (granularity, kind, name, period) INCLUDE (count);
+"""
+
+_COLUMNS = (
+    "seq, title, transcript, tags, mood, summary, created_at, journal, journal_generated_at"
+)
+# ``created_at`` is taken from the database clock, at least the spacing of
+# ``next_timestamp`` after the newest dream, while ``_CREATE_LOCK`` is held.
+_INSERT_DREAM = f"""
+INSERT INTO dreams (
+    title, transcript, tags, mood, summary, created_at, journal, journal_generated_at, haystack,
+    search
+) VALUES (
+    $1, $2, $3, $4, $5,
+    GREATEST(
+        clock_timestamp(),
+        (SELECT max(created_at) FROM dreams) + interval '1 second 1 microsecond'
+    ),
+    $6, $7, $8, $9::text::tsvector
+)
+RETURNING {_COLUMNS}
+"""
+# Tags travel as JSON because ``unnest`` cannot expand an array of ragged arrays.
+# Identities are drawn in ``position`` order, so sorting the returned rows by
+# ``seq`` restores the order of the drafts.
+_IMPORT_DREAMS = f"""
+INSERT INTO dreams (
+    title, transcript, tags, mood, summary, created_at, journal, journal_generated_at, haystack,
+    search
+)
+SELECT title, transcript, ARRAY(SELECT jsonb_array_elements_text(tags)), mood, summary,
+    created_at, NULL, NULL, haystack, search::tsvector
+FROM unnest(
+    $1::text[], $2::text[], $3::jsonb[], $4::text[], $5::text[], $6::timestamptz[], $7::text[],
+    $8::text[]
+) WITH ORDINALITY AS batch (
+    title, transcript, tags, mood, summary, created_at, haystack, search, position
+)
+ORDER BY position
+RETURNING {_COLUMNS}
+"""
+_UPDATE_DREAM = f"""
+UPDATE dreams SET title = $2, transcript = $3, tags = $4, mood = $5, summary = $6,
+    journal = $7, journal_generated_at = $8, haystack = $9, search = $10::text::tsvector,
+    version = version + 1
+WHERE seq = $1
+RETURNING {_COLUMNS}
+"""
+_SELECT_DREAM = f"SELECT {_COLUMNS} FROM dreams WHERE seq = $1"
+_EXPORT_DREAMS = f"SELECT {_COLUMNS} FROM dreams ORDER BY created_at, seq"
+_LOCK_DREAM = f"{_SELECT_DREAM} FOR UPDATE"
+_DELETE_DREAM = f"DELETE FROM dreams WHERE seq = $1 RETURNING {_COLUMNS}"
+# Stores created before ``search`` was written by the application derived it with
+# ``to_tsvector`` in a generated column; they are converted once on start.
+_SEARCH_GENERATED = """
+SELECT is_generated = 'ALWAYS' FROM information_schema.columns
+WHERE table_schema = current_schema() AND table_name = 'dreams' AND column_name = 'search'
+"""
+_DROP_SEARCH_EXPRESSION = "ALTER TABLE dreams ALTER COLUMN search DROP EXPRESSION"
+# Stores created before each dream carried its own ``version`` gain the column on start.
+_VERSION_MISSING = """
+SELECT NOT EXISTS (
+    SELECT FROM information_schema.columns
+    WHERE table_schema = current_schema() AND table_name = 'dreams' AND column_name = 'version'
+)
+"""
+_ADD_VERSION = "ALTER TABLE dreams ADD COLUMN version BIGINT NOT NULL DEFAULT 1"
+_SEARCH_SOURCES = f"SELECT {_COLUMNS} FROM dreams WHERE seq > $1 ORDER BY seq LIMIT $2"
+_SET_SEARCH = "UPDATE dreams SET search = $2::text::tsvector WHERE seq = $1"
+_APPLY_COUNTS = """
+INSERT INTO dream_counts (kind, key, count)
+SELECT * FROM unnest($1::text[], $2::text[], $3::bigint[])
+ON CONFLICT (kind, key) DO UPDATE SET count = dream_counts.count + excluded.count
+"""
+_PRUNE_COUNTS = """
+DELETE FROM dream_counts
+WHERE (kind, key) IN (SELECT * FROM unnest($1::text[], $2::text[])) AND count <= 0
+"""
+_TOTAL = "SELECT count FROM dream_counts WHERE kind = 'total' AND key = ''"
+_VERSION = "SELECT count FROM dream_counts WHERE kind = 'version' AND key = ''"
+_ADD_EPOCH = """
+INSERT INTO dream_counts (kind, key, count) VALUES ('epoch', '', $1) ON CONFLICT DO NOTHING
+"""
+_EPOCH = "SELECT count FROM dream_counts WHERE kind = 'epoch' AND key = ''"
+_DREAM_VERSION = "SELECT version FROM dreams WHERE seq = $1"
+_RANKED_COUNTS = (
+    "SELECT key, count FROM dream_counts WHERE kind = $1 ORDER BY count DESC, key LIMIT $2"
+)
+_WINDOW_TAGS = """
+SELECT tag AS key, sum(count)::bigint AS count FROM tag_days
+WHERE ($1::date IS NULL OR day >= $1) AND ($2::date IS NULL OR day <= $2)
+GROUP BY tag ORDER BY count DESC, key LIMIT $3
+"""
+_PAIRS = "SELECT first, second, count FROM tag_pairs WHERE first = ANY($1) AND second = ANY($1)"
+_WINDOW_PAIRS = """
+SELECT first, second, sum(count)::bigint AS count FROM tag_pair_days
+WHERE ($1::date IS NULL OR day >= $1) AND ($2::date IS NULL OR day <= $2)
+    AND first = ANY($3) AND second = ANY($3)
+GROUP BY first, second
+"""
+_NEWEST_WITH_TAGS = f"""
+SELECT motif, {_COLUMNS}
+FROM unnest($1::text[]) AS motif
+CROSS JOIN LATERAL (
+    SELECT seq FROM tag_timeline
+    WHERE tag = motif
+        AND ($2::timestamptz IS NULL OR created_at >= $2)
+        AND ($3::timestamptz IS NULL OR created_at <= $3)
+    ORDER BY created_at DESC, seq DESC
+    LIMIT $4
+) AS recent
+JOIN dreams USING (seq)
+ORDER BY motif, created_at DESC, seq DESC
+"""
+_UNLINK_TIMELINE = """
+DELETE FROM tag_timeline
+WHERE (tag, created_at, seq) IN (
+    SELECT * FROM unnest($1::text[], $2::timestamptz[], $3::bigint[])
+)
+"""
+_LINK_TIMELINE = """
+INSERT INTO tag_timeline (tag, created_at, seq)
+SELECT * FROM unnest($1::text[], $2::timestamptz[], $3::bigint[])
+ON CONFLICT DO NOTHING
+"""
+
+
+def _count_statements(table: str, columns: Sequence[str], types: Sequence[str]) -> tuple[str, str]:
+    """Return the upsert and prune statements for a count table keyed by ``columns``."""
+
+    keys = ", ".join(columns)
+    arrays = ", ".join(f"${index}::{kind}[]" for index, kind in enumerate(types, start=1))
+    upsert = (
+        f"INSERT INTO {table} ({keys}, count) "
+        f"SELECT * FROM unnest({arrays}, ${len(types) + 1}::bigint[]) "
+        f"ON CONFLICT ({keys}) DO UPDATE SET count = {table}.count + excluded.count"
+    )
+    prune = (
+        f"DELETE FROM {table} WHERE ({keys}) IN (SELECT * FROM unnest({arrays})) AND count <= 0"
+    )
+    return upsert, prune
+
+
+_TAG_DAY_STATEMENTS = _count_statements("tag_days", ("day", "tag"), ("date", "text"))
+_PAIR_STATEMENTS = _count_statements("tag_pairs", ("first", "second"), ("text", "text"))
+_PAIR_DAY_STATEMENTS = _count_statements(
+    "tag_pair_days", ("day", "first", "second"), ("date", "text", "text")
+)
+_PERIOD_COUNT_STATEMENTS = _count_statements(
+    "period_counts", ("granularity", "period", "kind", "name"), ("text", "date", "text", "text")
+)
+_SUMMED_COUNTS = """
+SELECT kind, name, sum(count)::bigint AS count FROM period_counts
+WHERE granularity = $1 AND period BETWEEN $2 AND $3 GROUP BY kind, name
+"""
+_SERIES = """
+SELECT kind, name, period, count
+FROM unnest($4::text[], $5::text[]) AS series (kind, name)
+JOIN period_counts USING (kind, name)
+WHERE granularity = $1 AND period BETWEEN $2 AND $3
+"""
+
+
+class PostgresDreamStore:
+    """Dream store backed by PostgreSQL through an ``asyncpg`` connection pool.
+
+    Each worker process owns one pool of at most ``pool_size`` connections, so
+    the database sees ``workers * pool_size`` connections at peak. ``asyncpg``
+    prepares every statement once per connection and reuses it from its
+    statement cache, which covers the constant insert and update statements.
+
+    Tags are a ``text[]`` column with a GIN index, token queries use a ``tsvector``
+    column holding the shared tokenizer's output with a GIN index (ranked with
+    ``ts_rank`` rather than BM25), and listings walk the
+    ``(created_at DESC, seq DESC)`` index, which is also the key for keyset
+    pagination. Tag, mood and total counts for :meth:`highlights` are kept in
+    ``dream_counts`` inside each write's transaction; ties are ordered
+    alphabetically. The same table holds the store
+    version and the database's :attr:`epoch`, so every worker sees one
+    committed value, and each row's ``version`` column is incremented by
+    every update of that dream. Writes that change
+    a dream's tags also adjust the pair, per-day and per-tag timeline tables
+    behind :meth:`graph`, and every write adjusts the day, week and month
+    rollups in ``period_counts`` behind :meth:`trends`.
+
+    Call :meth:`start` before use and :meth:`close` on shutdown.
+    """
+
+    def __init__(self, dsn: str, *, pool_size: int = 10) -> None:
+        self._dsn = dsn
+        self._pool_size = pool_size
+        self._pool: asyncpg.Pool | None = None
+        self.epoch = 0
+
+    async def start(self) -> None:
+        """Open the connection pool and create the schema if it is missing."""
+
+        self._pool = await asyncpg.create_pool(
+            self._dsn, min_size=min(2, self._pool_size), max_size=self._pool_size
+        )
+        async with self._pool.acquire() as connection, connection.transaction():
+            await connection.execute("SELECT pg_advisory_xact_lock($1)", _SCHEMA_LOCK)
+            await connection.execute(_SCHEMA)
+            if await connection.fetchval(_VERSION_MISSING):
+                await connection.execute(_ADD_VERSION)
+            await connection.execute(_ADD_EPOCH, new_epoch())
+            self.epoch = await connection.fetchval(_EPOCH)
+            if await connection.fetchval(_SEARCH_GENERATED):
+                await _rebuild_search(connection)
+
+    async def close(self) -> None:
+        """Close every pooled connection."""
+
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    async def create(self, payload: DreamCreate) -> Dream:
+        """Persist a dream and return the stored representation.
+
+        Creates from every worker take a transaction-scoped advisory lock, and the
+        ``created_at`` is derived in the insert from the newest stored dream, so
+        creation times increase with ``seq`` however many processes write.
+        """
+
+        draft = draft_dream(payload, identifier="", created_at=datetime.now(UTC))
+        async with self._connection() as connection, connection.transaction():
+            await connection.execute("SELECT pg_advisory_xact_lock($1)", _CREATE_LOCK)
+            row = await connection.fetchrow(
+                _INSERT_DREAM,
+                draft.title,
+                draft.transcript,
+                draft.tags,
+                draft.mood,
+                draft.summary,
+                None,
+                None,
+                haystack(draft),
+                _ts_vector(draft),
+            )
+            dream = _dream(row)
+            await _apply_counts(connection, [(None, dream)])
+            await _apply_graph(connection, [(None, dream)])
+            await _apply_rollups(connection, [(None, dream)])
+        return dream
+
+    async def import_dreams(self, drafts: Sequence[Dream]) -> list[Dream]:
+        """Insert drafted dreams with a single statement, keeping their ``created_at``.
+
+        The counts, graph tables and rollups are adjusted once for the whole
+        batch inside the same transaction.
+        """
+
+        if not drafts:
+            return []
+        columns = (
+            [draft.title for draft in drafts],
+            [draft.transcript for draft in drafts],
+            [json.dumps(draft.tags) for draft in drafts],
+            [draft.mood for draft in drafts],
+            [draft.summary for draft in drafts],
+            [draft.created_at for draft in drafts],
+            [haystack(draft) for draft in drafts],
+            [_ts_vector(draft) for draft in drafts],
+        )
+        async with self._connection() as connection, connection.transaction():
+            rows = await connection.fetch(_IMPORT_DREAMS, *columns)
+            dreams = [_dream(row) for row in sorted(rows, key=lambda row: row["seq"])]
+            changes: list[_Change] = [(None, dream) for dream in dreams]
+            await _apply_counts(connection, changes)
+            await _apply_graph(connection, changes)
+            await _apply_rollups(connection, changes)
+        return dreams
+
+    async def list(  # noqa: PLR0913 - keyword-only filters mirror the query string
+        self,
+        *,
+        tag: str | None = None,
+        tags: Sequence[str] | None = None,
+        tag_match: TagMatch = "all",
+        query: str | None = None,
+        search: SearchMode = "tokens",
+        mood: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int | None = None,
+        after: ListCursor | None = None,
+        count_total: bool = True,
+    ) -> DreamPage:
+        """Return stored dreams ordered by creation time descending.
+
+        Filters have the same semantics as :meth:`DreamStore.list`, with token
+        queries matched against the ``tsvector`` column and the last term as a
+        prefix. ``after`` is a row comparison that seeks into the
+        ``(created_at, seq)`` index.
+        """
+
+        conditions: list[str] = []
+        parameters: list[Any] = []
+
+        def bind(value: object) -> str:
+            parameters.append(value)
+            return f"${len(parameters)}"
+
+        if start is not None:
+            conditions.append(f"created_at >= {bind(start)}")
+        if end is not None:
+            conditions.append(f"created_at <= {bind(end)}")
+        if tag:
+            conditions.append(f"tags @> ARRAY[{bind(tag)}]::text[]")
+        if tags:
+            operator = "&&" if tag_match == "any" else "@>"
+            conditions.append(f"tags {operator} {bind(list(dict.fromkeys(tags)))}::text[]")
+        if mood:
+            conditions.append(f"mood = {bind(mood)}")
+
+        terms = search_terms(query) if query and search != "substring" else None
+        order = "created_at DESC, seq DESC"
+        if terms is not None:
+            text_query = f"{bind(_ts_query(terms))}::tsquery"
+            conditions.append(f"search @@ {text_query}")
+            if search == "ranked":
+                order = f"ts_rank(search, {text_query}) DESC, {order}"
+        elif query:
+            conditions.append(f"strpos(haystack, {bind(query.lower())}) > 0")
+
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        counted = list(parameters)
+        page_conditions = list(conditions)
+        if after is not None and not (terms is not None and search == "ranked"):
+            seq = _seq(after[1]) or 0
+            page_conditions.append(f"(created_at, seq) < ({bind(after[0])}, {bind(seq)})")
+        page_where = f" WHERE {' AND '.join(page_conditions)}" if page_conditions else ""
+        fetch = bind(None if limit is None else limit + 1)
+
+        async with self._connection() as connection:
+            total: int | None = None
+            if count_total and conditions:
+                total = await connection.fetchval(f"SELECT count(*) FROM dreams{where}", *counted)
+            elif count_total:
+                total = await connection.fetchval(_TOTAL) or 0
+            rows = await connection.fetch(
+                f"SELECT {_COLUMNS} FROM dreams{page_where} ORDER BY {order} LIMIT {fetch}",
+                *parameters,
+            )
+        has_more = limit is not None and len(rows) > limit
+        return DreamPage(
+            dreams=[_dream(row) for row in rows[:limit]], total=total, has_more=has_more
+        )
+
+    async def get(self, dream_id: str) -> Dream | None:
+        """Retrieve a specific dream by its identifier if available."""
+
+        seq = _seq(dream_id)
+        if seq is None:
+            return None
+        async with self._connection() as connection:
+            row = await connection.fetchrow(_SELECT_DREAM, seq)
+        return _dream(row) if row is not None else None
+
+    async def update(self, dream_id: str, payload: DreamUpdate) -> Dream | None:
+        """Mutate an existing dream entry with the provided payload."""
+
+        seq = _seq(dream_id)
+        if seq is None:
+            return None
+        async with self._connection() as connection, connection.transaction():
+            row = await connection.fetchrow(_LOCK_DREAM, seq)
+            if row is None:
+                return None
+            current = _dream(row)
+            return await _replace(connection, current, revise_dream(current, payload))
+
+    async def delete(self, dream_id: str) -> bool:
+        """Remove a dream entry from the database."""
+
+        seq = _seq(dream_id)
+        if seq is None:
+            return False
+        async with self._connection() as connection, connection.transaction():
+            row = await connection.fetchrow(_DELETE_DREAM, seq)
+            if row is None:
+                return False
+            removed = _dream(row)
+            await _apply_counts(connection, [(removed, None)])
+            await _apply_graph(connection, [(removed, None)])
+            await _apply_rollups(connection, [(removed, None)])
+        return True
+
+    async def set_journal(
+        self, dream_id: str, *, narrative: str, generated_at: datetime
+    ) -> Dream | None:
+        """Persist the generated journal on the stored dream."""
+
+        seq = _seq(dream_id)
+        if seq is None:
+            return None
+        async with self._connection() as connection, connection.transaction():
+            row = await connection.fetchrow(_LOCK_DREAM, seq)
+            if row is None:
+                return None
+            current = _dream(row)
+            updated = journal_dream(current, narrative=narrative, generated_at=generated_at)
+            return await _replace(connection, current, updated)
+
+    async def version(self) -> int:
+        """Return a number that increases with every committed mutation."""
+
+        async with self._connection() as connection:
+            return await connection.fetchval(_VERSION) or 0
+
+    async def dream_version(self, dream_id: str) -> int | None:
+        """Return how many times ``dream_id`` has been written, if it exists."""
+
+        seq = _seq(dream_id)
+        if seq is None:
+            return None
+        async with self._connection() as connection:
+            return await connection.fetchval(_DREAM_VERSION, seq)
+
+    async def highlights(self) -> DreamHighlights:
+        """Return the tag and mood counts maintained by every write."""
+
+        async with self._connection() as connection:
+            total = await connection.fetchval(_TOTAL) or 0
+            top_tags = await connection.fetch(_RANKED_COUNTS, "tag", MAX_AUTO_TAGS)
+            moods = await connection.fetch(_RANKED_COUNTS, "mood", None)
+        return DreamHighlights(
+            total_count=total,
+            top_tags=[TagCount(tag=row["key"], count=row["count"]) for row in top_tags],
+            moods=[MoodCount(mood=row["key"], count=row["count"]) for row in moods],
+        )
+
+    async def graph(
+        self,
+        *,
+        motifs: int,
+        edges: int,
+        dreams_per_motif: int,
+        start: date | None = None,
+        end: date | None = None,
+    ) -> DreamGraph:
+        """Return the dream map from the pair, day and timeline tables kept by every write.
+
+        Recent dreams for all motifs are fetched in one lateral join that seeks
+        into ``tag_timeline`` once per motif.
+        """
+
+        first, last = day_window(start, end)
+        async with self._connection() as connection:
+            if start is None and end is None:
+                ranked = await connection.fetch(_RANKED_COUNTS, "tag", motifs)
+            else:
+                ranked = await connection.fetch(_WINDOW_TAGS, start, end, motifs)
+            tags = [row["key"] for row in ranked]
+            if start is None and end is None:
+                pairs = await connection.fetch(_PAIRS, tags)
+            else:
+                pairs = await connection.fetch(_WINDOW_PAIRS, start, end, tags)
+            rows = await connection.fetch(_NEWEST_WITH_TAGS, tags, first, last, dreams_per_motif)
+        recent: dict[str, list[Dream]] = {}
+        for row in rows:
+            recent.setdefault(row["motif"], []).append(_dream(row))
+        return assemble_graph(
+            [(row["key"], row["count"]) for row in ranked],
+            {(row["first"], row["second"]): row["count"] for row in pairs},
+            recent,
+            edges=edges,
+        )
+
+    async def export(self) -> AsyncIterator[Dream]:
+        """Yield every dream oldest first from one repeatable-read snapshot.
+
+        Rows come from a server-side cursor ``_EXPORT_PREFETCH`` at a time, which
+        walks the ``(created_at DESC, seq DESC)`` index backwards.
+        """
+
+        async with (
+            self._connection() as connection,
+            connection.transaction(isolation="repeatable_read", readonly=True),
+        ):
+            async for row in connection.cursor(_EXPORT_DREAMS, prefetch=_EXPORT_PREFETCH):
+                yield _dream(row)
+
+    async def trends(
+        self, *, granularity: TrendGranularity, start: date, end: date, motifs: int
+    ) -> DreamTrends:
+        """Return per-period counts from the ``period_counts`` rollups.
+
+        Window totals sum whole months plus the days at the edges, every series
+        (dream totals, each mood in the window and each top motif) is read in one
+        join against ``period_counts_series``, and partial periods at the
+        window's edges sum their day rows.
+        """
+
+        spans = trend_spans(start, end, granularity)
+        full = [span for span in spans if span.full]
+        counts = {span.period: PeriodCounts() for span in spans}
+        async with self._connection() as connection:
+            months = trend_spans(start, end, "month")
+            whole = [span.period for span in months if span.full]
+            window = PeriodCounts()
+            if whole:
+                window.merge(await _summed(connection, "month", whole[0], whole[-1]))
+            for span in months:
+                if not span.full:
+                    window.merge(await _summed(connection, "day", span.first, span.last))
+            tags = [tag for tag, _ in top_motifs(window, motifs)]
+            if full:
+                series = [("total", ""), *(("mood", mood) for mood in window.moods)]
+                series += [("tag", tag) for tag in tags]
+                rows = await connection.fetch(
+                    _SERIES,
+                    granularity,
+                    full[0].period,
+                    full[-1].period,
+                    [kind for kind, _ in series],
+                    [name for _, name in series],
+                )
+                for row in rows:
+                    counts[row["period"]].add(row["kind"], row["name"], row["count"])
+            for span in spans:
+                if not span.full:
+                    edge = await _summed(connection, "day", span.first, span.last)
+                    counts[span.period] = edge.restricted(tags)
+        return assemble_trends(
+            granularity, spans, [counts[span.period] for span in spans], window, motifs=motifs
+        )
+
+    def _connection(self) -> Any:
+        if self._pool is None:
+            raise RuntimeError("PostgresDreamStore.start() has not been awaited")
+        return self._pool.acquire()
+
+
+async def _replace(connection: Any, current: Dream, updated: Dream) -> Dream:
+    """Write ``updated`` over ``current`` and adjust the counts it changes."""
+
+    row = await connection.fetchrow(
+        _UPDATE_DREAM,
+        int(current.id),
+        updated.title,
+        updated.transcript,
+        updated.tags,
+        updated.mood,
+        updated.summary,
+        updated.journal,
+        updated.journal_generated_at,
+        haystack(updated),
+        _ts_vector(updated),
+    )
+    await _apply_counts(connection, [(current, updated)])
+    await _apply_graph(connection, [(current, updated)])
+    await _apply_rollups(connection, [(current, updated)])
+    return _dream(row)
+
+
+async def _apply_counts(connection: Any, changes: Sequence[_Change]) -> None:
+    """Add the tag, mood and total differences of ``changes`` to ``dream_counts``.
+
+    The store version is incremented once per change.
+    """
+
+    deltas: Counter[tuple[str, str]] = Counter({("version", ""): len(changes)})
+    for before, after in changes:
+        for version, sign in ((before, -1), (after, 1)):
+            if version is None:
+                continue
+            deltas[("total", "")] += sign
+            for tag in set(version.tags):
+                deltas[("tag", tag)] += sign
+            if version.mood:
+                deltas[("mood", version.mood)] += sign
+    changed = sorted((key, delta) for key, delta in deltas.items() if delta)
+    kinds = [kind for (kind, _), _ in changed]
+    keys = [key for (_, key), _ in changed]
+    await connection.execute(_APPLY_COUNTS, kinds, keys, [delta for _, delta in changed])
+    if any(delta < 0 for _, delta in changed):
+        await connection.execute(_PRUNE_COUNTS, kinds, keys)
+
+
+async def _apply_graph(connection: Any, changes: Sequence[_Change]) -> None:
+    """Move dreams' tag pairs, day counts and timeline entries when their tags change.
+
+    Keys are written in sorted order so that concurrent writers touching the same
+    pairs lock them in the same order and cannot deadlock.
+    """
+
+    days: Counter[tuple[date, str]] = Counter()
+    pairs: Counter[tuple[str, str]] = Counter()
+    pair_days: Counter[tuple[date, str, str]] = Counter()
+    entries: dict[int, set[tuple[str, datetime, int]]] = {-1: set(), 1: set()}
+    for before, after in changes:
+        if (
+            before is not None
+            and after is not None
+            and set(before.tags) == set(after.tags)
+            and before.created_at == after.created_at
+        ):
+            continue
+        for version, sign in ((before, -1), (after, 1)):
+            if version is None:
+                continue
+            day = dream_day(version.created_at)
+            tags = sorted(set(version.tags))
+            for tag in tags:
+                days[(day, tag)] += sign
+                entries[sign].add((tag, version.created_at, int(version.id)))
+            for first, second in itertools.combinations(tags, 2):
+                pairs[(first, second)] += sign
+                pair_days[(day, first, second)] += sign
+
+    for statements, deltas in (
+        (_TAG_DAY_STATEMENTS, days),
+        (_PAIR_STATEMENTS, pairs),
+        (_PAIR_DAY_STATEMENTS, pair_days),
+    ):
+        await _apply_deltas(connection, statements, deltas)
+    for statement, changed in (
+        (_UNLINK_TIMELINE, entries[-1] - entries[1]),
+        (_LINK_TIMELINE, entries[1] - entries[-1]),
+    ):
+        if changed:
+            await connection.execute(statement, *map(list, zip(*sorted(changed), strict=True)))
+
+
+async def _summed(
+    connection: Any, granularity: TrendGranularity, first: date, last: date
+) -> PeriodCounts:
+    """Return the summed rollup rows of the periods starting ``first`` through ``last``."""
+
+    counts = PeriodCounts()
+    for row in await connection.fetch(_SUMMED_COUNTS, granularity, first, last):
+        counts.add(row["kind"], row["name"], row["count"])
+    return counts
+
+
+async def _apply_rollups(connection: Any, changes: Sequence[_Change]) -> None:
+    """Move dreams between the day, week and month rollups when their tags or mood change."""
+
+    deltas: Counter[tuple[str, date, str, str]] = Counter()
+    for before, after in changes:
+        if (
+            before is not None
+            and after is not None
+            and set(before.tags) == set(after.tags)
+            and before.mood == after.mood
+            and before.created_at == after.created_at
+        ):
+            continue
+        for version, sign in ((before, -1), (after, 1)):
+            if version is None:
+                continue
+            day = dream_day(version.created_at)
+            for granularity in TREND_GRANULARITIES:
+                period = period_start(day, granularity)
+                deltas[(granularity, period, "total", "")] += sign
+                for tag in set(version.tags):
+                    deltas[(granularity, period, "tag", tag)] += sign
+                if version.mood:
+                    deltas[(granularity, period, "mood", version.mood)] += sign
+    await _apply_deltas(connection, _PERIOD_COUNT_STATEMENTS, deltas)
+
+
+async def _apply_deltas(
+    connection: Any, statements: tuple[str, str], deltas: Counter[Any]
+) -> None:
+    """Add non-zero ``deltas`` to a count table and drop the keys that reached zero."""
+
+    changed = sorted((key, delta) for key, delta in deltas.items() if delta)
+    if not changed:
+        return
+    upsert, prune = statements
+    columns = [list(column) for column in zip(*(key for key, _ in changed), strict=True)]
+    await connection.execute(upsert, *columns, [delta for _, delta in changed])
+    if any(delta < 0 for _, delta in changed):
+        await connection.execute(prune, *columns)
+
+
+def _dream(row: Mapping[str, Any]) -> Dream:
+    return Dream(
+        id=str(row["seq"]),
+        title=row["title"],
+        transcript=row["transcript"],
+        tags=list(row["tags"]),
+        mood=row["mood"],
+        summary=row["summary"],
+        created_at=row["created_at"],
+        journal=row["journal"],
+        journal_generated_at=row["journal_generated_at"],
+    )
+
+
+def _seq(dream_id: str) -> int | None:
+    """Return the row key for ``dream_id`` or ``None`` if it cannot exist."""
+
+    if not dream_id.isdigit() or not dream_id.isascii():
+        return None
+    seq = int(dream_id)
+    return seq if 0 < seq <= _MAX_SEQ else None
+
+
+def _ts_query(terms: Sequence[str]) -> str:
+    """Build a ``tsquery`` literal requiring every term, the last one as a prefix.
+
+    The literal is cast rather than parsed with ``to_tsquery``, so the terms stay
+    exactly the tokens :func:`search_terms` produced, as in :func:`_ts_vector`.
+    """
+
+    quoted = ["'" + term.replace("'", "''") + "'" for term in terms]
+    quoted[-1] += ":*"
+    return " & ".join(quoted)
+
+
+def _ts_vector(dream: Dream) -> str:
+    """Build a ``tsvector`` literal of the dream's search tokens and their positions.
+
+    PostgreSQL caps positions at ``_MAX_TS_POSITION``; tokens further into very
+    long texts are still indexed, without distinct positions.
+    """
+
+    return " ".join(
+        "'" + token.replace("'", "''") + f"':{min(position, _MAX_TS_POSITION)}"
+        for position, token in enumerate(search_tokens(dream), start=1)
+    )
+
+
+async def _rebuild_search(connection: Any) -> None:
+    """Turn a generated ``search`` column into a stored one and refill it from the tokenizer."""
+
+    await connection.execute(_DROP_SEARCH_EXPRESSION)
+    last = 0
+    while rows := await connection.fetch(_SEARCH_SOURCES, last, _SEARCH_BATCH):
+        await connection.executemany(
+            _SET_SEARCH, [(row["seq"], _ts_vector(_dream(row))) for row in rows]
+        )
+        last = rows[-1]["seq"]
@@ -0,0 +1,212 @@
+"""Content-addressed result cache with LRU/TTL eviction and an optional disk tier."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+_KEY_SEPARATOR = b"\x00"
+
+
+def cache_key(*parts: str | bytes) -> str:
+    """Return a SHA-256 digest identifying the concatenation of ``parts``."""
+
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8") if isinstance(part, str) else part)
+        digest.update(_KEY_SEPARATOR)
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Point-in-time counters describing cache effectiveness."""
+
+    hits: int
+    misses: int
+    disk_hits: int
+    entries: int
+    bytes: int
+
+    @property
+    def hit_ratio(self) -> float:
+        """Fraction of lookups answered from either tier."""
+
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+@dataclass
+class _Entry:
+    payload: bytes
+    stored_at: float
+
+
+class ResultCache:
+    """Bounded cache of JSON-serialisable payloads keyed by content hashes.
+
+    The memory tier evicts least recently used entries once ``max_entries`` or
+    ``max_bytes`` is exceeded. Entries older than ``ttl_seconds`` are treated as
+    missing. When ``directory`` is set every entry is also written there, so a
+    restarted process can serve earlier results. Coroutines should use
+    :meth:`aget` and :meth:`aput`, which do the disk tier's file I/O in a thread.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 1024,
+        max_bytes: int = 16 * 1024 * 1024,
+        ttl_seconds: float | None = None,
+        directory: Path | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = Lock()
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl_seconds = ttl_seconds
+        self._directory = directory
+        self._clock = clock
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._disk_hits = 0
+        if directory is not None:
+            directory.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return the payload stored under ``key`` or ``None`` when absent or expired."""
+
+        now = self._clock()
+        payload = self._get_memory(key, now)
+        if payload is not None:
+            return payload
+        return self._promote(key, self._read_disk(key, now))
+
+    async def aget(self, key: str) -> dict[str, Any] | None:
+        """Asynchronous variant of :meth:`get` that reads the disk tier in a thread."""
+
+        now = self._clock()
+        payload = self._get_memory(key, now)
+        if payload is not None:
+            return payload
+        entry = await asyncio.to_thread(self._read_disk, key, now) if self._directory else None
+        return self._promote(key, entry)
+
+    def put(self, key: str, value: dict[str, Any]) -> None:
+        """Store ``value`` under ``key`` in memory and, if configured, on disk."""
+
+        self._write_disk(key, self._put_memory(key, value))
+
+    async def aput(self, key: str, value: dict[str, Any]) -> None:
+        """Asynchronous variant of :meth:`put` that writes the disk tier in a thread."""
+
+        entry = self._put_memory(key, value)
+        if self._directory is not None:
+            await asyncio.to_thread(self._write_disk, key, entry)
+
+    def stats(self) -> CacheStats:
+        """Return hit/miss counters and the memory tier's footprint."""
+
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                disk_hits=self._disk_hits,
+                entries=len(self._entries),
+                bytes=self._bytes,
+            )
+
+    def _get_memory(self, key: str, now: float) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry, now):
+                self._discard(key)
+                entry = None
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        return dict(json.loads(entry.payload))
+
+    def _promote(self, key: str, entry: _Entry | None) -> dict[str, Any] | None:
+        """Count a lookup that missed memory and keep ``entry`` read from disk in memory."""
+
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._disk_hits += 1
+            self._remember(key, entry)
+        return dict(json.loads(entry.payload))
+
+    def _put_memory(self, key: str, value: dict[str, Any]) -> _Entry:
+        entry = _Entry(
+            payload=json.dumps(value, separators=(",", ":")).encode("utf-8"),
+            stored_at=self._clock(),
+        )
+        with self._lock:
+            self._remember(key, entry)
+        return entry
+
+    def _expired(self, entry: _Entry, now: float) -> bool:
+        return self._ttl_seconds is not None and now - entry.stored_at > self._ttl_seconds
+
+    def _remember(self, key: str, entry: _Entry) -> None:
+        if len(entry.payload) > self._max_bytes:
+            return
+        self._discard(key)
+        self._entries[key] = entry
+        self._bytes += len(entry.payload)
+        while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry.payload)
+
+    def _path(self, key: str) -> Path | None:
+        if self._directory is None:
+            return None
+        return self._directory / key[:2] / f"{key}.json"
+
+    def _read_disk(self, key: str, now: float) -> _Entry | None:
+        path = self._path(key)
+        if path is None:
+            return None
+        try:
+            record = json.loads(path.read_bytes())
+            entry = _Entry(
+                payload=json.dumps(record["value"], separators=(",", ":")).encode("utf-8"),
+                stored_at=float(record["stored_at"]),
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if self._expired(entry, now):
+            path.unlink(missing_ok=True)
+            return None
+        return entry
+
+    def _write_disk(self, key: str, entry: _Entry) -> None:
+        path = self._path(key)
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        record = {"stored_at": entry.stored_at, "value": json.loads(entry.payload)}
+        with tempfile.NamedTemporaryFile("w", dir=path.parent, delete=False) as handle:
+            json.dump(record, handle)
+        os.replace(handle.name, path)
@@ -0,0 +1,155 @@
+"""Embedders and the similar-dream service built on :class:`VectorIndex`."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import zlib
+from collections import Counter
+from collections.abc import Sequence
+from typing import Protocol
+
+import numpy as np
+from openai import AsyncOpenAI, OpenAIError
+
+from ..schemas.dreams import Dream
+from .text_analysis import keywords
+from .vector_index import Vector, VectorIndex
+
+logger = logging.getLogger(__name__)
+
+_SIGN_BIT = 1 << 31
+
+
+class EmbeddingError(RuntimeError):
+    """Raised when an embedder cannot produce vectors for a batch of texts."""
+
+
+class Embedder(Protocol):
+    """Turns texts into fixed-size vectors whose cosine reflects similarity."""
+
+    dimensions: int
+
+    async def embed(self, texts: Sequence[str]) -> Vector:
+        """Return one row of ``dimensions`` floats per text."""
+        ...
+
+
+class HashingEmbedder:
+    """Deterministic offline embedder using the hashing trick.
+
+    Every keyword (the words eligible as tags) is hashed with CRC-32 to a bucket
+    and a sign and weighted by ``1 + log(tf)``. No vocabulary or model is needed,
+    vectors are identical across processes, and dreams sharing specific words
+    end up close together.
+    """
+
+    def __init__(self, dimensions: int = 256) -> None:
+        self.dimensions = dimensions
+
+    async def embed(self, texts: Sequence[str]) -> Vector:
+        """Return one hashed term-frequency vector per text."""
+
+        return self.embed_now(texts)
+
+    def embed_now(self, texts: Sequence[str]) -> Vector:
+        """Synchronous variant of :meth:`embed` for callers outside the event loop."""
+
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts = Counter(keywords(text))
+            for token, count in counts.items():
+                digest = zlib.crc32(token.encode("utf-8"))
+                weight = 1.0 + math.log(count)
+                bucket = digest % self.dimensions
+                vectors[row, bucket] += -weight if digest & _SIGN_BIT else weight
+        return vectors
+
+
+class OpenAIEmbedder:
+    """Embedder calling the OpenAI embeddings API through a shared async client."""
+
+    def __init__(
+        self,
+        client: AsyncOpenAI,
+        *,
+        model: str = "text-embedding-3-small",
+        dimensions: int = 256,
+    ) -> None:
+        self._client = client
+        self._model = model
+        self.dimensions = dimensions
+
+    async def embed(self, texts: Sequence[str]) -> Vector:
+        """Embed ``texts`` in one request, raising :class:`EmbeddingError` on failure."""
+
+        try:
+            response = await self._client.embeddings.create(
+                model=self._model, input=list(texts), dimensions=self.dimensions
+            )
+        except OpenAIError as exc:
+            raise EmbeddingError(f"Embedding request failed: {exc}") from exc
+        ordered = sorted(response.data, key=lambda item: item.index)
+        return np.asarray([item.embedding for item in ordered], dtype=np.float32)
+
+
+class SimilarDreams:
+    """Keeps a vector per dream and answers nearest-neighbour queries.
+
+    Vectors are embedded from the title, transcript and tags; a digest of that
+    text is remembered so re-indexing an unchanged dream (for example after a
+    mood edit) skips the embedder. Embedding failures are logged and leave the
+    dream unindexed until it is indexed again.
+    """
+
+    def __init__(self, embedder: Embedder, index: VectorIndex | None = None) -> None:
+        self._embedder = embedder
+        self.index = index if index is not None else VectorIndex(embedder.dimensions)
+        self._digests: dict[str, bytes] = {}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    async def add(self, dreams: Sequence[Dream]) -> None:
+        """Embed and store the dreams whose text changed since they were last indexed."""
+
+        pending: list[tuple[str, str, bytes]] = []
+        for dream in dreams:
+            text = similarity_text(dream)
+            digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+            if dream.id not in self.index or self._digests.get(dream.id) != digest:
+                pending.append((dream.id, text, digest))
+        if not pending:
+            return
+        try:
+            vectors = await self._embedder.embed([text for _, text, _ in pending])
+        except EmbeddingError:
+            logger.warning("Could not embed %d dream(s) for similarity search", len(pending))
+            return
+        self.index.upsert_many([dream_id for dream_id, _, _ in pending], vectors)
+        for dream_id, _, digest in pending:
+            self._digests[dream_id] = digest
+
+    def discard(self, dream_id: str) -> None:
+        """Forget the vector stored for ``dream_id``."""
+
+        self.index.remove(dream_id)
+        self._digests.pop(dream_id, None)
+
+    def similar(self, dream_id: str, limit: int) -> list[tuple[str, float]]:
+        """Return up to ``limit`` ``(dream_id, cosine)`` pairs closest to ``dream_id``."""
+
+        vector = self.index.vector(dream_id)
+        if vector is None:
+            return []
+        return self.index.search(vector, limit, exclude=[dream_id])
+
+
+def similarity_text(dream: Dream) -> str:
+    """Return the text embedded for ``dream``.
+
+    Tags are appended, so keyword tags drafted from the transcript count twice.
+    """
+
+    return "\n".join([dream.title, dream.transcript, " ".join(dream.tags)])
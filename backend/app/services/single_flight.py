@@ -0,0 +1,52 @@
+"""Coalescing of concurrent identical asynchronous calls."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """Share one in-flight call between concurrent callers using the same key.
+
+    The first caller for a key starts ``factory``; callers arriving before it
+    finishes await the same task and receive its result or exception. The key is
+    released as soon as the call completes, so later callers start a fresh call.
+    The shared task is shielded: a caller that is cancelled, for example because
+    its client disconnected, does not cancel the work other callers wait on.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Future[T]] = {}
+        self._coalesced = 0
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """Return the result of ``factory``, joining an in-flight call for ``key``."""
+
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(factory())
+            self._calls[key] = call
+            call.add_done_callback(lambda _: self._release(key, call))
+        else:
+            self._coalesced += 1
+        return await asyncio.shield(call)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running."""
+
+        return len(self._calls)
+
+    @property
+    def coalesced(self) -> int:
+        """Number of callers that joined an already running call."""
+
+        return self._coalesced
+
+    def _release(self, key: Hashable, call: asyncio.Future[T]) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
@@ -0,0 +1,822 @@
+"""SQLite implementation of :class:`DreamRepository`."""
+
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from datetime import UTC, date, datetime, time
+from pathlib import Path
+from threading import Lock
+
+from ..schemas.dreams import (
+    Dream,
+    DreamCreate,
+    DreamGraph,
+    DreamHighlights,
+    DreamTrends,
+    DreamUpdate,
+    MoodCount,
+    SearchMode,
+    TagCount,
+    TagMatch,
+    TrendGranularity,
+)
+from .dream_indexes import PeriodCounts, trend_spans
+from .dream_repository import (
+    DreamPage,
+    ListCursor,
+    assemble_graph,
+    assemble_trends,
+    day_window,
+    draft_dream,
+    haystack,
+    journal_dream,
+    new_epoch,
+    next_timestamp,
+    revise_dream,
+    search_tokens,
+    top_motifs,
+)
+from .text_analysis import MAX_AUTO_TAGS, TOKENIZER_VERSION, search_terms
+
+_STATEMENT_CACHE_SIZE = 256
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+# ``dream_text`` holds the output of the shared tokenizer joined by spaces, and
+# ``unicode61`` with the apostrophe as a token character splits it back into the
+# same tokens, so FTS5 matches exactly what the in-memory token index would.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dreams (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    created_at INTEGER NOT NULL,
+    mood TEXT,
+    haystack TEXT NOT NULL,
+    body TEXT NOT NULL,
+    version INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS dreams_created_at ON dreams (created_at, id);
+CREATE INDEX IF NOT EXISTS dreams_mood ON dreams (mood, created_at);
+
+CREATE TABLE IF NOT EXISTS dream_tags (
+    tag TEXT NOT NULL,
+    dream_seq INTEGER NOT NULL,
+    PRIMARY KEY (tag, dream_seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS dream_tags_dream ON dream_tags (dream_seq);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS dream_text USING fts5(
+    tokens, tokenize = "unicode61 remove_diacritics 0 tokenchars ''''"
+);
+
+CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO store_meta (key, value) VALUES ('version', 0);
+INSERT OR IGNORE INTO store_meta (key, value) VALUES ('tokenizer', 0);
+
+CREATE TABLE IF NOT EXISTS tag_counts (tag TEXT PRIMARY KEY, count INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS tag_counts_count ON tag_counts (count);
+CREATE TABLE IF NOT EXISTS mood_counts (mood TEXT PRIMARY KEY, count INTEGER NOT NULL);
+
+CREATE TRIGGER IF NOT EXISTS dream_tags_counted AFTER INSERT ON dream_tags BEGIN
+    INSERT INTO tag_counts (tag, count) VALUES (new.tag, 1)
+    ON CONFLICT (tag) DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS dream_tags_uncounted AFTER DELETE ON dream_tags BEGIN
+    UPDATE tag_counts SET count = count - 1 WHERE tag = old.tag;
+    DELETE FROM tag_counts WHERE tag = old.tag AND count = 0;
+END;
+CREATE TABLE IF NOT EXISTS tag_days (
+    day INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (day, tag)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tag_pairs (
+    first TEXT NOT NULL,
+    second TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (first, second)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tag_pair_days (
+    day INTEGER NOT NULL,
+    first TEXT NOT NULL,
+    second TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (day, first, second)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tag_timeline (
+    tag TEXT NOT NULL,
+    created_at INTEGER NOT NULL,
+    dream_seq INTEGER NOT NULL,
+    PRIMARY KEY (tag, created_at, dream_seq)
+) WITHOUT ROWID;
+
+-- UTC day numbers of dreams. Integer division truncates towards zero, so
+-- timestamps before 1970 are shifted down a day less one microsecond first.
+CREATE VIEW IF NOT EXISTS dream_days (seq, day) AS
+SELECT seq, (created_at - (created_at < 0) * 86399999999) / 86400000000 FROM dreams;
+
+-- Tags are inserted after their dream row and deleted before it, so the
+-- triggers can read the dream's day. Each pair is counted when its second tag
+-- is inserted and uncounted when its first tag is deleted.
+CREATE TRIGGER IF NOT EXISTS dream_tags_graphed AFTER INSERT ON dream_tags BEGIN
+    INSERT INTO tag_timeline (tag, created_at, dream_seq)
+    SELECT new.tag, created_at, seq FROM dreams WHERE seq = new.dream_seq;
+    INSERT INTO tag_days (day, tag, count)
+    SELECT day, new.tag, 1 FROM dream_days WHERE seq = new.dream_seq
+    ON CONFLICT (day, tag) DO UPDATE SET count = count + 1;
+    INSERT INTO tag_pairs (first, second, count)
+    SELECT min(tag, new.tag), max(tag, new.tag), 1 FROM dream_tags
+    WHERE dream_seq = new.dream_seq AND tag != new.tag
+    ON CONFLICT (first, second) DO UPDATE SET count = count + 1;
+    INSERT INTO tag_pair_days (day, first, second, count)
+    SELECT day, min(tag, new.tag), max(tag, new.tag), 1
+    FROM dream_tags JOIN dream_days ON dream_days.seq = dream_tags.dream_seq
+    WHERE dream_seq = new.dream_seq AND tag != new.tag
+    ON CONFLICT (day, first, second) DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS dream_tags_ungraphed AFTER DELETE ON dream_tags BEGIN
+    DELETE FROM tag_timeline
+    WHERE tag = old.tag AND dream_seq = old.dream_seq
+        AND created_at = (SELECT created_at FROM dreams WHERE seq = old.dream_seq);
+    UPDATE tag_days SET count = count - 1
+    WHERE tag = old.tag
+        AND day = (SELECT day FROM dream_days WHERE seq = old.dream_seq);
+    DELETE FROM tag_days WHERE tag = old.tag AND count = 0
+        AND day = (SELECT day FROM dream_days WHERE seq = old.dream_seq);
+    UPDATE tag_pairs SET count = count - 1
+    WHERE (first, second) IN (
+        SELECT min(tag, old.tag), max(tag, old.tag) FROM dream_tags
+        WHERE dream_seq = old.dream_seq
+    );
+    DELETE FROM tag_pairs WHERE count = 0 AND (first, second) IN (
+        SELECT min(tag, old.tag), max(tag, old.tag) FROM dream_tags
+        WHERE dream_seq = old.dream_seq
+    );
+    UPDATE tag_pair_days SET count = count - 1
+    WHERE day = (SELECT day FROM dream_days WHERE seq = old.dream_seq)
+        AND (first, second) IN (
+            SELECT min(tag, old.tag), max(tag, old.tag) FROM dream_tags
+            WHERE dream_seq = old.dream_seq
+        );
+    DELETE FROM tag_pair_days WHERE count = 0
+        AND day = (SELECT day FROM dream_days WHERE seq = old.dream_seq)
+        AND (first, second) IN (
+            SELECT min(tag, old.tag), max(tag, old.tag) FROM dream_tags
+            WHERE dream_seq = old.dream_seq
+        );
+END;
+
+CREATE TRIGGER IF NOT EXISTS dreams_mood_counted AFTER INSERT ON dreams
+WHEN new.mood IS NOT NULL AND new.mood != '' BEGIN
+    INSERT INTO mood_counts (mood, count) VALUES (new.mood, 1)
+    ON CONFLICT (mood) DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS dreams_mood_uncounted AFTER DELETE ON dreams
+WHEN old.mood IS NOT NULL AND old.mood != '' BEGIN
+    UPDATE mood_counts SET count = count - 1 WHERE mood = old.mood;
+    DELETE FROM mood_counts WHERE mood = old.mood AND count = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS dreams_mood_recounted AFTER UPDATE OF mood ON dreams
+WHEN old.mood IS NOT new.mood BEGIN
+    UPDATE mood_counts SET count = count - 1 WHERE mood = old.mood;
+    DELETE FROM mood_counts WHERE mood = old.mood AND count = 0;
+    INSERT INTO mood_counts (mood, count)
+    SELECT new.mood, 1 WHERE new.mood IS NOT NULL AND new.mood != ''
+    ON CONFLICT (mood) DO UPDATE SET count = count + 1;
+END;
+
+-- Trend rollups: dream totals (kind 'total', empty name), tag and mood counts per
+-- UTC day, Monday-based week and calendar month, keyed by the day number of the
+-- period's first day. 1970-01-01 was a Thursday, hence the ``+ 3``. Decrements
+-- join ``dream_periods`` so each is a primary-key seek; rows at zero are never
+-- kept, so pruning may match every granularity against every period.
+CREATE TABLE IF NOT EXISTS period_counts (
+    granularity TEXT NOT NULL,
+    period INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (granularity, period, kind, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS period_counts_series
+ON period_counts (kind, name, granularity, period, count);
+CREATE VIEW IF NOT EXISTS dream_periods (seq, granularity, period) AS
+SELECT seq, 'day', day FROM dream_days
+UNION ALL
+SELECT seq, 'week', day - ((day + 3) % 7 + 7) % 7 FROM dream_days
+UNION ALL
+SELECT seq, 'month',
+    CAST(strftime('%s', day * 86400, 'unixepoch', 'start of month') AS INTEGER) / 86400
+FROM dream_days;
+
+CREATE TRIGGER IF NOT EXISTS dreams_rolled_up AFTER INSERT ON dreams BEGIN
+    INSERT INTO period_counts (granularity, period, kind, name, count)
+    SELECT granularity, period, 'total', '', 1 FROM dream_periods WHERE seq = new.seq
+    ON CONFLICT (granularity, period, kind, name) DO UPDATE SET count = count + 1;
+    INSERT INTO period_counts (granularity, period, kind, name, count)
+    SELECT granularity, period, 'mood', new.mood, 1 FROM dream_periods
+    WHERE seq = new.seq AND new.mood IS NOT NULL AND new.mood != ''
+    ON CONFLICT (granularity, period, kind, name) DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS dreams_rolled_back BEFORE DELETE ON dreams BEGIN
+    UPDATE period_counts SET count = count - 1 FROM dream_periods AS periods
+    WHERE periods.seq = old.seq AND period_counts.granularity = periods.granularity
+        AND period_counts.period = periods.period AND kind = 'total' AND name = '';
+    UPDATE period_counts SET count = count - 1 FROM dream_periods AS periods
+    WHERE periods.seq = old.seq AND period_counts.granularity = periods.granularity
+        AND period_counts.period = periods.period AND kind = 'mood' AND name = old.mood;
+    DELETE FROM period_counts
+    WHERE count = 0 AND kind IN ('total', 'mood') AND name IN ('', old.mood)
+        AND granularity IN ('day', 'week', 'month')
+        AND period IN (SELECT period FROM dream_periods WHERE seq = old.seq);
+END;
+CREATE TRIGGER IF NOT EXISTS dreams_mood_rolled_up AFTER UPDATE OF mood ON dreams
+WHEN old.mood IS NOT new.mood BEGIN
+    UPDATE period_counts SET count = count - 1 FROM dream_periods AS periods
+    WHERE periods.seq = old.seq AND period_counts.granularity = periods.granularity
+        AND period_counts.period = periods.period AND kind = 'mood' AND name = old.mood;
+    DELETE FROM period_counts
+    WHERE count = 0 AND kind = 'mood' AND name = old.mood
+        AND granularity IN ('day', 'week', 'month')
+        AND period IN (SELECT period FROM dream_periods WHERE seq = old.seq);
+    INSERT INTO period_counts (granularity, period, kind, name, count)
+    SELECT granularity, period, 'mood', new.mood, 1 FROM dream_periods
+    WHERE seq = new.seq AND new.mood IS NOT NULL AND new.mood != ''
+    ON CONFLICT (granularity, period, kind, name) DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS dream_tags_rolled_up AFTER INSERT ON dream_tags BEGIN
+    INSERT INTO period_counts (granularity, period, kind, name, count)
+    SELECT granularity, period, 'tag', new.tag, 1 FROM dream_periods WHERE seq = new.dream_seq
+    ON CONFLICT (granularity, period, kind, name) DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS dream_tags_rolled_back AFTER DELETE ON dream_tags BEGIN
+    UPDATE period_counts SET count = count - 1 FROM dream_periods AS periods
+    WHERE periods.seq = old.dream_seq AND period_counts.granularity = periods.granularity
+        AND period_counts.period = periods.period AND kind = 'tag' AND name = old.tag;
+    DELETE FROM period_counts
+    WHERE count = 0 AND kind = 'tag' AND name = old.tag
+        AND granularity IN ('day', 'week', 'month')
+        AND period IN (SELECT period FROM dream_periods WHERE seq = old.dream_seq);
+END;
+"""
+
+_INSERT_DREAM = (
+    "INSERT INTO dreams (id, created_at, mood, haystack, body, version) VALUES (?, ?, ?, ?, ?, ?)"
+)
+_UPDATE_DREAM = "UPDATE dreams SET mood = ?, haystack = ?, body = ?, version = ? WHERE seq = ?"
+_DELETE_DREAM = "DELETE FROM dreams WHERE seq = ?"
+_SELECT_DREAM = "SELECT seq, body FROM dreams WHERE id = ?"
+_SELECT_VERSION = "SELECT version FROM dreams WHERE id = ?"
+_EXPORT_DREAMS = "SELECT body FROM dreams ORDER BY created_at, id"
+_STORE_VERSION = "SELECT value FROM store_meta WHERE key = 'version'"
+_BUMP_STORE_VERSION = (
+    "UPDATE store_meta SET value = value + 1 WHERE key = 'version' RETURNING value"
+)
+_ADD_STORE_EPOCH = "INSERT OR IGNORE INTO store_meta (key, value) VALUES ('epoch', ?)"
+_STORE_EPOCH = "SELECT value FROM store_meta WHERE key = 'epoch'"
+_TOKENIZER_VERSION = "SELECT value FROM store_meta WHERE key = 'tokenizer'"
+_SET_TOKENIZER_VERSION = "UPDATE store_meta SET value = ? WHERE key = 'tokenizer'"
+_TEXT_SOURCES = "SELECT seq, body FROM dreams"
+_TOTAL = """
+SELECT COALESCE(SUM(count), 0) FROM period_counts
+WHERE kind = 'total' AND name = '' AND granularity = 'month'
+"""
+_INSERT_TAG = "INSERT OR IGNORE INTO dream_tags (tag, dream_seq) VALUES (?, ?)"
+_DELETE_TAG = "DELETE FROM dream_tags WHERE tag = ? AND dream_seq = ?"
+_DELETE_TAGS = "DELETE FROM dream_tags WHERE dream_seq = ?"
+_INSERT_TEXT = "INSERT INTO dream_text (rowid, tokens) VALUES (?, ?)"
+_DELETE_TEXT = "DELETE FROM dream_text WHERE rowid = ?"
+_TOP_TAGS = "SELECT tag, count FROM tag_counts ORDER BY count DESC, tag LIMIT ?"
+_MOODS = "SELECT mood, count FROM mood_counts ORDER BY count DESC, mood"
+_WINDOW_TAGS = """
+SELECT tag, SUM(count) AS total FROM tag_days WHERE day BETWEEN ? AND ?
+GROUP BY tag ORDER BY total DESC, tag LIMIT ?
+"""
+_NEWEST_WITH_TAG = """
+SELECT dreams.body FROM tag_timeline JOIN dreams ON dreams.seq = tag_timeline.dream_seq
+WHERE tag_timeline.tag = ? AND tag_timeline.created_at BETWEEN ? AND ?
+ORDER BY tag_timeline.created_at DESC, tag_timeline.dream_seq DESC LIMIT ?
+"""
+_SUMMED_COUNTS = """
+SELECT kind, name, SUM(count) FROM period_counts
+WHERE granularity = ? AND period BETWEEN ? AND ? GROUP BY kind, name
+"""
+_SERIES = """
+SELECT period, count FROM period_counts
+WHERE granularity = ? AND kind = ? AND name = ? AND period BETWEEN ? AND ?
+"""
+_MICROS_PER_DAY = 86_400_000_000
+_SQLITE_INTEGER_RANGE = (-(2**63), 2**63 - 1)
+
+
+class SQLiteDreamStore:
+    """Dream store persisted in a single SQLite database running in WAL mode.
+
+    Timestamps are stored as integer microseconds so that ``created_at`` range
+    filters and the newest-first ordering are answered from the
+    ``(created_at, id)`` index. Tags live in a join table keyed by tag, token
+    queries are answered by an FTS5 table ranked with its built-in BM25, and
+    tag and mood counts for :meth:`highlights` are maintained by triggers, as
+    are the tag pair, per-day and per-tag timeline tables behind :meth:`graph`
+    and the day, week and month rollups behind :meth:`trends`.
+    Totals are summed from the monthly dream rollups, so they stay right
+    when other processes write to the same database. Highlight ties are
+    ordered alphabetically. The store version is a counter in ``store_meta``
+    that every write transaction increments and copies onto the rows it
+    touches, so it advances for writes from any process. The database's
+    :attr:`epoch` is drawn once and kept beside it.
+
+    Statements are parameterised constants, so ``sqlite3``'s per-connection
+    statement cache prepares each one only once. A single connection guarded by
+    a lock serves every thread.
+    """
+
+    blocking = True
+    """Calls perform disk I/O, so the routes run them in a worker thread."""
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._path = path
+        self._connection = sqlite3.connect(
+            path,
+            check_same_thread=False,
+            cached_statements=_STATEMENT_CACHE_SIZE,
+            isolation_level=None,
+        )
+        self._lock = Lock()
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode = WAL")
+            self._connection.execute("PRAGMA synchronous = NORMAL")
+            self._connection.executescript(_SCHEMA)
+            (latest,) = self._connection.execute("SELECT MAX(created_at) FROM dreams").fetchone()
+            self._last_created_at = _from_micros(latest) if latest is not None else None
+            self._connection.execute(_ADD_STORE_EPOCH, (new_epoch(),))
+            (self.epoch,) = self._connection.execute(_STORE_EPOCH).fetchone()
+            (tokenizer,) = self._connection.execute(_TOKENIZER_VERSION).fetchone()
+            if tokenizer != TOKENIZER_VERSION:
+                self._rebuild_text()
+
+    def create(self, payload: DreamCreate) -> Dream:
+        """Persist a dream and return the stored representation."""
+
+        with self._lock, _transaction(self._connection) as cursor:
+            identifier = str(_last_seq(cursor) + 1)
+            timestamp = next_timestamp(self._last_created_at)
+            dream = draft_dream(payload, identifier=identifier, created_at=timestamp)
+            self._insert(cursor, dream)
+            self._last_created_at = timestamp
+        return dream
+
+    def import_dreams(self, drafts: Sequence[Dream]) -> list[Dream]:
+        """Insert drafted dreams in one transaction, keeping their ``created_at``.
+
+        The triggers update the counts, graph tables and rollups row by row
+        inside that transaction, so the whole batch commits once.
+        """
+
+        if not drafts:
+            return []
+        with self._lock, _transaction(self._connection) as cursor:
+            seq = _last_seq(cursor)
+            dreams = [
+                draft.model_copy(update={"id": str(seq + offset)})
+                for offset, draft in enumerate(drafts, 1)
+            ]
+            for dream in dreams:
+                self._insert(cursor, dream)
+            newest = max(dream.created_at for dream in dreams)
+            if self._last_created_at is None or newest > self._last_created_at:
+                self._last_created_at = newest
+        return dreams
+
+    def list(  # noqa: PLR0913 - keyword-only filters mirror the query string
+        self,
+        *,
+        tag: str | None = None,
+        tags: Sequence[str] | None = None,
+        tag_match: TagMatch = "all",
+        query: str | None = None,
+        search: SearchMode = "tokens",
+        mood: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int | None = None,
+        after: ListCursor | None = None,
+        count_total: bool = True,
+    ) -> DreamPage:
+        """Return stored dreams ordered by creation time descending.
+
+        Filters have the same semantics as :meth:`DreamStore.list`: ``query`` is
+        matched against FTS5 with the last term as a prefix, ``search="ranked"``
+        orders by BM25, and ``search="substring"`` (or a query the tokenizer
+        cannot represent) scans the stored lowercase text. ``after`` becomes a
+        row-value comparison on the ``(created_at, id)`` index.
+        """
+
+        conditions, parameters = _filter_conditions(
+            tag=tag, tags=tags, tag_match=tag_match, mood=mood, start=start, end=end
+        )
+        terms = search_terms(query) if query and search != "substring" else None
+        if query and terms is None:
+            conditions.append("instr(dreams.haystack, ?) > 0")
+            parameters.append(query.lower())
+
+        if terms is not None:
+            source = "dream_text JOIN dreams ON dreams.seq = dream_text.rowid"
+            conditions.insert(0, "dream_text MATCH ?")
+            parameters.insert(0, _match_expression(terms))
+        else:
+            source = "dreams"
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        order = "dreams.created_at DESC, dreams.id DESC"
+        ranked = terms is not None and search == "ranked"
+        if ranked:
+            order = f"bm25(dream_text), {order}"
+        page_conditions, page_parameters = conditions, parameters
+        if after is not None and not ranked:
+            page_conditions = [*conditions, "(dreams.created_at, dreams.id) < (?, ?)"]
+            page_parameters = [*parameters, _micros(after[0]), after[1]]
+        page_where = f" WHERE {' AND '.join(page_conditions)}" if page_conditions else ""
+        fetch = -1 if limit is None else limit + 1
+
+        with self._lock, _read(self._connection):
+            total: int | None = None
+            if count_total and not conditions:
+                (total,) = self._connection.execute(_TOTAL).fetchone()
+            elif count_total:
+                (total,) = self._connection.execute(
+                    f"SELECT COUNT(*) FROM {source}{where}", parameters
+                ).fetchone()
+            rows = self._connection.execute(
+                f"SELECT dreams.body FROM {source}{page_where} ORDER BY {order} LIMIT ?",
+                [*page_parameters, fetch],
+            ).fetchall()
+        has_more = limit is not None and len(rows) > limit
+        dreams = [Dream.model_validate_json(body) for (body,) in rows[:limit]]
+        return DreamPage(dreams=dreams, total=total, has_more=has_more)
+
+    def get(self, dream_id: str) -> Dream | None:
+        """Retrieve a specific dream by its identifier if available."""
+
+        with self._lock:
+            row = self._connection.execute(_SELECT_DREAM, (dream_id,)).fetchone()
+        return Dream.model_validate_json(row[1]) if row else None
+
+    def update(self, dream_id: str, payload: DreamUpdate) -> Dream | None:
+        """Mutate an existing dream entry with the provided payload."""
+
+        with self._lock, _transaction(self._connection) as cursor:
+            row = cursor.execute(_SELECT_DREAM, (dream_id,)).fetchone()
+            if row is None:
+                return None
+            seq, body = row
+            current = Dream.model_validate_json(body)
+            updated = revise_dream(current, payload)
+            self._replace(cursor, seq, current, updated)
+        return updated
+
+    def delete(self, dream_id: str) -> bool:
+        """Remove a dream entry from the database."""
+
+        with self._lock, _transaction(self._connection) as cursor:
+            row = cursor.execute(_SELECT_DREAM, (dream_id,)).fetchone()
+            if row is None:
+                return False
+            seq = row[0]
+            cursor.execute(_DELETE_TAGS, (seq,))
+            cursor.execute(_DELETE_TEXT, (seq,))
+            cursor.execute(_DELETE_DREAM, (seq,))
+            self._bump(cursor)
+        return True
+
+    def set_journal(
+        self, dream_id: str, *, narrative: str, generated_at: datetime
+    ) -> Dream | None:
+        """Persist the generated journal on the stored dream."""
+
+        with self._lock, _transaction(self._connection) as cursor:
+            row = cursor.execute(_SELECT_DREAM, (dream_id,)).fetchone()
+            if row is None:
+                return None
+            seq, body = row
+            current = Dream.model_validate_json(body)
+            updated = journal_dream(current, narrative=narrative, generated_at=generated_at)
+            self._replace(cursor, seq, current, updated)
+        return updated
+
+    def version(self) -> int:
+        """Return a number that increases with every mutation of the store."""
+
+        with self._lock:
+            (version,) = self._connection.execute(_STORE_VERSION).fetchone()
+        return version
+
+    def dream_version(self, dream_id: str) -> int | None:
+        """Return the store version that last changed ``dream_id``, if it exists."""
+
+        with self._lock:
+            row = self._connection.execute(_SELECT_VERSION, (dream_id,)).fetchone()
+        return row[0] if row else None
+
+    def highlights(self) -> DreamHighlights:
+        """Return the trigger-maintained tag and mood counts."""
+
+        with self._lock, _read(self._connection):
+            top_tags = self._connection.execute(_TOP_TAGS, (MAX_AUTO_TAGS,)).fetchall()
+            moods = self._connection.execute(_MOODS).fetchall()
+            (total,) = self._connection.execute(_TOTAL).fetchone()
+        return DreamHighlights(
+            total_count=total,
+            top_tags=[TagCount(tag=tag, count=count) for tag, count in top_tags],
+            moods=[MoodCount(mood=mood, count=count) for mood, count in moods],
+        )
+
+    def graph(
+        self,
+        *,
+        motifs: int,
+        edges: int,
+        dreams_per_motif: int,
+        start: date | None = None,
+        end: date | None = None,
+    ) -> DreamGraph:
+        """Return the dream map from the trigger-maintained pair and day tables.
+
+        The top motifs come from ``tag_counts`` (or ``tag_days`` within a window),
+        their pairs are primary-key lookups, and recent dreams per motif are
+        seeks into ``tag_timeline``.
+        """
+
+        lowest, highest = _SQLITE_INTEGER_RANGE
+        first_day = lowest if start is None else _day_number(start)
+        last_day = highest if end is None else _day_number(end)
+        first, last = day_window(start, end)
+        earliest = lowest if first is None else _micros(first)
+        latest = highest if last is None else _micros(last)
+        with self._lock:
+            if start is None and end is None:
+                ranked = self._connection.execute(_TOP_TAGS, (motifs,)).fetchall()
+            else:
+                ranked = self._connection.execute(
+                    _WINDOW_TAGS, (first_day, last_day, motifs)
+                ).fetchall()
+            tags = [tag for tag, _ in ranked]
+            placeholders = ", ".join("?" * len(tags))
+            if start is None and end is None:
+                rows = self._connection.execute(
+                    "SELECT first, second, count FROM tag_pairs "
+                    f"WHERE first IN ({placeholders}) AND second IN ({placeholders})",
+                    [*tags, *tags],
+                ).fetchall()
+            else:
+                rows = self._connection.execute(
+                    "SELECT first, second, SUM(count) FROM tag_pair_days "
+                    f"WHERE day BETWEEN ? AND ? AND first IN ({placeholders}) "
+                    f"AND second IN ({placeholders}) GROUP BY first, second",
+                    [first_day, last_day, *tags, *tags],
+                ).fetchall()
+            recent = {
+                tag: self._connection.execute(
+                    _NEWEST_WITH_TAG, (tag, earliest, latest, dreams_per_motif)
+                ).fetchall()
+                for tag in tags
+            }
+        pairs = {(first_tag, second_tag): count for first_tag, second_tag, count in rows}
+        dreams = {
+            tag: [Dream.model_validate_json(body) for (body,) in bodies]
+            for tag, bodies in recent.items()
+        }
+        return assemble_graph(ranked, pairs, dreams, edges=edges)
+
+    def export(self) -> Iterator[Dream]:
+        """Yield every dream oldest first from a read transaction on its own connection.
+
+        In WAL mode that transaction keeps seeing the database as of its first
+        read while writes continue on the main connection, so the export is
+        consistent without holding the store lock. Rows are decoded as they are
+        stepped through the ``(created_at, id)`` index.
+        """
+
+        connection = sqlite3.connect(self._path, check_same_thread=False, isolation_level=None)
+        try:
+            connection.execute("BEGIN")
+            for (body,) in connection.execute(_EXPORT_DREAMS):
+                yield Dream.model_validate_json(body)
+        finally:
+            connection.close()
+
+    def trends(
+        self, *, granularity: TrendGranularity, start: date, end: date, motifs: int
+    ) -> DreamTrends:
+        """Return per-period counts from the trigger-maintained ``period_counts`` table.
+
+        Window totals sum whole months plus the days at the edges. Each series
+        (dream totals, every mood in the window and each top motif) is then one
+        range seek into ``period_counts_series``, and partial periods at the
+        window's edges sum their day rows, reusing the window's edge sums.
+        """
+
+        spans = trend_spans(start, end, granularity)
+        months = trend_spans(start, end, "month")
+        whole = [span.period for span in months if span.full]
+        full = [span for span in spans if span.full]
+        counts = {span.period: PeriodCounts() for span in spans}
+        with self._lock:
+            window = self._summed("month", whole[0], whole[-1]) if whole else PeriodCounts()
+            edges = {
+                (span.first, span.last): self._summed("day", span.first, span.last)
+                for span in months
+                if not span.full
+            }
+            for edge in edges.values():
+                window.merge(edge)
+            tags = [tag for tag, _ in top_motifs(window, motifs)]
+            if full:
+                periods = {_day_number(span.period): counts[span.period] for span in full}
+                bounds = (_day_number(full[0].period), _day_number(full[-1].period))
+                series = [("total", ""), *(("mood", mood) for mood in window.moods)]
+                for kind, name in [*series, *(("tag", tag) for tag in tags)]:
+                    rows = self._connection.execute(_SERIES, (granularity, kind, name, *bounds))
+                    for period, count in rows:
+                        periods[period].add(kind, name, count)
+            for span in spans:
+                if not span.full:
+                    edge = edges.get((span.first, span.last))
+                    if edge is None:
+                        edge = self._summed("day", span.first, span.last)
+                    counts[span.period] = edge.restricted(tags)
+        return assemble_trends(
+            granularity, spans, [counts[span.period] for span in spans], window, motifs=motifs
+        )
+
+    def _summed(self, granularity: TrendGranularity, first: date, last: date) -> PeriodCounts:
+        """Return the summed rollup rows of the periods starting ``first`` through ``last``."""
+
+        counts = PeriodCounts()
+        rows = self._connection.execute(
+            _SUMMED_COUNTS, (granularity, _day_number(first), _day_number(last))
+        )
+        for kind, name, count in rows:
+            counts.add(kind, name, count)
+        return counts
+
+    def close(self) -> None:
+        """Checkpoint the write-ahead log and close the connection."""
+
+        with self._lock:
+            self._connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._connection.close()
+
+    def _bump(self, cursor: sqlite3.Cursor) -> int:
+        """Advance the store version inside the caller's transaction and return it."""
+
+        (version,) = cursor.execute(_BUMP_STORE_VERSION).fetchone()
+        return version
+
+    def _insert(self, cursor: sqlite3.Cursor, dream: Dream) -> None:
+        """Insert ``dream`` with its tag and token rows under the next version."""
+
+        cursor.execute(
+            _INSERT_DREAM,
+            (
+                dream.id,
+                _micros(dream.created_at),
+                dream.mood,
+                haystack(dream),
+                dream.model_dump_json(),
+                self._bump(cursor),
+            ),
+        )
+        seq = cursor.lastrowid
+        cursor.executemany(_INSERT_TAG, ((tag, seq) for tag in dream.tags))
+        cursor.execute(_INSERT_TEXT, (seq, " ".join(search_tokens(dream))))
+
+    def _rebuild_text(self) -> None:
+        """Retokenize every dream into ``dream_text`` after the tokenizer changed."""
+
+        with _transaction(self._connection) as cursor:
+            cursor.execute("DELETE FROM dream_text")
+            rows = self._connection.execute(_TEXT_SOURCES)
+            cursor.executemany(
+                _INSERT_TEXT,
+                (
+                    (seq, " ".join(search_tokens(Dream.model_validate_json(body))))
+                    for seq, body in rows
+                ),
+            )
+            cursor.execute(_SET_TOKENIZER_VERSION, (TOKENIZER_VERSION,))
+
+    def _replace(self, cursor: sqlite3.Cursor, seq: int, before: Dream, after: Dream) -> None:
+        """Write ``after`` over ``before``, touching only the index rows that changed."""
+
+        cursor.execute(
+            _UPDATE_DREAM,
+            (after.mood, haystack(after), after.model_dump_json(), self._bump(cursor), seq),
+        )
+        old_tags, new_tags = set(before.tags), set(after.tags)
+        cursor.executemany(_DELETE_TAG, ((tag, seq) for tag in old_tags - new_tags))
+        cursor.executemany(_INSERT_TAG, ((tag, seq) for tag in new_tags - old_tags))
+        old_tokens, new_tokens = search_tokens(before), search_tokens(after)
+        if old_tokens != new_tokens:
+            cursor.execute(_DELETE_TEXT, (seq,))
+            cursor.execute(_INSERT_TEXT, (seq, " ".join(new_tokens)))
+
+
+@contextmanager
+def _transaction(connection: sqlite3.Connection) -> Iterator[sqlite3.Cursor]:
+    """Run the block in an immediate transaction, rolling back on errors."""
+
+    cursor = connection.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        yield cursor
+    except BaseException:
+        cursor.execute("ROLLBACK")
+        raise
+    else:
+        cursor.execute("COMMIT")
+    finally:
+        cursor.close()
+
+
+@contextmanager
+def _read(connection: sqlite3.Connection) -> Iterator[None]:
+    """Run the block's queries in one read transaction, so they see one snapshot."""
+
+    connection.execute("BEGIN")
+    try:
+        yield
+    finally:
+        connection.execute("COMMIT")
+
+
+def _last_seq(cursor: sqlite3.Cursor) -> int:
+    """Return the last ``seq`` handed out, which the next insert increments."""
+
+    row = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'dreams'").fetchone()
+    return int(row[0]) if row else 0
+
+
+def _filter_conditions(  # noqa: PLR0913 - keyword-only filters mirror the query string
+    *,
+    tag: str | None,
+    tags: Sequence[str] | None,
+    tag_match: TagMatch,
+    mood: str | None,
+    start: datetime | None,
+    end: datetime | None,
+) -> tuple[list[str], list[object]]:
+    """Translate the time, tag and mood filters into ``WHERE`` conditions."""
+
+    conditions: list[str] = []
+    parameters: list[object] = []
+    if start is not None:
+        conditions.append("dreams.created_at >= ?")
+        parameters.append(_micros(start))
+    if end is not None:
+        conditions.append("dreams.created_at <= ?")
+        parameters.append(_micros(end))
+    if tag:
+        conditions.append("dreams.seq IN (SELECT dream_seq FROM dream_tags WHERE tag = ?)")
+        parameters.append(tag)
+    if tags:
+        distinct = list(dict.fromkeys(tags))
+        placeholders = ", ".join("?" * len(distinct))
+        selection = f"SELECT dream_seq FROM dream_tags WHERE tag IN ({placeholders})"
+        if tag_match == "all":
+            selection += f" GROUP BY dream_seq HAVING COUNT(*) = {len(distinct)}"
+        conditions.append(f"dreams.seq IN ({selection})")
+        parameters.extend(distinct)
+    if mood:
+        conditions.append("dreams.mood = ?")
+        parameters.append(mood)
+    return conditions, parameters
+
+
+def _match_expression(terms: Sequence[str]) -> str:
+    """Build an FTS5 query requiring every term, the last one as a prefix."""
+
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " AND ".join(quoted)
+
+
+def _micros(value: datetime) -> int:
+    """Encode a timestamp as microseconds since the epoch, treating naive values as UTC."""
+
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    delta = value - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _day_number(day: date) -> int:
+    """Return the day number that the triggers derive from ``created_at`` microseconds."""
+
+    return _micros(datetime.combine(day, time.min, UTC)) // _MICROS_PER_DAY
+
+
+def _from_micros(value: int) -> datetime:
+    return datetime.fromtimestamp(value // 1_000_000, UTC).replace(microsecond=value % 1_000_000)
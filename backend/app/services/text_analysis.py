@@ -0,0 +1,264 @@
+"""Single-pass analysis of dream text shared by tagging, summaries and search.
+
+Text is NFKC-normalised and lowercased, then split into Latin words and runs of
+Japanese script in one regular-expression pass. Latin words are indexed as
+they are. Japanese has no spaces between words, so its runs are indexed as
+overlapping character bigrams plus the run's last character; a query's bigrams
+then match wherever the same characters appear, and a one-character query
+matches as a prefix. Keyword tags are Latin words and the kanji or katakana
+runs of Japanese text, which are mostly nouns; hiragana mostly spells particles
+and inflections and is left out.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import unicodedata
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+
+_LATIN = r"[0-9A-Za-zÀ-ÖØ-öø-ÿ']+"
+_KATAKANA = r"ァ-ヺー-ヿ"
+_KANJI = r"々〆㐀-䶿一-鿿"
+_TOKEN_PATTERN = re.compile(f"{_LATIN}|[ぁ-ゟ{_KATAKANA}{_KANJI}]+")
+_JAPANESE_KEYWORD = re.compile(f"[{_KATAKANA}]{{2,}}|[{_KANJI}]{{2,}}")
+_UNTOKENISED_WORD = re.compile(r"\w")
+_SENTENCE_BREAK = re.compile(r"[.!?]\s+|[。！？](?![。！？」』）])\s*")
+_JAPANESE_STOPS = ("。", "！", "？")
+_FIRST_JAPANESE = "\u3005"
+
+_STOPWORDS = {
+    "the",
+    "and",
+    "that",
+    "with",
+    "have",
+    "this",
+    "from",
+    "there",
+    "were",
+    "they",
+    "their",
+    "about",
+    "would",
+    "could",
+    "should",
+    "while",
+    "where",
+    "which",
+    "into",
+    "after",
+    "before",
+    "through",
+    "over",
+    "under",
+    "again",
+    "dream",
+    "dreams",
+    "like",
+    "just",
+    "then",
+    "some",
+    "when",
+    "your",
+    "once",
+    "自分",
+    "今日",
+    "昨日",
+    "最初",
+    "最後",
+    "途中",
+    "一緒",
+    "全部",
+    "本当",
+    "場所",
+    "時間",
+}
+
+_SUMMARY_MAX_CHARACTERS = 280
+_SUMMARY_SUFFIX = "..."
+_SUMMARY_SUFFIX_LENGTH = len(_SUMMARY_SUFFIX)
+_SUMMARY_BODY_LENGTH = _SUMMARY_MAX_CHARACTERS - _SUMMARY_SUFFIX_LENGTH
+_MIN_KEYWORD_LENGTH = 4
+_MEMO_ENTRIES = 1024
+
+MAX_AUTO_TAGS = 5
+"""Number of keyword tags drafted per transcript and of top tags in highlights."""
+
+TOKENIZER_VERSION = 1
+"""Changes whenever :func:`tokenize` does, so persistent token indexes know to rebuild."""
+
+
+@dataclass(frozen=True)
+class TranscriptAnalysis:
+    """Summary, keyword tags and search tokens drafted from a transcript."""
+
+    summary: str
+    tags: list[str]
+    tokens: tuple[str, ...]
+
+
+class _AnalysisMemo:
+    """Least recently used analyses keyed by a digest of their transcript.
+
+    Keys are 16-byte BLAKE2b digests, so the memo does not keep transcripts
+    alive and its size depends only on the analyses it holds.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self._entries: OrderedDict[bytes, TranscriptAnalysis] = OrderedDict()
+        self._lock = Lock()
+        self._max_entries = max_entries
+
+    def get(self, key: bytes) -> TranscriptAnalysis | None:
+        with self._lock:
+            analysis = self._entries.get(key)
+            if analysis is not None:
+                self._entries.move_to_end(key)
+            return analysis
+
+    def put(self, key: bytes, analysis: TranscriptAnalysis) -> None:
+        with self._lock:
+            self._entries[key] = analysis
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+
+_memo = _AnalysisMemo(_MEMO_ENTRIES)
+
+
+def analyse_transcript(transcript: str) -> TranscriptAnalysis:
+    """Return the summary, keyword tags and search tokens of a transcript.
+
+    Results are memoised per transcript digest, so an unchanged transcript is
+    analysed once however often its dream is drafted, revised or reindexed.
+    """
+
+    key = _digest(transcript)
+    analysis = _memo.get(key)
+    if analysis is None:
+        analysis = _analyse(transcript)
+        _memo.put(key, analysis)
+    return analysis
+
+
+def remember_analysis(transcript: str, analysis: TranscriptAnalysis) -> None:
+    """Memoise an analysis of ``transcript`` computed elsewhere, such as in a worker process."""
+
+    _memo.put(_digest(transcript), analysis)
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into the lowercase tokens indexed for token search."""
+
+    return _scan(text)[0]
+
+
+def keywords(text: str) -> list[str]:
+    """Return every occurrence of a word in ``text`` that is eligible as a tag."""
+
+    return _scan(text)[1]
+
+
+def search_terms(query: str) -> list[str] | None:
+    """Return the tokens of ``query`` or ``None`` if the tokenizer cannot represent it.
+
+    Queries containing word characters the tokenizer skips (for example Hangul
+    or Cyrillic) must fall back to substring matching to keep their meaning, as
+    must single Japanese characters before the last term: only the last term
+    matches as a prefix, and a lone character is not a token of longer runs.
+    """
+
+    normalised = _normalise(query)
+    terms: list[str] = []
+    runs = _TOKEN_PATTERN.findall(normalised)
+    for position, run in enumerate(runs):
+        if run[0] < _FIRST_JAPANESE:
+            if word := run.strip("'"):
+                terms.append(word)
+        elif len(run) > 1:
+            terms += [run[index : index + 2] for index in range(len(run) - 1)]
+        elif position == len(runs) - 1:
+            terms.append(run)
+        else:
+            return None
+    if not terms or _UNTOKENISED_WORD.search(_TOKEN_PATTERN.sub(" ", normalised)):
+        return None
+    return terms
+
+
+def _analyse(transcript: str) -> TranscriptAnalysis:
+    tokens, words = _scan(transcript)
+    counts = Counter(words)
+    # A stable sort keeps first occurrences first among ties, like most_common(),
+    # without its heap.
+    tags = sorted(counts, key=counts.__getitem__, reverse=True)[:MAX_AUTO_TAGS]
+    return TranscriptAnalysis(summary=_summarise(transcript), tags=tags, tokens=tuple(tokens))
+
+
+def _scan(text: str) -> tuple[list[str], list[str]]:
+    """Return the search tokens and keyword occurrences of ``text`` from one pass.
+
+    ASCII text, the common case for English, is handled with comprehensions
+    instead of a loop that checks the script of every run.
+    """
+
+    normalised = _normalise(text)
+    runs = _TOKEN_PATTERN.findall(normalised)
+    if normalised.isascii():
+        tokens = [word for run in runs if (word := run.strip("'"))]
+        return tokens, _latin_keywords(tokens)
+    tokens = []
+    latin = []
+    for run in runs:
+        if run[0] < _FIRST_JAPANESE:
+            if word := run.strip("'"):
+                tokens.append(word)
+                latin.append(word)
+        else:
+            tokens += [run[index : index + 2] for index in range(len(run) - 1)]
+            tokens.append(run[-1])
+    japanese = _JAPANESE_KEYWORD.findall(normalised)
+    return tokens, _latin_keywords(latin) + [word for word in japanese if word not in _STOPWORDS]
+
+
+def _latin_keywords(words: list[str]) -> list[str]:
+    """Keep the Latin words long and specific enough to describe a dream."""
+
+    return [
+        word
+        for word in words
+        if len(word) >= _MIN_KEYWORD_LENGTH and word not in _STOPWORDS and not word.isdigit()
+    ]
+
+
+def _summarise(transcript: str) -> str:
+    """Join the first two sentences, truncated to ``_SUMMARY_MAX_CHARACTERS``."""
+
+    cleaned = " ".join(line for chunk in transcript.splitlines() if (line := chunk.strip()))
+    if not cleaned:
+        return ""
+    breaks = _SENTENCE_BREAK.finditer(cleaned)
+    combined = cleaned
+    if first := next(breaks, None):
+        primary = cleaned[: first.start() + 1]
+        second = next(breaks, None)
+        secondary = cleaned[first.end() : second.start() + 1 if second else None]
+        separator = "" if primary.endswith(_JAPANESE_STOPS) else " "
+        combined = f"{primary}{separator}{secondary}" if secondary else primary
+    if len(combined) <= _SUMMARY_MAX_CHARACTERS:
+        return combined
+    return f"{combined[:_SUMMARY_BODY_LENGTH]}{_SUMMARY_SUFFIX}"
+
+
+def _normalise(text: str) -> str:
+    """Fold full-width and half-width forms together and lowercase ``text``."""
+
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+def _digest(transcript: str) -> bytes:
+    return hashlib.blake2b(transcript.encode("utf-8", "surrogatepass"), digest_size=16).digest()
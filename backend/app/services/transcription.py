@@ -2,23 +2,52 @@
 
 from __future__ import annotations
 
+import asyncio
 import base64
+import hashlib
 import io
 from dataclasses import dataclass
-from typing import Any, cast
+from typing import Any, BinaryIO, cast
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+
+from .audio_formats import HEADER_BYTES, AudioFormat, detect_format, wav_samples
+from .audio_segments import merge_confidences, stitch_transcripts
+from .result_cache import ResultCache, cache_key
+
+_DIGEST_CHUNK_BYTES = 1024 * 1024
 
 
 class TranscriptionEngine:
-    """Transcribe dream audio notes using Whisper when available."""
+    """Transcribe dream audio notes using Whisper when available.
 
-    def __init__(self, *, api_key: str | None, model: str = "gpt-4o-mini-transcribe") -> None:
-        self._client = OpenAI(api_key=api_key) if api_key else None
+    :meth:`transcribe` uses the blocking client and :meth:`atranscribe` the
+    asynchronous one; pass ``async_client`` to share a pooled ``AsyncOpenAI``.
+    Model results are cached by a hash of the audio bytes, the model and the
+    prompt when a ``cache`` is supplied. Audio is sent under a file name matching
+    its format (see :mod:`.audio_formats`), which the API uses to decode it.
+    """
+
+    def __init__(
+        self,
+        *,
+        api_key: str | None,
+        model: str = "gpt-4o-mini-transcribe",
+        base_url: str | None = None,
+        async_client: AsyncOpenAI | None = None,
+        cache: ResultCache | None = None,
+    ) -> None:
+        self._client = OpenAI(api_key=api_key, base_url=base_url) if api_key else None
+        if async_client is None and api_key:
+            async_client = AsyncOpenAI(api_key=api_key, base_url=base_url)
+        self._async_client = async_client
         self._model = model
+        self._cache = cache
 
-    def transcribe(self, *, audio: bytes, prompt: str | None = None) -> TranscriptionResult:
-        """Return the transcribed text."""
+    def transcribe(
+        self, *, audio: bytes, prompt: str | None = None, filename: str | None = None
+    ) -> TranscriptionResult:
+        """Return the transcribed text, naming the upload after its detected format by default."""
 
         if self._client is None:
             decoded = _offline_decode(audio)
@@ -27,26 +56,219 @@ class TranscriptionEngine:
         if not audio:
             raise ValueError("Audio payload is empty")
 
+        key = self._cache_key(_bytes_digest(audio), prompt)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
         with io.BytesIO(audio) as handle:
-            handle.name = "dream.m4a"
             transcriptions = cast(Any, self._client.audio.transcriptions)
-            if prompt is None:
-                response = transcriptions.create(
-                    model=self._model,
-                    file=handle,
-                )
-            else:
-                response = transcriptions.create(
-                    model=self._model,
-                    file=handle,
-                    prompt=prompt,
+            response = transcriptions.create(
+                **self._request(handle, prompt, filename or _filename_of(audio))
+            )
+
+        return self._remember(key, _result_from(response))
+
+    async def atranscribe(
+        self, *, audio: bytes, prompt: str | None = None, filename: str | None = None
+    ) -> TranscriptionResult:
+        """Asynchronous variant of :meth:`transcribe` that never blocks the event loop."""
+
+        if self._async_client is None:
+            decoded = _offline_decode(audio)
+            return TranscriptionResult(transcript=decoded, engine="offline", confidence=0.4)
+
+        if not audio:
+            raise ValueError("Audio payload is empty")
+
+        digest = await asyncio.to_thread(_bytes_digest, audio)
+        key = self._cache_key(digest, prompt)
+        cached = await self._acached(key)
+        if cached is not None:
+            return cached
+
+        with io.BytesIO(audio) as handle:
+            return await self._acreate(key, handle, prompt, filename or _filename_of(audio))
+
+    async def atranscribe_file(
+        self, *, file: BinaryIO, prompt: str | None = None, content_type: str | None = None
+    ) -> TranscriptionResult:
+        """Transcribe audio read from ``file`` without copying it into memory first.
+
+        The handle is streamed to the upload as-is, so spooled temporary files from
+        streaming uploads are sent straight from disk. Raw ``audio/L16`` PCM is
+        read and wrapped in a WAV header instead. Reading and hashing ``file`` and
+        the cache's disk tier run in threads.
+        """
+
+        if self._async_client is None:
+            audio = await asyncio.to_thread(file.read)
+            return TranscriptionResult(
+                transcript=_offline_decode(audio), engine="offline", confidence=0.4
+            )
+
+        audio_format, size = await asyncio.to_thread(_probe, file, content_type)
+        if size == 0:
+            raise ValueError("Audio payload is empty")
+        if audio_format.headerless:
+            samples = await asyncio.to_thread(file.read)
+            return await self.atranscribe(
+                audio=audio_format.wrap(samples), prompt=prompt, filename=audio_format.filename
+            )
+
+        key = self._cache_key(await asyncio.to_thread(_file_digest, file), prompt)
+        cached = await self._acached(key)
+        if cached is not None:
+            return cached
+
+        return await self._acreate(key, file, prompt, audio_format.filename)
+
+    async def atranscribe_segmented(
+        self,
+        *,
+        file: BinaryIO,
+        prompt: str | None = None,
+        segment_bytes: int,
+        overlap_bytes: int,
+        concurrency: int = 4,
+        content_type: str | None = None,
+    ) -> TranscriptionResult:
+        """Transcribe a long recording as overlapping segments, ``concurrency`` at a time.
+
+        Only PCM audio (WAV, or raw ``audio/L16`` declared by ``content_type``) is
+        split: segments are cut on sample-frame boundaries and each is sent as a
+        WAV file of its own. Compressed formats such as M4A cannot be cut and are
+        transcribed whole. Only the segments being transcribed are held in memory,
+        and they are read from ``file`` in a thread. The segment texts are stitched
+        with the overlap de-duplicated and the confidence is weighted by segment size.
+        """
+
+        audio_format, size = await asyncio.to_thread(_probe, file, content_type)
+        if not audio_format.splittable:
+            return await self.atranscribe_file(file=file, prompt=prompt, content_type=content_type)
+        ranges = audio_format.segment_ranges(
+            size, segment_bytes=segment_bytes, overlap_bytes=overlap_bytes
+        )
+        slots = asyncio.Semaphore(max(1, concurrency))
+        reading = asyncio.Lock()
+
+        async def transcribe_range(offset: int, length: int) -> TranscriptionResult:
+            async with slots:
+                async with reading:
+                    samples = await asyncio.to_thread(_read_range, file, offset, length)
+                return await self.atranscribe(
+                    audio=audio_format.wrap(samples), prompt=prompt, filename=audio_format.filename
                 )
 
-        text: str | None = getattr(response, "text", None)
-        if not text:
-            raise RuntimeError("Transcription service returned no text")
+        results = await asyncio.gather(
+            *(transcribe_range(offset, length) for offset, length in ranges)
+        )
+        return TranscriptionResult(
+            transcript=stitch_transcripts([result.transcript for result in results]),
+            engine=results[0].engine,
+            confidence=merge_confidences(
+                [result.confidence for result in results], [length for _, length in ranges]
+            ),
+        )
 
-        return TranscriptionResult(transcript=text.strip(), engine="openai", confidence=0.9)
+    def _cache_key(self, audio_digest: str, prompt: str | None) -> str:
+        return cache_key(self._model, prompt or "", audio_digest)
+
+    def _cached(self, key: str) -> TranscriptionResult | None:
+        if self._cache is None:
+            return None
+        return _cached_result(self._cache.get(key))
+
+    async def _acached(self, key: str) -> TranscriptionResult | None:
+        if self._cache is None:
+            return None
+        return _cached_result(await self._cache.aget(key))
+
+    def _remember(self, key: str, result: TranscriptionResult) -> TranscriptionResult:
+        if self._cache is not None:
+            self._cache.put(key, _cache_payload(result))
+        return result
+
+    async def _aremember(self, key: str, result: TranscriptionResult) -> TranscriptionResult:
+        if self._cache is not None:
+            await self._cache.aput(key, _cache_payload(result))
+        return result
+
+    async def _acreate(
+        self, key: str, file: BinaryIO, prompt: str | None, filename: str
+    ) -> TranscriptionResult:
+        transcriptions = cast(Any, self._async_client).audio.transcriptions
+        response = await transcriptions.create(**self._request(file, prompt, filename))
+        return await self._aremember(key, _result_from(response))
+
+    def _request(self, file: BinaryIO, prompt: str | None, filename: str) -> dict[str, Any]:
+        request: dict[str, Any] = {"model": self._model, "file": (filename, file)}
+        if prompt is not None:
+            request["prompt"] = prompt
+        return request
+
+
+def _cached_result(payload: dict[str, Any] | None) -> TranscriptionResult | None:
+    if payload is None:
+        return None
+    return TranscriptionResult(
+        transcript=str(payload["transcript"]),
+        engine=str(payload["engine"]),
+        confidence=float(payload["confidence"]),
+        cached=True,
+    )
+
+
+def _cache_payload(result: TranscriptionResult) -> dict[str, Any]:
+    return {
+        "transcript": result.transcript,
+        "engine": result.engine,
+        "confidence": result.confidence,
+    }
+
+
+def _bytes_digest(audio: bytes) -> str:
+    return hashlib.sha256(audio).hexdigest()
+
+
+def _file_digest(file: BinaryIO) -> str:
+    """Hash the rest of ``file`` in chunks and rewind to where reading started."""
+
+    position = file.tell()
+    digest = hashlib.sha256()
+    while chunk := file.read(_DIGEST_CHUNK_BYTES):
+        digest.update(chunk)
+    file.seek(position)
+    return digest.hexdigest()
+
+
+def _probe(file: BinaryIO, content_type: str | None) -> tuple[AudioFormat, int]:
+    """Detect the format of the rest of ``file`` and measure it, then rewind."""
+
+    position = file.tell()
+    head = file.read(HEADER_BYTES)
+    end = file.seek(0, io.SEEK_END)
+    file.seek(position)
+    return detect_format(head, content_type), end - position
+
+
+def _read_range(file: BinaryIO, offset: int, length: int) -> bytes:
+    file.seek(offset)
+    return file.read(length)
+
+
+def _filename_of(audio: bytes) -> str:
+    return detect_format(audio[:HEADER_BYTES]).filename
+
+
+def _result_from(response: object) -> TranscriptionResult:
+    """Convert a transcription API response into a :class:`TranscriptionResult`."""
+
+    text: str | None = getattr(response, "text", None)
+    if not text:
+        raise RuntimeError("Transcription service returned no text")
+
+    return TranscriptionResult(transcript=text.strip(), engine="openai", confidence=0.9)
 
 
 def decode_audio(payload: str) -> bytes:
@@ -59,10 +281,12 @@ def decode_audio(payload: str) -> bytes:
 
 
 def _offline_decode(audio: bytes) -> str:
+    """Read the audio's samples as UTF-8 text, which lets tests round-trip transcripts."""
+
     if not audio:
         return ""
     try:
-        return audio.decode("utf-8", errors="ignore")
+        return wav_samples(audio).decode("utf-8", errors="ignore")
     except Exception:  # pragma: no cover - defensive fallback
         return ""
 @dataclass
@@ -72,4 +296,5 @@ class TranscriptionResult:
     transcript: str
     engine: str
     confidence: float
+    cached: bool = False
 
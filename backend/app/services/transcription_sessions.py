@@ -0,0 +1,255 @@
+"""Live transcription sessions fed by audio chunks while the user is recording."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import cast
+from uuid import uuid4
+
+from .audio_formats import HEADER_BYTES, AudioFormat, detect_format
+from .audio_segments import merge_confidences, stitch_transcripts
+from .transcription import TranscriptionResult
+from .uploads import UploadTooLargeError
+
+SegmentTranscriber = Callable[[bytes, str | None, str], Awaitable[TranscriptionResult]]
+"""Transcribes ``(audio, prompt, filename)``, the file name naming the audio's format."""
+
+
+class SessionLimitError(RuntimeError):
+    """Raised when no further sessions or audio can be accepted."""
+
+
+class _Segment:
+    def __init__(self, length: int, task: asyncio.Task[TranscriptionResult]) -> None:
+        self.length = length
+        self.task = task
+        task.add_done_callback(_retrieve_exception)
+
+    def result(self) -> TranscriptionResult | None:
+        if not self.task.done() or self.task.cancelled() or self.task.exception() is not None:
+            return None
+        return self.task.result()
+
+
+class TranscriptionSession:
+    """Audio received so far and the segments already sent for transcription.
+
+    Only audio that has not been fully covered by a scheduled segment is kept:
+    once a segment starts, the bytes before the next segment's offset are dropped.
+    ``audio_format`` is known once the first segment's worth of audio arrived.
+    """
+
+    def __init__(self, prompt: str | None, content_type: str | None = None) -> None:
+        self.id = uuid4().hex
+        self.prompt = prompt
+        self.content_type = content_type
+        self.audio_format: AudioFormat | None = None
+        self.received_bytes = 0
+        self.touched_at = time.monotonic()
+        self.segments: list[_Segment] = []
+        self._buffer = bytearray()
+
+    @property
+    def buffered_bytes(self) -> int:
+        """Audio received but not yet fully covered by a scheduled segment."""
+
+        return len(self._buffer)
+
+    def extend(self, chunk: bytes) -> None:
+        """Append recorded audio."""
+
+        self._buffer.extend(chunk)
+        self.received_bytes += len(chunk)
+        self.touched_at = time.monotonic()
+
+    def take(self, length: int, *, advance: int) -> bytes:
+        """Return the next ``length`` bytes and drop the first ``advance`` of them."""
+
+        audio = bytes(self._buffer[:length])
+        del self._buffer[:advance]
+        return audio
+
+    def detect_format(self) -> AudioFormat:
+        """Recognise the audio from its first bytes and drop a WAV header."""
+
+        audio_format = detect_format(bytes(self._buffer[:HEADER_BYTES]), self.content_type)
+        if audio_format.splittable:
+            del self._buffer[: audio_format.data_offset]
+        self.audio_format = audio_format
+        return audio_format
+
+    @property
+    def segments_completed(self) -> int:
+        """Number of segments whose transcription has finished."""
+
+        return sum(1 for segment in self.segments if segment.task.done())
+
+    def partial_transcript(self) -> str:
+        """Stitched text of the leading run of successfully transcribed segments."""
+
+        texts: list[str] = []
+        for segment in self.segments:
+            result = segment.result()
+            if result is None:
+                break
+            texts.append(result.transcript)
+        return stitch_transcripts(texts)
+
+    def cancel(self) -> None:
+        """Cancel segments that are still being transcribed."""
+
+        for segment in self.segments:
+            segment.task.cancel()
+
+
+class TranscriptionSessionManager:
+    """Transcribes overlapping segments of live sessions in the background.
+
+    Once ``segment_bytes`` have arrived the session's format is detected (see
+    :mod:`.audio_formats`). For WAV or ``audio/L16`` PCM each appended chunk then
+    schedules every frame-aligned segment that is now complete, sent as a WAV
+    file of its own; at most ``concurrency`` segments are transcribed at once
+    across all sessions, and finalising only has to transcribe the audio after
+    the last full segment. Compressed recordings such as M4A cannot be cut, so
+    they are buffered and transcribed whole when the session is finalised.
+    Sessions idle for longer than ``idle_seconds`` are discarded.
+    """
+
+    def __init__(
+        self,
+        transcribe: SegmentTranscriber,
+        *,
+        segment_bytes: int,
+        overlap_bytes: int,
+        concurrency: int = 4,
+        max_sessions: int = 256,
+        max_session_bytes: int = 25 * 1024 * 1024,
+        idle_seconds: float = 600.0,
+    ) -> None:
+        if segment_bytes <= overlap_bytes:
+            raise ValueError("Segments must be larger than their overlap")
+        self._transcribe = transcribe
+        self._segment_bytes = segment_bytes
+        self._overlap_bytes = overlap_bytes
+        self._concurrency = concurrency
+        self._max_sessions = max_sessions
+        self._max_session_bytes = max_session_bytes
+        self._idle_seconds = idle_seconds
+        self._sessions: dict[str, TranscriptionSession] = {}
+        self._slots: asyncio.Semaphore | None = None
+
+    def open(self, *, prompt: str | None, content_type: str | None = None) -> TranscriptionSession:
+        """Start a new session, raising :class:`ValueError` for invalid ``audio/L16`` types."""
+
+        self._expire()
+        if len(self._sessions) >= self._max_sessions:
+            raise SessionLimitError("Too many open transcription sessions")
+        detect_format(b"", content_type)
+        session = TranscriptionSession(prompt, content_type)
+        self._sessions[session.id] = session
+        return session
+
+    def get(self, session_id: str) -> TranscriptionSession | None:
+        """Return the open session ``session_id``."""
+
+        self._expire()
+        return self._sessions.get(session_id)
+
+    def append(self, session: TranscriptionSession, chunk: bytes) -> None:
+        """Add recorded audio and schedule every segment it completes.
+
+        Raises :class:`UploadTooLargeError` once the session would exceed
+        ``max_session_bytes``.
+        """
+
+        if session.received_bytes + len(chunk) > self._max_session_bytes:
+            raise UploadTooLargeError(
+                f"Sessions are limited to {self._max_session_bytes} bytes of audio"
+            )
+        session.extend(chunk)
+        audio_format = session.audio_format
+        if audio_format is None and session.buffered_bytes >= self._segment_bytes:
+            audio_format = session.detect_format()
+        if audio_format is None or not audio_format.splittable:
+            return
+        segment, overlap = audio_format.segment_lengths(self._segment_bytes, self._overlap_bytes)
+        while session.buffered_bytes >= segment:
+            self._schedule(session, segment, advance=segment - overlap)
+
+    async def finalize(self, session: TranscriptionSession) -> TranscriptionResult:
+        """Transcribe the remaining audio and return the stitched transcript.
+
+        The session is closed whether or not transcription succeeds. Raises
+        :class:`ValueError` when no audio was received.
+        """
+
+        self._sessions.pop(session.id, None)
+        audio_format = session.audio_format or session.detect_format()
+        if not session.segments and not session.buffered_bytes:
+            raise ValueError("Audio payload is empty")
+        overlap = (
+            audio_format.segment_lengths(self._segment_bytes, self._overlap_bytes)[1]
+            if audio_format.splittable
+            else 0
+        )
+        if not session.segments or session.buffered_bytes > overlap:
+            remaining = session.buffered_bytes
+            self._schedule(session, remaining, advance=remaining)
+        try:
+            results = await asyncio.gather(*(segment.task for segment in session.segments))
+        except BaseException:
+            session.cancel()
+            raise
+        return TranscriptionResult(
+            transcript=stitch_transcripts([result.transcript for result in results]),
+            engine=results[0].engine,
+            confidence=merge_confidences(
+                [result.confidence for result in results],
+                [segment.length for segment in session.segments],
+            ),
+        )
+
+    def close(self, session: TranscriptionSession) -> None:
+        """Discard a session and cancel its pending segments."""
+
+        self._sessions.pop(session.id, None)
+        session.cancel()
+
+    def remaining_bytes(self, session: TranscriptionSession) -> int:
+        """Audio ``session`` may still receive."""
+
+        return max(0, self._max_session_bytes - session.received_bytes)
+
+    @property
+    def open_sessions(self) -> int:
+        """Number of sessions that have not been finalised or closed."""
+
+        return len(self._sessions)
+
+    def _schedule(self, session: TranscriptionSession, length: int, *, advance: int) -> None:
+        audio_format = cast(AudioFormat, session.audio_format)
+        audio = session.take(length, advance=advance)
+        if audio_format.splittable:
+            audio = audio_format.wrap(audio)
+        task = asyncio.create_task(self._run(audio, session.prompt, audio_format.filename))
+        session.segments.append(_Segment(length, task))
+
+    async def _run(self, audio: bytes, prompt: str | None, filename: str) -> TranscriptionResult:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(max(1, self._concurrency))
+        async with self._slots:
+            return await self._transcribe(audio, prompt, filename)
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self._idle_seconds
+        for session in [item for item in self._sessions.values() if item.touched_at < cutoff]:
+            self.close(session)
+
+
+def _retrieve_exception(task: asyncio.Task[TranscriptionResult]) -> None:
+    """Mark failures as observed; they are reported when the session is finalised."""
+
+    if not task.cancelled():
+        task.exception()
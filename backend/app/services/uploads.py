@@ -0,0 +1,76 @@
+"""Streaming request-body helpers for audio uploads."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator, AsyncIterator
+from tempfile import SpooledTemporaryFile
+from typing import BinaryIO
+
+from starlette.datastructures import Headers, UploadFile
+from starlette.formparsers import MultiPartException, MultiPartParser
+
+_UPLOAD_FIELD = "file"
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured maximum size."""
+
+
+async def limit_stream(
+    chunks: AsyncIterator[bytes], *, max_bytes: int
+) -> AsyncGenerator[bytes, None]:
+    """Yield ``chunks`` unchanged, failing as soon as more than ``max_bytes`` arrived."""
+
+    received = 0
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > max_bytes:
+            raise UploadTooLargeError(f"Upload exceeds the {max_bytes} byte limit")
+        yield chunk
+
+
+async def spool_body(
+    chunks: AsyncIterator[bytes], *, max_bytes: int, spool_bytes: int
+) -> BinaryIO:
+    """Copy a streamed body into a temporary file positioned at its start.
+
+    The body stays in memory up to ``spool_bytes`` and rolls over to disk beyond
+    that, so large uploads never exist as a single ``bytes`` object.
+    """
+
+    spooled: SpooledTemporaryFile[bytes] = SpooledTemporaryFile(max_size=spool_bytes)
+    try:
+        async for chunk in limit_stream(chunks, max_bytes=max_bytes):
+            spooled.write(chunk)
+    except BaseException:
+        spooled.close()
+        raise
+    spooled.seek(0)
+    return spooled  # type: ignore[return-value]
+
+
+async def multipart_upload(
+    headers: Headers,
+    chunks: AsyncIterator[bytes],
+    *,
+    max_bytes: int,
+    spool_bytes: int,
+) -> tuple[UploadFile, str | None]:
+    """Parse a multipart body into its ``file`` part and optional ``prompt`` field.
+
+    The size limit applies to the raw body while it streams in; file parts are
+    spooled to disk beyond ``spool_bytes``.
+    """
+
+    parser = MultiPartParser(headers, limit_stream(chunks, max_bytes=max_bytes), max_files=1)
+    parser.max_file_size = spool_bytes
+    try:
+        form = await parser.parse()
+    except MultiPartException as exc:
+        raise ValueError(exc.message) from exc
+    upload = form.get(_UPLOAD_FIELD)
+    if not isinstance(upload, UploadFile):
+        await form.close()
+        raise ValueError(f"Multipart upload must include a '{_UPLOAD_FIELD}' file part")
+    prompt = form.get("prompt")
+    return upload, prompt if isinstance(prompt, str) and prompt else None
@@ -0,0 +1,295 @@
+"""In-process cosine similarity index over a contiguous NumPy matrix."""
+
+from __future__ import annotations
+
+import itertools
+from collections.abc import Sequence
+from dataclasses import dataclass
+from threading import Lock
+
+import numpy as np
+from numpy.typing import NDArray
+
+_INITIAL_CAPACITY = 1024
+_ASSIGN_CHUNK_ROWS = 8192
+_KMEANS_ITERATIONS = 8
+_TRAINING_POINTS_PER_CLUSTER = 40
+_MIN_SLICE_ROWS = 32
+
+Vector = NDArray[np.float32]
+_Piece = slice | NDArray[np.intp]
+
+
+@dataclass
+class _Cluster:
+    """Rows assigned to one centroid, split into contiguous slices where possible."""
+
+    rows: NDArray[np.intp]
+    pieces: list[_Piece]
+
+    @classmethod
+    def of(cls, rows: NDArray[np.intp]) -> _Cluster:
+        """Describe sorted ``rows``; runs of adjacent rows are read as slices, not copies."""
+
+        pieces: list[_Piece] = []
+        scattered: list[NDArray[np.intp]] = []
+        for run in np.split(rows, np.flatnonzero(np.diff(rows) != 1) + 1):
+            if len(run) < _MIN_SLICE_ROWS:
+                scattered.append(run)
+                continue
+            if scattered:
+                pieces.append(np.concatenate(scattered))
+                scattered = []
+            pieces.append(slice(int(run[0]), int(run[-1]) + 1))
+        if scattered:
+            pieces.append(np.concatenate(scattered))
+        return cls(rows=rows, pieces=pieces)
+
+    def extended(self, row: int) -> _Cluster:
+        """Return the cluster with ``row`` appended, without rescanning assignments."""
+
+        pieces = list(self.pieces)
+        if pieces and not isinstance(pieces[-1], slice):
+            pieces[-1] = np.append(pieces[-1], row)
+        else:
+            pieces.append(np.array([row], dtype=np.intp))
+        return _Cluster(rows=np.append(self.rows, row), pieces=pieces)
+
+
+class VectorIndex:
+    """Top-k cosine search over unit vectors stored row by row in one matrix.
+
+    Vectors are normalised on insert, so cosine similarity is a single
+    matrix-vector product. Deleting moves the last row into the freed slot, which
+    keeps the live rows contiguous.
+
+    Below ``approximate_threshold`` vectors every query scans the whole matrix.
+    From there on the index also keeps an inverted file: spherical k-means
+    centroids (about ``sqrt(n)`` of them) partition the rows, and a query only
+    scans the rows of its ``probes`` nearest centroids. The partition is retrained
+    whenever the index has doubled since the last training; vectors inserted in
+    between join their nearest existing centroid.
+    """
+
+    def __init__(
+        self,
+        dimensions: int,
+        *,
+        approximate_threshold: int = 50_000,
+        probes: int = 8,
+        seed: int = 0,
+    ) -> None:
+        self.dimensions = dimensions
+        self._threshold = approximate_threshold
+        self._probes = probes
+        self._random = np.random.default_rng(seed)
+        self._vectors: Vector = np.zeros((_INITIAL_CAPACITY, dimensions), dtype=np.float32)
+        self._keys: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._centroids: Vector | None = None
+        self._assignments = np.zeros(_INITIAL_CAPACITY, dtype=np.int32)
+        self._members: list[_Cluster | None] = []
+        self._trained_size = 0
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._rows
+
+    @property
+    def approximate(self) -> bool:
+        """Whether queries currently probe the inverted file instead of scanning."""
+
+        return self._centroids is not None
+
+    def upsert(self, key: str, vector: Sequence[float] | Vector) -> None:
+        """Insert or replace the vector stored under ``key``."""
+
+        self.upsert_many([key], np.asarray(vector, dtype=np.float32).reshape(1, -1))
+
+    def upsert_many(self, keys: Sequence[str], vectors: Vector) -> None:
+        """Insert or replace one vector per key, given as the rows of ``vectors``."""
+
+        units = _normalise_rows(np.asarray(vectors, dtype=np.float32))
+        if units.shape != (len(keys), self.dimensions):
+            raise ValueError(f"Expected {len(keys)} vectors of {self.dimensions} dimensions")
+        with self._lock:
+            self._reserve(len(self._keys) + len(keys))
+            rows = np.empty(len(keys), dtype=np.intp)
+            added = np.zeros(len(keys), dtype=bool)
+            for position, key in enumerate(keys):
+                row = self._rows.get(key)
+                if row is None:
+                    row = len(self._keys)
+                    self._keys.append(key)
+                    self._rows[key] = row
+                    added[position] = True
+                rows[position] = row
+            self._vectors[rows] = units
+            if self._centroids is not None:
+                clusters = np.argmax(units @ self._centroids.T, axis=1)
+                for row, cluster, new in zip(rows, clusters, added, strict=True):
+                    self._assign(int(row), int(cluster), new=bool(new))
+            self._maybe_train()
+
+    def remove(self, key: str) -> bool:
+        """Drop ``key`` from the index, returning whether it was present."""
+
+        with self._lock:
+            row = self._rows.pop(key, None)
+            if row is None:
+                return False
+            last = len(self._keys) - 1
+            if self._centroids is not None:
+                self._invalidate(int(self._assignments[row]))
+                self._invalidate(int(self._assignments[last]))
+            if row != last:
+                moved = self._keys[last]
+                self._vectors[row] = self._vectors[last]
+                self._assignments[row] = self._assignments[last]
+                self._keys[row] = moved
+                self._rows[moved] = row
+            self._keys.pop()
+            if len(self._keys) < self._threshold:
+                self._centroids = None
+                self._members = []
+            return True
+
+    def vector(self, key: str) -> Vector | None:
+        """Return a copy of the unit vector stored under ``key``."""
+
+        with self._lock:
+            row = self._rows.get(key)
+            return None if row is None else self._vectors[row].copy()
+
+    def search(
+        self, query: Sequence[float] | Vector, limit: int, *, exclude: Sequence[str] = ()
+    ) -> list[tuple[str, float]]:
+        """Return up to ``limit`` ``(key, cosine)`` pairs, most similar first."""
+
+        unit = _normalise(np.asarray(query, dtype=np.float32))
+        wanted = limit + len(exclude)
+        with self._lock:
+            count = len(self._keys)
+            if count == 0 or limit <= 0:
+                return []
+            rows: NDArray[np.intp] | None = None
+            if self._centroids is None:
+                scores = self._vectors[:count] @ unit
+            else:
+                rows, scores = self._probe(unit)
+            if wanted < scores.shape[0]:
+                best = np.argpartition(-scores, wanted - 1)[:wanted]
+            else:
+                best = np.arange(scores.shape[0])
+            best = best[np.argsort(-scores[best], kind="stable")]
+            positions = best if rows is None else rows[best]
+            matches = [
+                (self._keys[position], float(scores[index]))
+                for index, position in zip(best, positions, strict=True)
+            ]
+        excluded = set(exclude)
+        return [match for match in matches if match[0] not in excluded][:limit]
+
+    def _reserve(self, size: int) -> None:
+        capacity = self._vectors.shape[0]
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        vectors = np.zeros((capacity, self.dimensions), dtype=np.float32)
+        vectors[: len(self._keys)] = self._vectors[: len(self._keys)]
+        self._vectors = vectors
+        assignments = np.zeros(capacity, dtype=np.int32)
+        assignments[: len(self._keys)] = self._assignments[: len(self._keys)]
+        self._assignments = assignments
+
+    def _probe(self, unit: Vector) -> tuple[NDArray[np.intp], Vector]:
+        """Score the rows of the clusters whose centroids are nearest to ``unit``."""
+
+        assert self._centroids is not None
+        centroid_scores = self._centroids @ unit
+        probes = min(self._probes, centroid_scores.shape[0])
+        nearest = np.argpartition(-centroid_scores, probes - 1)[:probes]
+        rows: list[NDArray[np.intp]] = []
+        scores: list[Vector] = []
+        for cluster in nearest:
+            members = self._cluster(int(cluster))
+            rows.append(members.rows)
+            scores.extend(self._vectors[piece] @ unit for piece in members.pieces)
+        return np.concatenate(rows), np.concatenate(scores)
+
+    def _cluster(self, cluster: int) -> _Cluster:
+        members = self._members[cluster]
+        if members is None:
+            rows = np.flatnonzero(self._assignments[: len(self._keys)] == cluster)
+            members = _Cluster.of(rows)
+            self._members[cluster] = members
+        return members
+
+    def _assign(self, row: int, cluster: int, *, new: bool) -> None:
+        if not new:
+            self._invalidate(int(self._assignments[row]))
+        self._assignments[row] = cluster
+        members = self._members[cluster]
+        if members is not None:
+            self._members[cluster] = members.extended(row)
+
+    def _invalidate(self, cluster: int) -> None:
+        if cluster < len(self._members):
+            self._members[cluster] = None
+
+    def _maybe_train(self) -> None:
+        count = len(self._keys)
+        if count < self._threshold:
+            return
+        if self._centroids is not None and count < 2 * self._trained_size:
+            return
+        self._train(count)
+
+    def _train(self, count: int) -> None:
+        """Fit spherical k-means on a sample and assign every row to a centroid."""
+
+        clusters = max(1, int(np.sqrt(count)))
+        sample_size = min(count, clusters * _TRAINING_POINTS_PER_CLUSTER)
+        sample = self._vectors[self._random.choice(count, size=sample_size, replace=False)]
+        centroids = sample[:clusters].copy()
+        for _ in range(_KMEANS_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            filled = np.bincount(labels, minlength=clusters) > 0
+            centroids[filled] = _normalise_rows(sums[filled])
+
+        for start in range(0, count, _ASSIGN_CHUNK_ROWS):
+            chunk = self._vectors[start : min(count, start + _ASSIGN_CHUNK_ROWS)]
+            self._assignments[start : start + chunk.shape[0]] = np.argmax(
+                chunk @ centroids.T, axis=1
+            )
+
+        # Store each cluster's rows next to each other so probing reads
+        # contiguous memory; rows inserted later are appended after them.
+        order = np.argsort(self._assignments[:count], kind="stable")
+        self._vectors[:count] = self._vectors[order]
+        self._assignments[:count] = self._assignments[order]
+        self._keys = [self._keys[row] for row in order]
+        self._rows = {key: row for row, key in enumerate(self._keys)}
+        bounds = np.searchsorted(self._assignments[:count], np.arange(clusters + 1))
+        self._centroids = centroids
+        self._members = [
+            _Cluster.of(np.arange(start, end)) for start, end in itertools.pairwise(bounds)
+        ]
+        self._trained_size = count
+
+
+def _normalise(vector: Vector) -> Vector:
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm > 0 else vector
+
+
+def _normalise_rows(matrix: Vector) -> Vector:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
@@ -0,0 +1,95 @@
+"""Measure dream map latency as the store grows.
+
+Run from the ``backend`` directory::
+
+    python -m benchmarks.dream_graph --sizes 1000 10000 100000
+    python -m benchmarks.dream_graph --backend sqlite
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from collections.abc import Callable, Sequence
+from datetime import timedelta
+from functools import partial
+from pathlib import Path
+
+from app.schemas.dreams import DreamCreate
+from app.services.dream_repository import DreamRepository, dream_day
+from app.services.dream_store import DreamStore
+from app.services.sqlite_dream_store import SQLiteDreamStore
+
+_MOTIFS = 25
+_EDGES = 50
+_DREAMS_PER_MOTIF = 3
+_VOCABULARY = [f"motif-{index}" for index in range(300)]
+_REPEATS = 50
+
+
+def _populate(store: DreamRepository, count: int, generator: random.Random) -> None:
+    for index in range(count):
+        store.create(
+            DreamCreate(
+                title=f"Dream {index}",
+                transcript="It was odd.",
+                tags=generator.sample(_VOCABULARY, generator.randint(2, 6)),
+            )
+        )
+
+
+def _median_microseconds(operation: Callable[[], object]) -> float:
+    samples: list[float] = []
+    for _ in range(_REPEATS):
+        started = time.perf_counter()
+        operation()
+        samples.append((time.perf_counter() - started) * 1_000_000)
+    return statistics.median(samples)
+
+
+def run(sizes: Sequence[int], backend: str) -> None:
+    """Print median latencies of the whole-history and one-day dream maps."""
+
+    with tempfile.TemporaryDirectory() as directory:
+        store: DreamRepository = (
+            SQLiteDreamStore(Path(directory) / "dreams.sqlite3")
+            if backend == "sqlite"
+            else DreamStore()
+        )
+        try:
+            _measure(store, sizes)
+        finally:
+            store.close()
+
+
+def _measure(store: DreamRepository, sizes: Sequence[int]) -> None:
+    print(f"{'dreams':>10} {'all time (µs)':>15} {'latest day (µs)':>16}")
+    generator = random.Random(1)
+    populated = 0
+    for size in sorted(sizes):
+        _populate(store, size - populated, generator)
+        populated = size
+        latest = dream_day(store.list(limit=1).dreams[0].created_at)
+        graph = partial(
+            store.graph, motifs=_MOTIFS, edges=_EDGES, dreams_per_motif=_DREAMS_PER_MOTIF
+        )
+        overall = _median_microseconds(graph)
+        windowed = _median_microseconds(
+            partial(graph, start=latest - timedelta(days=1), end=latest)
+        )
+        print(f"{size:>10} {overall:>15.0f} {windowed:>16.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default="memory")
+    arguments = parser.parse_args()
+    run(arguments.sizes, arguments.backend)
+
+
+if __name__ == "__main__":
+    main()
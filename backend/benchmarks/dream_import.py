@@ -0,0 +1,117 @@
+"""Compare importing an archive through ``POST /dreams/`` calls and ``POST /dreams/import``.
+
+The application runs in process behind ``httpx.ASGITransport``, so the numbers
+cover routing, validation, drafting and storage but not the network. Run from
+the ``backend`` directory::
+
+    python -m benchmarks.dream_import --dreams 5000
+    python -m benchmarks.dream_import --backend sqlite --workers 0 2 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from collections.abc import AsyncIterator, Sequence
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import httpx
+
+from app.config import DreamStoreBackend, Settings
+from app.main import create_app
+from app.schemas.dreams import DreamImportItem
+
+_VOCABULARY = [f"motif-{index}" for index in range(300)]
+_WORDS = "lantern river mirror corridor station garden stairs whisper ocean forest".split()
+_MOODS = ["calm", "uneasy", "joyful", "afraid", "curious", None]
+_CHUNK_BYTES = 64 * 1024
+
+
+def _archive(count: int) -> list[dict[str, object]]:
+    generator = random.Random(1)
+    start = datetime.now(UTC) - timedelta(days=3 * 365)
+    return [
+        {
+            "title": f"Dream {index}",
+            "transcript": " ".join(generator.choices(_WORDS, k=120)) + ".",
+            "tags": generator.sample(_VOCABULARY, generator.randint(0, 4)),
+            "mood": generator.choice(_MOODS),
+            "created_at": (start + timedelta(hours=index)).isoformat(),
+        }
+        for index in range(count)
+    ]
+
+
+async def _chunks(body: bytes) -> AsyncIterator[bytes]:
+    for index in range(0, len(body), _CHUNK_BYTES):
+        yield body[index : index + _CHUNK_BYTES]
+
+
+async def _measure(
+    archive: Sequence[dict[str, object]], settings: Settings, *, streamed: bool
+) -> float:
+    """Return the dreams per second stored by one import run against a fresh app."""
+
+    app = create_app(settings)
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None
+    ) as client:
+        if streamed:
+            # The pool lives as long as the app, so spawning workers is left out.
+            await app.state.dream_drafter.draft([DreamImportItem.model_validate(archive[0])])
+        started = time.perf_counter()
+        if streamed:
+            body = "\n".join(json.dumps(item) for item in archive).encode("utf-8")
+            response = await client.post(
+                "/dreams/import",
+                content=_chunks(body),
+                headers={"Content-Type": "application/x-ndjson"},
+            )
+            summary = json.loads(response.text.splitlines()[-1])
+            if summary["imported"] != len(archive):
+                raise RuntimeError(f"Import failed: {summary}")
+        else:
+            for item in archive:
+                payload = {key: value for key, value in item.items() if key != "created_at"}
+                (await client.post("/dreams/", json=payload)).raise_for_status()
+        elapsed = time.perf_counter() - started
+        app.state.dream_drafter.close()
+        closing = app.state.dream_store.close()
+        if closing is not None:
+            await closing
+    return len(archive) / elapsed
+
+
+def run(count: int, backend: DreamStoreBackend, workers: Sequence[int]) -> None:
+    """Print import throughput for each approach."""
+
+    archive = _archive(count)
+    print(f"{'approach':>22} {'dreams/s':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        labels = ["POST /dreams/", *(f"import, {size} workers" for size in workers)]
+        for index, label in enumerate(labels):
+            settings = Settings(
+                dream_store_backend=backend,
+                dream_store_dir=Path(directory) / str(index) if backend == "sqlite" else None,
+                import_workers=workers[index - 1] if index else 0,
+            )
+            rate = asyncio.run(_measure(archive, settings, streamed=index > 0))
+            print(f"{label:>22} {rate:>9.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dreams", type=int, default=5000)
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 2])
+    arguments = parser.parse_args()
+    run(arguments.dreams, arguments.backend, arguments.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Measure durable write throughput and cold-start replay of the dream log.
+
+The write phase creates dreams from several threads with ``durable_writes`` on, so
+every request waits for its operation to be fsynced, and compares group commit
+with syncing the same records after every append. The replay phase writes a
+snapshot of ``--dreams`` dreams plus a log tail and times opening the store.
+Run from the ``backend`` directory::
+
+    python -m benchmarks.dream_log --dreams 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from app.schemas.dreams import Dream, DreamCreate
+from app.services.dream_log import DreamLog
+from app.services.dream_store import DreamStore
+
+_TAIL_OPERATIONS = 10_000
+
+
+def _payload(index: int) -> DreamCreate:
+    return DreamCreate(
+        title=f"Dream {index}",
+        transcript=f"Wandering through hallway {index} under paper lanterns.",
+        tags=[f"motif-{index % 50}"],
+        mood="calm" if index % 3 else "uneasy",
+    )
+
+
+def _throughput(write: Callable[[int], object], writes: int, threads: int) -> float:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(write, range(writes)))
+    return writes / (time.perf_counter() - started)
+
+
+def _group_commit(directory: Path, writes: int, threads: int) -> float:
+    store = DreamStore(log=DreamLog(directory), durable_writes=True)
+    try:
+        return _throughput(lambda index: store.create(_payload(index)), writes, threads)
+    finally:
+        store.close()
+
+
+def _fsync_per_append(directory: Path, writes: int, threads: int) -> float:
+    store = DreamStore()
+    lock = threading.Lock()
+    with (directory / "oplog.jsonl").open("ab", buffering=0) as handle:
+
+        def write(index: int) -> None:
+            dream = store.create(_payload(index))
+            with lock:
+                handle.write(dream.model_dump_json().encode("utf-8") + b"\n")
+                os.fsync(handle.fileno())
+
+        return _throughput(write, writes, threads)
+
+
+def _replay(directory: Path, dreams: int) -> tuple[float, int]:
+    log = DreamLog(directory)
+    created = datetime(2024, 1, 1, tzinfo=UTC)
+    records = (
+        Dream(
+            id=str(index),
+            summary=f"Hallway {index}.",
+            created_at=created + timedelta(seconds=index),
+            **_payload(index).model_dump(),
+        )
+        for index in range(1, dreams + 1)
+    )
+    log.snapshot(records, counter=dreams, next_segment=log.rotate())
+    log.close()
+
+    store = DreamStore(log=DreamLog(directory))
+    for index in range(_TAIL_OPERATIONS):
+        store.create(_payload(index))
+    store.close()
+
+    started = time.perf_counter()
+    restored = DreamStore(log=DreamLog(directory))
+    elapsed = time.perf_counter() - started
+    total = restored.list(limit=1).total
+    restored.close()
+    return elapsed, total
+
+
+def run(dreams: int, writes: int, threads: int) -> None:
+    """Print durable write throughput and the time to restore ``dreams`` dreams."""
+
+    with tempfile.TemporaryDirectory() as directory:
+        grouped = _group_commit(Path(directory) / "grouped", writes, threads)
+        Path(directory, "per-append").mkdir()
+        per_append = _fsync_per_append(Path(directory) / "per-append", writes, threads)
+        print(f"durable creates with {threads} threads")
+        print(f"{'group commit (ops/s)':>24} {'fsync per append (ops/s)':>26}")
+        print(f"{grouped:>24.0f} {per_append:>26.0f}")
+
+        elapsed, total = _replay(Path(directory) / "replay", dreams)
+        print(f"restored {total} dreams (snapshot + {_TAIL_OPERATIONS} logged) in {elapsed:.1f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dreams", type=int, default=1_000_000)
+    parser.add_argument("--writes", type=int, default=5_000)
+    parser.add_argument("--threads", type=int, default=16)
+    arguments = parser.parse_args()
+    run(arguments.dreams, arguments.writes, arguments.threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Measure year-long trend latency for journals of increasing size.
+
+Dreams are spread evenly over the year ending today, so every query below
+covers all of them. Run from the ``backend`` directory::
+
+    python -m benchmarks.dream_trends --per-day 5 20 100
+    python -m benchmarks.dream_trends --backend sqlite
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from datetime import UTC, datetime, timedelta
+from functools import partial
+from pathlib import Path
+from unittest import mock
+
+from app.schemas.dreams import DreamCreate
+from app.services.dream_repository import DreamRepository
+from app.services.dream_store import DreamStore
+from app.services.sqlite_dream_store import SQLiteDreamStore
+
+_DAYS = 365
+_MOTIFS = 5
+_VOCABULARY = [f"motif-{index}" for index in range(300)]
+_MOODS = ["calm", "uneasy", "joyful", "afraid", "curious", None]
+_REPEATS = 50
+
+
+@contextmanager
+def _backdated(count: int) -> Iterator[None]:
+    """Stamp the next ``count`` dreams evenly across the last year instead of now."""
+
+    step = timedelta(days=_DAYS) / count
+    stamps = (datetime.now(UTC) - timedelta(days=_DAYS) + step * index for index in range(count))
+    clock = partial(next, stamps)
+    with (
+        mock.patch("app.services.dream_store.next_timestamp", lambda _: clock()),
+        mock.patch("app.services.sqlite_dream_store.next_timestamp", lambda _: clock()),
+    ):
+        yield
+
+
+def _populate(store: DreamRepository, count: int, generator: random.Random) -> None:
+    with _backdated(count):
+        for index in range(count):
+            store.create(
+                DreamCreate(
+                    title=f"Dream {index}",
+                    transcript="It was odd.",
+                    tags=generator.sample(_VOCABULARY, generator.randint(2, 6)),
+                    mood=generator.choice(_MOODS),
+                )
+            )
+
+
+def _median_microseconds(operation: Callable[[], object]) -> float:
+    samples: list[float] = []
+    for _ in range(_REPEATS):
+        started = time.perf_counter()
+        operation()
+        samples.append((time.perf_counter() - started) * 1_000_000)
+    return statistics.median(samples)
+
+
+def run(per_day: Sequence[int], backend: str) -> None:
+    """Print median latencies of year-long trends at each granularity."""
+
+    print(f"{'dreams':>10} {'month (µs)':>11} {'week (µs)':>10} {'day (µs)':>9}")
+    for rate in per_day:
+        with tempfile.TemporaryDirectory() as directory:
+            store: DreamRepository = (
+                SQLiteDreamStore(Path(directory) / "dreams.sqlite3")
+                if backend == "sqlite"
+                else DreamStore()
+            )
+            try:
+                count = rate * _DAYS
+                _populate(store, count, random.Random(1))
+                end = datetime.now(UTC).date()
+                start = end - timedelta(days=_DAYS - 1)
+                latencies = [
+                    _median_microseconds(
+                        partial(
+                            store.trends,
+                            granularity=granularity,
+                            start=start,
+                            end=end,
+                            motifs=_MOTIFS,
+                        )
+                    )
+                    for granularity in ("month", "week", "day")
+                ]
+            finally:
+                store.close()
+        print(f"{count:>10} {latencies[0]:>11.0f} {latencies[1]:>10.0f} {latencies[2]:>9.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--per-day", type=int, nargs="+", default=[5, 20, 100])
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default="memory")
+    arguments = parser.parse_args()
+    run(arguments.per_day, arguments.backend)
+
+
+if __name__ == "__main__":
+    main()
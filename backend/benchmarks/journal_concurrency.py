@@ -0,0 +1,171 @@
+"""Load test: ``GET /dreams/`` latency while journal generations are in flight.
+
+Starts a local stub of the OpenAI chat completions API that answers after a fixed
+delay, serves DreamWeave against it with uvicorn and measures ``GET /dreams/``
+latency while ``--concurrency`` journal generations are running. Run from the
+``backend`` directory::
+
+    python -m benchmarks.journal_concurrency --concurrency 100 --delay 0.5
+    python -m benchmarks.journal_concurrency --concurrency 20 --blocking
+
+``--blocking`` calls the synchronous engine on the event loop, reproducing the
+behaviour before the routes awaited ``NarrativeEngine.ajournal``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import socket
+import statistics
+import threading
+import time
+from collections.abc import Sequence
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+from app.config import Settings
+from app.main import create_app
+from app.schemas.dreams import DreamCreate
+from app.services.narrative import NarrativeEngine, NarrativeResult
+
+_PROBE_INTERVAL_SECONDS = 0.01
+
+
+def _stub_openai(delay: float) -> FastAPI:
+    stub = FastAPI()
+
+    @stub.post("/v1/chat/completions")
+    async def chat_completions() -> dict[str, object]:
+        await asyncio.sleep(delay)
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "gpt-4o-mini",
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": "A stubbed dream journal."},
+                }
+            ],
+        }
+
+    return stub
+
+
+class _BlockingEngine:
+    """Exposes the synchronous engine through ``ajournal`` to block the event loop."""
+
+    def __init__(self, engine: NarrativeEngine) -> None:
+        self._engine = engine
+
+    def journal(self, **kwargs: object) -> NarrativeResult:
+        return self._engine.journal(**kwargs)  # type: ignore[arg-type]
+
+    async def ajournal(self, **kwargs: object) -> NarrativeResult:
+        return self.journal(**kwargs)
+
+
+class _Server:
+    def __init__(self, app: FastAPI) -> None:
+        self.port = _free_port()
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def __enter__(self) -> _Server:
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self._server.should_exit = True
+        self._thread.join()
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return int(probe.getsockname()[1])
+
+
+def _percentile(samples: Sequence[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def _drive(base_url: str, concurrency: int) -> tuple[list[float], float]:
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        started = time.perf_counter()
+        journals = [
+            asyncio.create_task(
+                client.post(f"/dreams/{index + 1}/journal", json={"focus_points": []})
+            )
+            for index in range(concurrency)
+        ]
+        latencies: list[float] = []
+        while not all(task.done() for task in journals):
+            probe_started = time.perf_counter()
+            response = await client.get("/dreams/")
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - probe_started) * 1000)
+            await asyncio.sleep(_PROBE_INTERVAL_SECONDS)
+        for task in journals:
+            task.result().raise_for_status()
+        return latencies, time.perf_counter() - started
+
+
+def run(*, concurrency: int, delay: float, blocking: bool) -> None:
+    """Print ``GET /dreams/`` latency percentiles under concurrent journal load."""
+
+    with _Server(_stub_openai(delay)) as stub:
+        settings = Settings(
+            openai_api_key="stub-key",
+            openai_base_url=f"http://127.0.0.1:{stub.port}/v1",
+            openai_max_connections=concurrency,
+            openai_max_keepalive_connections=concurrency,
+        )
+        app = create_app(settings)
+        for index in range(concurrency):
+            app.state.dream_store.create(
+                DreamCreate(title=f"Dream {index}", transcript="Drifting through fog.")
+            )
+        if blocking:
+            app.state.narrative_engine = _BlockingEngine(app.state.narrative_engine)
+
+        with _Server(app) as server:
+            latencies, elapsed = asyncio.run(
+                _drive(f"http://127.0.0.1:{server.port}", concurrency)
+            )
+
+    mode = "blocking" if blocking else "async"
+    print(f"mode={mode} concurrency={concurrency} upstream_delay={delay:.2f}s")
+    print(f"journals completed in {elapsed:.2f}s")
+    if not latencies:
+        print("no GET /dreams/ probes completed")
+        return
+    print(
+        f"GET /dreams/ probes={len(latencies)} "
+        f"p50={statistics.median(latencies):.1f}ms "
+        f"p99={_percentile(latencies, 0.99):.1f}ms "
+        f"max={max(latencies):.1f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--delay", type=float, default=0.5)
+    parser.add_argument("--blocking", action="store_true")
+    arguments = parser.parse_args()
+    run(concurrency=arguments.concurrency, delay=arguments.delay, blocking=arguments.blocking)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Measure dream store ``list`` latency as the store grows.
+
+Run from the ``backend`` directory::
+
+    python -m benchmarks.list_latency --sizes 1000 10000 50000
+    python -m benchmarks.list_latency --backend sqlite
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import tempfile
+import time
+from collections.abc import Callable, Sequence
+from datetime import timedelta
+from functools import partial
+from pathlib import Path
+
+from app.schemas.dreams import DreamCreate
+from app.services.dream_repository import DreamRepository
+from app.services.dream_store import DreamStore
+from app.services.sqlite_dream_store import SQLiteDreamStore
+
+_PAGE_SIZE = 20
+_REPEATS = 200
+
+
+def _populate(store: DreamRepository, count: int) -> None:
+    for index in range(count):
+        store.create(
+            DreamCreate(
+                title=f"Dream {index}",
+                transcript=f"Wandering through hallway {index} under paper lanterns.",
+                tags=[f"motif-{index % 50}"],
+                mood="calm" if index % 3 else "uneasy",
+            )
+        )
+
+
+def _median_microseconds(operation: Callable[[], object]) -> float:
+    samples: list[float] = []
+    for _ in range(_REPEATS):
+        started = time.perf_counter()
+        operation()
+        samples.append((time.perf_counter() - started) * 1_000_000)
+    return statistics.median(samples)
+
+
+def run(sizes: Sequence[int], backend: str) -> None:
+    """Print median latencies for representative listing queries."""
+
+    with tempfile.TemporaryDirectory() as directory:
+        store: DreamRepository = (
+            SQLiteDreamStore(Path(directory) / "dreams.sqlite3")
+            if backend == "sqlite"
+            else DreamStore()
+        )
+        try:
+            _measure(store, sizes)
+        finally:
+            store.close()
+
+
+def _measure(store: DreamRepository, sizes: Sequence[int]) -> None:
+    print(f"{'dreams':>10} {'newest page (µs)':>18} {'last-week page (µs)':>20}")
+    populated = 0
+    for size in sorted(sizes):
+        _populate(store, size - populated)
+        populated = size
+        newest = store.list(limit=1).dreams[0].created_at
+        window_start = newest - timedelta(days=7)
+
+        unfiltered = _median_microseconds(lambda: store.list(limit=_PAGE_SIZE))
+        windowed = _median_microseconds(
+            partial(store.list, start=window_start, end=newest, limit=_PAGE_SIZE)
+        )
+        print(f"{size:>10} {unfiltered:>18.1f} {windowed:>20.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default="memory")
+    arguments = parser.parse_args()
+    run(arguments.sizes, arguments.backend)
+
+
+if __name__ == "__main__":
+    main()
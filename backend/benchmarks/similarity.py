@@ -0,0 +1,113 @@
+"""Measure similar-dream search latency and recall as the index grows.
+
+Vectors are synthetic: each is a random topic centre plus noise, which gives
+the clustered neighbourhoods real dream embeddings have. Recall@k compares the
+inverted-file search with an exact scan over the same vectors.
+
+Run from the ``backend`` directory::
+
+    python -m benchmarks.similarity --sizes 10000 100000 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable, Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+
+from app.services.similarity import HashingEmbedder
+from app.services.vector_index import Vector, VectorIndex
+
+_QUERIES = 200
+_LIMIT = 10
+_INSERT_BATCH = 10_000
+_EMBED_SAMPLE = 5_000
+_NOISE = 1.0
+_MOTIFS = "moon river stairs mirror train garden ocean forest owl lantern door bridge".split()
+
+
+def _vectors(count: int, dimensions: int, generator: np.random.Generator) -> Vector:
+    topics = generator.normal(size=(max(16, count // 200), dimensions)).astype(np.float32)
+    labels = generator.integers(0, topics.shape[0], size=count)
+    noise = generator.normal(scale=_NOISE, size=(count, dimensions)).astype(np.float32)
+    noisy = topics[labels] + noise
+    return noisy / np.linalg.norm(noisy, axis=1, keepdims=True)
+
+
+def _median_microseconds(operation: Callable[[int], object], queries: int) -> float:
+    samples: list[float] = []
+    for query in range(queries):
+        started = time.perf_counter()
+        operation(query)
+        samples.append((time.perf_counter() - started) * 1_000_000)
+    return statistics.median(samples)
+
+
+def _exact(vectors: Vector, query: Vector) -> NDArray[np.intp]:
+    scores = vectors @ query
+    best = np.argpartition(-scores, _LIMIT)[: _LIMIT + 1]
+    return best[np.argsort(-scores[best])]
+
+
+def run(sizes: Sequence[int], dimensions: int, probes: int) -> None:
+    """Print build time, exact and approximate latency and recall for each size."""
+
+    generator = np.random.default_rng(7)
+    embedder = HashingEmbedder(dimensions)
+    texts = [
+        " ".join(generator.choice(_MOTIFS, size=12)) + f" night {index}"
+        for index in range(_EMBED_SAMPLE)
+    ]
+    started = time.perf_counter()
+    embedder.embed_now(texts)
+    rate = _EMBED_SAMPLE / (time.perf_counter() - started)
+    print(f"hashing embedder: {rate:,.0f} dreams/s at {dimensions} dimensions\n")
+
+    print(
+        f"{'dreams':>10} {'build (s)':>10} {'exact (µs)':>11} "
+        f"{'approx (µs)':>12} {f'recall@{_LIMIT}':>10}"
+    )
+    for size in sizes:
+        _measure(size, dimensions, probes, generator)
+
+
+def _measure(size: int, dimensions: int, probes: int, generator: np.random.Generator) -> None:
+    vectors = _vectors(size, dimensions, generator)
+    keys = [str(row) for row in range(size)]
+    index = VectorIndex(dimensions, approximate_threshold=min(50_000, size), probes=probes)
+    started = time.perf_counter()
+    for start in range(0, size, _INSERT_BATCH):
+        end = start + _INSERT_BATCH
+        index.upsert_many(keys[start:end], vectors[start:end])
+    build = time.perf_counter() - started
+
+    rows = generator.choice(size, size=_QUERIES, replace=False)
+    exact = _median_microseconds(lambda query: _exact(vectors, vectors[rows[query]]), _QUERIES)
+    approximate = _median_microseconds(
+        lambda query: index.search(vectors[rows[query]], _LIMIT, exclude=[keys[rows[query]]]),
+        _QUERIES,
+    )
+    hits = 0
+    for row in rows:
+        expected = {keys[found] for found in _exact(vectors, vectors[row]) if found != row}
+        found = index.search(vectors[row], _LIMIT, exclude=[keys[row]])
+        hits += len(expected & {key for key, _ in found})
+    recall = hits / (_LIMIT * _QUERIES)
+    print(f"{size:>10} {build:>10.2f} {exact:>11.0f} {approximate:>12.0f} {recall:>10.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dimensions", type=int, default=256)
+    parser.add_argument("--probes", type=int, default=8)
+    arguments = parser.parse_args()
+    run(arguments.sizes, arguments.dimensions, arguments.probes)
+
+
+if __name__ == "__main__":
+    main()
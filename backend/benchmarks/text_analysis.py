@@ -0,0 +1,98 @@
+"""Measure transcript analysis throughput on English and Japanese corpora.
+
+Each corpus holds synthetic transcripts assembled from dream-like sentences.
+``analysis`` runs the single pass that drafts tags, the summary and search
+tokens for transcripts it has not seen; ``memoised`` repeatedly analyses the
+latest transcripts that fit in the memo, which only hashes each one and looks
+the result up. Throughput is reported in megabytes of UTF-8 text per second,
+the best of ``_ROUNDS`` passes. Run from the ``backend`` directory::
+
+    python -m benchmarks.text_analysis --transcripts 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from collections.abc import Callable, Sequence
+
+from app.services import text_analysis
+
+_SENTENCES = 8
+_ROUNDS = 3
+_ENGLISH = [
+    "I was walking down a corridor lined with lanterns",
+    "the river outside the station had turned to glass",
+    "my grandmother handed me a key that did not fit any door",
+    "someone kept whispering my name from the stairs",
+    "the ocean rose quietly until the garden was underwater",
+    "a train without a driver carried me through the forest",
+    "every mirror showed the room a few seconds late",
+    "I could fly, but only a little above the rooftops",
+]
+_JAPANESE = [
+    "提灯が並ぶ長い廊下を歩いていた",
+    "駅の外の川がガラスのように固まっていた",
+    "祖母がどの扉にも合わない鍵を渡してくれた",
+    "階段の上から誰かが私の名前をささやき続けていた",
+    "海が静かに満ちてきて庭が水の底に沈んだ",
+    "運転手のいない電車が森の中を走っていった",
+    "どの鏡も部屋を数秒遅れて映していた",
+    "空を飛べたが屋根の少し上までしか上がれなかった",
+]
+
+
+def _corpus(sentences: Sequence[str], count: int, stop: str, generator: random.Random) -> list[str]:
+    joiner = " " if stop == "." else ""
+    return [
+        joiner.join(
+            f"{sentence[0].upper()}{sentence[1:]}{stop}"
+            for sentence in generator.choices(sentences, k=_SENTENCES)
+        )
+        + f" {index}"
+        for index in range(count)
+    ]
+
+
+def _megabytes_per_second(
+    operation: Callable[[str], object], transcripts: Sequence[str], size: int
+) -> float:
+    """Return the best throughput of ``_ROUNDS`` passes over ``transcripts``."""
+
+    elapsed = []
+    for _ in range(_ROUNDS):
+        started = time.perf_counter()
+        for transcript in transcripts:
+            operation(transcript)
+        elapsed.append(time.perf_counter() - started)
+    return size / min(elapsed) / 1_000_000
+
+
+def run(count: int) -> None:
+    """Print analysis throughput with and without memo hits for each corpus."""
+
+    generator = random.Random(1)
+    corpora = {
+        "English": _corpus(_ENGLISH, count, ".", generator),
+        "Japanese": _corpus(_JAPANESE, count, "。", generator),
+    }
+    print(f"{'corpus':>10} {'KiB':>8} {'analysis (MB/s)':>16} {'memoised (MB/s)':>16}")
+    for name, transcripts in corpora.items():
+        size = sum(len(transcript.encode("utf-8")) for transcript in transcripts)
+        fresh = _megabytes_per_second(text_analysis._analyse, transcripts, size)
+        recent = transcripts[-text_analysis._MEMO_ENTRIES :]
+        recent_size = sum(len(transcript.encode("utf-8")) for transcript in recent)
+        memoised = _megabytes_per_second(text_analysis.analyse_transcript, recent, recent_size)
+        print(f"{name:>10} {size / 1024:>8.0f} {fresh:>16.1f} {memoised:>16.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transcripts", type=int, default=2000)
+    arguments = parser.parse_args()
+    run(arguments.transcripts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Compare peak server RSS of base64, raw-body and multipart transcription uploads.
+
+Each mode runs against a fresh uvicorn subprocess whose transcription engine reads
+the audio the way the OpenAI client would and discards it. The reported figure is
+the growth of the server's peak resident set (``VmHWM``) caused by one upload, so
+this benchmark requires Linux. Run from the ``backend`` directory::
+
+    python -m benchmarks.upload_memory --size-mb 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import io
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import BinaryIO
+
+import httpx
+import uvicorn
+
+from app.config import Settings
+from app.main import create_app
+from app.services.transcription import TranscriptionResult
+
+from .journal_concurrency import _free_port
+
+_CHUNK_BYTES = 64 * 1024
+_WARMUP_BYTES = 1024
+_MODES = ("base64", "raw", "multipart")
+
+
+class _DiscardingEngine:
+    """Consumes audio like an upload to the model would, then reports its size."""
+
+    def transcribe(self, *, audio: bytes, prompt: str | None) -> TranscriptionResult:
+        return self._result(len(audio))
+
+    async def atranscribe(self, *, audio: bytes, prompt: str | None) -> TranscriptionResult:
+        with io.BytesIO(audio) as handle:
+            return await self.atranscribe_file(file=handle, prompt=prompt)
+
+    async def atranscribe_file(self, *, file: BinaryIO, prompt: str | None) -> TranscriptionResult:
+        size = 0
+        while chunk := file.read(_CHUNK_BYTES):
+            size += len(chunk)
+        return self._result(size)
+
+    @staticmethod
+    def _result(size: int) -> TranscriptionResult:
+        return TranscriptionResult(transcript=str(size), engine="discard", confidence=1.0)
+
+
+def serve(port: int, max_upload_bytes: int) -> None:
+    """Run the API with the discarding engine; used as the benchmark subprocess."""
+
+    app = create_app(Settings(transcription_max_upload_bytes=max_upload_bytes))
+    app.state.transcription_engine = _DiscardingEngine()
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def _peak_rss_kib(pid: int) -> int:
+    for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+        if line.startswith("VmHWM:"):
+            return int(line.split()[1])
+    raise RuntimeError("VmHWM is not reported for this process")
+
+
+def _file_chunks(path: Path) -> Iterator[bytes]:
+    with path.open("rb") as handle:
+        while chunk := handle.read(_CHUNK_BYTES):
+            yield chunk
+
+
+def _upload(client: httpx.Client, mode: str, path: Path) -> httpx.Response:
+    if mode == "base64":
+        encoded = base64.b64encode(path.read_bytes()).decode()
+        return client.post("/dreams/transcribe", json={"audio_base64": encoded})
+    if mode == "raw":
+        return client.post("/dreams/transcribe/upload", content=_file_chunks(path))
+    with path.open("rb") as handle:
+        return client.post("/dreams/transcribe/upload", files={"file": ("dream.m4a", handle)})
+
+
+def _measure(mode: str, audio: Path, warmup: Path, max_upload_bytes: int) -> tuple[int, float]:
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.upload_memory", "--serve", str(port)]
+        + ["--max-upload-bytes", str(max_upload_bytes)]
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=120) as client:
+            while True:
+                try:
+                    client.get("/health")
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.05)
+            _upload(client, mode, warmup).raise_for_status()
+            baseline = _peak_rss_kib(server.pid)
+            started = time.perf_counter()
+            _upload(client, mode, audio).raise_for_status()
+            elapsed = time.perf_counter() - started
+            return _peak_rss_kib(server.pid) - baseline, elapsed
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def run(size_mb: int) -> None:
+    """Print the peak RSS growth of one upload of ``size_mb`` MiB per mode."""
+
+    size = size_mb * 1024 * 1024
+    with tempfile.TemporaryDirectory() as directory:
+        audio = Path(directory) / "audio.bin"
+        warmup = Path(directory) / "warmup.bin"
+        with audio.open("wb") as handle:
+            for _ in range(0, size, _CHUNK_BYTES):
+                handle.write(b"\x00" * _CHUNK_BYTES)
+        warmup.write_bytes(b"\x00" * _WARMUP_BYTES)
+
+        print(f"upload size {size_mb} MiB")
+        print(f"{'mode':>10} {'peak RSS growth (MiB)':>22} {'elapsed (s)':>12}")
+        for mode in _MODES:
+            growth_kib, elapsed = _measure(mode, audio, warmup, max_upload_bytes=size * 2)
+            print(f"{mode:>10} {growth_kib / 1024:>22.1f} {elapsed:>12.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=20)
+    parser.add_argument("--serve", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    parser.add_argument("--max-upload-bytes", type=int, help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+    if arguments.serve is not None:
+        serve(arguments.serve, arguments.max_upload_bytes)
+        return
+    run(arguments.size_mb)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Tests for recognising audio formats and wrapping PCM segments as WAV."""
+
+import io
+import struct
+import wave
+
+import pytest
+
+from app.services.audio_formats import detect_format, wav_samples
+
+FRAME_BYTES = 4
+SEGMENT_BYTES = 10
+OVERLAP_BYTES = 5
+
+
+def _stereo_wav(frames: int) -> bytes:
+    handle = io.BytesIO()
+    with wave.open(handle, "wb") as writer:
+        writer.setnchannels(2)
+        writer.setsampwidth(2)
+        writer.setframerate(16_000)
+        writer.writeframes(bytes(range(frames * FRAME_BYTES)))
+    return handle.getvalue()
+
+
+def test_wav_segments_are_frame_aligned_and_playable() -> None:
+    recording = _stereo_wav(6)
+    # A metadata chunk between the header and the samples must be skipped.
+    info = b"LIST" + struct.pack("<I", 5) + b"INFO!\x00"
+    recording = recording[:36] + info + recording[36:]
+    recording = recording[:4] + struct.pack("<I", len(recording) - 8) + recording[8:]
+
+    audio_format = detect_format(recording)
+    ranges = audio_format.segment_ranges(
+        len(recording), segment_bytes=SEGMENT_BYTES, overlap_bytes=OVERLAP_BYTES
+    )
+
+    assert audio_format.filename == "dream.wav"
+    assert all(length % FRAME_BYTES == 0 for _, length in ranges)
+    segment = audio_format.wrap(recording[ranges[1][0] : ranges[1][0] + ranges[1][1]])
+    with wave.open(io.BytesIO(segment)) as reader:
+        assert (reader.getnchannels(), reader.getsampwidth(), reader.getnframes()) == (2, 2, 2)
+    assert wav_samples(segment) == bytes(range(4, 12))
+
+
+@pytest.mark.parametrize(
+    ("head", "content_type", "filename"),
+    [
+        (b"\x00\x00\x00\x20ftypM4A ", None, "dream.m4a"),
+        (b"ID3\x04", "application/octet-stream", "dream.mp3"),
+        (b"\xff\xfb\x90\x00", None, "dream.mp3"),
+        (b"OggS\x00", None, "dream.ogg"),
+        (b"\x1aE\xdf\xa3", None, "dream.webm"),
+        (b"unrecognised", "audio/flac", "dream.flac"),
+        (b"unrecognised", None, "dream.m4a"),
+    ],
+)
+def test_compressed_formats_are_named_and_never_split(
+    head: bytes, content_type: str | None, filename: str
+) -> None:
+    audio_format = detect_format(head, content_type)
+
+    assert (audio_format.filename, audio_format.splittable) == (filename, False)
+
+
+def test_raw_pcm_must_declare_its_rate() -> None:
+    with pytest.raises(ValueError, match="rate"):
+        detect_format(b"", "audio/L16")
@@ -0,0 +1,54 @@
+"""Tests for splitting audio into segments and stitching their transcripts."""
+
+import pytest
+
+from app.services.audio_segments import merge_confidences, segment_ranges, stitch_transcripts
+
+SEGMENT_BYTES = 10
+OVERLAP_BYTES = 3
+
+
+def test_segment_ranges_cover_audio_with_overlap() -> None:
+    ranges = segment_ranges(25, segment_bytes=SEGMENT_BYTES, overlap_bytes=OVERLAP_BYTES)
+
+    assert ranges == [(0, 10), (7, 10), (14, 10), (21, 4)]
+    for (offset, length), (next_offset, _) in zip(ranges, ranges[1:], strict=False):
+        assert offset + length - next_offset == OVERLAP_BYTES
+
+
+def test_short_audio_is_a_single_segment() -> None:
+    assert segment_ranges(8, segment_bytes=SEGMENT_BYTES, overlap_bytes=OVERLAP_BYTES) == [(0, 8)]
+    with pytest.raises(ValueError, match="overlap"):
+        segment_ranges(8, segment_bytes=3, overlap_bytes=3)
+
+
+def test_stitch_removes_repeated_overlap_and_boundary_fragments() -> None:
+    stitched = stitch_transcripts(
+        [
+            "I walked into the old library and the shel",
+            "ary and the shelves were breathing slowly.",
+            "breathing slowly. Then the lights went out",
+        ]
+    )
+
+    assert stitched == (
+        "I walked into the old library and the shelves were breathing slowly. "
+        "Then the lights went out"
+    )
+
+
+def test_stitch_joins_segments_without_shared_words() -> None:
+    assert stitch_transcripts(["Falling", "upwards"]) == "Falling upwards"
+    assert stitch_transcripts([]) == ""
+
+
+def test_stitch_keeps_words_shared_away_from_the_boundary() -> None:
+    previous = "I walked down to the river and sat by the water"
+    incoming = "a heron stood in the reeds while the sun set"
+
+    assert stitch_transcripts([previous, incoming]) == f"{previous} {incoming}"
+
+
+def test_merge_confidences_weights_by_segment_size() -> None:
+    assert merge_confidences([0.9, 0.5], [3, 1]) == pytest.approx(0.8)
+    assert merge_confidences([0.4], [0]) == pytest.approx(0.4)
@@ -0,0 +1,110 @@
+"""Tests for streaming NDJSON and CSV encoding of dream exports."""
+
+import asyncio
+import csv
+import gzip
+import io
+import json
+import tracemalloc
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
+
+from app.schemas.dreams import Dream, ExportFormat
+from app.services.dream_export import encode_export
+from app.services.dream_repository import AsyncDreamStore
+from app.services.dream_store import DreamStore
+
+EXPORTED_DREAMS = 100_000
+MAX_EXPORT_PEAK_BYTES = 4 * 1024 * 1024
+
+
+async def _dreams(*dreams: Dream) -> AsyncIterator[Dream]:
+    for dream in dreams:
+        yield dream
+
+
+async def _encode(
+    dreams: AsyncIterator[Dream], *, export_format: ExportFormat, compress: bool
+) -> bytes:
+    chunks = encode_export(dreams, export_format=export_format, compress=compress)
+    return b"".join([chunk async for chunk in chunks])
+
+
+def test_csv_export_quotes_fields_and_leaves_missing_values_empty() -> None:
+    dreams = (
+        Dream(
+            id="1",
+            title='The "long" hallway',
+            transcript="Doors, doors, doors.\nThen a garden.",
+            tags=["doors", "garden"],
+            mood=None,
+            summary="Doors, doors, doors.",
+            created_at=datetime(2022, 5, 6, 7, 8, tzinfo=UTC),
+        ),
+        Dream(
+            id="2",
+            title="Ferry",
+            transcript="A ferry at night.",
+            mood="calm",
+            summary="A ferry at night.",
+            created_at=datetime(2022, 5, 7, tzinfo=UTC),
+            journal="Crossing dark water.",
+            journal_generated_at=datetime(2022, 5, 8, tzinfo=UTC),
+        ),
+    )
+
+    body = asyncio.run(_encode(_dreams(*dreams), export_format="csv", compress=True))
+
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(body).decode("utf-8"))))
+    assert rows[0]["title"] == 'The "long" hallway'
+    assert rows[0]["transcript"] == "Doors, doors, doors.\nThen a garden."
+    assert json.loads(rows[0]["tags"]) == ["doors", "garden"]
+    assert (rows[0]["mood"], rows[0]["journal"], rows[0]["journal_generated_at"]) == ("", "", "")
+    assert rows[0]["created_at"] == "2022-05-06T07:08:00+00:00"
+    assert rows[1]["journal_generated_at"] == "2022-05-08T00:00:00+00:00"
+
+
+def test_export_of_100k_dreams_keeps_memory_bounded() -> None:
+    start = datetime(2015, 1, 1, tzinfo=UTC)
+    store = DreamStore()
+    store.import_dreams(
+        [
+            Dream.model_construct(
+                id="",
+                title=f"Dream {index}",
+                transcript=f"Walking the lantern corridor for the {index}th time, doors ajar.",
+                tags=["corridor", "lantern"],
+                mood="curious",
+                summary="Walking the lantern corridor.",
+                created_at=start + timedelta(minutes=index),
+                journal=None,
+                journal_generated_at=None,
+            )
+            for index in range(EXPORTED_DREAMS)
+        ]
+    )
+
+    async def export(export_format: ExportFormat, compress: bool) -> tuple[int, int, bytes]:
+        """Stream one export, keeping only its size and last line."""
+
+        size = 0
+        tail = b""
+        chunks = encode_export(
+            AsyncDreamStore(store).export(), export_format=export_format, compress=compress
+        )
+        tracemalloc.start()
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                tail = chunk
+            return size, tracemalloc.get_traced_memory()[1], tail
+        finally:
+            tracemalloc.stop()
+
+    size, peak, tail = asyncio.run(export("ndjson", compress=False))
+    assert size > MAX_EXPORT_PEAK_BYTES * 4
+    assert peak < MAX_EXPORT_PEAK_BYTES
+    assert json.loads(tail.splitlines()[-1])["id"] == str(EXPORTED_DREAMS)
+
+    _, peak, _ = asyncio.run(export("csv", compress=True))
+    assert peak < MAX_EXPORT_PEAK_BYTES
@@ -0,0 +1,72 @@
+"""Tests for incremental NDJSON parsing and parallel drafting of imports."""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
+
+from app.schemas.dreams import DreamImportItem
+from app.services.dream_import import DreamDrafter, draft_imports, import_lines, ndjson_lines
+
+DRAFTED_ITEMS = 130
+
+
+async def _chunks(*parts: bytes) -> AsyncIterator[bytes]:
+    for part in parts:
+        yield part
+
+
+async def _collect(lines: AsyncIterator[object]) -> list[object]:
+    return [line async for line in lines]
+
+
+def test_ndjson_lines_join_chunks_and_skip_long_lines() -> None:
+    body = _chunks(b"ab", b"c\n\nde", b"fghijkl", b"mnop\nqr\r\n", b"0123456789\nend")
+
+    lines = asyncio.run(_collect(ndjson_lines(body, max_line_bytes=8)))
+
+    assert lines == [(1, b"abc"), (2, b""), (3, None), (4, b"qr\r"), (5, None), (6, b"end")]
+
+
+def test_import_lines_report_invalid_lines_and_skip_blank_ones() -> None:
+    valid = {"title": "Tide", "transcript": "Water rose.", "created_at": "2020-02-02T08:00:00"}
+    body = _chunks(
+        json.dumps(valid).encode() + b"\n",
+        b"\n{not json\n",
+        json.dumps({"title": "Undated", "transcript": "When?"}).encode() + b"\n",
+    )
+
+    lines = asyncio.run(_collect(import_lines(body, max_line_bytes=1024)))
+
+    assert [number for number, _ in lines] == [1, 3, 4]
+    item = lines[0][1]
+    assert isinstance(item, DreamImportItem)
+    assert item.created_at == datetime(2020, 2, 2, 8, tzinfo=UTC)
+    assert str(lines[1][1]).startswith("Invalid JSON")
+    assert lines[2][1] == "created_at: Field required"
+
+
+def test_drafter_splits_batches_across_worker_processes() -> None:
+    start = datetime(2019, 1, 1, tzinfo=UTC)
+    items = [
+        DreamImportItem(
+            title=f"Archived {index}",
+            transcript=f"Wandering the lantern market {index}. Someone called my name.",
+            tags=["market"] if index % 2 else [],
+            created_at=start + timedelta(hours=index),
+        )
+        for index in range(DRAFTED_ITEMS)
+    ]
+
+    async def draft(workers: int) -> list[object]:
+        drafter = DreamDrafter(workers=workers)
+        try:
+            return list(await drafter.draft(items))
+        finally:
+            drafter.close()
+
+    expected = draft_imports(items)
+    assert asyncio.run(draft(2)) == expected
+    assert asyncio.run(draft(0)) == expected
+    assert expected[1].created_at == start + timedelta(hours=1)
+    assert expected[1].id == ""
@@ -0,0 +1,85 @@
+"""Tests for the append-only dream log and snapshots."""
+
+from datetime import UTC, datetime
+from pathlib import Path
+
+from app.schemas.dreams import DreamCreate, DreamUpdate
+from app.services.dream_log import DreamLog
+from app.services.dream_store import DreamStore
+
+SNAPSHOT_EVERY = 4
+DREAM_COUNT = 10
+
+
+def _open(directory: Path, **options: int | bool) -> DreamStore:
+    return DreamStore(log=DreamLog(directory, commit_interval=0.001), **options)  # type: ignore[arg-type]
+
+
+def _create(store: DreamStore, index: int) -> None:
+    store.create(
+        DreamCreate(
+            title=f"Dream {index}",
+            transcript=f"Climbing staircase {index} towards a humming door.",
+            tags=["stairs"],
+            mood="curious" if index % 2 else "calm",
+        )
+    )
+
+
+def test_store_replays_every_operation_after_restart(tmp_path: Path) -> None:
+    store = _open(tmp_path, durable_writes=True)
+    for index in range(3):
+        _create(store, index)
+    store.update("1", DreamUpdate(title="Renamed", tags=["renamed"]))
+    store.set_journal("2", narrative="A humming door opened.", generated_at=datetime.now(UTC))
+    store.delete("3")
+    before = store.list()
+    store.close()
+
+    restored = _open(tmp_path)
+
+    after = restored.list()
+    assert after == before
+    assert restored.version() == store.version() == 6  # noqa: PLR2004
+    assert restored.dream_version("3") is None
+    assert restored.get("1") is not None and restored.get("1").title == "Renamed"  # type: ignore[union-attr]
+    assert restored.list(tag="renamed").total == 1
+    restored_moods = {(mood.mood, mood.count) for mood in restored.highlights().moods}
+    assert restored_moods == {(mood.mood, mood.count) for mood in store.highlights().moods}
+    _create(restored, 3)
+    assert restored.list(limit=1).dreams[0].id == "4"
+    restored.close()
+
+
+def test_snapshots_compact_the_log(tmp_path: Path) -> None:
+    store = _open(tmp_path, snapshot_every=SNAPSHOT_EVERY)
+    for index in range(DREAM_COUNT):
+        _create(store, index)
+    store.delete(str(DREAM_COUNT))
+    store.snapshot()
+    store.close()
+
+    assert (tmp_path / "snapshot.jsonl").exists()
+    assert len(list(tmp_path.glob("oplog-*.jsonl"))) == 1
+
+    restored = _open(tmp_path)
+    assert restored.list().total == DREAM_COUNT - 1
+    assert restored.version() == DREAM_COUNT + 1
+    _create(restored, DREAM_COUNT)
+    assert restored.get(str(DREAM_COUNT + 1)) is not None
+    restored.close()
+
+
+def test_torn_final_line_is_ignored(tmp_path: Path) -> None:
+    store = _open(tmp_path)
+    _create(store, 0)
+    _create(store, 1)
+    store.close()
+    segment = next(tmp_path.glob("oplog-*.jsonl"))
+    with segment.open("ab") as handle:
+        handle.write(b'{"op":"create","dream":{"id":"3"')
+
+    restored = _open(tmp_path)
+
+    assert [dream.id for dream in restored.list().dreams] == ["2", "1"]
+    restored.close()
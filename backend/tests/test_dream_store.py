@@ -0,0 +1,448 @@
+"""Unit tests for the in-memory dream store and its indexes."""
+
+import itertools
+import random
+from collections import Counter
+from datetime import UTC, date, datetime, time, timedelta
+
+from app.schemas.dreams import DreamCreate, DreamImportItem, DreamUpdate
+from app.services.dream_indexes import MotifGraph, PeriodRollups, RankedCounter, trend_spans
+from app.services.dream_repository import draft_import
+from app.services.dream_store import DreamStore
+
+PAGE_SIZE = 3
+DREAM_COUNT = 10
+EXPECTED_PAIR = 2
+
+
+def _populate(store: DreamStore, count: int) -> None:
+    for index in range(count):
+        store.create(
+            DreamCreate(
+                title=f"Dream {index}",
+                transcript=f"Walking through corridor number {index} with lanterns.",
+                tags=["even" if index % 2 == 0 else "odd"],
+                mood="calm",
+            )
+        )
+
+
+def test_list_returns_newest_first_with_full_total() -> None:
+    store = DreamStore()
+    _populate(store, DREAM_COUNT)
+
+    page = store.list(limit=PAGE_SIZE)
+
+    assert page.total == DREAM_COUNT
+    assert [dream.id for dream in page.dreams] == ["10", "9", "8"]
+
+
+def test_list_time_window_uses_inclusive_bounds() -> None:
+    store = DreamStore()
+    _populate(store, DREAM_COUNT)
+    everything = store.list().dreams
+    newest, oldest = everything[0], everything[-1]
+
+    window = store.list(
+        start=oldest.created_at + timedelta(seconds=1),
+        end=newest.created_at - timedelta(seconds=1),
+    )
+    assert window.total == DREAM_COUNT - 2
+    assert oldest.id not in {dream.id for dream in window.dreams}
+
+    exact = store.list(start=newest.created_at, end=newest.created_at)
+    assert [dream.id for dream in exact.dreams] == [newest.id]
+
+
+def test_filtered_list_counts_matches_beyond_limit() -> None:
+    store = DreamStore()
+    _populate(store, DREAM_COUNT)
+
+    page = store.list(tag="odd", limit=2)
+
+    assert page.total == DREAM_COUNT // 2
+    assert [dream.id for dream in page.dreams] == ["10", "8"]
+
+    ninth = store.get("9")
+    assert ninth is not None
+    narrow = store.list(tag="odd", start=ninth.created_at)
+    assert [dream.id for dream in narrow.dreams] == ["10"]
+    assert narrow.total == 1
+
+
+def test_cursor_pages_walk_every_match_once() -> None:
+    store = DreamStore()
+    _populate(store, DREAM_COUNT)
+    store.create(DreamCreate(title="Odd one", transcript="Lanterns again.", tags=["odd"]))
+
+    for filters in (
+        {},
+        {"tag": "odd"},
+        {"query": "lantern"},
+        {"query": "ridor nu", "search": "substring"},
+    ):
+        expected = [dream.id for dream in store.list(**filters).dreams]  # type: ignore[arg-type]
+        seen: list[str] = []
+        after = None
+        while True:
+            page = store.list(
+                limit=PAGE_SIZE, after=after, count_total=False, **filters  # type: ignore[arg-type]
+            )
+            assert page.total is None
+            seen.extend(dream.id for dream in page.dreams)
+            if not page.has_more:
+                break
+            after = (page.dreams[-1].created_at, page.dreams[-1].id)
+        assert seen == expected, filters
+
+    last = store.list(tag="odd").dreams[-1]
+    assert store.list(tag="odd", after=(last.created_at, last.id)).total == DREAM_COUNT // 2 + 1
+
+
+def test_delete_removes_dream_from_timeline() -> None:
+    store = DreamStore()
+    _populate(store, DREAM_COUNT)
+
+    assert store.delete("10")
+    assert not store.delete("10")
+
+    page = store.list(limit=1)
+    assert page.total == DREAM_COUNT - 1
+    assert page.dreams[0].id == "9"
+
+
+def test_import_keeps_timestamps_and_later_creates_stay_newest() -> None:
+    store = DreamStore(check_consistency=True)
+    store.create(DreamCreate(title="Today", transcript="A lighthouse at dusk."))
+    recorded = datetime(2021, 3, 4, 5, 6, tzinfo=UTC)
+    ahead = datetime.now(UTC) + timedelta(hours=1)
+
+    imported = store.import_dreams(
+        [
+            draft_import(
+                DreamImportItem(title=title, transcript=transcript, tags=tags, created_at=when)
+            )
+            for title, transcript, tags, when in (
+                ("Old", "Swimming under the pier.", ["sea"], recorded),
+                ("Ahead", "A clock running fast.", [], ahead),
+            )
+        ]
+    )
+
+    assert [(dream.id, dream.created_at) for dream in imported] == [("2", recorded), ("3", ahead)]
+    assert [dream.id for dream in store.list().dreams] == ["3", "1", "2"]
+    assert store.list(tag="sea").total == 1
+    assert store.create(DreamCreate(title="Next", transcript="Awake.")).created_at > ahead
+    assert store.highlights().total_count == len(imported) + 2
+    march = store.trends(
+        granularity="month", start=date(2021, 3, 1), end=date(2021, 3, 31), motifs=5
+    )
+    assert march.dream_count == 1
+    assert [tag.tag for tag in march.top_tags] == ["pier", "sea", "swimming"]
+
+
+def test_export_yields_oldest_first_from_snapshot_at_call() -> None:
+    store = DreamStore()
+    _populate(store, DREAM_COUNT)
+
+    exported = store.export()
+    store.delete("1")
+    store.create(DreamCreate(title="Late", transcript="Written after the export began."))
+
+    assert [dream.id for dream in exported] == [str(index) for index in range(1, 11)]
+    assert [dream.id for dream in store.export()][-1] == str(DREAM_COUNT + 1)
+
+
+def test_tag_and_mood_indexes_follow_updates() -> None:
+    store = DreamStore()
+    store.create(
+        DreamCreate(title="Harbour", transcript="Boats rocking.", tags=["sea"], mood="calm")
+    )
+    store.create(
+        DreamCreate(title="Cliff", transcript="Wind howling.", tags=["sea", "wind"], mood="tense")
+    )
+
+    assert [dream.id for dream in store.list(tag="sea", mood="calm").dreams] == ["1"]
+
+    store.update("1", DreamUpdate(tags=["harbour"], mood="tense"))
+
+    assert [dream.id for dream in store.list(tag="sea").dreams] == ["2"]
+    assert store.list(mood="calm").total == 0
+    assert store.list(mood="tense").total == EXPECTED_PAIR
+
+    store.delete("2")
+    assert store.list(tag="wind").total == 0
+    assert store.list(mood="tense").total == 1
+
+
+def test_multi_tag_filters_support_all_and_any() -> None:
+    store = DreamStore()
+    for title, tags in (("a", ["sea", "wind"]), ("b", ["sea"]), ("c", ["forest"])):
+        store.create(DreamCreate(title=title, transcript="Quiet.", tags=tags))
+
+    every = store.list(tags=["sea", "wind"])
+    assert [dream.title for dream in every.dreams] == ["a"]
+
+    either = store.list(tags=["wind", "forest"], tag_match="any")
+    assert [dream.title for dream in either.dreams] == ["c", "a"]
+
+    combined = store.list(tag="sea", tags=["wind", "forest"], tag_match="any")
+    assert combined.total == 1
+
+
+def test_query_matches_tokens_with_prefix_on_last_term() -> None:
+    store = DreamStore()
+    store.create(DreamCreate(title="Reef", transcript="Dolphins circled the glowing reef."))
+    store.create(DreamCreate(title="Attic", transcript="Dusty boxes and a glowing lamp."))
+
+    assert [dream.title for dream in store.list(query="glowing dolph").dreams] == ["Reef"]
+    assert store.list(query="glow").total == EXPECTED_PAIR
+    assert store.list(query="olph").total == 0
+    assert store.list(query="olph", search="substring").total == 1
+
+
+def test_ranked_search_orders_by_relevance() -> None:
+    store = DreamStore()
+    store.create(DreamCreate(title="Lantern", transcript="One lantern in a long dark hallway."))
+    store.create(DreamCreate(title="Attic", transcript="Boxes, dust and cobwebs everywhere."))
+    store.create(DreamCreate(title="Festival", transcript="Lanterns, lanterns, lantern light."))
+
+    recent = store.list(query="lantern")
+    assert [dream.title for dream in recent.dreams] == ["Festival", "Lantern"]
+
+    ranked = store.list(query="lantern", search="ranked", limit=1)
+    assert ranked.total == EXPECTED_PAIR
+    assert [dream.title for dream in ranked.dreams] == ["Festival"]
+
+
+def test_query_index_follows_journal_and_transcript_changes() -> None:
+    store = DreamStore()
+    created = store.create(DreamCreate(title="Bridge", transcript="Crossing a rope bridge."))
+
+    store.set_journal(
+        created.id, narrative="Fog swallowed the valley.", generated_at=created.created_at
+    )
+    assert store.list(query="valley").total == 1
+
+    store.update(created.id, DreamUpdate(transcript="Climbing a granite stair."))
+    assert store.list(query="valley").total == 0
+    assert store.list(query="rope").total == 0
+    assert store.list(query="granite").total == 1
+
+
+def test_japanese_text_is_tokenized_for_search_and_tags() -> None:
+    store = DreamStore(check_consistency=True)
+    store.create(DreamCreate(title="空の夢", transcript="大きな鳥と一緒に空を飛んだ。"))
+    store.create(
+        DreamCreate(title="海の夢", transcript="大きな波が海岸に打ち寄せた。海岸は静かだった。")
+    )
+
+    assert [dream.title for dream in store.list(query="空を飛").dreams] == ["空の夢"]
+    assert [dream.title for dream in store.list(query="大き").dreams] == ["海の夢", "空の夢"]
+    assert [dream.title for dream in store.list(query="海岸", search="ranked").dreams] == [
+        "海の夢"
+    ]
+    assert store.list(query="山").total == 0
+    assert store.get("2").tags == ["海岸"]  # type: ignore[union-attr]
+    assert [tag.tag for tag in store.highlights().top_tags] == ["海岸"]
+
+
+def test_ranked_counter_tracks_increments_and_decrements() -> None:
+    counter = RankedCounter()
+    for key in ["moon", "moon", "sea", "moon", "sea", "owl"]:
+        counter.increment(key)
+
+    assert counter.most_common(2) == [("moon", 3), ("sea", 2)]
+
+    counter.decrement("moon")
+    counter.decrement("moon")
+    counter.decrement("owl")
+
+    assert counter.most_common() == [("sea", 2), ("moon", 1)]
+    assert counter["owl"] == 0
+    assert len(counter) == EXPECTED_PAIR
+
+
+def test_highlights_stay_consistent_with_full_recount() -> None:
+    store = DreamStore(check_consistency=True)
+    generator = random.Random(7)
+    motifs = ["moon", "river", "stairs", "mirror", "train", "garden"]
+    moods = [None, "calm", "anxious", "joyful"]
+
+    for step in range(200):
+        existing = [dream.id for dream in store.list().dreams]
+        action = generator.choices(["create", "update", "delete"], weights=[5, 3, 2])[0]
+        if action == "create" or not existing:
+            store.create(
+                DreamCreate(
+                    title=f"Dream {step}",
+                    transcript=" ".join(generator.sample(motifs, 3)),
+                    tags=generator.sample(motifs, generator.randint(0, 3)),
+                    mood=generator.choice(moods),
+                )
+            )
+        elif action == "update":
+            store.update(
+                generator.choice(existing),
+                DreamUpdate(
+                    tags=generator.sample(motifs, generator.randint(0, 3)),
+                    mood=generator.choice(moods[1:]),
+                ),
+            )
+        else:
+            store.delete(generator.choice(existing))
+        store.highlights()
+
+
+def test_motif_graph_counts_pairs_overall_and_per_day() -> None:
+    graph = MotifGraph()
+    monday, tuesday = date(2026, 3, 2), date(2026, 3, 3)
+
+    def at(day: date, hour: int) -> datetime:
+        return datetime.combine(day, time(hour), UTC)
+
+    graph.add("1", at(monday, 1), monday, ["moon", "river", "owl"])
+    graph.add("2", at(monday, 2), monday, ["river", "moon"])
+    graph.add("3", at(tuesday, 1), tuesday, ["owl", "moon"])
+
+    everything = ["moon", "river", "owl"]
+    assert graph.pair_counts(everything, None, None) == {
+        ("moon", "river"): 2,
+        ("moon", "owl"): 2,
+        ("owl", "river"): 1,
+    }
+    assert graph.pair_counts(everything, tuesday, None) == {("moon", "owl"): 1}
+    assert graph.window_counts(2, None, monday) == [("moon", 2), ("river", 2)]
+    assert graph.newest("moon", 2, None, None) == ["3", "2"]
+    assert graph.newest("moon", 5, at(monday, 0), at(monday, 23)) == ["2", "1"]
+
+    graph.remove("1", at(monday, 1), monday, ["moon", "river", "owl"])
+    assert graph.pair_counts(everything, None, None) == {("moon", "river"): 1, ("moon", "owl"): 1}
+    assert graph.window_counts(5, monday, monday) == [("moon", 1), ("river", 1)]
+    assert graph.newest("owl", 5, None, None) == ["3"]
+
+
+def test_graph_matches_full_recount() -> None:
+    store = DreamStore()
+    generator = random.Random(3)
+    motifs = ["moon", "river", "stairs", "mirror", "train", "garden"]
+    for step in range(150):
+        existing = [dream.id for dream in store.list().dreams]
+        action = generator.choices(["create", "update", "delete"], weights=[5, 3, 2])[0]
+        if action == "create" or not existing:
+            store.create(
+                DreamCreate(
+                    title=f"Dream {step}",
+                    transcript="It was odd.",
+                    tags=generator.sample(motifs, generator.randint(0, 4)),
+                )
+            )
+        elif action == "update":
+            store.update(
+                generator.choice(existing),
+                DreamUpdate(tags=generator.sample(motifs, generator.randint(0, 4))),
+            )
+        else:
+            store.delete(generator.choice(existing))
+
+    dreams = store.list().dreams
+    counts = Counter(tag for dream in dreams for tag in set(dream.tags))
+    pairs = Counter(
+        pair for dream in dreams for pair in itertools.combinations(sorted(set(dream.tags)), 2)
+    )
+    graph = store.graph(motifs=len(motifs), edges=100, dreams_per_motif=2)
+
+    assert {node.label: node.weight for node in graph.nodes if node.kind == "motif"} == counts
+    co_occurring = {
+        (edge.source.removeprefix("motif:"), edge.target.removeprefix("motif:")): edge.weight
+        for edge in graph.edges
+        if edge.kind == "co_occurs"
+    }
+    assert co_occurring == pairs
+    newest = {dream.id for tag in counts for dream in store.list(tag=tag, limit=2).dreams}
+    assert {node.id for node in graph.nodes if node.kind == "dream"} == {
+        f"dream:{dream_id}" for dream_id in newest
+    }
+    tomorrow = datetime.now(UTC).date() + timedelta(days=1)
+    assert store.graph(motifs=5, edges=5, dreams_per_motif=1, start=tomorrow).nodes == []
+
+
+def test_period_rollups_keep_weeks_and_months_and_merge_edge_days() -> None:
+    rollups = PeriodRollups()
+    sunday, monday, march = date(2026, 3, 1), date(2026, 3, 2), date(2026, 3, 31)
+    rollups.add(sunday, ["moon", "owl"], "calm")
+    rollups.add(monday, ["moon"], None)
+    rollups.add(march, ["river"], "calm")
+
+    spans = trend_spans(date(2026, 2, 25), march, "week")
+    assert [(span.first, span.last, span.full) for span in spans] == [
+        (date(2026, 2, 25), sunday, False),
+        (monday, date(2026, 3, 8), True),
+        (date(2026, 3, 9), date(2026, 3, 15), True),
+        (date(2026, 3, 16), date(2026, 3, 22), True),
+        (date(2026, 3, 23), date(2026, 3, 29), True),
+        (date(2026, 3, 30), march, False),
+    ]
+    weeks = rollups.read("week", spans, ["moon"])
+    assert [week.dreams for week in weeks] == [1, 1, 0, 0, 0, 1]
+    assert [dict(week.tags) for week in weeks] == [{"moon": 1}, {"moon": 1}, {}, {}, {}, {}]
+    assert dict(weeks[0].moods) == {"calm": 1}
+
+    window = rollups.window(monday, march)
+    assert (window.dreams, dict(window.tags), dict(window.moods)) == (
+        2,
+        {"moon": 1, "river": 1},
+        {"calm": 1},
+    )
+
+    rollups.remove(sunday, ["moon", "owl"], "calm")
+    assert rollups.read("week", spans[:1])[0].dreams == 0
+    (month,) = rollups.read("month", trend_spans(sunday, march, "month"))
+    assert (month.dreams, dict(month.tags), dict(month.moods)) == (
+        2,
+        {"moon": 1, "river": 1},
+        {"calm": 1},
+    )
+
+
+def test_trends_match_full_recount() -> None:
+    store = DreamStore()
+    generator = random.Random(5)
+    motifs = ["moon", "river", "stairs", "mirror"]
+    moods = ["calm", "uneasy", None]
+    for step in range(120):
+        existing = [dream.id for dream in store.list().dreams]
+        action = generator.choices(["create", "update", "delete"], weights=[5, 3, 2])[0]
+        if action == "create" or not existing:
+            store.create(
+                DreamCreate(
+                    title=f"Dream {step}",
+                    transcript="It was odd.",
+                    tags=generator.sample(motifs, generator.randint(0, 3)),
+                    mood=generator.choice(moods),
+                )
+            )
+        elif action == "update":
+            store.update(
+                generator.choice(existing),
+                DreamUpdate(
+                    tags=generator.sample(motifs, generator.randint(0, 3)),
+                    mood=generator.choice(moods),
+                ),
+            )
+        else:
+            store.delete(generator.choice(existing))
+
+    dreams = store.list().dreams
+    today = datetime.now(UTC).date()
+    for granularity in ("day", "week", "month"):
+        trends = store.trends(
+            granularity=granularity, start=today - timedelta(days=40), end=today, motifs=2
+        )
+        last = trends.buckets[-1]
+        assert trends.dream_count == last.dream_count == len(dreams)
+        assert last.moods == Counter(dream.mood for dream in dreams if dream.mood)
+        tags = Counter(tag for dream in dreams for tag in set(dream.tags))
+        expected = sorted(tags.items(), key=lambda item: (-item[1], item[0]))[:2]
+        assert list(last.tags.items()) == expected
+        assert all(bucket.dream_count == 0 for bucket in trends.buckets[:-1])
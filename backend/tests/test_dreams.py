@@ -1,20 +1,35 @@
 """Tests for the dream management API."""
+import asyncio
 import base64
-from collections.abc import Iterable
-from datetime import datetime, timedelta
+import csv
+import gzip
+import io
+import json
+import time
+import wave
+from collections.abc import AsyncIterator, Iterable, Iterator
+from datetime import UTC, datetime, timedelta
 from http import HTTPStatus
-from typing import TypeAlias
+from types import SimpleNamespace
+from typing import Any, TypeAlias, cast
 
+import httpx
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from openai import APIConnectionError, AsyncOpenAI
 
+from app.config import Settings
 from app.main import create_app
-from app.services.narrative import NarrativeResult
+from app.services.narrative import NarrativeEngine, NarrativeResult
 from app.services.transcription import TranscriptionResult
 
 Payload: TypeAlias = dict[str, object | None]
 
 EXPECTED_TRANSCRIPTION_CONFIDENCE = 0.75
 EXPECTED_MULTI_DREAM_TOTAL = 2
+CONCURRENT_JOURNAL_REQUESTS = 4
+BATCH_CONCURRENCY = 2
+BATCH_SIZE = 6
 
 
 class _StubNarrativeEngine:
@@ -349,3 +364,707 @@ def test_transcribe_audio_endpoint() -> None:
     assert body["transcript"] == sample
     assert body["engine"] == "stub"
     assert body["confidence"] == EXPECTED_TRANSCRIPTION_CONFIDENCE
+
+
+def test_transcribe_upload_accepts_raw_body() -> None:
+    client = _create_client()
+
+    response = client.post(
+        "/dreams/transcribe/upload",
+        params={"prompt": "dream diary"},
+        content=b"Falling through clouds",
+        headers={"Content-Type": "audio/m4a"},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["transcript"] == "Falling through clouds"
+    engine = cast(_StubTranscriptionEngine, cast(FastAPI, client.app).state.transcription_engine)
+    assert engine.calls[-1]["prompt"] == "dream diary"
+
+
+def test_transcribe_upload_accepts_multipart_file() -> None:
+    app = create_app(Settings(transcription_spool_bytes=4))
+    app.state.transcription_engine = _StubTranscriptionEngine()
+    client = TestClient(app)
+
+    response = client.post(
+        "/dreams/transcribe/upload",
+        files={"file": ("dream.m4a", b"Swimming with whales", "audio/m4a")},
+        data={"prompt": "ocean"},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["transcript"] == "Swimming with whales"
+    assert app.state.transcription_engine.calls[-1]["prompt"] == "ocean"
+
+    missing = client.post(
+        "/dreams/transcribe/upload", files={"audio": ("dream.m4a", b"whales", "audio/m4a")}
+    )
+    assert missing.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_transcribe_upload_can_segment_long_audio() -> None:
+    app = create_app(Settings(transcription_segment_bytes=32, transcription_overlap_bytes=20))
+    client = TestClient(app)
+    spoken = "A tram made of seashells carried me past a lighthouse that hummed softly"
+
+    handle = io.BytesIO()
+    with wave.open(handle, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(1)
+        writer.setframerate(8000)
+        writer.writeframes(spoken.encode())
+
+    response = client.post(
+        "/dreams/transcribe/upload",
+        params={"segmented": "true"},
+        content=handle.getvalue(),
+        headers={"content-type": "audio/wav"},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["transcript"] == spoken
+
+
+def test_live_transcription_session_round_trip() -> None:
+    app = create_app(Settings(transcription_segment_bytes=32, transcription_overlap_bytes=20))
+    spoken = "Marching bands of foxes crossed a frozen lake under three small moons tonight."
+
+    with TestClient(app) as client:
+        rejected = client.post("/dreams/transcribe/sessions", json={"content_type": "audio/L16"})
+        assert rejected.status_code == HTTPStatus.BAD_REQUEST
+
+        opened = client.post(
+            "/dreams/transcribe/sessions",
+            json={"prompt": None, "content_type": "audio/L16;rate=8000;channels=1"},
+        )
+        assert opened.status_code == HTTPStatus.CREATED
+        session_id = opened.json()["id"]
+
+        # Offline transcription reads samples as text; swap pairs to undo the
+        # big-endian to little-endian conversion of audio/L16.
+        text = spoken.encode()
+        swapped = bytearray(text)
+        swapped[0::2], swapped[1::2] = text[1::2], text[0::2]
+        audio = bytes(swapped)
+        for offset in range(0, len(audio), 10):
+            appended = client.post(
+                f"/dreams/transcribe/sessions/{session_id}/chunks",
+                content=audio[offset : offset + 10],
+            )
+            assert appended.status_code == HTTPStatus.OK
+
+        status_payload = client.get(f"/dreams/transcribe/sessions/{session_id}").json()
+        assert status_payload["received_bytes"] == len(audio)
+        assert status_payload["segments_scheduled"] > 1
+
+        finalized = client.post(f"/dreams/transcribe/sessions/{session_id}/finalize")
+        assert finalized.status_code == HTTPStatus.OK
+        assert finalized.json()["transcript"] == spoken
+        assert finalized.json()["engine"] == "offline"
+
+        missing = client.get(f"/dreams/transcribe/sessions/{session_id}")
+        assert missing.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_transcribe_upload_enforces_size_limit_while_streaming() -> None:
+    app = create_app(Settings(transcription_max_upload_bytes=16))
+    app.state.transcription_engine = _StubTranscriptionEngine()
+    client = TestClient(app)
+
+    def chunks() -> Iterator[bytes]:
+        for _ in range(4):
+            yield b"0123456789"
+
+    streamed = client.post("/dreams/transcribe/upload", content=chunks())
+    declared = client.post("/dreams/transcribe/upload", content=b"x" * 17)
+
+    assert streamed.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    assert declared.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    assert app.state.transcription_engine.calls == []
+
+
+def test_filtering_by_multiple_tags() -> None:
+    client = _create_client()
+
+    for title, tags in (
+        ("Storm shore", ["ocean", "storm"]),
+        ("Calm shore", ["ocean"]),
+        ("Pine maze", ["forest"]),
+    ):
+        response = client.post(
+            "/dreams/",
+            json={"title": title, "transcript": "A quiet scene.", "tags": tags},
+        )
+        assert response.status_code == HTTPStatus.CREATED
+
+    every = client.get("/dreams/", params={"tags": "ocean,storm"})
+    assert every.status_code == HTTPStatus.OK
+    assert [dream["title"] for dream in every.json()["dreams"]] == ["Storm shore"]
+
+    either = client.get("/dreams/", params={"tags": "storm, forest", "tag_match": "any"})
+    assert either.status_code == HTTPStatus.OK
+    either_body = either.json()
+    assert either_body["total"] == EXPECTED_MULTI_DREAM_TOTAL
+    assert [dream["title"] for dream in either_body["dreams"]] == ["Pine maze", "Storm shore"]
+
+
+def test_list_pages_with_cursor() -> None:
+    client = _create_client()
+    for index in range(5):
+        response = client.post(
+            "/dreams/",
+            json={"title": f"Step {index}", "transcript": "Walking down a spiral stair."},
+        )
+        assert response.status_code == HTTPStatus.CREATED
+
+    first = client.get("/dreams/", params={"limit": 2}).json()
+    assert first["total"] == 5  # noqa: PLR2004
+    assert [dream["title"] for dream in first["dreams"]] == ["Step 4", "Step 3"]
+
+    titles: list[str] = []
+    cursor = first["next_cursor"]
+    while cursor is not None:
+        page = client.get(
+            "/dreams/", params={"limit": 2, "cursor": cursor, "include_total": "false"}
+        ).json()
+        assert page["total"] is None
+        titles.extend(dream["title"] for dream in page["dreams"])
+        cursor = page["next_cursor"]
+    assert titles == ["Step 2", "Step 1", "Step 0"]
+
+    invalid = client.get("/dreams/", params={"cursor": "not-a-cursor"})
+    assert invalid.status_code == HTTPStatus.BAD_REQUEST
+    ranked = client.get(
+        "/dreams/", params={"cursor": first["next_cursor"], "query": "stair", "search": "ranked"}
+    )
+    assert ranked.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_conditional_gets_return_not_modified_until_data_changes() -> None:
+    client = _create_client()
+    first = client.post("/dreams/", json={"title": "Lake", "transcript": "Swimming at night."})
+    second = client.post("/dreams/", json={"title": "Bells", "transcript": "Bells ringing."})
+    first_path = f"/dreams/{first.json()['id']}"
+
+    tags: dict[str, str] = {}
+    for path in ("/dreams/?limit=5", "/dreams/highlights", first_path):
+        response = client.get(path)
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers["Cache-Control"] == "no-cache"
+        tags[path] = response.headers["ETag"]
+        unchanged = client.get(path, headers={"If-None-Match": f'"other", W/{tags[path]}'})
+        assert unchanged.status_code == HTTPStatus.NOT_MODIFIED
+        assert unchanged.content == b""
+        assert unchanged.headers["ETag"] == tags[path]
+
+    list_tag = tags["/dreams/?limit=5"]
+    other_filters = client.get("/dreams/?limit=4", headers={"If-None-Match": list_tag})
+    assert other_filters.status_code == HTTPStatus.OK
+
+    client.put(f"/dreams/{second.json()['id']}", json={"mood": "calm"})
+    for path, expected in (
+        ("/dreams/?limit=5", HTTPStatus.OK),
+        ("/dreams/highlights", HTTPStatus.OK),
+        (first_path, HTTPStatus.NOT_MODIFIED),
+    ):
+        assert client.get(path, headers={"If-None-Match": tags[path]}).status_code == expected
+
+    client.delete(first_path)
+    gone = client.get(first_path, headers={"If-None-Match": tags[first_path]})
+    assert gone.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_etags_from_a_previous_store_do_not_match_a_fresh_one() -> None:
+    before = _create_client()
+    after = _create_client()
+    for client, transcript in ((before, "Swimming at night."), (after, "Bells ringing.")):
+        client.post("/dreams/", json={"title": "Lake", "transcript": transcript})
+
+    # Both stores are at the same version with different data after a restart.
+    for path in ("/dreams/", "/dreams/highlights", "/dreams/1"):
+        stale = before.get(path).headers["ETag"]
+        assert after.get(path, headers={"If-None-Match": stale}).status_code == HTTPStatus.OK
+
+
+def test_graph_links_motifs_and_follows_writes() -> None:
+    client = _create_client()
+    ids = [
+        client.post(
+            "/dreams/", json={"title": title, "transcript": "It was odd.", "tags": tags}
+        ).json()["id"]
+        for title, tags in (
+            ("Owl", ["moon", "owl"]),
+            ("Owl again", ["moon", "owl"]),
+            ("River", ["moon", "river"]),
+        )
+    ]
+
+    params = {"motifs": 2, "dreams_per_motif": 1}
+    response = client.get("/dreams/graph", params=params)
+    assert response.status_code == HTTPStatus.OK
+    graph = response.json()
+    assert [(node["id"], node["weight"]) for node in graph["nodes"]] == [
+        ("motif:moon", 3),
+        ("motif:owl", 2),
+        (f"dream:{ids[2]}", 2),
+        (f"dream:{ids[1]}", 2),
+    ]
+    assert {(edge["source"], edge["target"], edge["kind"]) for edge in graph["edges"]} == {
+        ("motif:moon", "motif:owl", "co_occurs"),
+        (f"dream:{ids[2]}", "motif:moon", "features"),
+        (f"dream:{ids[1]}", "motif:moon", "features"),
+        (f"dream:{ids[1]}", "motif:owl", "features"),
+        (f"dream:{ids[1]}", f"dream:{ids[2]}", "related"),
+    }
+    etag = response.headers["ETag"]
+    unchanged = client.get("/dreams/graph", params=params, headers={"If-None-Match": etag})
+    assert unchanged.status_code == HTTPStatus.NOT_MODIFIED
+
+    client.put(f"/dreams/{ids[0]}", json={"tags": ["river"]})
+    client.delete(f"/dreams/{ids[1]}")
+    graph = client.get("/dreams/graph", params={"motifs": 3, "dreams_per_motif": 0}).json()
+    assert [(node["label"], node["weight"]) for node in graph["nodes"]] == [
+        ("river", 2),
+        ("moon", 1),
+    ]
+    assert [edge["weight"] for edge in graph["edges"]] == [1]
+
+    tomorrow = (datetime.now(UTC) + timedelta(days=1)).date().isoformat()
+    assert client.get("/dreams/graph", params={"start": tomorrow}).json()["nodes"] == []
+    assert client.get("/dreams/graph", params={"motifs": 0}).status_code == (
+        HTTPStatus.UNPROCESSABLE_ENTITY
+    )
+
+
+def test_trends_bucket_counts_and_follow_writes() -> None:
+    client = _create_client()
+    ids = [
+        client.post(
+            "/dreams/",
+            json={"title": title, "transcript": "It was odd.", "tags": tags, "mood": mood},
+        ).json()["id"]
+        for title, tags, mood in (
+            ("Owl", ["moon", "owl"], "calm"),
+            ("Owl again", ["moon", "owl"], "uneasy"),
+            ("River", ["river"], "calm"),
+        )
+    ]
+
+    today = datetime.now(UTC).date()
+    params = {"granularity": "month", "motifs": 2}
+    response = client.get("/dreams/trends", params=params)
+    assert response.status_code == HTTPStatus.OK
+    trends = response.json()
+    assert (trends["start"], trends["end"]) == (
+        (today - timedelta(days=364)).isoformat(),
+        today.isoformat(),
+    )
+    assert len(trends["buckets"]) in {12, 13}
+    assert trends["dream_count"] == len(ids)
+    assert trends["top_tags"] == [{"tag": "moon", "count": 2}, {"tag": "owl", "count": 2}]
+    assert trends["moods"] == [{"mood": "calm", "count": 2}, {"mood": "uneasy", "count": 1}]
+    latest = trends["buckets"][-1]
+    assert latest["dream_count"] == len(ids)
+    assert latest["moods"] == {"calm": 2, "uneasy": 1}
+    assert trends["buckets"][0]["tags"] == {"moon": 0, "owl": 0}
+    etag = response.headers["ETag"]
+    unchanged = client.get("/dreams/trends", params=params, headers={"If-None-Match": etag})
+    assert unchanged.status_code == HTTPStatus.NOT_MODIFIED
+
+    client.put(f"/dreams/{ids[0]}", json={"tags": ["river"], "mood": "uneasy"})
+    client.delete(f"/dreams/{ids[1]}")
+    day = today.isoformat()
+    trends = client.get(
+        "/dreams/trends", params={"granularity": "day", "start": day, "end": day}
+    ).json()
+    assert [bucket["start"] for bucket in trends["buckets"]] == [day]
+    assert trends["top_tags"] == [{"tag": "river", "count": 2}]
+    assert trends["moods"] == [{"mood": "calm", "count": 1}, {"mood": "uneasy", "count": 1}]
+
+    tomorrow = (today + timedelta(days=1)).isoformat()
+    assert client.get(
+        "/dreams/trends", params={"start": tomorrow, "end": day}
+    ).status_code == HTTPStatus.BAD_REQUEST
+    assert client.get(
+        "/dreams/trends", params={"granularity": "day", "start": "2000-01-01"}
+    ).status_code == HTTPStatus.BAD_REQUEST
+
+
+class _AsyncOnlyNarrativeEngine(_StubNarrativeEngine):
+    def journal(
+        self,
+        *,
+        title: str,
+        transcript: str,
+        mood: str | None,
+        focus_points: Iterable[str],
+        tone: str | None,
+    ) -> NarrativeResult:
+        raise AssertionError("The blocking journal variant must not be used")
+
+    async def ajournal(
+        self,
+        *,
+        title: str,
+        transcript: str,
+        mood: str | None,
+        focus_points: Iterable[str],
+        tone: str | None,
+    ) -> NarrativeResult:
+        return super().journal(
+            title=title, transcript=transcript, mood=mood, focus_points=focus_points, tone=tone
+        )
+
+
+def test_generate_journal_awaits_async_engine() -> None:
+    client = _create_client()
+    engine = _AsyncOnlyNarrativeEngine()
+    cast(FastAPI, client.app).state.narrative_engine = engine
+
+    client.post(
+        "/dreams/",
+        json={"title": "Night train", "transcript": "Carriages full of owls.", "tags": []},
+    )
+    response = client.post("/dreams/1/journal", json={"focus_points": [], "tone": None})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["engine"] == "stub"
+    assert len(engine.calls) == 1
+
+
+class _SlowNarrativeEngine(_StubNarrativeEngine):
+    async def ajournal(
+        self,
+        *,
+        title: str,
+        transcript: str,
+        mood: str | None,
+        focus_points: Iterable[str],
+        tone: str | None,
+    ) -> NarrativeResult:
+        await asyncio.sleep(0.05)
+        return self.journal(
+            title=title, transcript=transcript, mood=mood, focus_points=focus_points, tone=tone
+        )
+
+
+def test_concurrent_identical_journal_requests_share_one_generation() -> None:
+    app = create_app()
+    engine = _SlowNarrativeEngine()
+    app.state.narrative_engine = engine
+
+    async def scenario() -> list[httpx.Response]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post(
+                "/dreams/",
+                json={"title": "Bell tower", "transcript": "Ringing bells at dawn.", "tags": []},
+            )
+            body = {"focus_points": ["bells"], "tone": "quiet"}
+            requests = [
+                client.post("/dreams/1/journal", json=body)
+                for _ in range(CONCURRENT_JOURNAL_REQUESTS)
+            ]
+            requests.append(client.post("/dreams/1/journal", json={**body, "tone": "loud"}))
+            return list(await asyncio.gather(*requests))
+
+    responses = asyncio.run(scenario())
+
+    assert all(response.status_code == HTTPStatus.OK for response in responses)
+    shared = [response.json() for response in responses[:CONCURRENT_JOURNAL_REQUESTS]]
+    assert all(payload == shared[0] for payload in shared)
+    assert [call["tone"] for call in engine.calls] == ["quiet", "loud"]
+
+
+def _parse_events(body: str) -> list[tuple[str, dict[str, object]]]:
+    events: list[tuple[str, dict[str, object]]] = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_stream_journal_emits_chunks_and_persists() -> None:
+    client = _create_client()
+    cast(FastAPI, client.app).state.narrative_engine = NarrativeEngine(api_key=None)
+
+    client.post(
+        "/dreams/",
+        json={"title": "Glass lake", "transcript": "Skating across a glass lake.", "tags": []},
+    )
+    response = client.post(
+        "/dreams/1/journal/stream", json={"focus_points": ["ice"], "tone": "serene"}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_events(response.text)
+    chunks = [str(data["text"]) for name, data in events if name == "chunk"]
+    assert len(chunks) > 1
+    name, done = events[-1]
+    assert name == "done"
+    assert done["engine"] == "offline"
+    assert done["narrative"] == "".join(chunks).strip()
+
+    stored = client.get("/dreams/1").json()
+    assert stored["journal"] == done["narrative"]
+
+    metrics = client.get("/metrics").json()
+    assert metrics["summaries"]["journal_stream_ttfb_ms"]["count"] == 1
+
+
+def test_stream_journal_wraps_non_streaming_engines() -> None:
+    client = _create_client()
+
+    client.post(
+        "/dreams/",
+        json={"title": "Harbour", "transcript": "Boats knocking together.", "tags": []},
+    )
+    response = client.post("/dreams/1/journal/stream", json={"focus_points": []})
+
+    events = _parse_events(response.text)
+    assert [name for name, _ in events] == ["chunk", "done"]
+    assert events[-1][1]["engine"] == "stub"
+
+
+class _FailingStreamCompletions:
+    async def create(self, **kwargs: Any) -> AsyncIterator[SimpleNamespace]:
+        async def chunks() -> AsyncIterator[SimpleNamespace]:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="Ice "))])
+            raise APIConnectionError(request=httpx.Request("POST", "https://api.openai.com"))
+
+        return chunks()
+
+
+def test_stream_journal_reports_model_failures_as_error_events() -> None:
+    client = _create_client()
+    completions = SimpleNamespace(completions=_FailingStreamCompletions())
+    cast(FastAPI, client.app).state.narrative_engine = NarrativeEngine(
+        api_key=None, async_client=cast(AsyncOpenAI, SimpleNamespace(chat=completions))
+    )
+
+    client.post(
+        "/dreams/",
+        json={"title": "Glass lake", "transcript": "Skating across a glass lake.", "tags": []},
+    )
+    response = client.post("/dreams/1/journal/stream", json={"focus_points": []})
+
+    events = _parse_events(response.text)
+    assert [name for name, _ in events] == ["chunk", "error"]
+    assert "Language model request failed" in str(events[-1][1]["detail"])
+    assert client.get("/dreams/1").json()["journal"] is None
+    metrics = client.get("/metrics").json()
+    assert metrics["counters"]["journal_stream_errors"] == 1
+
+
+def test_stream_journal_missing_dream_returns_404() -> None:
+    client = _create_client()
+
+    response = client.post("/dreams/9/journal/stream", json={"focus_points": []})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_background_journal_job_can_be_polled() -> None:
+    app = create_app()
+    app.state.narrative_engine = _StubNarrativeEngine()
+
+    with TestClient(app) as client:
+        client.post(
+            "/dreams/",
+            json={"title": "Lighthouse", "transcript": "A beam sweeping the sea.", "tags": []},
+        )
+        accepted = client.post(
+            "/dreams/1/journal",
+            params={"background": "true"},
+            json={"focus_points": ["beam"]},
+            headers={"X-User-Id": "alice"},
+        )
+        assert accepted.status_code == HTTPStatus.ACCEPTED
+        job = accepted.json()
+        assert job["user"] == "alice"
+        assert accepted.headers["location"] == f"/dreams/journal-jobs/{job['id']}"
+
+        for _ in range(100):
+            job = client.get(f"/dreams/journal-jobs/{job['id']}").json()
+            if job["state"] == "succeeded":
+                break
+            time.sleep(0.01)
+
+        assert job["state"] == "succeeded"
+        assert job["result"]["narrative"].startswith("Lighthouse")
+        assert client.get("/dreams/1").json()["journal"] == job["result"]["narrative"]
+
+
+def test_background_journal_queue_applies_backpressure() -> None:
+    app = create_app(Settings(journal_workers=0, journal_queue_capacity=1))
+
+    with TestClient(app) as client:
+        client.post(
+            "/dreams/",
+            json={"title": "Lighthouse", "transcript": "A beam sweeping the sea.", "tags": []},
+        )
+        first = client.post("/dreams/1/journal?background=true", json={"focus_points": []})
+        second = client.post("/dreams/1/journal?background=true", json={"focus_points": []})
+
+        assert first.status_code == HTTPStatus.ACCEPTED
+        assert second.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert second.headers["retry-after"]
+        missing = client.get("/dreams/journal-jobs/unknown")
+        assert missing.status_code == HTTPStatus.NOT_FOUND
+
+
+class _ConcurrencyTrackingEngine(_StubNarrativeEngine):
+    def __init__(self) -> None:
+        super().__init__()
+        self.active = 0
+        self.peak = 0
+
+    async def ajournal(
+        self,
+        *,
+        title: str,
+        transcript: str,
+        mood: str | None,
+        focus_points: Iterable[str],
+        tone: str | None,
+    ) -> NarrativeResult:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if tone == "fail":
+            raise RuntimeError("Model unavailable")
+        return self.journal(
+            title=title, transcript=transcript, mood=mood, focus_points=focus_points, tone=tone
+        )
+
+
+def test_batch_journal_reports_per_item_results() -> None:
+    app = create_app(Settings(journal_batch_concurrency=BATCH_CONCURRENCY))
+    engine = _ConcurrencyTrackingEngine()
+    app.state.narrative_engine = engine
+    client = TestClient(app)
+    for index in range(BATCH_SIZE):
+        client.post(
+            "/dreams/",
+            json={"title": f"Dream {index}", "transcript": "Wandering a maze.", "tags": []},
+        )
+
+    items: list[Payload] = [
+        {"dream_id": str(index + 1), "focus_points": ["maze"], "tone": "calm"}
+        for index in range(BATCH_SIZE)
+    ]
+    items[1]["tone"] = "fail"
+    items.append({"dream_id": "404"})
+    response = client.post("/dreams/journal/batch", json={"items": items})
+
+    assert response.status_code == HTTPStatus.OK
+    body = response.json()
+    assert [result["dream_id"] for result in body["results"]] == [
+        str(item["dream_id"]) for item in items
+    ]
+    assert (body["succeeded"], body["failed"]) == (BATCH_SIZE - 1, 2)
+    assert body["results"][1]["error"] == "Model unavailable"
+    assert body["results"][-1]["error"] == "Dream not found"
+    assert body["results"][0]["result"]["dream"]["journal"].startswith("Dream 0")
+    assert engine.peak == BATCH_CONCURRENCY
+
+
+def test_import_streams_line_results_and_keeps_timestamps() -> None:
+    app = create_app(Settings(import_batch_size=2, import_max_line_bytes=300, import_workers=0))
+    client = TestClient(app)
+    archive: list[Payload | str] = [
+        {
+            "title": "Lighthouse",
+            "transcript": "A lighthouse blinking over a quiet harbour.",
+            "tags": ["sea"],
+            "mood": "calm",
+            "created_at": "2021-03-04T05:06:07",
+        },
+        "{not json",
+        {"title": "Undated", "transcript": "No idea when this happened."},
+        "",
+        {"title": "Rambling", "transcript": "and then " * 40, "created_at": "2021-03-05"},
+        {
+            "title": "Harbour",
+            "transcript": "The harbour lighthouse again, blinking slowly.",
+            "created_at": "2021-03-05T22:00:00+09:00",
+        },
+    ]
+    body = "\n".join(line if isinstance(line, str) else json.dumps(line) for line in archive)
+    encoded = body.encode("utf-8")
+
+    response = client.post(
+        "/dreams/import",
+        content=(encoded[index : index + 7] for index in range(0, len(encoded), 7)),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert results[1]["error"].startswith("Invalid JSON")
+    assert results[:1] + results[2:] == [
+        {"line": 1, "dream_id": "1"},
+        {"line": 3, "error": "created_at: Field required"},
+        {"line": 5, "error": "Line exceeds the 300 byte limit"},
+        {"line": 6, "dream_id": "2"},
+        {"imported": 2, "failed": 3},
+    ]
+    assert client.get("/dreams/1").json()["created_at"] == "2021-03-04T05:06:07Z"
+    assert client.get("/dreams/2").json()["created_at"] == "2021-03-05T13:00:00Z"
+    assert "lighthouse" in client.get("/dreams/1").json()["tags"]
+
+    created = client.post("/dreams/", json={"title": "Now", "transcript": "Back home."}).json()
+    assert [dream["id"] for dream in client.get("/dreams/").json()["dreams"]] == [
+        created["id"],
+        "2",
+        "1",
+    ]
+    matches = client.get("/dreams/1/similar").json()["dreams"]
+    assert matches[0]["dream"]["id"] == "2"
+    trends = client.get(
+        "/dreams/trends",
+        params={"granularity": "month", "start": "2021-03-01", "end": "2021-03-31"},
+    ).json()
+    assert trends["dream_count"] == EXPECTED_MULTI_DREAM_TOTAL
+    assert trends["buckets"][0]["tags"]["lighthouse"] == EXPECTED_MULTI_DREAM_TOTAL
+
+
+def test_export_streams_archive_that_imports_back() -> None:
+    client = TestClient(create_app(Settings(import_workers=0)))
+    for title, transcript, mood in (
+        ("Lighthouse", "A lighthouse blinking over a quiet harbour.", "calm"),
+        ("Orchard", "Apples glowing, then falling, in the dark orchard.", None),
+    ):
+        client.post("/dreams/", json={"title": title, "transcript": transcript, "mood": mood})
+
+    exported = client.get("/dreams/export")
+    compressed = client.get("/dreams/export", params={"format": "csv", "compress": "true"})
+
+    assert exported.status_code == HTTPStatus.OK
+    assert exported.headers["content-type"] == "application/x-ndjson"
+    assert exported.headers["content-disposition"] == 'attachment; filename="dreams.ndjson"'
+    dreams = [json.loads(line) for line in exported.text.splitlines()]
+    assert [dream["title"] for dream in dreams] == ["Lighthouse", "Orchard"]
+    assert compressed.headers["content-type"] == "application/gzip"
+    assert compressed.headers["content-disposition"] == 'attachment; filename="dreams.csv.gz"'
+    rows = list(csv.reader(io.StringIO(gzip.decompress(compressed.content).decode("utf-8"))))
+    assert rows[0][:3] == ["id", "title", "transcript"]
+    assert [row[1] for row in rows[1:]] == ["Lighthouse", "Orchard"]
+    assert client.get("/dreams/export", params={"format": "xml"}).status_code == (
+        HTTPStatus.UNPROCESSABLE_ENTITY
+    )
+
+    restored = TestClient(create_app(Settings(import_workers=0)))
+    summary = restored.post(
+        "/dreams/import",
+        content=exported.content,
+        headers={"Content-Type": "application/x-ndjson"},
+    ).text.splitlines()[-1]
+    assert json.loads(summary) == {"imported": 2, "failed": 0}
+    again = [json.loads(line) for line in restored.get("/dreams/export").text.splitlines()]
+    assert [(dream["title"], dream["created_at"]) for dream in again] == [
+        (dream["title"], dream["created_at"]) for dream in dreams
+    ]
@@ -0,0 +1,154 @@
+"""Tests for the background journal queue."""
+
+import asyncio
+import threading
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+from app.schemas.dreams import Dream, DreamJournalJob, DreamJournalRequest, DreamJournalResponse
+from app.services import journal_jobs
+from app.services.journal_jobs import JournalJobQueue, QueueFullError
+
+
+def _response(job: DreamJournalJob) -> DreamJournalResponse:
+    dream = Dream(
+        id=job.dream_id,
+        title="Dream",
+        transcript="Floating.",
+        created_at=datetime.now(UTC),
+        summary="Floating.",
+    )
+    return DreamJournalResponse(dream=dream, narrative=f"journal {job.id}", engine="stub")
+
+
+class _RecordingHandler:
+    def __init__(self) -> None:
+        self.users: list[str] = []
+
+    async def __call__(self, job: DreamJournalJob) -> DreamJournalResponse:
+        self.users.append(job.user)
+        await asyncio.sleep(0)
+        return _response(job)
+
+
+async def _drain(queue: JournalJobQueue) -> None:
+    while queue.depth or queue.running:
+        await asyncio.sleep(0.001)
+
+
+def test_workers_alternate_between_users() -> None:
+    handler = _RecordingHandler()
+    queue = JournalJobQueue(handler, workers=1)
+    request = DreamJournalRequest()
+
+    async def scenario() -> None:
+        for user in ["alice", "alice", "alice", "bob", "carol"]:
+            await queue.submit(user=user, dream_id="1", request=request)
+        await queue.start()
+        await _drain(queue)
+        await queue.stop()
+
+    asyncio.run(scenario())
+
+    assert handler.users == ["alice", "bob", "carol", "alice", "alice"]
+
+
+def test_submit_rejects_work_beyond_capacity() -> None:
+    queue = JournalJobQueue(_RecordingHandler(), capacity=3, per_user_capacity=2)
+    request = DreamJournalRequest()
+
+    async def scenario() -> None:
+        await queue.submit(user="alice", dream_id="1", request=request)
+        await queue.submit(user="alice", dream_id="2", request=request)
+
+        with pytest.raises(QueueFullError):
+            await queue.submit(user="alice", dream_id="3", request=request)
+
+        await queue.submit(user="bob", dream_id="3", request=request)
+        with pytest.raises(QueueFullError):
+            await queue.submit(user="carol", dream_id="4", request=request)
+
+    asyncio.run(scenario())
+
+
+def test_failed_jobs_record_the_error() -> None:
+    async def fail(_: DreamJournalJob) -> DreamJournalResponse:
+        raise LookupError("Dream not found")
+
+    queue = JournalJobQueue(fail)
+
+    async def scenario() -> DreamJournalJob:
+        job = await queue.submit(user="alice", dream_id="9", request=DreamJournalRequest())
+        await queue.start()
+        await _drain(queue)
+        await queue.stop()
+        return job
+
+    job = asyncio.run(scenario())
+
+    finished = queue.get(job.id)
+    assert finished is not None
+    assert finished.state == "failed"
+    assert finished.error == "Dream not found"
+    assert finished.finished_at is not None
+
+
+def test_unfinished_jobs_resume_after_restart(tmp_path: Path) -> None:
+    handler = _RecordingHandler()
+    first = JournalJobQueue(handler, directory=tmp_path)
+    pending = asyncio.run(
+        first.submit(user="alice", dream_id="1", request=DreamJournalRequest(tone="wry"))
+    )
+
+    restarted = JournalJobQueue(handler, directory=tmp_path)
+
+    async def scenario() -> None:
+        await restarted.start()
+        await _drain(restarted)
+        await restarted.stop()
+
+    asyncio.run(scenario())
+
+    finished = restarted.get(pending.id)
+    assert finished is not None
+    assert finished.state == "succeeded"
+    assert finished.request.tone == "wry"
+    assert finished.result is not None
+    reloaded = JournalJobQueue(handler, directory=tmp_path, workers=0)
+    asyncio.run(reloaded.start())
+    assert reloaded.get(pending.id) == finished
+    assert handler.users == ["alice"]
+
+
+def test_job_files_are_written_off_the_event_loop(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    threads: list[int] = []
+
+    def traced(function: Callable[..., None]) -> Callable[..., None]:
+        def call(*args: object) -> None:
+            threads.append(threading.get_ident())
+            function(*args)
+
+        return call
+
+    monkeypatch.setattr(journal_jobs, "_write_atomically", traced(journal_jobs._write_atomically))
+    monkeypatch.setattr(journal_jobs, "_unlink_all", traced(journal_jobs._unlink_all))
+    queue = JournalJobQueue(_RecordingHandler(), directory=tmp_path, retained=0)
+
+    async def scenario() -> int:
+        await queue.submit(user="alice", dream_id="1", request=DreamJournalRequest())
+        await queue.start()
+        await _drain(queue)
+        await queue.stop()
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(scenario())
+
+    assert threads
+    assert loop_thread not in threads
+    # The retired job's file is removed after its final write, never rewritten.
+    assert list(tmp_path.glob("*.json")) == []
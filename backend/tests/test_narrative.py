@@ -0,0 +1,176 @@
+"""Tests for the narrative engine."""
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any, cast
+
+import httpx
+import pytest
+from openai import APITimeoutError, AsyncOpenAI
+
+from app.services.narrative import NarrativeEngine
+from app.services.result_cache import ResultCache
+
+UNCACHED_CALLS = 3
+
+
+class _FakeCompletions:
+    def __init__(self) -> None:
+        self.calls: list[dict[str, Any]] = []
+
+    async def create(self, **kwargs: Any) -> SimpleNamespace:
+        self.calls.append(kwargs)
+        await asyncio.sleep(0)
+        message = SimpleNamespace(content="  A lantern-lit corridor.  ")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _fake_client(completions: _FakeCompletions) -> AsyncOpenAI:
+    return cast(AsyncOpenAI, SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+
+
+def test_ajournal_uses_async_client() -> None:
+    completions = _FakeCompletions()
+    engine = NarrativeEngine(api_key=None, async_client=_fake_client(completions))
+
+    result = asyncio.run(
+        engine.ajournal(
+            title="Corridor",
+            transcript="Walking past lanterns.",
+            mood="calm",
+            focus_points=["lanterns"],
+            tone=None,
+        )
+    )
+
+    assert result.engine == "openai"
+    assert result.narrative == "A lantern-lit corridor."
+    user_prompt = completions.calls[0]["messages"][1]["content"]
+    assert "Focus on: lanterns" in user_prompt
+
+
+def test_ajournal_falls_back_offline_without_client() -> None:
+    engine = NarrativeEngine(api_key=None)
+
+    result = asyncio.run(
+        engine.ajournal(
+            title="Corridor",
+            transcript="Walking past lanterns.",
+            mood=None,
+            focus_points=[],
+            tone=None,
+        )
+    )
+
+    assert result.engine == "offline"
+    assert result.narrative.startswith("Corridor:")
+
+
+def test_astream_journal_offline_matches_full_journal() -> None:
+    engine = NarrativeEngine(api_key=None)
+    arguments: dict[str, Any] = {
+        "title": "Corridor",
+        "transcript": "Walking past lanterns toward a humming door.",
+        "mood": "uneasy",
+        "focus_points": ["door"],
+        "tone": "quiet",
+    }
+
+    async def collect() -> list[str]:
+        return [fragment async for fragment in engine.astream_journal(**arguments)]
+
+    fragments = asyncio.run(collect())
+
+    assert len(fragments) > 1
+    assert "".join(fragments).strip() == engine.journal(**arguments).narrative
+
+
+class _FakeStreamingCompletions:
+    async def create(self, **kwargs: Any) -> Any:
+        assert kwargs["stream"] is True
+
+        async def chunks() -> Any:
+            for text in ["The ", None, "tide ", "sang."]:
+                delta = SimpleNamespace(content=text)
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+        return chunks()
+
+
+def test_astream_journal_yields_model_deltas() -> None:
+    engine = NarrativeEngine(
+        api_key=None,
+        async_client=cast(
+            AsyncOpenAI,
+            SimpleNamespace(chat=SimpleNamespace(completions=_FakeStreamingCompletions())),
+        ),
+    )
+
+    async def collect() -> list[str]:
+        stream = engine.astream_journal(
+            title="Tide", transcript="Waves singing.", mood=None, focus_points=[], tone=None
+        )
+        return [fragment async for fragment in stream]
+
+    assert asyncio.run(collect()) == ["The ", "tide ", "sang."]
+    assert engine.engine_name == "openai"
+
+
+class _FailingStreamingCompletions:
+    async def create(self, **kwargs: Any) -> Any:
+        async def chunks() -> Any:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="The "))])
+            raise APITimeoutError(request=httpx.Request("POST", "https://api.openai.com"))
+
+        return chunks()
+
+
+def test_astream_journal_raises_model_failures_as_runtime_errors() -> None:
+    engine = NarrativeEngine(
+        api_key=None,
+        async_client=cast(
+            AsyncOpenAI,
+            SimpleNamespace(chat=SimpleNamespace(completions=_FailingStreamingCompletions())),
+        ),
+    )
+    fragments: list[str] = []
+
+    async def collect() -> None:
+        stream = engine.astream_journal(
+            title="Tide", transcript="Waves singing.", mood=None, focus_points=[], tone=None
+        )
+        async for fragment in stream:
+            fragments.append(fragment)
+
+    with pytest.raises(RuntimeError, match="Language model request failed"):
+        asyncio.run(collect())
+    assert fragments == ["The "]
+
+
+def test_ajournal_serves_cached_narrative_until_forced() -> None:
+    completions = _FakeCompletions()
+    engine = NarrativeEngine(
+        api_key=None, async_client=_fake_client(completions), cache=ResultCache()
+    )
+    arguments: dict[str, Any] = {
+        "title": "Corridor",
+        "transcript": "Walking past lanterns.",
+        "mood": "calm",
+        "focus_points": [],
+        "tone": None,
+    }
+
+    first = asyncio.run(engine.ajournal(**arguments))
+    second = asyncio.run(engine.ajournal(**arguments))
+    forced = asyncio.run(engine.ajournal(**arguments, force_regenerate=True))
+    other_tone = asyncio.run(engine.ajournal(**{**arguments, "tone": "wry"}))
+
+    assert (first.cached, second.cached, forced.cached, other_tone.cached) == (
+        False,
+        True,
+        False,
+        False,
+    )
+    assert second.narrative == first.narrative
+    assert second.engine == "openai"
+    assert len(completions.calls) == UNCACHED_CALLS
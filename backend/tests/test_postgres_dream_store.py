@@ -0,0 +1,315 @@
+"""Integration tests for the PostgreSQL dream store.
+
+They run against ``DREAMWEAVE_TEST_DATABASE_URL`` when it is set (for example the
+local Supabase stack) and otherwise against an embedded server started with
+``pgserver``. Each test creates and drops its own database.
+"""
+
+import asyncio
+import os
+import random
+import uuid
+from collections.abc import Iterator
+from datetime import UTC, date, datetime, time, timedelta
+from http import HTTPStatus
+from urllib.parse import urlsplit, urlunsplit
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import Settings
+from app.main import create_app
+from app.schemas.dreams import Dream, DreamCreate, DreamGraph, DreamImportItem, DreamUpdate
+from app.services.dream_repository import draft_import
+from app.services.dream_store import DreamStore
+
+asyncpg = pytest.importorskip("asyncpg")
+
+from app.services.postgres_dream_store import PostgresDreamStore  # noqa: E402
+
+MOTIFS = ["moon", "river", "stairs", "mirror", "train", "garden"]
+MOODS = [None, "calm", "anxious", "joyful"]
+EXPECTED_UPDATED_VERSION = 2
+ARCHIVE_START = datetime.combine(datetime.now(UTC).date() - timedelta(days=40), time.min, UTC)
+
+
+@pytest.fixture(scope="module")
+def server_url(tmp_path_factory: pytest.TempPathFactory) -> Iterator[str]:
+    configured = os.getenv("DREAMWEAVE_TEST_DATABASE_URL")
+    if configured:
+        yield configured
+        return
+    pgserver = pytest.importorskip("pgserver")
+    server = pgserver.get_server(tmp_path_factory.mktemp("postgres"), cleanup_mode="stop")
+    yield server.get_uri()
+    server.cleanup()
+
+
+@pytest.fixture
+def database_url(server_url: str) -> Iterator[str]:
+    name = f"dreamweave_{uuid.uuid4().hex[:12]}"
+    asyncio.run(_admin(server_url, f'CREATE DATABASE "{name}"'))
+    parts = urlsplit(server_url)
+    yield urlunsplit(parts._replace(path=f"/{name}"))
+    asyncio.run(_admin(server_url, f'DROP DATABASE "{name}" WITH (FORCE)'))
+
+
+async def _admin(url: str, statement: str) -> None:
+    connection = await asyncpg.connect(url)
+    try:
+        await connection.execute(statement)
+    finally:
+        await connection.close()
+
+
+def _archived(generator: random.Random, step: int) -> list[Dream]:
+    return [
+        draft_import(
+            DreamImportItem(
+                title=f"Archived {step}.{index}",
+                transcript=" ".join(generator.sample(MOTIFS, 3)) + f" archived {step}.",
+                tags=generator.sample(MOTIFS, generator.randint(0, 2)),
+                mood=generator.choice(MOODS),
+                created_at=ARCHIVE_START
+                + timedelta(minutes=generator.randrange(40 * 24 * 60), microseconds=step),
+            )
+        )
+        for index in range(generator.randint(1, 3))
+    ]
+
+
+_GENERATED_SEARCH_TABLE = """
+CREATE TABLE dreams (
+    seq BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    title TEXT NOT NULL,
+    transcript TEXT NOT NULL,
+    tags TEXT[] NOT NULL DEFAULT '{}',
+    mood TEXT,
+    summary TEXT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL,
+    journal TEXT,
+    journal_generated_at TIMESTAMPTZ,
+    haystack TEXT NOT NULL,
+    search TSVECTOR GENERATED ALWAYS AS (
+        to_tsvector('simple', title || ' ' || transcript || ' ' || coalesce(journal, ''))
+    ) STORED
+);
+INSERT INTO dreams (title, transcript, summary, created_at, haystack)
+VALUES ('古い夢', '学校の廊下を走っていた。', '学校の廊下を走っていた。', now(), '');
+"""
+
+
+async def _exercise(store: DreamStore | PostgresDreamStore, seed: int) -> None:
+    generator = random.Random(seed)
+
+    async def resolve(value: object) -> object:
+        return await value if asyncio.iscoroutine(value) else value
+
+    for step in range(80):
+        page = await resolve(store.list())
+        existing = [dream.id for dream in page.dreams]  # type: ignore[attr-defined]
+        action = generator.choices(
+            ["create", "import", "update", "journal", "delete"], [6, 1, 3, 1, 2]
+        )[0]
+        if action == "import":
+            await resolve(store.import_dreams(_archived(generator, step)))
+        elif action == "create" or not existing:
+            await resolve(
+                store.create(
+                    DreamCreate(
+                        title=f"Dream {step}",
+                        transcript=" ".join(generator.sample(MOTIFS, 3)) + f" number {step}.",
+                        tags=generator.sample(MOTIFS, generator.randint(0, 2)),
+                        mood=generator.choice(MOODS),
+                    )
+                )
+            )
+        elif action == "update":
+            await resolve(
+                store.update(
+                    generator.choice(existing),
+                    DreamUpdate(
+                        tags=generator.sample(MOTIFS, generator.randint(0, 2)),
+                        mood=generator.choice(MOODS[1:]),
+                    ),
+                )
+            )
+        elif action == "journal":
+            await resolve(
+                store.set_journal(
+                    generator.choice(existing),
+                    narrative=f"The {generator.choice(MOTIFS)} whispered.",
+                    generated_at=datetime.now(UTC),
+                )
+            )
+        else:
+            await resolve(store.delete(generator.choice(existing)))
+
+
+def _graph_keys(graph: DreamGraph) -> tuple[set[tuple], set[tuple]]:
+    nodes = {(node.id, node.kind, node.label, node.weight) for node in graph.nodes}
+    edges = {(edge.source, edge.target, edge.kind, edge.weight) for edge in graph.edges}
+    return nodes, edges
+
+
+def test_postgres_store_matches_memory_store(database_url: str) -> None:
+    memory = DreamStore()
+
+    async def scenario() -> None:
+        store = PostgresDreamStore(database_url, pool_size=2)
+        await store.start()
+        try:
+            await _exercise(memory, seed=5)
+            await _exercise(store, seed=5)
+            for filters in (
+                {},
+                {"limit": 5},
+                {"tag": "moon"},
+                {"tags": ["moon", "river"]},
+                {"tags": ["moon", "river"], "tag_match": "any", "limit": 3},
+                {"mood": "calm"},
+                {"query": "mirr"},
+                {"query": "train whisper"},
+                {"query": "number 1", "search": "substring"},
+            ):
+                expected = memory.list(**filters)  # type: ignore[arg-type]
+                actual = await store.list(**filters)  # type: ignore[arg-type]
+                assert [dream.id for dream in actual.dreams] == [
+                    dream.id for dream in expected.dreams
+                ], filters
+                assert actual.total == expected.total, filters
+
+            expected_after, after = None, None
+            while True:
+                expected = memory.list(limit=4, after=expected_after, tag="river")
+                actual = await store.list(limit=4, after=after, tag="river", count_total=False)
+                assert [dream.id for dream in actual.dreams] == [
+                    dream.id for dream in expected.dreams
+                ]
+                assert actual.total is None
+                if not actual.has_more:
+                    break
+                expected_after = (expected.dreams[-1].created_at, expected.dreams[-1].id)
+                after = (actual.dreams[-1].created_at, actual.dreams[-1].id)
+
+            ranked = await store.list(query="moon", search="ranked")
+            assert {dream.id for dream in ranked.dreams} == {
+                dream.id for dream in memory.list(query="moon").dreams
+            }
+
+            expected_highlights = memory.highlights()
+            highlights = await store.highlights()
+            assert highlights.total_count == expected_highlights.total_count
+            assert {(m.mood, m.count) for m in highlights.moods} == {
+                (m.mood, m.count) for m in expected_highlights.moods
+            }
+            assert [tag.count for tag in highlights.top_tags] == [
+                tag.count for tag in expected_highlights.top_tags
+            ]
+            assert await store.get("not-a-number") is None
+
+            today = datetime.now(UTC).date()
+            for window in ({}, {"start": today - timedelta(days=1)}, {"end": date(2000, 1, 1)}):
+                options = {"motifs": 20, "edges": 100, "dreams_per_motif": 2, **window}
+                assert _graph_keys(await store.graph(**options)) == _graph_keys(
+                    memory.graph(**options)
+                ), window
+            for granularity in ("day", "week", "month"):
+                window = {"start": today - timedelta(days=40), "end": today, "motifs": 5}
+                assert await store.trends(granularity=granularity, **window) == memory.trends(
+                    granularity=granularity, **window
+                ), granularity
+            assert [dream.id async for dream in store.export()] == [
+                dream.id for dream in memory.export()
+            ]
+        finally:
+            await store.close()
+
+    asyncio.run(scenario())
+
+
+def test_postgres_store_rebuilds_a_generated_search_column(database_url: str) -> None:
+    async def scenario() -> None:
+        connection = await asyncpg.connect(database_url)
+        try:
+            await connection.execute(_GENERATED_SEARCH_TABLE)
+        finally:
+            await connection.close()
+        store = PostgresDreamStore(database_url, pool_size=2)
+        await store.start()
+        try:
+            created = await store.create(
+                DreamCreate(title="Lift", transcript="エレベーターが止まった。 I don't know why.")
+            )
+            assert [dream.id for dream in (await store.list(query="廊下")).dreams] == ["1"]
+            for query in ("エレベーター", "don't", "止"):
+                assert [dream.id for dream in (await store.list(query=query)).dreams] == [
+                    created.id
+                ], query
+            # Rows from before the version column start at 1 like new ones.
+            assert await store.dream_version("1") == await store.dream_version(created.id) == 1
+            await store.update(created.id, DreamUpdate(mood="calm"))
+            assert await store.dream_version(created.id) == EXPECTED_UPDATED_VERSION
+            assert await store.dream_version("1") == 1
+        finally:
+            await store.close()
+
+    asyncio.run(scenario())
+
+
+def test_postgres_creation_times_follow_seq_across_workers(database_url: str) -> None:
+    async def scenario() -> list[Dream]:
+        workers = [PostgresDreamStore(database_url, pool_size=2) for _ in range(2)]
+        for worker in workers:
+            await worker.start()
+        try:
+            # Back-to-back creates push timestamps ahead of the clock, which the
+            # second worker has not seen.
+            for index in range(3):
+                await workers[0].create(DreamCreate(title=f"Early {index}", transcript="Fog."))
+            await asyncio.gather(
+                *(
+                    workers[index % 2].create(
+                        DreamCreate(title=f"Late {index}", transcript="Rain.")
+                    )
+                    for index in range(6)
+                )
+            )
+            return [dream async for dream in workers[1].export()]
+        finally:
+            for worker in workers:
+                await worker.close()
+
+    dreams = sorted(asyncio.run(scenario()), key=lambda dream: int(dream.id))
+
+    created = [dream.created_at for dream in dreams]
+    assert created == sorted(created)
+    assert len(set(created)) == len(created)
+
+
+def test_app_uses_postgres_store_when_configured(database_url: str) -> None:
+    settings = Settings(
+        dream_store_backend="postgres", database_url=database_url, database_pool_size=2
+    )
+    payload = {"title": "Orchard", "transcript": "Apples glowing in the dark orchard."}
+
+    with TestClient(create_app(settings)) as client:
+        created = client.post("/dreams/", json=payload)
+        assert created.status_code == HTTPStatus.CREATED
+        highlights_tag = client.get("/dreams/highlights").headers["ETag"]
+
+    with TestClient(create_app(settings)) as client:
+        response = client.get("/dreams/", params={"query": "glow"})
+        assert response.json()["total"] == 1
+        # Workers share the database's epoch, so their tags validate each other.
+        shared = client.get("/dreams/highlights", headers={"If-None-Match": highlights_tag})
+        assert shared.status_code == HTTPStatus.NOT_MODIFIED
+        dream_id = created.json()["id"]
+        etag = client.get(f"/dreams/{dream_id}").headers["ETag"]
+        unchanged = client.get(f"/dreams/{dream_id}", headers={"If-None-Match": etag})
+        assert unchanged.status_code == HTTPStatus.NOT_MODIFIED
+        client.put(f"/dreams/{dream_id}", json={"mood": "calm"})
+        changed = client.get(f"/dreams/{dream_id}", headers={"If-None-Match": etag})
+        assert changed.status_code == HTTPStatus.OK
+        assert client.delete(f"/dreams/{dream_id}").status_code == HTTPStatus.NO_CONTENT
+        assert client.get("/dreams/highlights").json()["total_count"] == 0
@@ -0,0 +1,108 @@
+"""Tests for the content-addressed result cache."""
+
+import asyncio
+import threading
+from pathlib import Path
+from typing import Any
+
+from app.services.result_cache import ResultCache, cache_key
+
+TTL_SECONDS = 60.0
+BYTE_BUDGET = 64
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_key_separates_parts() -> None:
+    assert cache_key("ab", "c") != cache_key("a", "bc")
+    assert cache_key("model", "prompt") == cache_key("model", "prompt")
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    cache = ResultCache(max_entries=2)
+    cache.put("a", {"value": 1})
+    cache.put("b", {"value": 2})
+    assert cache.get("a") == {"value": 1}
+
+    cache.put("c", {"value": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"value": 1}
+    assert cache.get("c") == {"value": 3}
+
+
+def test_memory_tier_respects_byte_budget() -> None:
+    cache = ResultCache(max_bytes=BYTE_BUDGET)
+    cache.put("small", {"text": "x"})
+    cache.put("large", {"text": "y" * 40})
+    cache.put("oversized", {"text": "z" * 100})
+
+    stats = cache.stats()
+    assert stats.bytes <= BYTE_BUDGET
+    assert cache.get("oversized") is None
+    assert cache.get("large") == {"text": "y" * 40}
+
+
+def test_entries_expire_after_ttl() -> None:
+    clock = _Clock()
+    cache = ResultCache(ttl_seconds=TTL_SECONDS, clock=clock)
+    cache.put("dream", {"narrative": "fog"})
+
+    clock.now += TTL_SECONDS / 2
+    assert cache.get("dream") == {"narrative": "fog"}
+
+    clock.now += TTL_SECONDS
+    assert cache.get("dream") is None
+    assert cache.stats().entries == 0
+
+
+def test_disk_tier_survives_new_instance(tmp_path: Path) -> None:
+    ResultCache(directory=tmp_path).put("dream", {"narrative": "fog"})
+
+    restarted = ResultCache(directory=tmp_path)
+
+    assert restarted.get("dream") == {"narrative": "fog"}
+    stats = restarted.stats()
+    assert (stats.hits, stats.disk_hits, stats.misses) == (1, 1, 0)
+    assert stats.hit_ratio == 1.0
+
+
+def test_expired_disk_entries_are_removed(tmp_path: Path) -> None:
+    clock = _Clock()
+    ResultCache(directory=tmp_path, clock=clock).put("dream", {"narrative": "fog"})
+    clock.now += TTL_SECONDS * 2
+
+    restarted = ResultCache(directory=tmp_path, ttl_seconds=TTL_SECONDS, clock=clock)
+
+    assert restarted.get("dream") is None
+    assert not list(tmp_path.rglob("*.json"))
+
+
+def test_async_methods_do_disk_io_off_the_event_loop(tmp_path: Path) -> None:
+    threads: list[int] = []
+
+    class _TracingCache(ResultCache):
+        def _read_disk(self, key: str, now: float) -> Any:
+            threads.append(threading.get_ident())
+            return super()._read_disk(key, now)
+
+        def _write_disk(self, key: str, entry: Any) -> None:
+            threads.append(threading.get_ident())
+            super()._write_disk(key, entry)
+
+    async def scenario() -> tuple[int, dict[str, Any] | None, dict[str, Any] | None]:
+        await _TracingCache(directory=tmp_path).aput("dream", {"narrative": "fog"})
+        restarted = _TracingCache(directory=tmp_path)
+        return threading.get_ident(), await restarted.aget("dream"), await restarted.aget("dream")
+
+    loop_thread, from_disk, from_memory = asyncio.run(scenario())
+
+    assert from_disk == from_memory == {"narrative": "fog"}
+    assert threads
+    assert loop_thread not in threads
@@ -0,0 +1,172 @@
+"""Tests for the vector index, embedders and the similar-dream endpoint."""
+
+import asyncio
+import time
+from collections.abc import Sequence
+from datetime import UTC, datetime
+from http import HTTPStatus
+from pathlib import Path
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.config import Settings
+from app.main import create_app
+from app.schemas.dreams import Dream
+from app.services.similarity import (
+    EmbeddingError,
+    HashingEmbedder,
+    SimilarDreams,
+    similarity_text,
+)
+from app.services.vector_index import Vector, VectorIndex
+
+DIMENSIONS = 32
+CLUSTERED_COUNT = 3000
+MIN_RECALL = 0.9
+
+
+def _clustered_vectors(count: int, *, seed: int = 3) -> Vector:
+    generator = np.random.default_rng(seed)
+    centres = generator.normal(size=(60, DIMENSIONS))
+    labels = generator.integers(0, len(centres), size=count)
+    noise = generator.normal(scale=0.3, size=(count, DIMENSIONS))
+    return (centres[labels] + noise).astype(np.float32)
+
+
+def test_exact_search_orders_by_cosine_and_survives_removal() -> None:
+    index = VectorIndex(3)
+    index.upsert("x", [1, 0, 0])
+    index.upsert("xy", [1, 1, 0])
+    index.upsert("y", [0, 2, 0])
+    index.upsert("z", [0, 0, 1])
+
+    assert [key for key, _ in index.search([1, 0.1, 0], 3)] == ["x", "xy", "y"]
+    assert index.search([1, 0, 0], 1) == [("x", 1.0)]
+
+    assert index.remove("x")
+    assert not index.remove("x")
+    index.upsert("z", [1, 0, 0])
+    matches = index.search([1, 0, 0], 4, exclude=["xy"])
+    assert [key for key, _ in matches] == ["z", "y"]
+    assert len(index) == 3  # noqa: PLR2004
+
+
+def test_index_switches_to_inverted_file_above_threshold() -> None:
+    vectors = _clustered_vectors(CLUSTERED_COUNT)
+    keys = [str(row) for row in range(CLUSTERED_COUNT)]
+    exact = VectorIndex(DIMENSIONS, approximate_threshold=CLUSTERED_COUNT * 2)
+    approximate = VectorIndex(DIMENSIONS, approximate_threshold=CLUSTERED_COUNT // 2, probes=6)
+    exact.upsert_many(keys[:1000], vectors[:1000])
+    approximate.upsert_many(keys[:1000], vectors[:1000])
+    for key, vector in zip(keys[1000:], vectors[1000:], strict=True):
+        exact.upsert(key, vector)
+        approximate.upsert(key, vector)
+    assert approximate.approximate and not exact.approximate
+
+    for key in keys[::7]:
+        exact.remove(key)
+        approximate.remove(key)
+
+    hits = 0
+    queries = vectors[1::50]
+    for query in queries:
+        expected = {key for key, _ in exact.search(query, 10)}
+        hits += len(expected & {key for key, _ in approximate.search(query, 10)})
+    assert hits / (10 * len(queries)) >= MIN_RECALL
+
+    for key in keys:
+        approximate.remove(key)
+    assert len(approximate) == 0 and not approximate.approximate
+
+
+class _CountingEmbedder(HashingEmbedder):
+    def __init__(self) -> None:
+        super().__init__(DIMENSIONS)
+        self.embedded: list[str] = []
+        self.failing = False
+
+    async def embed(self, texts: Sequence[str]) -> Vector:
+        if self.failing:
+            raise EmbeddingError("offline")
+        self.embedded.extend(texts)
+        return await super().embed(texts)
+
+
+def _dream(dream_id: str, transcript: str, **changes: object) -> Dream:
+    return Dream(
+        id=dream_id,
+        title="Untitled",
+        transcript=transcript,
+        summary=transcript,
+        created_at=datetime.now(UTC),
+        **changes,  # type: ignore[arg-type]
+    )
+
+
+def test_similar_dreams_only_embed_changed_text() -> None:
+    embedder = _CountingEmbedder()
+    similar = SimilarDreams(embedder)
+    lantern = _dream("1", "Paper lanterns drifting over the harbour")
+
+    async def scenario() -> None:
+        await similar.add([lantern, _dream("2", "Lanterns glowing above a quiet harbour")])
+        await similar.add([lantern.model_copy(update={"mood": "calm"})])
+        assert len(embedder.embedded) == 2  # noqa: PLR2004
+
+        embedder.failing = True
+        trains = _dream("3", "Trains racing through tunnels")
+        await similar.add([trains])
+        assert len(similar) == 2  # noqa: PLR2004
+        embedder.failing = False
+        await similar.add([trains])
+        assert embedder.embedded[-1] == similarity_text(trains)
+
+    asyncio.run(scenario())
+    assert [dream_id for dream_id, _ in similar.similar("1", 2)] == ["2", "3"]
+    similar.discard("2")
+    assert [dream_id for dream_id, _ in similar.similar("1", 2)] == ["3"]
+    assert similar.similar("missing", 2) == []
+
+
+def test_similar_endpoint_ranks_dreams_by_shared_motifs() -> None:
+    client = TestClient(create_app())
+    transcripts = [
+        "Drifting on a silver river under a giant moon",
+        "The moon rose over the river while I drifted in a boat",
+        "Climbing endless stairs inside a library",
+        "A library of stairs that never ended",
+    ]
+    ids = [
+        client.post("/dreams/", json={"title": "Dream", "transcript": text}).json()["id"]
+        for text in transcripts
+    ]
+
+    response = client.get(f"/dreams/{ids[0]}/similar", params={"limit": 2})
+    assert response.status_code == HTTPStatus.OK
+    matches = response.json()["dreams"]
+    assert matches[0]["dream"]["id"] == ids[1]
+    assert matches[0]["score"] > matches[1]["score"]
+
+    client.put(f"/dreams/{ids[2]}", json={"transcript": "A silver moon over a river"})
+    client.delete(f"/dreams/{ids[1]}")
+    matches = client.get(f"/dreams/{ids[0]}/similar").json()["dreams"]
+    assert [match["dream"]["id"] for match in matches][0] == ids[2]
+    assert ids[1] not in {match["dream"]["id"] for match in matches}
+
+    assert client.get("/dreams/999/similar").status_code == HTTPStatus.NOT_FOUND
+
+
+def test_startup_indexes_dreams_already_in_the_store(tmp_path: Path) -> None:
+    settings = Settings(dream_store_backend="sqlite", dream_store_dir=tmp_path)
+    with TestClient(create_app(settings)) as client:
+        for text in ("Owls in a moonlit forest", "A forest of owls", "Driving a red car"):
+            client.post("/dreams/", json={"title": "Dream", "transcript": text})
+
+    with TestClient(create_app(settings)) as client:
+        deadline = time.monotonic() + 5
+        while client.get("/metrics").json()["gauges"]["similarity_index_size"] < 3:  # noqa: PLR2004
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        matches = client.get("/dreams/2/similar", params={"limit": 1}).json()["dreams"]
+        assert [match["dream"]["id"] for match in matches] == ["1"]
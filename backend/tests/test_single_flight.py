@@ -0,0 +1,89 @@
+"""Tests for coalescing concurrent identical calls."""
+
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+CONCURRENT_CALLERS = 5
+
+
+def test_concurrent_callers_share_one_call() -> None:
+    flights: SingleFlight[str] = SingleFlight()
+    calls: list[str] = []
+
+    async def generate() -> str:
+        calls.append("generate")
+        await asyncio.sleep(0.01)
+        return "journal"
+
+    async def scenario() -> list[str]:
+        return await asyncio.gather(
+            *(flights.run("dream-1", generate) for _ in range(CONCURRENT_CALLERS))
+        )
+
+    assert asyncio.run(scenario()) == ["journal"] * CONCURRENT_CALLERS
+    assert calls == ["generate"]
+    assert flights.coalesced == CONCURRENT_CALLERS - 1
+    assert flights.in_flight == 0
+
+
+def test_distinct_keys_and_later_calls_run_separately() -> None:
+    flights: SingleFlight[str] = SingleFlight()
+    calls: list[str] = []
+
+    async def generate(label: str) -> str:
+        calls.append(label)
+        await asyncio.sleep(0)
+        return label
+
+    async def scenario() -> None:
+        await asyncio.gather(
+            flights.run("a", lambda: generate("a")), flights.run("b", lambda: generate("b"))
+        )
+        await flights.run("a", lambda: generate("a"))
+
+    asyncio.run(scenario())
+
+    assert sorted(calls) == ["a", "a", "b"]
+    assert flights.coalesced == 0
+
+
+def test_failures_propagate_to_every_caller_and_release_the_key() -> None:
+    flights: SingleFlight[str] = SingleFlight()
+
+    async def fail() -> str:
+        await asyncio.sleep(0)
+        raise RuntimeError("model unavailable")
+
+    async def scenario() -> list[str | BaseException]:
+        return list(
+            await asyncio.gather(
+                flights.run("dream-1", fail), flights.run("dream-1", fail), return_exceptions=True
+            )
+        )
+
+    results = asyncio.run(scenario())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flights.in_flight == 0
+
+
+def test_cancelled_caller_does_not_cancel_shared_call() -> None:
+    flights: SingleFlight[str] = SingleFlight()
+
+    async def generate() -> str:
+        await asyncio.sleep(0.01)
+        return "journal"
+
+    async def scenario() -> str:
+        impatient = asyncio.create_task(flights.run("dream-1", generate))
+        patient = asyncio.create_task(flights.run("dream-1", generate))
+        await asyncio.sleep(0)
+        impatient.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await impatient
+        return await patient
+
+    assert asyncio.run(scenario()) == "journal"
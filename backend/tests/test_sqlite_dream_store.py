@@ -0,0 +1,308 @@
+"""Tests for the SQLite dream store against the in-memory reference store."""
+
+import random
+import sqlite3
+from datetime import UTC, date, datetime, time, timedelta
+from http import HTTPStatus
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app.config import Settings
+from app.main import create_app
+from app.schemas.dreams import Dream, DreamCreate, DreamImportItem, DreamUpdate
+from app.services.dream_repository import DreamRepository, draft_import
+from app.services.dream_store import DreamStore
+from app.services.sqlite_dream_store import SQLiteDreamStore
+
+MOTIFS = ["moon", "river", "stairs", "mirror", "train", "garden"]
+MOODS = [None, "calm", "anxious", "joyful"]
+EXPECTED_SHARED_TOTAL = 2
+ARCHIVE_START = datetime.combine(datetime.now(UTC).date() - timedelta(days=40), time.min, UTC)
+
+
+def _exercise(store: DreamRepository, seed: int) -> None:
+    generator = random.Random(seed)
+    for step in range(120):
+        existing = [dream.id for dream in store.list().dreams]
+        action = generator.choices(
+            ["create", "import", "update", "journal", "delete"], [6, 1, 3, 1, 2]
+        )[0]
+        if action == "import":
+            store.import_dreams(_archived(generator, step))
+        elif action == "create" or not existing:
+            store.create(
+                DreamCreate(
+                    title=f"Dream {step}",
+                    transcript=" ".join(generator.sample(MOTIFS, 3)) + f" number {step}.",
+                    tags=generator.sample(MOTIFS, generator.randint(0, 2)),
+                    mood=generator.choice(MOODS),
+                )
+            )
+        elif action == "update":
+            store.update(
+                generator.choice(existing),
+                DreamUpdate(
+                    tags=generator.sample(MOTIFS, generator.randint(0, 2)),
+                    mood=generator.choice(MOODS[1:]),
+                ),
+            )
+        elif action == "journal":
+            store.set_journal(
+                generator.choice(existing),
+                narrative=f"The {generator.choice(MOTIFS)} whispered.",
+                generated_at=datetime.now(UTC),
+            )
+        else:
+            store.delete(generator.choice(existing))
+
+
+def _archived(generator: random.Random, step: int) -> list[Dream]:
+    return [
+        draft_import(
+            DreamImportItem(
+                title=f"Archived {step}.{index}",
+                transcript=" ".join(generator.sample(MOTIFS, 3)) + f" archived {step}.",
+                tags=generator.sample(MOTIFS, generator.randint(0, 2)),
+                mood=generator.choice(MOODS),
+                created_at=ARCHIVE_START
+                + timedelta(minutes=generator.randrange(40 * 24 * 60), microseconds=step),
+            )
+        )
+        for index in range(generator.randint(1, 3))
+    ]
+
+
+def _listing(store: DreamRepository, **filters: object) -> tuple[list[str], int]:
+    for bound in ("start", "end"):
+        if filters.get(bound) == "middle":
+            dreams = store.list().dreams
+            filters[bound] = dreams[len(dreams) // 2].created_at
+    page = store.list(**filters)  # type: ignore[arg-type]
+    return [dream.id for dream in page.dreams], page.total
+
+
+def _graph(store: DreamRepository, **window: date) -> tuple[set[tuple], set[tuple]]:
+    graph = store.graph(motifs=20, edges=100, dreams_per_motif=2, **window)
+    nodes = {(node.id, node.kind, node.label, node.weight) for node in graph.nodes}
+    edges = {(edge.source, edge.target, edge.kind, edge.weight) for edge in graph.edges}
+    return nodes, edges
+
+
+def test_sqlite_store_matches_memory_store(tmp_path: Path) -> None:
+    memory = DreamStore()
+    sqlite = SQLiteDreamStore(tmp_path / "dreams.sqlite3")
+    _exercise(memory, seed=11)
+    _exercise(sqlite, seed=11)
+
+    for filters in (
+        {},
+        {"limit": 5},
+        {"tag": "moon"},
+        {"tags": ["moon", "river"]},
+        {"tags": ["moon", "river"], "tag_match": "any", "limit": 3},
+        {"mood": "calm", "start": "middle"},
+        {"end": "middle", "tag": "garden"},
+        {"query": "mirr"},
+        {"query": "train whisper"},
+        {"query": "number 1", "search": "substring"},
+    ):
+        assert _listing(sqlite, **filters) == _listing(memory, **filters), filters
+
+    for filters in ({}, {"tag": "river"}, {"query": "num"}):
+        expected_after, after = None, None
+        while True:
+            expected = memory.list(limit=4, after=expected_after, **filters)  # type: ignore[arg-type]
+            actual = sqlite.list(
+                limit=4, after=after, count_total=False, **filters  # type: ignore[arg-type]
+            )
+            assert [dream.id for dream in actual.dreams] == [dream.id for dream in expected.dreams]
+            assert actual.has_more == expected.has_more
+            if not actual.has_more:
+                break
+            expected_after = (expected.dreams[-1].created_at, expected.dreams[-1].id)
+            after = (actual.dreams[-1].created_at, actual.dreams[-1].id)
+
+    ranked = sqlite.list(query="moon", search="ranked")
+    assert ranked.total == memory.list(query="moon", search="ranked").total
+    assert {dream.id for dream in ranked.dreams} == {
+        dream.id for dream in memory.list(query="moon").dreams
+    }
+
+    expected = memory.highlights()
+    actual = sqlite.highlights()
+    assert actual.total_count == expected.total_count
+    assert {(m.mood, m.count) for m in actual.moods} == {(m.mood, m.count) for m in expected.moods}
+    assert [tag.count for tag in actual.top_tags] == [tag.count for tag in expected.top_tags]
+
+    today = datetime.now(UTC).date()
+    for window in (
+        {},
+        {"start": today - timedelta(days=1), "end": today + timedelta(days=1)},
+        {"end": date(2000, 1, 1)},
+    ):
+        assert _graph(sqlite, **window) == _graph(memory, **window), window
+    assert _graph(sqlite)[1]
+    for granularity in ("day", "week", "month"):
+        options = {"start": today - timedelta(days=40), "end": today, "motifs": 5}
+        assert sqlite.trends(granularity=granularity, **options) == memory.trends(
+            granularity=granularity, **options
+        ), granularity
+    assert [dream.id for dream in sqlite.export()] == [dream.id for dream in memory.export()]
+    sqlite.close()
+
+
+def test_sqlite_rollups_match_memory_store_before_1970(tmp_path: Path) -> None:
+    memory = DreamStore()
+    sqlite = SQLiteDreamStore(tmp_path / "dreams.sqlite3")
+    moments = [
+        datetime(1969, 11, 30, 23, 59, 59, 500_000, UTC),
+        datetime(1969, 12, 29, 8, tzinfo=UTC),
+        datetime(1969, 12, 31, 12, tzinfo=UTC),
+        datetime(1970, 1, 1, 6, tzinfo=UTC),
+    ]
+    items = [
+        DreamImportItem(
+            title=f"Old {index}",
+            transcript="A moon over the river.",
+            tags=["moon", "river"],
+            mood="calm",
+            created_at=moment,
+        )
+        for index, moment in enumerate(moments)
+    ]
+    for store in (memory, sqlite):
+        store.import_dreams([draft_import(item) for item in items])
+
+    window = {"start": date(1969, 11, 1), "end": date(1970, 1, 31)}
+    for granularity in ("day", "week", "month"):
+        expected = memory.trends(granularity=granularity, motifs=2, **window)
+        assert sqlite.trends(granularity=granularity, motifs=2, **window) == expected
+    for days in ({"end": date(1969, 12, 31)}, {"start": date(1970, 1, 1)}):
+        assert _graph(sqlite, **days) == _graph(memory, **days), days
+    sqlite.close()
+
+
+def test_sqlite_token_search_matches_memory_store_for_japanese(tmp_path: Path) -> None:
+    memory = DreamStore()
+    sqlite = SQLiteDreamStore(tmp_path / "dreams.sqlite3")
+    for title, transcript in (
+        ("廊下", "学校の廊下を走っていた。エレベーターが止まっていた。"),
+        ("海辺", "夜の海辺で、古い学校の鐘が鳴った。"),
+        ("Lift", "An elevator (エレベーター) stuck between floors."),
+    ):
+        memory.create(DreamCreate(title=title, transcript=transcript))
+        sqlite.create(DreamCreate(title=title, transcript=transcript))
+
+    for query, expected in (
+        ("廊下", ["1"]),
+        ("エレベーター", ["3", "1"]),
+        ("学校 鐘", ["2"]),
+        ("elevator エレベ", ["3"]),
+        ("学", ["2", "1"]),
+    ):
+        assert _listing(memory, query=query) == (expected, len(expected)), query
+        assert _listing(sqlite, query=query) == (expected, len(expected)), query
+    assert memory.get("2").tags == ["海辺", "学校"]  # type: ignore[union-attr]
+    sqlite.close()
+
+
+def test_sqlite_store_retokenizes_text_indexed_by_an_older_tokenizer(tmp_path: Path) -> None:
+    path = tmp_path / "dreams.sqlite3"
+    store = SQLiteDreamStore(path)
+    store.create(DreamCreate(title="廊下", transcript="学校の廊下を走っていた。"))
+    store.close()
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute("UPDATE dream_text SET tokens = '学校の廊下を走っていた'")
+        connection.execute("UPDATE store_meta SET value = 0 WHERE key = 'tokenizer'")
+    connection.close()
+
+    reopened = SQLiteDreamStore(path)
+
+    assert _listing(reopened, query="廊下") == (["1"], 1)
+    reopened.close()
+
+
+def test_sqlite_totals_include_writes_from_other_connections(tmp_path: Path) -> None:
+    path = tmp_path / "dreams.sqlite3"
+    reader = SQLiteDreamStore(path)
+    writer = SQLiteDreamStore(path)
+    reader.create(DreamCreate(title="Moon", transcript="A moon over the river.", mood="calm"))
+
+    writer.create(DreamCreate(title="Train", transcript="A train in the garden."))
+    writer.create(DreamCreate(title="Stairs", transcript="Endless stairs."))
+    writer.delete("1")
+
+    assert reader.list().total == len(writer.list().dreams) == EXPECTED_SHARED_TOTAL
+    assert reader.highlights().total_count == EXPECTED_SHARED_TOTAL
+    writer.close()
+    reader.close()
+
+
+def test_sqlite_version_advances_for_writes_from_other_connections(tmp_path: Path) -> None:
+    path = tmp_path / "dreams.sqlite3"
+    first = SQLiteDreamStore(path)
+    second = SQLiteDreamStore(path)
+    moon = first.create(DreamCreate(title="Moon", transcript="A moon over the river."))
+    seen = first.version()
+
+    train = second.create(DreamCreate(title="Train", transcript="A train in the garden."))
+
+    assert first.version() == second.version() > seen
+    assert first.dream_version(train.id) > first.dream_version(moon.id)
+    second.delete(moon.id)
+    assert first.version() > second.dream_version(train.id)
+    second.close()
+    first.close()
+
+
+def test_sqlite_export_reads_a_snapshot_while_writes_continue(tmp_path: Path) -> None:
+    store = SQLiteDreamStore(tmp_path / "dreams.sqlite3")
+    for index in range(3):
+        store.create(DreamCreate(title=f"Dream {index}", transcript=f"Corridor {index}."))
+
+    exported = store.export()
+    first = next(exported)
+    store.delete("2")
+    store.update("3", DreamUpdate(title="Renamed"))
+    store.create(DreamCreate(title="Late", transcript="Written during the export."))
+
+    assert [first.id, *(dream.id for dream in exported)] == ["1", "2", "3"]
+    assert [dream.title for dream in store.export()] == ["Dream 0", "Renamed", "Late"]
+    store.close()
+
+
+def test_sqlite_store_persists_across_reopen(tmp_path: Path) -> None:
+    path = tmp_path / "dreams.sqlite3"
+    store = SQLiteDreamStore(path)
+    store.create(DreamCreate(title="Tide", transcript="Shells on a silver beach.", mood="calm"))
+    store.create(DreamCreate(title="Storm", transcript="Thunder over the harbour."))
+    store.delete("2")
+    store.close()
+
+    reopened = SQLiteDreamStore(path)
+    assert reopened.epoch == store.epoch
+    assert SQLiteDreamStore(tmp_path / "other.sqlite3").epoch != store.epoch
+    assert _listing(reopened) == (["1"], 1)
+    assert reopened.version() == 3  # noqa: PLR2004
+    assert reopened.dream_version("1") == 1
+    assert reopened.dream_version("2") is None
+    assert _listing(reopened, query="silv") == (["1"], 1)
+    created = reopened.create(DreamCreate(title="Fog", transcript="Lamps in the fog."))
+    assert created.id == "3"
+    assert created.created_at > reopened.get("1").created_at  # type: ignore[union-attr]
+    assert reopened.highlights().moods[0].mood == "calm"
+    reopened.close()
+
+
+def test_app_uses_sqlite_store_when_configured(tmp_path: Path) -> None:
+    settings = Settings(dream_store_backend="sqlite", dream_store_dir=tmp_path)
+    payload = {"title": "Orchard", "transcript": "Apples glowing in the dark orchard."}
+
+    with TestClient(create_app(settings)) as client:
+        assert client.post("/dreams/", json=payload).status_code == HTTPStatus.CREATED
+
+    with TestClient(create_app(settings)) as client:
+        response = client.get("/dreams/", params={"query": "glow"})
+        assert response.json()["total"] == 1
@@ -0,0 +1,73 @@
+"""Tests for the shared single-pass text analysis."""
+
+from datetime import UTC, datetime
+
+import pytest
+
+from app.schemas.dreams import Dream, DreamUpdate
+from app.services import text_analysis
+from app.services.dream_repository import revise_dream, search_tokens
+from app.services.text_analysis import analyse_transcript, search_terms, tokenize
+
+JAPANESE_DREAM = (
+    "昨日、学校の廊下を走っていた。学校はとても暗くて、エレベーターが止まっていた！"
+    "「怖い。」と思った。"
+)
+
+
+def test_japanese_transcripts_get_tags_summary_and_bigram_tokens() -> None:
+    analysis = analyse_transcript(JAPANESE_DREAM)
+
+    assert analysis.tags == ["学校", "廊下", "エレベーター"]
+    assert analysis.summary == (
+        "昨日、学校の廊下を走っていた。学校はとても暗くて、エレベーターが止まっていた！"
+    )
+    assert analysis.tokens[:4] == ("昨日", "日", "学校", "校の")
+    assert "廊下" in analysis.tokens
+    assert tokenize("ｴﾚﾍﾞｰﾀｰ") == tokenize("エレベーター")
+
+
+def test_english_analysis_matches_the_previous_drafting_rules() -> None:
+    analysis = analyse_transcript(
+        "I was flying over the ocean.  The ocean was silver!\nThen 1999 came, over and over."
+    )
+
+    assert analysis.summary == "I was flying over the ocean. The ocean was silver!"
+    assert analysis.tags == ["ocean", "flying", "silver", "came"]
+    assert analysis.tokens[:4] == ("i", "was", "flying", "over")
+
+
+def test_search_terms_fall_back_to_substrings_only_when_tokens_cannot_match() -> None:
+    assert search_terms("廊下") == ["廊下"]
+    assert search_terms("エレベーター walk") == ["エレ", "レベ", "ベー", "ータ", "ター", "walk"]
+    assert search_terms("walk 海") == ["walk", "海"]
+    assert search_terms("海 walk") is None
+    assert search_terms("привет") is None
+
+
+def test_analysis_is_memoised_and_skipped_for_untouched_transcripts(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    analysed: list[str] = []
+    analyse = text_analysis._analyse
+
+    def counting(transcript: str) -> text_analysis.TranscriptAnalysis:
+        analysed.append(transcript)
+        return analyse(transcript)
+
+    monkeypatch.setattr(text_analysis, "_analyse", counting)
+    transcript = "A paper boat drifting through a flooded library."
+    dream = Dream(
+        id="1",
+        title="Library",
+        transcript=transcript,
+        tags=["paper", "boat"],
+        summary=transcript,
+        created_at=datetime(2023, 1, 2, tzinfo=UTC),
+    )
+
+    assert search_tokens(dream) == tokenize(f"Library {transcript}")
+    assert revise_dream(dream, DreamUpdate(title="Flooded")).tags == ["paper", "boat"]
+    revised = revise_dream(dream, DreamUpdate(tags=["water"], transcript=transcript))
+    assert revised.tags == ["water", "paper", "boat", "drifting", "flooded", "library"]
+    assert analysed == [transcript]
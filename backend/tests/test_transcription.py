@@ -0,0 +1,225 @@
+"""Tests for the transcription engine."""
+
+import asyncio
+import io
+import threading
+import wave
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, BinaryIO, cast
+
+import pytest
+from openai import AsyncOpenAI
+
+from app.services import transcription
+from app.services.audio_formats import wav_samples
+from app.services.result_cache import ResultCache
+from app.services.transcription import TranscriptionEngine
+
+EXPECTED_UNCACHED_CALLS = 2
+
+
+class _FakeTranscriptions:
+    def __init__(self) -> None:
+        self.calls: list[dict[str, Any]] = []
+
+    async def create(self, **kwargs: Any) -> SimpleNamespace:
+        name, handle = kwargs["file"]
+        self.calls.append({**kwargs, "name": name, "body": handle.read()})
+        return SimpleNamespace(text=" Climbing a glass tower. ")
+
+
+def _engine(transcriptions: _FakeTranscriptions) -> TranscriptionEngine:
+    audio = SimpleNamespace(transcriptions=transcriptions)
+    client = cast(AsyncOpenAI, SimpleNamespace(audio=audio))
+    return TranscriptionEngine(api_key=None, async_client=client)
+
+
+def test_atranscribe_file_streams_the_handle() -> None:
+    transcriptions = _FakeTranscriptions()
+    handle = io.BytesIO(b"audio-bytes")
+
+    result = asyncio.run(_engine(transcriptions).atranscribe_file(file=handle, prompt="tower"))
+
+    assert result.transcript == "Climbing a glass tower."
+    assert result.engine == "openai"
+    assert transcriptions.calls[0]["body"] == b"audio-bytes"
+    assert transcriptions.calls[0]["name"] == "dream.m4a"
+    assert transcriptions.calls[0]["prompt"] == "tower"
+
+
+def test_atranscribe_file_rejects_empty_audio() -> None:
+    transcriptions = _FakeTranscriptions()
+
+    with pytest.raises(ValueError, match="empty"):
+        asyncio.run(_engine(transcriptions).atranscribe_file(file=io.BytesIO()))
+
+    assert transcriptions.calls == []
+
+
+TRANSCRIPT = (
+    "I was walking along a river of glass while paper birds folded themselves into "
+    "lanterns above me and a voice kept counting backwards from one hundred"
+)
+SEGMENT_BYTES = 48
+OVERLAP_BYTES = 24
+SEGMENT_CONCURRENCY = 2
+L16_RATE = 16_000
+
+
+def _wav(samples: bytes) -> bytes:
+    """Wrap ``samples`` as 8-bit mono PCM, so each byte is one sample frame."""
+
+    handle = io.BytesIO()
+    with wave.open(handle, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(1)
+        writer.setframerate(8000)
+        writer.writeframes(samples)
+    return handle.getvalue()
+
+
+def test_segmented_offline_transcription_round_trips_text() -> None:
+    engine = TranscriptionEngine(api_key=None)
+
+    result = asyncio.run(
+        engine.atranscribe_segmented(
+            file=io.BytesIO(_wav(TRANSCRIPT.encode())),
+            segment_bytes=SEGMENT_BYTES,
+            overlap_bytes=OVERLAP_BYTES,
+        )
+    )
+
+    assert result.transcript == TRANSCRIPT
+    assert result.engine == "offline"
+
+
+class _DecodingTranscriptions:
+    def __init__(self) -> None:
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+        self.names: set[str] = set()
+
+    async def create(self, **kwargs: Any) -> SimpleNamespace:
+        name, handle = kwargs["file"]
+        self.calls += 1
+        self.names.add(name)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        with wave.open(handle) as reader:
+            samples = reader.readframes(reader.getnframes())
+        return SimpleNamespace(text=samples.decode("utf-8", errors="ignore"))
+
+
+def test_segmented_transcription_bounds_concurrency() -> None:
+    transcriptions = _DecodingTranscriptions()
+    audio = SimpleNamespace(transcriptions=transcriptions)
+    engine = TranscriptionEngine(
+        api_key=None, async_client=cast(AsyncOpenAI, SimpleNamespace(audio=audio))
+    )
+
+    result = asyncio.run(
+        engine.atranscribe_segmented(
+            file=io.BytesIO(_wav(TRANSCRIPT.encode())),
+            prompt="river",
+            segment_bytes=SEGMENT_BYTES,
+            overlap_bytes=OVERLAP_BYTES,
+            concurrency=SEGMENT_CONCURRENCY,
+        )
+    )
+
+    assert result.transcript == TRANSCRIPT
+    assert result.engine == "openai"
+    assert transcriptions.calls > SEGMENT_CONCURRENCY
+    assert transcriptions.peak == SEGMENT_CONCURRENCY
+    assert transcriptions.names == {"dream.wav"}
+
+
+def test_segmented_transcription_sends_compressed_audio_whole() -> None:
+    transcriptions = _FakeTranscriptions()
+    recording = b"\x00\x00\x00\x18ftypM4A " + TRANSCRIPT.encode()
+
+    asyncio.run(
+        _engine(transcriptions).atranscribe_segmented(
+            file=io.BytesIO(recording),
+            segment_bytes=SEGMENT_BYTES,
+            overlap_bytes=OVERLAP_BYTES,
+        )
+    )
+
+    assert [(call["name"], call["body"]) for call in transcriptions.calls] == [
+        ("dream.m4a", recording)
+    ]
+
+
+def test_raw_l16_audio_is_sent_as_little_endian_wav() -> None:
+    transcriptions = _FakeTranscriptions()
+    samples = bytes(range(1, 9))
+
+    asyncio.run(
+        _engine(transcriptions).atranscribe_file(
+            file=io.BytesIO(samples), content_type=f"audio/L16; rate={L16_RATE}; channels=2"
+        )
+    )
+
+    name, body = transcriptions.calls[0]["name"], transcriptions.calls[0]["body"]
+    with wave.open(io.BytesIO(body)) as reader:
+        assert (reader.getnchannels(), reader.getframerate()) == (2, L16_RATE)
+    assert name == "dream.wav"
+    assert wav_samples(body) == bytes([2, 1, 4, 3, 6, 5, 8, 7])
+
+
+def test_repeated_uploads_are_served_from_cache() -> None:
+    transcriptions = _FakeTranscriptions()
+    audio = SimpleNamespace(transcriptions=transcriptions)
+    engine = TranscriptionEngine(
+        api_key=None,
+        async_client=cast(AsyncOpenAI, SimpleNamespace(audio=audio)),
+        cache=ResultCache(),
+    )
+
+    first = asyncio.run(engine.atranscribe(audio=b"same-recording", prompt="tower"))
+    handle = io.BytesIO(b"same-recording")
+    second = asyncio.run(engine.atranscribe_file(file=handle, prompt="tower"))
+    other_prompt = asyncio.run(engine.atranscribe(audio=b"same-recording", prompt="river"))
+
+    assert (first.cached, second.cached, other_prompt.cached) == (False, True, False)
+    assert (second.transcript, second.engine, second.confidence) == (
+        first.transcript,
+        first.engine,
+        first.confidence,
+    )
+    assert handle.tell() == 0
+    assert len(transcriptions.calls) == EXPECTED_UNCACHED_CALLS
+
+
+def test_upload_hashing_and_disk_cache_run_off_the_event_loop(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    threads: list[int] = []
+    file_digest = transcription._file_digest
+
+    def traced_digest(file: BinaryIO) -> str:
+        threads.append(threading.get_ident())
+        return file_digest(file)
+
+    monkeypatch.setattr(transcription, "_file_digest", traced_digest)
+    transcriptions = _FakeTranscriptions()
+    audio = SimpleNamespace(transcriptions=transcriptions)
+    client = cast(AsyncOpenAI, SimpleNamespace(audio=audio))
+
+    async def scenario(cache: ResultCache) -> tuple[int, bool]:
+        engine = TranscriptionEngine(api_key=None, async_client=client, cache=cache)
+        result = await engine.atranscribe_file(file=io.BytesIO(b"spooled-recording"))
+        return threading.get_ident(), result.cached
+
+    loop_thread, first_cached = asyncio.run(scenario(ResultCache(directory=tmp_path)))
+    _, restarted_cached = asyncio.run(scenario(ResultCache(directory=tmp_path)))
+
+    assert (first_cached, restarted_cached) == (False, True)
+    assert len(transcriptions.calls) == 1
+    assert threads
+    assert loop_thread not in threads
@@ -0,0 +1,135 @@
+"""Tests for live transcription sessions."""
+
+import asyncio
+import io
+import wave
+
+import pytest
+
+from app.services.audio_formats import wav_samples
+from app.services.transcription import TranscriptionResult
+from app.services.transcription_sessions import SessionLimitError, TranscriptionSessionManager
+from app.services.uploads import UploadTooLargeError
+
+SPOKEN = (
+    "Snow was falling upwards in the station while a train of paper cranes waited "
+    "at the platform and nobody could remember the name of the town"
+)
+SEGMENT_BYTES = 64
+OVERLAP_BYTES = 16
+CHUNK_BYTES = 7
+
+
+class _Transcriber:
+    """Reads each segment's samples as text and records them with the file name."""
+
+    def __init__(self) -> None:
+        self.segments: list[bytes] = []
+        self.filenames: set[str] = set()
+
+    async def __call__(
+        self, audio: bytes, prompt: str | None, filename: str
+    ) -> TranscriptionResult:
+        samples = wav_samples(audio)
+        self.segments.append(samples)
+        self.filenames.add(filename)
+        await asyncio.sleep(0)
+        return TranscriptionResult(
+            transcript=samples.decode(errors="ignore"), engine="fake", confidence=0.8
+        )
+
+
+def _wav(samples: bytes) -> bytes:
+    """Wrap ``samples`` as 8-bit mono PCM, so each byte is one sample frame."""
+
+    handle = io.BytesIO()
+    with wave.open(handle, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(1)
+        writer.setframerate(8000)
+        writer.writeframes(samples)
+    return handle.getvalue()
+
+
+def _manager(transcriber: _Transcriber, **options: int) -> TranscriptionSessionManager:
+    return TranscriptionSessionManager(
+        transcriber, segment_bytes=SEGMENT_BYTES, overlap_bytes=OVERLAP_BYTES, **options
+    )
+
+
+def test_segments_are_transcribed_while_recording() -> None:
+    transcriber = _Transcriber()
+    manager = _manager(transcriber)
+    audio = _wav(SPOKEN.encode())
+
+    async def scenario() -> tuple[str, int, TranscriptionResult]:
+        session = manager.open(prompt=None)
+        for offset in range(0, len(audio), CHUNK_BYTES):
+            manager.append(session, audio[offset : offset + CHUNK_BYTES])
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+        partial = session.partial_transcript()
+        transcribed_before_finalize = len(transcriber.segments)
+        return partial, transcribed_before_finalize, await manager.finalize(session)
+
+    partial, transcribed_before_finalize, result = asyncio.run(scenario())
+
+    assert SPOKEN.startswith(partial)
+    assert len(partial.split()) > len(SPOKEN.split()) // 2
+    assert len(transcriber.segments) == transcribed_before_finalize + 1
+    assert len(transcriber.segments[-1]) <= SEGMENT_BYTES
+    assert transcriber.filenames == {"dream.wav"}
+    assert result.transcript == SPOKEN
+    assert result.confidence == pytest.approx(0.8)
+    assert manager.open_sessions == 0
+
+
+def test_short_session_is_transcribed_on_finalize() -> None:
+    transcriber = _Transcriber()
+    manager = _manager(transcriber)
+
+    async def scenario() -> TranscriptionResult:
+        session = manager.open(prompt="short")
+        manager.append(session, b"Just a cat")
+        return await manager.finalize(session)
+
+    assert asyncio.run(scenario()).transcript == "Just a cat"
+    assert transcriber.segments == [b"Just a cat"]
+
+
+def test_compressed_sessions_are_transcribed_whole_on_finalize() -> None:
+    transcriber = _Transcriber()
+    manager = _manager(transcriber)
+    audio = b"\x00\x00\x00\x18ftypM4A " + SPOKEN.encode()
+
+    async def scenario() -> tuple[int, TranscriptionResult]:
+        session = manager.open(prompt=None)
+        for offset in range(0, len(audio), CHUNK_BYTES):
+            manager.append(session, audio[offset : offset + CHUNK_BYTES])
+        await asyncio.sleep(0.01)
+        return len(session.segments), await manager.finalize(session)
+
+    scheduled_while_recording, result = asyncio.run(scenario())
+
+    assert scheduled_while_recording == 0
+    assert transcriber.segments == [audio]
+    assert transcriber.filenames == {"dream.m4a"}
+    assert result.transcript.endswith(SPOKEN)
+
+
+def test_raw_pcm_sessions_must_declare_a_rate() -> None:
+    with pytest.raises(ValueError, match="rate"):
+        _manager(_Transcriber()).open(prompt=None, content_type="audio/L16")
+
+
+def test_session_limits() -> None:
+    manager = _manager(_Transcriber(), max_sessions=1, max_session_bytes=8)
+    session = manager.open(prompt=None)
+
+    with pytest.raises(SessionLimitError):
+        manager.open(prompt=None)
+    with pytest.raises(UploadTooLargeError):
+        manager.append(session, b"123456789")
+
+    manager.close(session)
+    assert manager.get(session.id) is None